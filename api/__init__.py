@@ -0,0 +1,13 @@
+"""
+Headless HTTP API for the RAG-based Technical Support Assistant.
+
+This package contains:
+- app: FastAPI application exposing the chatbot pipeline as JSON and SSE endpoints
+- prefork: multi-worker launcher sharing read-only state copy-on-write (run as a script)
+"""
+
+from api.app import create_app
+
+__all__ = [
+    'create_app',
+]
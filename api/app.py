@@ -0,0 +1,216 @@
+"""
+Headless FastAPI application for the RAG pipeline.
+
+This module handles:
+- POST /answer: run chatbot_router and return the final answer as JSON
+- POST /answer/stream: the same pipeline as Server-Sent Events of text deltas
+- End-to-end request timeouts: the pipeline gets the deadline and falls back to
+  retrieved answers; 504 / SSE error event only if even that does not arrive
+- Fast "busy" rejections when the admission queue is full (503 / SSE error event)
+- Warming the embedding model, LLM clients and query caches before reporting ready
+- /health and /metrics, and optionally the Gradio UI on the same server
+
+Usage:
+    python api/app.py --port 8000
+    python api/app.py --port 8000 --ui      # also serve the Gradio UI at /ui
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api.warmup import warm_up
+from chatbot import BUSY_MESSAGE, chatbot_router
+from context_expansion.intent_llm import intent_llm
+from generator.generator_llm import generator_llm
+from retriever.vector_store import get_vectorstore
+from utils.constants import (
+    API_PORT,
+    API_REQUEST_TIMEOUT_SECONDS,
+    API_MAX_TIMEOUT_SECONDS,
+    API_DEADLINE_GRACE_SECONDS,
+    ADMISSION_RETRY_AFTER_SECONDS,
+    UI_MOUNT_PATH,
+)
+from utils.logging_setup import get_logger, setup_logging
+from utils.metrics import CONTENT_TYPE, metrics_client_allowed, render_metrics
+
+logger = get_logger("api")
+
+
+class AnswerRequest(BaseModel):
+    query: str
+    history: List[dict] = Field(default_factory=list)  # [{"role": "user"|"assistant", "content": "..."}]
+    timeout_seconds: Optional[float] = None
+
+
+def _request_id(request):
+    """Use the caller's X-Request-ID so traces can be joined with ticketing logs."""
+    return request.headers.get("x-request-id") or uuid.uuid4().hex[:12]
+
+
+def _timeout(body):
+    if body.timeout_seconds is None:
+        return API_REQUEST_TIMEOUT_SECONDS
+    return max(0.1, min(body.timeout_seconds, API_MAX_TIMEOUT_SECONDS))
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _next_chunk(chunks, deadline):
+    """
+    Pull the next chunk from the pipeline, bounded by the request deadline.
+
+    Returns:
+        str or None: Next chunk, or None when the pipeline is finished
+
+    Raises:
+        asyncio.TimeoutError: If the deadline passes first
+    """
+    try:
+        return await asyncio.wait_for(chunks.__anext__(), max(0.0, deadline - time.monotonic()))
+    except StopAsyncIteration:
+        return None
+
+
+def create_app(mount_ui=False):
+    """
+    Create the API application.
+
+    Args:
+        mount_ui (bool): Also serve the Gradio UI at UI_MOUNT_PATH
+
+    Returns:
+        FastAPI: Application
+    """
+
+    @asynccontextmanager
+    async def lifespan(app):
+        # Load the embedding model and create the LLM clients before taking traffic
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            loop.run_in_executor(None, get_vectorstore),
+            loop.run_in_executor(None, generator_llm),
+            loop.run_in_executor(None, intent_llm),
+        )
+        # Yesterday's popular queries: cache their embeddings and retrieval results (and answers)
+        try:
+            await loop.run_in_executor(None, warm_up)
+        except Exception:
+            logger.exception("Warm-up failed; starting with cold caches")
+        app.state.ready = True
+        logger.info("API ready (pid %d)", os.getpid())
+        yield
+
+    app = FastAPI(title="Ubuntu RAG support API", lifespan=lifespan)
+    app.state.ready = False
+
+    @app.post("/answer")
+    async def answer(body: AnswerRequest, request: Request):
+        request_id = _request_id(request)
+        timeout = _timeout(body)
+        # The pipeline gets the caller's budget; the grace period lets it send its fallback answer
+        deadline = time.monotonic() + timeout + API_DEADLINE_GRACE_SECONDS
+        chunks = chatbot_router(body.query, body.history, request_id=request_id, timeout_seconds=timeout)
+
+        text = ""
+        try:
+            while (chunk := await _next_chunk(chunks, deadline)) is not None:
+                text = chunk
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail={"request_id": request_id, "error": "timeout"})
+        finally:
+            await chunks.aclose()
+
+        if text == BUSY_MESSAGE:
+            raise HTTPException(
+                status_code=503,
+                detail={"request_id": request_id, "error": "busy"},
+                headers={"Retry-After": str(ADMISSION_RETRY_AFTER_SECONDS)},
+            )
+        return {"request_id": request_id, "answer": text}
+
+    @app.post("/answer/stream")
+    async def answer_stream(body: AnswerRequest, request: Request):
+        request_id = _request_id(request)
+        timeout = _timeout(body)
+        deadline = time.monotonic() + timeout + API_DEADLINE_GRACE_SECONDS
+
+        async def events():
+            # chatbot_router yields the full text so far; send only what was appended,
+            # or a replace event when the text changes (e.g. the placeholder is swapped out)
+            chunks = chatbot_router(body.query, body.history, request_id=request_id, timeout_seconds=timeout)
+            previous = ""
+            try:
+                while (chunk := await _next_chunk(chunks, deadline)) is not None:
+                    if await request.is_disconnected():
+                        return
+                    if chunk == BUSY_MESSAGE:
+                        yield _sse("error", {"request_id": request_id, "error": "busy",
+                                             "retry_after": ADMISSION_RETRY_AFTER_SECONDS})
+                        return
+                    if chunk.startswith(previous):
+                        if len(chunk) > len(previous):
+                            yield _sse("delta", {"text": chunk[len(previous):]})
+                    else:
+                        yield _sse("replace", {"text": chunk})
+                    previous = chunk
+                yield _sse("done", {"request_id": request_id})
+            except asyncio.TimeoutError:
+                yield _sse("error", {"request_id": request_id, "error": "timeout"})
+            finally:
+                await chunks.aclose()
+
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Request-ID": request_id},
+        )
+
+    @app.get("/health")
+    async def health():
+        return {"ready": app.state.ready, "pid": os.getpid()}
+
+    @app.get("/metrics")
+    async def metrics(request: Request):
+        # The API binds every interface; metrics stay local unless METRICS_HOST opens them
+        if not metrics_client_allowed(request.client.host if request.client else None):
+            raise HTTPException(status_code=404)
+        return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
+
+    if mount_ui:
+        import gradio as gr
+        from ui import create_demo
+
+        app = gr.mount_gradio_app(app, create_demo(chatbot_router), path=UI_MOUNT_PATH)
+
+    return app
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the headless RAG API")
+    parser.add_argument("--host", default="0.0.0.0", help="Host to bind")
+    parser.add_argument("--port", type=int, default=API_PORT, help="Port to bind")
+    parser.add_argument("--ui", action="store_true", help=f"Also serve the Gradio UI at {UI_MOUNT_PATH}")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    setup_logging()
+    uvicorn.run(create_app(mount_ui=args.ui), host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,371 @@
+"""
+Pre-fork launcher for the headless API.
+
+This module handles:
+- Loading the embedding model and read-only indexes once in a master process
+- Freezing the garbage collector so the shared pages stay shared after fork
+- Forking N uvicorn workers that accept on one shared listening socket
+- Worker heartbeats, a per-worker status file, and respawning dead or silent workers
+- Graceful reload on SIGHUP: reload read-only state, then replace workers one at a time
+
+Milvus connections, LLM clients, log writer threads and executors are created
+after fork in each worker (see the os.register_at_fork hooks next to them).
+The master never serves requests.
+
+Usage:
+    python api/prefork.py --workers 4 --port 8000
+    kill -HUP <master pid>      # reload indexes / answer store and roll the workers
+    kill -TERM <master pid>     # graceful shutdown
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import signal
+import socket
+import argparse
+import selectors
+import threading
+
+# Tokenizer thread pools must not be started before fork
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+import uvicorn
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api.app import create_app
+from generator.response_cache import get_response_cache
+from retriever.answer_bank import get_answer_bank
+from retriever.answer_store import get_answer_store
+from retriever.lexical_index import get_lexical_index
+from retriever.topic_router import load_centroids, partitions_match
+from retriever.vector_store import get_embeddings
+from utils.constants import (
+    API_PORT,
+    RETRIEVAL_SERVICE_ENV,
+    PREFORK_DEFAULT_WORKERS,
+    PREFORK_HEARTBEAT_SECONDS,
+    PREFORK_HEARTBEAT_TIMEOUT_SECONDS,
+    PREFORK_GRACEFUL_TIMEOUT_SECONDS,
+    PREFORK_STATUS_FILE,
+)
+from utils.logging_setup import get_logger, setup_logging
+from utils.metrics import REQUESTS, REQUESTS_IN_FLIGHT
+from utils.timing_log import set_worker_index
+
+logger = get_logger("prefork")
+
+
+def rss_bytes(pid):
+    """Resident set size of a process from /proc (0 if unavailable)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def preload(mount_ui):
+    """
+    Load everything read-only that workers can share copy-on-write.
+
+    Args:
+        mount_ui (bool): Also build the Gradio UI
+
+    Returns:
+        FastAPI: Application object the workers will serve
+    """
+    if not os.environ.get(RETRIEVAL_SERVICE_ENV):
+        # Weights only: running inference here would start thread pools before fork
+        get_embeddings()
+    get_lexical_index()
+    get_answer_store()
+    load_centroids()
+    app = create_app(mount_ui=mount_ui)
+
+    # Move everything allocated so far out of the collector's reach, so
+    # collections in the workers do not write to (and un-share) these pages
+    gc.collect()
+    gc.freeze()
+    return app
+
+
+def reload_state(mount_ui):
+    """
+    Drop and reload the read-only state (e.g. after store_data.py rebuilt the indexes).
+
+    Returns:
+        FastAPI: New application object
+    """
+    gc.unfreeze()
+    get_lexical_index.cache_clear()
+    get_answer_store.cache_clear()
+    load_centroids.cache_clear()
+    partitions_match.cache_clear()
+    get_response_cache.cache_clear()
+    get_answer_bank.cache_clear()
+    return preload(mount_ui)
+
+
+def _heartbeat(index, app, fd):
+    """Report worker health to the master until the process exits."""
+    while True:
+        beat = {
+            "index": index,
+            "pid": os.getpid(),
+            "ready": bool(getattr(app.state, "ready", False)),
+            "in_flight": REQUESTS_IN_FLIGHT.total(),
+            "requests": REQUESTS.total(),
+            "rss_bytes": rss_bytes(os.getpid()),
+        }
+        try:
+            os.write(fd, (json.dumps(beat) + "\n").encode())
+        except OSError:
+            return
+        time.sleep(PREFORK_HEARTBEAT_SECONDS)
+
+
+def run_worker(index, app, sock, heartbeat_fd, num_workers, generation=0):
+    """
+    Serve the app on the shared socket (runs in the forked child, never returns).
+    """
+    for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+        signal.signal(sig, signal.SIG_DFL)
+    signal.set_wakeup_fd(-1)
+
+    set_worker_index(index, generation)
+    setup_logging()
+
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        # Share the cores between workers instead of oversubscribing them
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) // num_workers))
+
+    threading.Thread(target=_heartbeat, args=(index, app, heartbeat_fd), daemon=True).start()
+
+    server = uvicorn.Server(uvicorn.Config(
+        app, log_level="warning", timeout_graceful_shutdown=PREFORK_GRACEFUL_TIMEOUT_SECONDS
+    ))
+    code = 0
+    try:
+        server.run(sockets=[sock])
+    except BaseException:
+        logger.exception("Worker %d crashed", index)
+        code = 1
+    os._exit(code)
+
+
+class _Worker:
+    def __init__(self, index, pid, fd):
+        self.index = index
+        self.pid = pid
+        self.fd = fd
+        self.started = time.time()
+        self.last_beat = time.monotonic()
+        self.buffer = b""
+        self.health = {}
+        self.stopping = False
+
+
+class Master:
+    """
+    Fork, watch and replace the worker processes.
+    """
+
+    def __init__(self, host, port, num_workers, mount_ui, status_file):
+        self.num_workers = num_workers
+        self.mount_ui = mount_ui
+        self.status_file = status_file
+        self.workers = {}          # pid -> _Worker
+        self.restarts = 0
+        self.generation = 0
+        self.pending_signals = []
+        self.selector = selectors.DefaultSelector()
+
+        self.sock = socket.create_server((host, port), backlog=2048)
+        self.app = preload(mount_ui)
+
+        # Signals only set flags; the main loop is woken through this pipe
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        signal.set_wakeup_fd(self._wake_w)
+        self.selector.register(self._wake_r, selectors.EVENT_READ, None)
+        for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+            signal.signal(sig, self._on_signal)
+
+    def _on_signal(self, signum, frame):
+        self.pending_signals.append(signum)
+
+    def spawn(self, index):
+        """Fork one worker for slot index."""
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            for worker in self.workers.values():
+                os.close(worker.fd)
+            run_worker(index, self.app, self.sock, write_fd, self.num_workers, self.generation)
+        os.close(write_fd)
+        os.set_blocking(read_fd, False)
+        worker = _Worker(index, pid, read_fd)
+        self.workers[pid] = worker
+        self.selector.register(read_fd, selectors.EVENT_READ, worker)
+        logger.info("Started worker %d (pid %d)", index, pid)
+        return worker
+
+    def _read_heartbeats(self, worker):
+        try:
+            data = os.read(worker.fd, 65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self.selector.unregister(worker.fd)
+            return
+        worker.buffer += data
+        *lines, worker.buffer = worker.buffer.split(b"\n")
+        for line in lines:
+            try:
+                worker.health = json.loads(line)
+                worker.last_beat = time.monotonic()
+            except json.JSONDecodeError:
+                continue
+
+    def _reap(self):
+        """Collect exited workers and refill their slots unless they were being replaced."""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker = self.workers.pop(pid, None)
+            if worker is None:
+                continue
+            try:
+                self.selector.unregister(worker.fd)
+            except (KeyError, ValueError):
+                pass
+            os.close(worker.fd)
+            if not worker.stopping:
+                logger.warning("Worker %d (pid %d) exited with status %d; respawning",
+                               worker.index, pid, os.waitstatus_to_exitcode(status))
+                self.restarts += 1
+                self.spawn(worker.index)
+
+    def _check_liveness(self):
+        now = time.monotonic()
+        for worker in list(self.workers.values()):
+            if not worker.stopping and now - worker.last_beat > PREFORK_HEARTBEAT_TIMEOUT_SECONDS:
+                logger.warning("Worker %d (pid %d) missed heartbeats; killing", worker.index, worker.pid)
+                os.kill(worker.pid, signal.SIGKILL)
+
+    def write_status(self):
+        """Write per-worker health for operators and the benchmark."""
+        now = time.monotonic()
+        status = {
+            "master_pid": os.getpid(),
+            "master_rss_bytes": rss_bytes(os.getpid()),
+            "generation": self.generation,
+            "restarts": self.restarts,
+            "workers": [
+                {
+                    "index": worker.index,
+                    "pid": worker.pid,
+                    "stopping": worker.stopping,
+                    "uptime_s": round(time.time() - worker.started, 1),
+                    "heartbeat_age_s": round(now - worker.last_beat, 1),
+                    **{key: value for key, value in worker.health.items() if key not in ("index", "pid")},
+                }
+                for worker in sorted(self.workers.values(), key=lambda w: (w.index, w.started))
+            ],
+        }
+        os.makedirs(os.path.dirname(self.status_file) or ".", exist_ok=True)
+        tmp = f"{self.status_file}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(status, f, indent=2)
+        os.replace(tmp, self.status_file)
+
+    def poll(self, timeout):
+        """Process heartbeats, exits and signals for up to timeout seconds."""
+        for key, _ in self.selector.select(timeout):
+            if key.data is None:
+                try:
+                    while os.read(self._wake_r, 512):
+                        pass
+                except BlockingIOError:
+                    pass
+            else:
+                self._read_heartbeats(key.data)
+        self._reap()
+        self._check_liveness()
+
+    def reload(self):
+        """Reload read-only state, then replace workers one at a time once each successor is ready."""
+        logger.info("Reloading (generation %d)", self.generation + 1)
+        self.app = reload_state(self.mount_ui)
+        self.generation += 1
+        for old in [w for w in self.workers.values() if not w.stopping]:
+            new = self.spawn(old.index)
+            deadline = time.monotonic() + PREFORK_HEARTBEAT_TIMEOUT_SECONDS
+            while new.pid in self.workers and not new.health.get("ready") and time.monotonic() < deadline:
+                self.poll(PREFORK_HEARTBEAT_SECONDS)
+            # uvicorn stops accepting, finishes in-flight requests, then exits
+            old.stopping = True
+            os.kill(old.pid, signal.SIGTERM)
+
+    def stop(self):
+        """Gracefully stop every worker, killing any that outlive the grace period."""
+        logger.info("Shutting down %d workers", len(self.workers))
+        for worker in self.workers.values():
+            worker.stopping = True
+            os.kill(worker.pid, signal.SIGTERM)
+        deadline = time.monotonic() + PREFORK_GRACEFUL_TIMEOUT_SECONDS
+        while self.workers and time.monotonic() < deadline:
+            self.poll(0.2)
+        for worker in self.workers.values():
+            os.kill(worker.pid, signal.SIGKILL)
+
+    def run(self):
+        for index in range(self.num_workers):
+            self.spawn(index)
+        last_status = 0.0
+        while True:
+            self.poll(PREFORK_HEARTBEAT_SECONDS)
+            while self.pending_signals:
+                signum = self.pending_signals.pop(0)
+                if signum == signal.SIGHUP:
+                    self.reload()
+                elif signum in (signal.SIGTERM, signal.SIGINT):
+                    self.stop()
+                    self.write_status()
+                    return
+            if time.monotonic() - last_status >= PREFORK_HEARTBEAT_SECONDS:
+                self.write_status()
+                last_status = time.monotonic()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the API as a pre-forked multi-worker server")
+    parser.add_argument("--workers", type=int, default=PREFORK_DEFAULT_WORKERS, help="Worker processes")
+    parser.add_argument("--host", default="0.0.0.0", help="Host to bind")
+    parser.add_argument("--port", type=int, default=API_PORT, help="Port to bind")
+    parser.add_argument("--ui", action="store_true", help="Also serve the Gradio UI")
+    parser.add_argument("--status-file", default=PREFORK_STATUS_FILE, help="Where per-worker health is written")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    setup_logging()
+    logger.info("Master %d preloading shared state for %d workers", os.getpid(), args.workers)
+    Master(args.host, args.port, args.workers, args.ui, args.status_file).run()
@@ -0,0 +1,173 @@
+"""
+Startup warm-up from historical query logs.
+
+This module handles:
+- Picking the most frequent queries from the timing log, plus the UI's example queries
+- Running them through retrieval so their embeddings and results are cached
+- Optionally generating their answers into the response cache (WARMUP=generate)
+- Appending a warm-up record (duration, counts, cache sizes) to WARMUP_LOG_FILE
+
+The API runs warm_up before it reports ready; chatbot.py runs it before the
+UI starts. Warm-up stops after WARMUP_MAX_SECONDS so a slow backend cannot
+hold back startup. timing/analyze_warmup.py reports the cache hit ratio over
+the traffic that followed each warm-up.
+"""
+
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from generator.generator_llm import generator_llm
+from generator.prompt_builder import build_prompt
+from generator.response_cache import cache_key, get_response_cache
+from llm.base import LLMBackendError
+from retriever.answer_store import collection_version
+from retriever.query_cache import get_embedding_cache, get_retrieval_cache
+from retriever.retriever import retrieve_context_batch
+from retriever.vector_store import get_vectorstore
+from utils.constants import (
+    DEFAULT_QUALITY_TIER,
+    DEFAULT_RETRIEVAL_K,
+    HIGH_SIMILARITY_THRESHOLD,
+    WARMUP_MODE_ENV,
+    WARMUP_TOP_QUERIES,
+    WARMUP_BATCH_SIZE,
+    WARMUP_MAX_SECONDS,
+    WARMUP_LOG_FILE,
+)
+from utils.deadline import DeadlineExceeded, deadline_scope
+from utils.helpers import normalize_query
+from utils.logging_setup import get_logger
+from utils.metrics import uncounted_lookups
+from utils.timing_log import get_timing_writer, read_timing_records
+
+logger = get_logger("warmup")
+
+WARMUP_MODES = ("off", "retrieval", "generate")
+
+
+def top_logged_queries(limit=WARMUP_TOP_QUERIES):
+    """
+    Most frequent queries in the timing log (including the legacy timing_log.json).
+
+    Queries are counted after normalization; each is returned in its most
+    common spelling, since retrieval is cached by the exact text.
+
+    Args:
+        limit (int): Number of queries to return
+
+    Returns:
+        list: Query strings, most frequent first
+    """
+    counts = Counter()
+    spellings = {}
+    for record in read_timing_records():
+        query = record.get("query")
+        if not query or record.get("status") == "BUSY":
+            continue
+        normalized = normalize_query(query)
+        counts[normalized] += 1
+        spellings.setdefault(normalized, Counter())[query] += 1
+    return [spellings[normalized].most_common(1)[0][0] for normalized, _ in counts.most_common(limit)]
+
+
+def example_queries():
+    """The UI's example queries, or none when gradio is not installed."""
+    try:
+        from ui import get_example_queries
+    except ImportError:
+        return []
+    return get_example_queries()
+
+
+def _warm_answer(query, context, search_info, time_left):
+    """
+    Generate and cache the answer stream_response would give to a first-turn query.
+
+    Returns:
+        bool: True if a new answer was cached
+    """
+    llm = generator_llm()
+    cache = get_response_cache()
+    version = collection_version()
+    if version is None:
+        # Answers are only cached against a versioned collection
+        return False
+    key = cache_key(query, search_info["doc_ids"], [], llm.model_id, llm.params, version)
+    if cache.get(key)[0] is not None:
+        return False
+    try:
+        with deadline_scope(time_left):
+            response = llm.generate_text(build_prompt(user_question=query, context=context, history=[]))
+    except (LLMBackendError, DeadlineExceeded) as e:
+        logger.warning("Warm-up generation failed for %r: %s", query, e)
+        return False
+    cache.put(key, response, version)
+    return True
+
+
+def warm_up(mode=None, limit=WARMUP_TOP_QUERIES, max_seconds=WARMUP_MAX_SECONDS):
+    """
+    Fill the process caches with the most frequent queries.
+
+    Args:
+        mode (str, optional): "off", "retrieval" or "generate" (default: WARMUP env, else "retrieval")
+        limit (int): Logged queries to warm (example queries are always included)
+        max_seconds (float): Time after which warm-up stops
+
+    Returns:
+        dict or None: Warm-up record, or None when warm-up is off
+    """
+    mode = mode or os.environ.get(WARMUP_MODE_ENV, "retrieval")
+    if mode not in WARMUP_MODES:
+        raise ValueError(f"Unknown {WARMUP_MODE_ENV} {mode!r} (expected one of {', '.join(WARMUP_MODES)})")
+    if mode == "off":
+        return None
+
+    start = time.perf_counter()
+    stop_at = start + max_seconds
+    queries = list(dict.fromkeys(example_queries() + top_logged_queries(limit)))
+    vectorstore = get_vectorstore()
+
+    retrieved = answered = 0
+    # Warm-up lookups are not traffic; counting them would skew the cache hit ratios
+    with uncounted_lookups():
+        for i in range(0, len(queries), WARMUP_BATCH_SIZE):
+            if time.perf_counter() >= stop_at:
+                break
+            batch = queries[i:i + WARMUP_BATCH_SIZE]
+            # Same k and tier as stream_response at full service, so the cache keys match
+            results = retrieve_context_batch(
+                vectorstore, batch, k=DEFAULT_RETRIEVAL_K, quality_tier=DEFAULT_QUALITY_TIER,
+                return_search_info=True
+            )
+            retrieved += len(batch)
+            if mode != "generate":
+                continue
+            for query, (context, score, search_info) in zip(batch, results):
+                time_left = stop_at - time.perf_counter()
+                if time_left <= 0:
+                    break
+                if score >= HIGH_SIMILARITY_THRESHOLD and _warm_answer(query, context, search_info, time_left):
+                    answered += 1
+
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "pid": os.getpid(),
+        "mode": mode,
+        "queries": len(queries),
+        "retrieved": retrieved,
+        "answered": answered,
+        "duration_s": round(time.perf_counter() - start, 3),
+        "completed": retrieved == len(queries),
+        "embedding_cache_entries": len(get_embedding_cache()),
+        "retrieval_cache_entries": len(get_retrieval_cache()),
+    }
+    get_timing_writer(WARMUP_LOG_FILE).write(record)
+    logger.info("Warm-up (%s): %d/%d queries retrieved, %d answers generated in %.1fs",
+                mode, retrieved, len(queries), answered, record["duration_s"])
+    return record
@@ -1,142 +1,408 @@
 """
 Main chatbot application with built-in latency measurement.
 
+Every request is traced (utils/tracing.py): spans for intent analysis,
+retrieval, prompt building, streamed generation (with time to first token)
+and UI yields are exported to timing/traces.jsonl, and per-stage totals are
+appended to the timing log. Stage latency histograms, status counters and
+in-flight/queue gauges are served in Prometheus format on METRICS_PORT.
+
+Requests are admitted through a bounded queue (utils/admission.py) and
+answered with BUSY_MESSAGE when it is full; each stage runs on its own
+bounded executor. Under sustained load, utils/degradation.py switches
+admitted requests to cheaper modes, down to retrieval-only answers.
+Concurrent identical requests share one pipeline execution (utils/single_flight.py).
+Every request runs under a deadline (utils/deadline.py) that bounds its LLM
+calls; if generation fails or runs out of time the retrieved answers are returned.
+Answers are cached by query, retrieved documents, history and model settings
+(generator/response_cache.py), so a repeat is streamed without an LLM call.
+First-turn questions close to a high-traffic cluster are answered from the
+precomputed answer bank (retriever/answer_bank.py) without intent or generation.
+Greetings, one-word replies and obvious component problems are classified by
+rules (context_expansion/intent_rules.py); only the rest costs an intent LLM call.
+A reply to a follow-up question is merged with the original question
+(context_expansion/clarification.py) and answered without classifying it again.
+In single-call mode (PIPELINE_MODE=single_call) retrieval runs first and one
+LLM call either asks a clarification question or answers (generator/single_call.py).
 """
 
 import os
+import re
 import sys
-import asyncio
 import time
-import json
+import functools
 from datetime import datetime
 
 # Add parent directory to path for imports
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from context_expansion.clarification import merge_clarification, pending_clarification
 from context_expansion.intent_analyzer import analyze_intent
+from context_expansion.intent_rules import classify_intent
 from generator.generator_llm import generator_llm
-from generator.prompt_builder import build_prompt
-from retriever.retriever import retrieve_context
+from generator.prompt_builder import _format_conversation_history, build_prompt, build_single_call_prompt
+from generator.single_call import SingleCallParser
+from generator.response_cache import cache_key, get_response_cache
+from llm.base import LLMBackendError
+from retriever.answer_bank import get_answer_bank
+from retriever.answer_store import collection_version
+from retriever.client import RetrievalServiceClient
+from retriever.retriever import embed_queries, retrieve_context
 from retriever.vector_store import get_vectorstore
-from utils.constants import HIGH_SIMILARITY_THRESHOLD
-from utils.helpers import validate_query
-from ui import create_demo, launch_interface
+from utils.admission import AdmissionController, AdmissionRejected, stage_executor
+from utils.constants import (
+    HIGH_SIMILARITY_THRESHOLD,
+    DEFAULT_QUALITY_TIER,
+    DEFAULT_RETRIEVAL_K,
+    DEGRADED_RETRIEVAL_K,
+    DEGRADED_QUALITY_TIER,
+    DEGRADED_MAX_NEW_TOKENS,
+    RETRIEVAL_ONLY_PAIRS,
+    PIPELINE_MODE_ENV,
+    REQUEST_DEADLINE_SECONDS,
+)
+from utils.deadline import DeadlineExceeded, deadline_scope
+from utils.degradation import (
+    DegradationController, LEVEL_NAMES, NORMAL, SKIP_INTENT, REDUCED_RETRIEVAL, SHORT_ANSWER, RETRIEVAL_ONLY
+)
+from utils.helpers import normalize_query, validate_query
+from utils.logging_setup import get_logger, sampled, setup_logging
+from utils.metrics import (
+    COALESCED_REQUESTS, LLM_CALLS_SAVED, REQUESTS_IN_FLIGHT, record_request, start_metrics_server
+)
+from utils.single_flight import SingleFlight
+from utils.timing_log import get_timing_writer
+from utils.tracing import start_trace, span, run_in_executor
 
 # Enable/disable timing measurements (set to False to disable)
 ENABLE_TIMING = True
 
-# Timing log file path
-TIMING_LOG_FILE = "timing/timing_log.json"
+logger = get_logger("chatbot")
+
+BUSY_MESSAGE = "⏳ The assistant is handling too many requests right now. Please try again in a moment."
+# Appended to a partial answer, by generation_error
+CUT_SHORT_NOTES = {
+    "timeout": "\n\n_⚠️ The answer was cut short because generation did not finish in time._",
+    "error": "\n\n_⚠️ The answer was cut short because the language model stopped responding._",
+}
+FALLBACK_MESSAGE = (
+    "I couldn't find highly relevant information for your query. "
+    "Could you provide more details about your Ubuntu issue?"
+)
+
+# Bounds the requests processed at once; the rest wait in a bounded queue
+_admission = AdmissionController()
+
+# Picks a cheaper pipeline mode for admitted requests when the queue or latency grows
+_degradation = DegradationController(_admission)
+
+# Identical requests that arrive while one is running attach to it
+_flights = SingleFlight()
 
 
 def log_timing_data(timing_data):
     """
-    Append timing data to log file.
+    Update metrics and queue timing data for the background timing log writer.
+    
+    Metrics are always updated. The record is appended to TIMING_LOG_FILE
+    (JSON Lines) off the request path; this call only enqueues it.
     
     Args:
         timing_data (dict): Dictionary containing timing information
     """
+    record_request(timing_data)
+    
     if not ENABLE_TIMING:
         return
     
-    try:
-        # Read existing data
-        if os.path.exists(TIMING_LOG_FILE):
-            with open(TIMING_LOG_FILE, 'r') as f:
-                logs = json.load(f)
-        else:
-            logs = []
-        
-        # Append new data
-        logs.append(timing_data)
-        
-        # Write back to file
-        with open(TIMING_LOG_FILE, 'w') as f:
-            json.dump(logs, f, indent=2)
-        
-        print(f"✅ Timing data logged to {TIMING_LOG_FILE}")
-    
-    except Exception as e:
-        print(f"⚠️  Failed to log timing data: {e}")
+    logger.info("⏱️  [%s] %s: intent=%.3fs retrieval=%.3fs generation=%.3fs ttft=%ss total=%.3fs",
+                timing_data["request_id"], timing_data["status"], timing_data["intent_time"],
+                timing_data["retrieval_time"], timing_data["generation_time"],
+                timing_data["ttft_time"], timing_data["total_time"])
+    get_timing_writer().write(timing_data)
 
 
-async def chatbot_router(message, history):
+def _coalesce_key(message, history):
+    """
+    Identity of a request for coalescing: the normalized query, the history
+    exactly as the prompt formats it (recent turns and the rolling summary of
+    older ones, as in response_cache.cache_key) and the follow-up it replies to.
+    """
+    return normalize_query(message), _format_conversation_history(history), pending_clarification(history)
+
+
+def _llm_calls(root):
+    """Number of LLM calls (intent and generation) a finished request made."""
+    return sum(1 for s in root.trace.spans if s.name in ("intent.llm_call", "generation"))
+
+
+async def chatbot_router(message, history, request_id=None, timeout_seconds=None, pipeline_mode=None):
     """
     Route user messages through intent analysis before generating responses.
     
-    1. Analyzes query intent (CLEAR vs AMBIGUOUS)
-    2. Returns follow-up question if AMBIGUOUS
-    3. Generates response if CLEAR
+    If an identical request (same normalized query and recent history) is
+    already running, this request attaches to it and streams its output
+    instead of running the pipeline again.
     
     Args:
         message (str): User's input message
         history (list): Conversation history
+        request_id (str, optional): Caller-supplied request id (generated if omitted)
+        timeout_seconds (float, optional): Request deadline (default: REQUEST_DEADLINE_SECONDS)
+        pipeline_mode (str, optional): "two_call" or "single_call" (default: PIPELINE_MODE env, else "two_call")
         
     Yields:
         str: Response for streaming display
     """
-    total_start = time.time() if ENABLE_TIMING else None
-    intent_start = None
-    intent_time = 0.0
+    pipeline_mode = pipeline_mode or os.environ.get(PIPELINE_MODE_ENV, "two_call")
+    flight, joined = _flights.join(
+        (_coalesce_key(message, history), pipeline_mode),
+        lambda stats: _route(message, history, request_id, stats, timeout_seconds, pipeline_mode)
+    )
+    if not joined:
+        async for chunk in flight.subscribe():
+            yield chunk
+        return
     
-    if ENABLE_TIMING:
-        print("\n" + "⏱️ "*40)
-        print("TIMING MEASUREMENT ENABLED")
-        print("⏱️ "*40)
+    # Coalesced: traced on its own, pointing at the request that did the work
+    COALESCED_REQUESTS.inc()
+    with start_trace("chat_request", request_id=request_id,
+                     coalesced_with=flight.stats.get("request_id")) as root:
+        logger.debug("Request %s coalesced with %s", root.trace.request_id, flight.stats.get("request_id"))
+        async for chunk in flight.subscribe():
+            yield chunk
+    LLM_CALLS_SAVED.inc(flight.stats.get("llm_calls", 0))
+
+
+async def _route(message, history, request_id=None, stats=None, timeout_seconds=None, pipeline_mode="two_call"):
+    """
+    Run the pipeline for one request.
     
-    print("chatbot_router - Processing message")
+    1. Analyzes query intent (CLEAR vs AMBIGUOUS); a reply to a follow-up
+       question is merged with the original question and treated as CLEAR
+    2. Returns follow-up question if AMBIGUOUS
+    3. Generates response if CLEAR
     
-    # Analyze intent (run in executor to not block)
-    if ENABLE_TIMING:
-        intent_start = time.time()
+    In single-call mode only the intent rules run here; the LLM decides
+    between a clarification question and an answer in stream_response.
     
-    loop = asyncio.get_event_loop()
-    intent = await loop.run_in_executor(None, analyze_intent, message)
+    Under overload the request runs at the current degradation level
+    (see utils/degradation.py), recorded with its timing data.
     
-    if ENABLE_TIMING and intent_start is not None:
-        intent_time = time.time() - intent_start
-        print(f"⏱️  Intent Analysis: {intent_time:.3f}s")
+    Each call is one trace: the request id and per-stage spans are exported
+    to TRACE_LOG_FILE, and the stage totals go to the timing log.
     
-    # Handle AMBIGUOUS queries
-    if intent["status"] == "AMBIGUOUS":
-        print("AMBIGUOUS - Requesting clarification (NO RETRIEVAL/GENERATION)")
+    Args:
+        message (str): User's input message
+        history (list): Conversation history
+        request_id (str, optional): Caller-supplied request id (generated if omitted)
+        stats (dict, optional): Receives the request id and the number of LLM calls made
+        timeout_seconds (float, optional): Request deadline (default: REQUEST_DEADLINE_SECONDS)
+        pipeline_mode (str): "two_call" or "single_call"
+        
+    Yields:
+        str: Response for streaming display
+    """
+    stats = {} if stats is None else stats
+    with start_trace("chat_request", request_id=request_id) as root, REQUESTS_IN_FLIGHT.track_inprogress(), \
+            deadline_scope(timeout_seconds or REQUEST_DEADLINE_SECONDS):
+        logger.debug("Processing message (request %s)", root.trace.request_id)
+        stats["request_id"] = root.trace.request_id
+        
+        # Wait for an admission slot, or fail fast when too many requests are queued
+        try:
+            with span("queue_wait", parent=root):
+                queue_wait = await _admission.acquire()
+        except AdmissionRejected as e:
+            logger.warning("Rejected request %s: %s", root.trace.request_id, e)
+            log_timing_data(_timing_record(root, message, "BUSY", {}))
+            yield BUSY_MESSAGE
+            return
+        root.set_attribute("queue_wait_s", queue_wait)
+        level = _degradation.current()
+        root.set_attribute("degradation_level", level)
         
-        if ENABLE_TIMING and total_start is not None:
-            total_time = time.time() - total_start
-            print(f"\n{'='*80}")
-            print("⏱️  LATENCY BREAKDOWN (AMBIGUOUS QUERY):")
-            print(f"{'='*80}")
-            print(f"  Intent Analysis:     {intent_time:.3f}s (100%)")
-            print(f"  Vector Retrieval:    0.000s (skipped)")
-            print(f"  Response Generation: 0.000s (skipped)")
-            print(f"  ─────────────────────────────")
-            print(f"  ⏱️  TOTAL:            {total_time:.3f}s")
-            print(f"{'='*80}\n")
+        try:
+            # Recurring first-turn questions: answer from the bank, skipping intent and generation
+            if not history and get_answer_bank() is not None:
+                with span("answer_bank", parent=root) as bank_span:
+                    banked = await run_in_executor(_match_answer_bank, message, executor=stage_executor("retrieval"))
+                    bank_span.set_attribute("hit", banked is not None)
+                if banked is not None:
+                    entry, similarity = banked
+                    log_timing_data(_timing_record(
+                        root, message, "BANKED", {"retrieval": bank_span},
+                        similarity_score=round(similarity, 4), confidence_level="High",
+                        num_sources=len(entry["source_ids"]), answer_bank_cluster=entry["cluster"]
+                    ))
+                    with span("ui_yield", parent=root):
+                        yield _banked_response(entry, similarity)
+                    return
+            
+            # A reply to our follow-up question: merge it with the original question
+            original = pending_clarification(history)
+            if original is not None:
+                message = merge_clarification(original, message)
+                root.set_attribute("clarified", True)
+            
+            # Analyze intent (run in executor to not block); only the rules run when degraded
+            # or in single-call mode, and a merged clarification is CLEAR without asking again
+            with span("intent", parent=root) as intent_span:
+                if original is not None:
+                    intent = {"status": "CLEAR", "follow_up_question": "", "source": "clarification"}
+                elif level >= SKIP_INTENT or pipeline_mode == "single_call":
+                    rule = classify_intent(message)
+                    intent = {**rule, "source": "rules"} if rule else {
+                        "status": "CLEAR", "follow_up_question": "",
+                        "source": "skipped" if level >= SKIP_INTENT else "single_call"
+                    }
+                    intent_span.set_attribute("intent.skipped", level >= SKIP_INTENT)
+                else:
+                    intent = await run_in_executor(analyze_intent, message, executor=stage_executor("intent"))
+                intent_span.set_attribute("intent.status", intent["status"])
+                root.set_attribute("intent_source", intent["source"])
+                root.set_attribute("intent_status", intent["status"])
             
-            # Log timing data
-            timing_data = {
-                "timestamp": datetime.now().isoformat(),
-                "query": message,
-                "status": "AMBIGUOUS",
-                "intent_time": round(intent_time, 3),
-                "retrieval_time": 0.0,
-                "generation_time": 0.0,
-                "total_time": round(total_time, 3),
-                "similarity_score": None,
-                "confidence_level": None
-            }
-            log_timing_data(timing_data)
+            # Handle AMBIGUOUS queries
+            if intent["status"] == "AMBIGUOUS":
+                logger.debug("AMBIGUOUS - requesting clarification (no retrieval/generation)")
+                
+                log_timing_data(_timing_record(root, message, "AMBIGUOUS", {"intent": intent_span}))
+                
+                with span("ui_yield", parent=root):
+                    yield intent["follow_up_question"]
+                return
+            
+            # Handle CLEAR queries
+            logger.debug("CLEAR - generating response")
+            single_call = intent["source"] == "single_call"
+            async for chunk in stream_response(message, history, root, intent_span, level, single_call):
+                yield chunk
+        finally:
+            _admission.release()
+            _degradation.observe((time.perf_counter_ns() - root.start_ns) / 1e9)
+            stats["llm_calls"] = _llm_calls(root)
+
+
+def _timing_record(root, message, status, spans, ttft_time=None, search_info=None, **fields):
+    """
+    Build a timing log record from a request's spans.
+    
+    Args:
+        root (Span): Request root span
+        message (str): User's input message
+        status (str): "CLEAR", "BANKED", "AMBIGUOUS", "FALLBACK" or "BUSY"
+        spans (dict): Stage spans keyed by "intent", "retrieval" and "generation"
+        ttft_time (float, optional): Seconds from request start to the first generated token
+        search_info (dict, optional): Search info returned by retrieve_context
+        **fields: Extra fields (similarity_score, confidence_level, num_sources)
         
-        yield intent["follow_up_question"]
-        return
+    Returns:
+        dict: Timing record
+    """
+    def stage_time(name):
+        return round(spans[name].duration_s, 3) if name in spans else 0.0
+
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "request_id": root.trace.request_id,
+        "query": message,
+        "status": status,
+        "queue_wait_time": round(root.attributes.get("queue_wait_s", 0.0), 3),
+        "intent_time": stage_time("intent"),
+        "intent_source": root.attributes.get("intent_source"),
+        "intent_status": root.attributes.get("intent_status"),
+        "clarified": root.attributes.get("clarified", False),
+        "retrieval_time": stage_time("retrieval"),
+        "generation_time": stage_time("generation"),
+        "ttft_time": round(ttft_time, 3) if ttft_time is not None else None,
+        "total_time": round(root.duration_s, 3),
+        "degradation_level": root.attributes.get("degradation_level", NORMAL),
+        "similarity_score": None,
+        "confidence_level": None,
+        **fields,
+    }
+    if search_info is not None:
+        record.update({
+            "search_mode": search_info["mode"],
+            "search_tier": search_info["tier"],
+            "search_params": search_info["search_params"],
+            "search_expanded": search_info["expanded"],
+            "search_in_flight": search_info["in_flight"],
+            "search_downgraded": search_info.get("downgraded", False),
+            "search_partitions": search_info["partitions"],
+            "search_cached": search_info.get("cached", False)
+        })
+    return record
+
+
+def _match_answer_bank(message):
+    """
+    Find the banked answer for a query.
+    
+    Needs the local embedding model, so the bank is not used with the shared retrieval service.
+    
+    Args:
+        message (str): User's input message
+        
+    Returns:
+        tuple or None: (entry, similarity) from AnswerBank.match
+    """
+    vectorstore = get_vectorstore()
+    if isinstance(vectorstore, RetrievalServiceClient):
+        return None
+    # The embedding is cached, so a miss does not encode the query twice
+    return get_answer_bank().match(embed_queries(vectorstore, [message])[0])
+
+
+def _banked_response(entry, similarity):
+    """
+    Format a banked answer like a generated one.
     
-    # Handle CLEAR queries
-    print("CLEAR - Generating response")
-    async for chunk in stream_response(message, history, total_start, intent_time):
-        yield chunk
+    Args:
+        entry (dict): Answer bank entry
+        similarity (float): Query-to-cluster similarity
+        
+    Returns:
+        str: Markdown response with metadata
+    """
+    return (
+        f"🟢 **High Confidence** (Score: {similarity:.2f})\n\n"
+        f"_Answer to a frequently asked question_\n\n"
+        f"{entry['answer']}\n\n"
+        f"---\n"
+        f"📊 **Response Metadata:**\n"
+        f"- Similarity Score: {similarity:.3f}\n"
+        f"- Sources Retrieved: {len(entry['source_ids'])}\n"
+        f"- Confidence Level: High\n"
+        f"- Matched Question: {entry['question']}\n\n"
+        f"_⚠️ Please verify commands before execution. This is a research prototype._"
+    )
 
 
-async def stream_response(message, history, total_start=None, intent_time=0.0):
+def _retrieval_only_answer(context, reason="The assistant is under heavy load"):
+    """
+    Format the closest Q&A pairs as the answer when generation is shed or fails.
+    
+    Args:
+        context (str): Context from retrieve_context ("User: ...\nAssistant: ..." pairs)
+        reason (str): Why no answer was generated, shown above the pairs
+        
+    Returns:
+        str: Markdown answer
+    """
+    pairs = re.split(r"\n\n(?=User: )", context)[:RETRIEVAL_ONLY_PAIRS]
+    sections = []
+    for pair in pairs:
+        question, _, answer = pair.removeprefix("User: ").partition("\nAssistant: ")
+        sections.append(f"**Similar question:** {question.strip()}\n\n{answer.strip()}")
+    return (
+        f"_{reason}, so here are the closest answers from the knowledge base:_\n\n"
+        + "\n\n".join(sections)
+    )
+
+
+async def stream_response(message, history, root=None, intent_span=None, level=NORMAL, single_call=False):
     """
     Generate and stream response for a user query.
     
@@ -144,14 +410,21 @@ async def stream_response(message, history, total_start=None, intent_time=0.0):
     1. Retrieves relevant context from vector store
     2. Checks similarity threshold
     3. Builds prompt with context and history
-    4. Generates response using LLM
-    5. Streams response word by word
+    4. Streams the LLM response as it is generated
+    5. Yields the final response with confidence metadata
+    
+    With single_call the prompt also asks the model to classify the query;
+    output starting with CLARIFICATION_MARKER is returned as a follow-up
+    question (logged as AMBIGUOUS) instead of an answer. The low-similarity
+    fallback is skipped then, because no intent call has seen the query.
     
     Args:
         message (str): User's input message
         history (list): Conversation history
-        total_start (float, optional): Start time for total latency measurement
-        intent_time (float, optional): Time taken for intent analysis
+        root (Span, optional): Request root span from chatbot_router
+        intent_span (Span, optional): Finished intent analysis span
+        level (int): Degradation level (NORMAL runs the full pipeline)
+        single_call (bool): Classify and answer with one LLM call
         
     Yields:
         str: Response chunks for streaming display
@@ -161,130 +434,232 @@ async def stream_response(message, history, total_start=None, intent_time=0.0):
         yield ""
         return
 
-    print("\n" + "="*80)
-    print("STREAM RESPONSE - Starting generation")
-    print("="*80)
+    if root is None:
+        # Called directly (not through chatbot_router): trace this call on its own
+        with start_trace("chat_request") as root:
+            async for chunk in stream_response(message, history, root, level=level):
+                yield chunk
+        return
+
+    stages = {"intent": intent_span} if intent_span is not None else {}
     
     # Yield immediately to show we're processing
     yield "🔍 Generating response..."
     
-    # Get event loop for async operations
-    loop = asyncio.get_event_loop()
+    # Fewer documents and the fast search tier when degraded
+    if level >= REDUCED_RETRIEVAL:
+        k, quality_tier = DEGRADED_RETRIEVAL_K, DEGRADED_QUALITY_TIER
+    else:
+        k, quality_tier = DEFAULT_RETRIEVAL_K, DEFAULT_QUALITY_TIER
     
     # Retrieve relevant context (run in executor to not block)
-    retrieval_start = time.time() if ENABLE_TIMING else None
-    
-    context, top_similarity_score = await loop.run_in_executor(
-        None, retrieve_context, get_vectorstore(), message
-    )
-    
-    retrieval_time = 0.0
-    if ENABLE_TIMING and retrieval_start is not None:
-        retrieval_time = time.time() - retrieval_start
-        print(f"⏱️  Vector Retrieval: {retrieval_time:.3f}s")
+    with span("retrieval", parent=root) as retrieval_span:
+        context, top_similarity_score, search_info = await run_in_executor(
+            functools.partial(
+                retrieve_context, get_vectorstore(), message, k=k,
+                quality_tier=quality_tier, return_search_info=True
+            ),
+            executor=stage_executor("retrieval")
+        )
+        retrieval_span.set_attribute("similarity_score", top_similarity_score)
+        retrieval_span.set_attribute("search_mode", search_info["mode"])
+    stages["retrieval"] = retrieval_span
     
-    print(f"\nSimilarity Score: {top_similarity_score:.4f}")
+    logger.debug("Similarity score: %.4f", top_similarity_score)
     
     # Determine confidence level based on similarity score
-    if top_similarity_score >= 0.7:
-        confidence_indicator = "🟢 **High Confidence**"
-        confidence_level = "High"
-        confidence_text = "Found highly relevant information"
-    elif top_similarity_score >= 0.5:
-        confidence_indicator = "🟡 **Medium Confidence**"
-        confidence_level = "Medium"
-        confidence_text = "Found related information"
-    else:
-        confidence_indicator = "🔴 **Low Confidence**"
-        confidence_level = "Low"
-        confidence_text = "Limited relevant information available"
+    confidence_indicator, confidence_level, confidence_text = _confidence(top_similarity_score)
     
-    # Check if retrieval quality is sufficient
-    if top_similarity_score < HIGH_SIMILARITY_THRESHOLD:
+    # Check if retrieval quality is sufficient; in single-call mode the model has
+    # not classified the query yet, so it decides between clarifying and answering
+    if top_similarity_score < HIGH_SIMILARITY_THRESHOLD and not single_call:
         fallback_msg = (
             f"{confidence_indicator} (Score: {top_similarity_score:.2f})\n\n"
-            f"_{confidence_text}_\n\n"
-            "I couldn't find highly relevant information for your query. "
-            "Could you provide more details about your Ubuntu issue?"
+            f"_{confidence_text}_\n\n{FALLBACK_MESSAGE}"
         )
-        print(f"Low similarity - returning fallback message")
-        yield fallback_msg
+        logger.debug("Low similarity - returning fallback message")
+
+        # Log low-score queries too so search effort can be correlated with score
+        log_timing_data(_timing_record(
+            root, message, "FALLBACK", stages, search_info=search_info,
+            similarity_score=round(top_similarity_score, 4), confidence_level=confidence_level
+        ))
+
+        with span("ui_yield", parent=root):
+            yield fallback_msg
         return
     
-    # Build prompt with context and history
-    prompt = build_prompt(
-        user_question=message,
-        context=context,
-        history=history
-    )
+    header = f"{confidence_indicator} (Score: {top_similarity_score:.2f})\n\n_{confidence_text}_\n\n"
+    ttft_time = None
+    generation_error = None
 
-    # Generate response (run in executor to not block)
-    generation_start = time.time() if ENABLE_TIMING else None
-    
-    response = await loop.run_in_executor(
-        None, generator_llm().generate_text, prompt
-    )
-    
-    generation_time = 0.0
-    if ENABLE_TIMING and generation_start is not None:
-        generation_time = time.time() - generation_start
-        print(f"⏱️  Response Generation: {generation_time:.3f}s")
+    llm = generator_llm()
+    params = {**llm.params, "max_new_tokens": DEGRADED_MAX_NEW_TOKENS} if SHORT_ANSWER <= level < RETRIEVAL_ONLY else None
     
-    print("\n" + "="*80)
-    print("GENERATED RESPONSE:")
-    print("="*80)
-    print(response)
-    print("="*80 + "\n")
+    # Same question, documents, history and model settings as an earlier answer: reuse it
+    cache = get_response_cache()
+    version = collection_version()
+    cache_params = params or llm.params
+    if single_call:
+        # The single-call prompt differs from the two-call one: keep their answers apart
+        cache_params = {**cache_params, "prompt": "single_call"}
+    key = cache_key(message, search_info["doc_ids"], history, llm.model_id, cache_params, version)
+    with span("response_cache", parent=root) as cache_span:
+        if version is None:
+            # No answer store: nothing identifies the collection build, so nothing is cached
+            response, cache_result = None, "off"
+        else:
+            response, cache_result = await run_in_executor(cache.get, key)
+        cache_span.set_attribute("result", cache_result)
+
+    # A cached answer is shown in one piece, with no generation span or TTFT
+    if response is None and level >= RETRIEVAL_ONLY:
+        # Shed generation entirely: answer with the closest Q&A pairs
+        response = _retrieval_only_answer(context)
+    elif response is None:
+        # Build prompt with context and history
+        with span("prompt_build", parent=root):
+            prompt = (build_single_call_prompt if single_call else build_prompt)(
+                user_question=message,
+                context=context,
+                history=history
+            )
+
+        # Stream the response; each chunk is pulled in the executor to not block.
+        # In single-call mode nothing is shown until the parser knows it is an answer
+        chunks = []
+        parser = SingleCallParser() if single_call else None
+        ui_ns = 0
+        with span("generation", parent=root) as generation_span:
+            stream = llm.generate_text_stream(prompt=prompt, params=params)
+            try:
+                while True:
+                    chunk = await run_in_executor(next, stream, None, executor=stage_executor("generation"))
+                    if chunk is None:
+                        break
+                    chunks.append(chunk)
+                    text = "".join(chunks) if parser is None else parser.feed(chunk)
+                    if text is None:
+                        continue
+                    if ttft_time is None:
+                        first_token_ns = time.perf_counter_ns()
+                        generation_span.add_event("first_token")
+                        generation_span.set_attribute("ttft_ms", round((first_token_ns - generation_span.start_ns) / 1e6, 3))
+                        ttft_time = (first_token_ns - root.start_ns) / 1e9
+                    
+                    # Time spent handing partial text to the UI
+                    yield_start = time.perf_counter_ns()
+                    yield header + text
+                    ui_ns += time.perf_counter_ns() - yield_start
+            except (LLMBackendError, DeadlineExceeded) as e:
+                generation_error = "timeout" if isinstance(e, DeadlineExceeded) else "error"
+                generation_span.set_attribute("error", generation_error)
+                logger.warning("Generation failed (%s): %s", generation_error, e)
+            
+            generation_span.set_attribute("chunks", len(chunks))
+            generation_span.set_attribute("ui_yield_ms", round(ui_ns / 1e6, 3))
+        stages["generation"] = generation_span
+
+        if parser is not None:
+            parser.finish()
+            if parser.clarification and not generation_error:
+                # The model asked for specifics: answer with its follow-up question
+                logger.debug("Single call returned a clarification (no answer)")
+                follow_up = parser.clarification
+                root.set_attribute("intent_status", "AMBIGUOUS")
+                log_timing_data(_timing_record(
+                    root, message, "AMBIGUOUS", stages, search_info=search_info,
+                    similarity_score=round(top_similarity_score, 4), confidence_level=confidence_level
+                ))
+                with span("ui_yield", parent=root):
+                    yield follow_up
+                return
+
+        response = "".join(chunks) if parser is None else parser.answer
+        if response and not generation_error and version is not None:
+            await run_in_executor(cache.put, key, response, version)
+        elif generation_error and response:
+            response += CUT_SHORT_NOTES[generation_error]
+        elif generation_error:
+            # Nothing was generated: fall back to the retrieved answers
+            response = _retrieval_only_answer(context, reason="The answer could not be generated right now")
+
+    if sampled("response"):
+        logger.info("Generated response:\n%s", response)
 
     # Count number of context sources
     num_sources = len([c for c in context.split('\n\n') if c.strip()])
     
-    # Print timing summary and log data
-    if ENABLE_TIMING and total_start is not None:
-        total_time = time.time() - total_start
-        print(f"\n{'='*80}")
-        print("⏱️  LATENCY BREAKDOWN (CLEAR QUERY):")
-        print(f"{'='*80}")
-        print(f"  Intent Analysis:     {intent_time:.3f}s ({intent_time/total_time*100:.1f}%)")
-        print(f"  Vector Retrieval:    {retrieval_time:.3f}s ({retrieval_time/total_time*100:.1f}%)")
-        print(f"  Response Generation: {generation_time:.3f}s ({generation_time/total_time*100:.1f}%)")
-        print(f"  ─────────────────────────────")
-        print(f"  ⏱️  TOTAL:            {total_time:.3f}s")
-        print(f"{'='*80}\n")
+    log_timing_data(_timing_record(
+        root, message, "CLEAR", stages, ttft_time=ttft_time, search_info=search_info,
+        similarity_score=round(top_similarity_score, 4), confidence_level=confidence_level,
+        num_sources=num_sources, generation_error=generation_error, response_cache=cache_result
+    ))
+    
+    # Yield complete response with metadata
+    with span("ui_yield", parent=root):
+        yield _format_response(response, top_similarity_score, num_sources, level)
+
+
+def _confidence(similarity_score):
+    """
+    Confidence shown for a retrieval similarity score.
+    
+    Returns:
+        tuple: (indicator, level, description)
+    """
+    if similarity_score >= 0.7:
+        return "🟢 **High Confidence**", "High", "Found highly relevant information"
+    if similarity_score >= 0.5:
+        return "🟡 **Medium Confidence**", "Medium", "Found related information"
+    return "🔴 **Low Confidence**", "Low", "Limited relevant information available"
+
+
+def _format_response(response, similarity_score, num_sources, level=NORMAL):
+    """
+    Wrap a generated answer with its confidence indicator and metadata.
+    
+    Args:
+        response (str): Answer text
+        similarity_score (float): Top retrieval similarity
+        num_sources (int): Number of context sources
+        level (int): Degradation level the request was served at
         
-        # Log timing data
-        timing_data = {
-            "timestamp": datetime.now().isoformat(),
-            "query": message,
-            "status": "CLEAR",
-            "intent_time": round(intent_time, 3),
-            "retrieval_time": round(retrieval_time, 3),
-            "generation_time": round(generation_time, 3),
-            "total_time": round(total_time, 3),
-            "similarity_score": round(top_similarity_score, 4),
-            "confidence_level": confidence_level,
-            "num_sources": num_sources
-        }
-        log_timing_data(timing_data)
-    
-    # Build response with confidence indicator and metadata
-    full_response = (
-        f"{confidence_indicator} (Score: {top_similarity_score:.2f})\n\n"
+    Returns:
+        str: Markdown response as shown in the chat
+    """
+    confidence_indicator, confidence_level, confidence_text = _confidence(similarity_score)
+    
+    # Note the degradation level in the metadata when the request was served in a cheaper mode
+    service_mode = f"- Service Mode: {LEVEL_NAMES[level]} (reduced under load)\n" if level else ""
+    
+    return (
+        f"{confidence_indicator} (Score: {similarity_score:.2f})\n\n"
         f"_{confidence_text}_\n\n"
         f"{response}\n\n"
         f"---\n"
         f"📊 **Response Metadata:**\n"
-        f"- Similarity Score: {top_similarity_score:.3f}\n"
+        f"- Similarity Score: {similarity_score:.3f}\n"
         f"- Sources Retrieved: {num_sources}\n"
-        f"- Confidence Level: {confidence_level}\n\n"
+        f"- Confidence Level: {confidence_level}\n"
+        f"{service_mode}\n"
         f"_⚠️ Please verify commands before execution. This is a research prototype._"
     )
 
-    # Yield complete response immediately
-    yield full_response
-
 
 if __name__ == "__main__":
+    from ui import create_demo, launch_interface
+    
+    from api.warmup import warm_up
+    
+    setup_logging()
+    
+    # Prometheus metrics alongside the Gradio app
+    start_metrics_server()
+    
+    # Cache the most frequent logged queries before taking traffic
+    warm_up()
+    
     # Create and launch the interface
     demo = create_demo(chatbot_router)
     launch_interface(demo, share=False, show_error=True)
@@ -0,0 +1,98 @@
+"""
+Clarification-aware routing for replies to follow-up questions.
+
+This module handles:
+- Recognising a reply to one of our follow-up questions from the conversation history
+- Merging the reply with the original question into one retrieval query
+
+The pending clarification is derived from the history sent with each
+request, not from process memory, so it does not depend on which worker
+asked the follow-up and survives restarts. Answers, fallbacks and banked
+answers open with the confidence banner ("(Score: 0.82)"); a follow-up is a
+plain question without one.
+"""
+
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from context_expansion.intent_rules import (
+    GREETING_FOLLOW_UP, HELP_FOLLOW_UP, OFF_TOPIC_FOLLOW_UP, classify_intent
+)
+
+# Rule-based follow-ups whose original message carries nothing worth merging
+# (greetings, "help me", off-topic requests): the reply is a new question
+_NO_CONTENT_RULES = {"empty", "greeting", "short_reply", "bare_task", "off_topic"}
+_NO_CONTENT_FOLLOW_UPS = {GREETING_FOLLOW_UP, HELP_FOLLOW_UP, OFF_TOPIC_FOLLOW_UP}
+
+# Part of every answer's confidence banner, never of a follow-up question
+_ANSWER_BANNER = "(Score: "
+
+
+def _last_exchange(history):
+    """
+    The last user message and the assistant's reply to it.
+
+    Supports both Gradio format (tuples) and Watsonx format (dicts).
+
+    Returns:
+        tuple or None: (user_message, assistant_message)
+    """
+    if not history:
+        return None
+    last = history[-1]
+    if isinstance(last, (list, tuple)) and len(last) == 2:
+        return str(last[0] or ""), str(last[1] or "")
+    if isinstance(last, dict) and last.get("role") == "assistant" and len(history) >= 2:
+        previous = history[-2]
+        if isinstance(previous, dict) and previous.get("role") == "user":
+            return str(previous.get("content") or ""), str(last.get("content") or "")
+    return None
+
+
+def _is_follow_up(text):
+    """Whether an assistant message is a follow-up question rather than an answer or notice."""
+    text = text.strip()
+    return text.endswith("?") and _ANSWER_BANNER not in text
+
+
+def pending_clarification(history):
+    """
+    Find the question a message answers a follow-up for.
+
+    Args:
+        history (list): Conversation history before the message
+
+    Returns:
+        str or None: The original question, or None if the last turn was not a follow-up we asked
+    """
+    exchange = _last_exchange(history)
+    if exchange is None:
+        return None
+    question, follow_up = exchange
+    if not question.strip() or not _is_follow_up(follow_up):
+        return None
+    if " ".join(follow_up.split()) in _NO_CONTENT_FOLLOW_UPS:
+        return None
+    rule = classify_intent(question)
+    if rule is not None and rule["rule"] in _NO_CONTENT_RULES:
+        return None
+    return question
+
+
+def merge_clarification(question, reply):
+    """
+    Combine the original question and the reply to its follow-up.
+
+    Args:
+        question (str): The original question
+        reply (str): The user's reply to the follow-up
+
+    Returns:
+        str: One query for retrieval and generation
+    """
+    question = question.strip()
+    if question and question[-1] not in ".?!":
+        question += "."
+    return f"{question} {reply.strip()}"
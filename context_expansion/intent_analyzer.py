@@ -3,13 +3,21 @@ Intent analysis module for query classification.
 
 This module handles:
 - Query intent classification (CLEAR vs AMBIGUOUS)
+- Deterministic pre-classification (context_expansion/intent_rules.py) before the LLM
 - JSON extraction from LLM responses
-- Fallback handling for parsing errors
+- Fallback handling for parsing errors, failed LLM calls and expired deadlines
 """
 
 import json
 from context_expansion.intent_prompt import build_intent_prompt
 from context_expansion.intent_llm import intent_llm
+from context_expansion.intent_rules import classify_intent
+from llm.base import LLMBackendError
+from utils.deadline import DeadlineExceeded
+from utils.logging_setup import get_logger
+from utils.tracing import span
+
+logger = get_logger("intent_analyzer")
 
 
 def extract_first_json(text):
@@ -44,11 +52,12 @@ def analyze_intent(user_query):
     Analyze user query intent and classify as CLEAR or AMBIGUOUS.
     
     This function:
-    1. Generates a classification prompt
-    2. Gets LLM response
-    3. Extracts and parses JSON
-    4. Ensures follow_up_question is empty for CLEAR queries
-    5. Falls back to CLEAR if parsing fails
+    1. Returns the rule-based classification when a rule is confident
+    2. Otherwise generates a classification prompt
+    3. Gets LLM response
+    4. Extracts and parses JSON
+    5. Ensures follow_up_question is empty for CLEAR queries
+    6. Falls back to CLEAR if the call or parsing fails
     
     Args:
         user_query (str): User's input query
@@ -57,19 +66,34 @@ def analyze_intent(user_query):
         dict: Classification result with keys:
             - status (str): "CLEAR" or "AMBIGUOUS"
             - follow_up_question (str): Follow-up question if AMBIGUOUS, empty if CLEAR
+            - source (str): "rules" or "llm"
+            - rule (str): Rule that decided (rules only)
     """
+    # Greetings, one-word replies and obvious component problems need no LLM call
+    with span("intent.rules") as rules_span:
+        result = classify_intent(user_query)
+        rules_span.set_attribute("rule", result["rule"] if result else None)
+    if result is not None:
+        logger.debug("Rule %s: %s", result["rule"], result["status"])
+        return {**result, "source": "rules"}
+    
     # Build classification prompt
     prompt = build_intent_prompt(user_query)
     
-    # Get LLM response
-    response = intent_llm().generate_text(prompt).strip()
+    # Get LLM response; a failed or timed-out call is treated like an unparseable one
+    try:
+        with span("intent.llm_call"):
+            response = intent_llm().generate_text(prompt).strip()
+    except (LLMBackendError, DeadlineExceeded) as e:
+        logger.warning("Intent LLM call failed (%s), falling back to CLEAR", e)
+        return {"status": "CLEAR", "follow_up_question": "", "source": "llm"}
     
     # Extract JSON from response
     json_block = extract_first_json(response)
     
-    # Log for debugging
-    print(f"Intent Analysis - Raw response: {response}")
-    print(f"Intent Analysis - Extracted JSON: {json_block}")
+    # Log for debugging (raw LLM output only for a sample of requests)
+    logger.debug("Raw response: %s", response, extra={"category": "intent_raw"})
+    logger.debug("Extracted JSON: %s", json_block)
     
     # Parse JSON if found
     if json_block:
@@ -79,13 +103,14 @@ def analyze_intent(user_query):
             # Ensure follow_up_question is empty for CLEAR status
             if result.get("status") == "CLEAR":
                 result["follow_up_question"] = ""
+            result["source"] = "llm"
             
-            print(f"Intent Analysis - Final result: {result}")
+            logger.debug("Final result: %s", result)
             return result
             
         except json.JSONDecodeError as e:
-            print(f"Intent Analysis - JSON decode error: {e}")
+            logger.warning("JSON decode error: %s", e)
     
     # Fallback: Default to CLEAR for technical queries
-    print("Intent Analysis - Fallback to CLEAR")
-    return {"status": "CLEAR", "follow_up_question": ""}
+    logger.warning("Could not parse intent response, falling back to CLEAR")
+    return {"status": "CLEAR", "follow_up_question": "", "source": "llm"}
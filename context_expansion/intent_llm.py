@@ -2,45 +2,43 @@
 LLM initialization module for intent classification.
 
 This module handles:
-- IBM Watsonx AI model initialization for intent analysis
+- Intent backend creation (watsonx, or the offline stand-in via LLM_BACKEND)
 - Model parameter configuration optimized for JSON generation
-- Warning suppression
 """
 
 import os
 import sys
-import warnings
-from ibm_watsonx_ai.foundation_models import ModelInference
+from functools import lru_cache
 
 # Add parent directory to path for imports
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from app.config import PROJECT_ID, WATSONX_CREDENTIALS, WATSONX_INTENT_MODEL_ID, WATSONX_MODEL_ID
+from llm.factory import create_backend
 
-# Suppress deprecation and lifecycle warnings for cleaner output
-warnings.filterwarnings('ignore', category=DeprecationWarning)
-warnings.filterwarnings('ignore', message='.*deprecated state.*')
+INTENT_PARAMS = {
+    "temperature": 0.1,           # Low for consistent classification
+    "max_new_tokens": 150,        # Sufficient for complete JSON responses
+    "top_p": 0.9,                 # Diverse token selection
+    "stop_sequences": ["}"]       # Stop after JSON closes
+}
 
 
+@lru_cache(maxsize=1)
 def intent_llm():
     """
-    Initialize and return IBM Watsonx AI model for intent classification.
+    Initialize and return the LLM backend for intent classification.
     
     Configured with parameters optimized for:
     - Structured JSON output
     - Complete responses (no truncation)
     - Diverse token selection for better classification
     
+    The backend is created once per process and reused by every request.
+    
     Returns:
-        ModelInference: Configured IBM Watsonx AI model instance
+        LLMBackend: Configured intent backend
     """
-    return ModelInference(
-        model_id=WATSONX_MODEL_ID,
-        credentials=WATSONX_CREDENTIALS,
-        project_id=PROJECT_ID,
-        params={
-            "temperature": 0.1,           # Low for consistent classification
-            "max_new_tokens": 150,        # Sufficient for complete JSON responses
-            "top_p": 0.9,                 # Diverse token selection
-            "stop_sequences": ["}"]       # Stop after JSON closes
-        }
-    )
+    return create_backend("intent", INTENT_PARAMS)
+
+
+# HTTP sessions must not be shared across fork(); each worker creates its own client
+os.register_at_fork(after_in_child=intent_llm.cache_clear)
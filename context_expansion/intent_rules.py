@@ -0,0 +1,180 @@
+"""
+Rule-based intent pre-classification.
+
+This module handles:
+- Greetings, one-word replies and bare requests for help (AMBIGUOUS)
+- Off-topic requests that name no component, error or failure (AMBIGUOUS)
+- Vague problem statements and tasks with nothing specific in them (AMBIGUOUS)
+- Queries naming a specific package, command or device together with a
+  problem or task, queries quoting error output, and startup failures such
+  as "won't boot" (CLEAR)
+
+The AMBIGUOUS rules run first, so a distro name or a generic word such as
+"install" never makes a greeting CLEAR. An off-topic word in a query that
+also names a component or a failure ("GNOME Weather app won't open") is left
+to the LLM. Each rule only fires when it is confident; everything else goes
+to the LLM classifier.
+Follow-up questions reuse the wording of the intent prompt's examples.
+Setting INTENT_RULES=off disables the rules.
+
+Agreement is measured on evaluation/data/intent_queries.json with
+timing/report_intent_rules.py --labelled; its "held_out" entries were
+labelled before the rules were tuned against them.
+"""
+
+import os
+import re
+import sys
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.constants import INTENT_RULES_ENV
+
+GREETING_FOLLOW_UP = "Hello! What specific Ubuntu issue are you experiencing?"
+HELP_FOLLOW_UP = "What Ubuntu issue do you need help with? Please describe the problem."
+VAGUE_FOLLOW_UP = (
+    "What specifically is broken? For example: WiFi, display, sound, boot process, or something else?"
+)
+OFF_TOPIC_FOLLOW_UP = "I can only help with Ubuntu technical support. Do you have an Ubuntu-related question?"
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9.+_-]*")
+
+GREETINGS = {
+    "hi", "hello", "hey", "hiya", "yo", "greetings", "morning", "afternoon", "evening", "good",
+    "thanks", "thank", "thx", "ty", "cheers", "bye", "goodbye", "there", "you", "all", "everyone",
+}
+
+SHORT_REPLIES = {
+    "yes", "no", "yeah", "yep", "nope", "ok", "okay", "sure", "maybe", "fine", "cool", "great",
+    "help", "me", "please", "pls", "plz", "anyone", "question", "hmm", "what", "why", "?",
+}
+
+# Off-topic subjects; only decisive when nothing else in the query is technical
+# (no "music" or "video": media players break too)
+OFF_TOPIC = {
+    "weather", "movie", "movies", "joke", "jokes", "recipe", "recipes", "cook", "cooking", "bake",
+    "cake", "pasta", "football", "soccer", "cricket", "sports", "restaurant", "poem", "horoscope",
+    "stocks", "bitcoin", "dating", "holiday", "vacation", "news", "president", "capital",
+}
+
+DISTROS = {"ubuntu", "kubuntu", "xubuntu", "lubuntu", "linux"}
+
+# Words that name nothing in particular: addressees and filler
+GENERIC = {
+    "users", "user", "folks", "guys", "people", "everybody", "friends", "community", "i", "im",
+    "need", "want", "with", "a", "an", "the", "my", "on", "in", "for", "to", "some", "can", "could",
+    "would", "someone", "somebody", "is", "am", "do", "get",
+}
+
+# Tasks that need an object before anything can be retrieved for them
+TASKS = {
+    "how", "install", "installing", "installation", "uninstall", "remove", "update", "updates",
+    "upgrade", "upgrading", "setup", "set", "up", "configure", "fix", "failed", "fails", "error",
+    "problem", "issue", "software", "program", "app", "apps", "it", "this", "that",
+}
+
+# Specific packages, commands and devices; distro names and generic words
+# ("ubuntu", "install", "update", "network", "display") are left to the LLM
+COMPONENTS = {
+    "wifi", "wi-fi", "wlan", "ethernet", "bluetooth", "touchpad", "webcam", "hdmi", "printer",
+    "dns", "dhcp", "vpn", "ssh", "samba", "nfs", "pulseaudio", "alsa", "pipewire", "nvidia",
+    "radeon", "xorg", "x11", "wayland", "gnome", "kde", "xfce", "lightdm", "gdm", "grub",
+    "bootloader", "uefi", "apt", "apt-get", "aptitude", "dpkg", "snap", "flatpak", "ppa", "sudo",
+    "fstab", "ext4", "ntfs", "cups", "ufw", "iptables", "cron", "systemd", "systemctl",
+    "networkmanager", "nmcli", "firefox", "chromium", "thunderbird", "libreoffice", "wine", "steam",
+    "docker", "virtualbox", "vmware", "nautilus", "apache", "mysql", "kubernetes", "update-alternatives",
+}
+
+# Failures: an off-topic word next to one of these is usually an app or a key
+_FAILURE = (
+    r"not|no|can'?t|cannot|won'?t|doesn'?t|don'?t|isn'?t|didn'?t|unable|fail(?:s|ed|ing)?|"
+    r"error|errors|broken|crash(?:es|ed|ing)?|freez(?:e|es|ing)|frozen|hang(?:s|ing)?|stuck|slow|"
+    r"missing|disappeared|lost|black|blank|flicker(?:s|ing)?|loop|drops?|keeps?|stopped"
+)
+_FAILURE_WORD = re.compile(rf"\b(?:{_FAILURE})\b")
+
+# Problems, tasks and questions that make a component mention specific
+_PROBLEM = re.compile(
+    rf"\b(?:{_FAILURE}|"
+    r"how|what|which|where|install|remove|uninstall|update|upgrade|change|set|setup|configure|"
+    r"enable|disable|check|fix|reset|mount|connect|find|add|run|use|switch|restore|recover)\b"
+)
+
+# Startup and power failures that are specific without naming a component
+_SYMPTOM = re.compile(
+    r"\b(?:won'?t|can'?t|cannot|doesn'?t|does not|will not|fails? to|unable to) "
+    r"(?:boot|start up|power on|shut ?down|wake up|resume)\b|\bboot ?loop\b"
+)
+
+# Error output and identifiers that only show up in specific reports
+_ERROR = re.compile(
+    r"(?:^|\s)e:\s|\berr(?:no|or)?\s*[:#]?\s*-?\d+\b|\b0x[0-9a-f]{4,}\b|\bexit (?:status|code) \d+\b|"
+    r"segmentation fault|kernel panic|permission denied|no such file|command not found|"
+    r"unmet dependenc|broken packages?|dpkg was interrupted|could not get lock|"
+    r"\b[a-z0-9]+(?:-[a-z0-9]+)*-(?:dev|common|utils|tools|dkms|driver|firmware|server|client)\b|"
+    r"\blib[a-z0-9]*\d[a-z0-9.-]*\b|\blib[a-z0-9]+-[a-z0-9.-]+\b|/(?:etc|var|usr|dev|boot|home)/"
+)
+
+# Problem statements that say nothing about what is affected
+_VAGUE = re.compile(
+    r"^(?:my |the )?(?:system|computer|pc|laptop|machine|ubuntu|linux|os|"
+    r"it|this|that|everything|something|things?)\s+"
+    r"(?:is |are )?(?:broke|broken|wrong|not working|doesn'?t work|does not work|won'?t work|messed up|bad)"
+    r"|^(?:something|everything) (?:is |went )?wrong"
+    r"|^(?:how (?:do|can) i )?fix (?:it|this|that)$"
+    r"|^what (?:should|do|can) i do$"
+    r"|^(?:it|this|that) (?:doesn'?t|does not|won'?t|isn'?t) work(?:ing)?$"
+    r"|^(?:it|this|that)(?:'s| is) (?:not working|broken)$"
+)
+
+
+def _intent(status, follow_up, rule):
+    return {"status": status, "follow_up_question": follow_up, "rule": rule}
+
+
+def classify_intent(user_query):
+    """
+    Classify a query without the LLM when a rule is confident.
+
+    Args:
+        user_query (str): User's input query
+
+    Returns:
+        dict or None: {"status", "follow_up_question", "rule"}, or None to ask the LLM
+    """
+    if os.environ.get(INTENT_RULES_ENV, "on").lower() == "off":
+        return None
+    text = " ".join(user_query.lower().split())
+    bare = text.rstrip("?!. ")
+    words = _WORD.findall(text)
+
+    if not words:
+        return _intent("AMBIGUOUS", HELP_FOLLOW_UP, "empty")
+
+    filler = GREETINGS | GENERIC | DISTROS
+    if any(word in GREETINGS for word in words) and all(word in filler for word in words):
+        return _intent("AMBIGUOUS", GREETING_FOLLOW_UP, "greeting")
+    if all(word in SHORT_REPLIES or word in filler for word in words):
+        return _intent("AMBIGUOUS", HELP_FOLLOW_UP, "short_reply")
+    if _VAGUE.search(bare):
+        return _intent("AMBIGUOUS", VAGUE_FOLLOW_UP, "vague")
+    if all(word in TASKS or word in SHORT_REPLIES or word in GENERIC for word in words):
+        # e.g. "how to install": a task without an object
+        return _intent("AMBIGUOUS", HELP_FOLLOW_UP, "bare_task")
+
+    has_component = any(word in COMPONENTS for word in words)
+    has_error = _ERROR.search(text) is not None
+    if any(word in OFF_TOPIC for word in words):
+        if has_component or has_error or _FAILURE_WORD.search(text):
+            # e.g. "GNOME Weather app won't open": the LLM decides
+            return None
+        return _intent("AMBIGUOUS", OFF_TOPIC_FOLLOW_UP, "off_topic")
+
+    if has_error:
+        return _intent("CLEAR", "", "error_pattern")
+    if _SYMPTOM.search(text):
+        return _intent("CLEAR", "", "symptom")
+    if has_component and _PROBLEM.search(text):
+        return _intent("CLEAR", "", "component")
+    # e.g. a bare "wifi" or "my ubuntu is slow": the LLM decides
+    return None
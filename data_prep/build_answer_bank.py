@@ -0,0 +1,183 @@
+"""
+Offline job that builds the answer bank for recurring questions.
+
+This script:
+- Embeds the corpus questions (from the answer store) and the logged queries
+- Clusters them with k-means and keeps the dense clusters with the most traffic
+- Retrieves context for each cluster's most central corpus question and
+  generates a grounded answer, stored with the ids of its source documents
+- Reports the share of logged traffic the bank would answer
+
+Run it after store_data.py; the bank is ignored once the collection is rebuilt.
+
+Usage:
+    python data_prep/build_answer_bank.py
+    python data_prep/build_answer_bank.py --clusters 2000 --max-entries 300 --limit 200000
+"""
+
+import os
+import sys
+import argparse
+from collections import Counter
+
+import numpy as np
+
+# Adding the parent directory to the search path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from generator.generator_llm import generator_llm
+from generator.prompt_builder import build_prompt
+from llm.base import LLMBackendError
+from retriever.answer_bank import write_answer_bank
+from retriever.answer_store import get_answer_store
+from retriever.retriever import retrieve_context
+from retriever.vector_store import get_embeddings, get_vectorstore
+from topic_partitions import cluster_embeddings
+from utils.constants import (
+    ANSWER_BANK_CLUSTERS,
+    ANSWER_BANK_MAX_ENTRIES,
+    ANSWER_BANK_MIN_CLUSTER_SIZE,
+    ANSWER_BANK_MIN_COHESION,
+    ANSWER_BANK_MATCH_THRESHOLD,
+    DEFAULT_RETRIEVAL_K,
+    HIGH_SIMILARITY_THRESHOLD,
+)
+from utils.helpers import normalize_query
+from utils.timing_log import read_timing_records
+
+
+def embed(texts, batch_size=512):
+    """Embed texts in batches and L2-normalise them."""
+    embeddings = get_embeddings()
+    vectors = np.vstack([
+        np.asarray(embeddings.embed_documents(texts[i:i + batch_size]), dtype=np.float32)
+        for i in range(0, len(texts), batch_size)
+    ])
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def logged_queries():
+    """
+    Distinct logged queries with how often each was asked.
+
+    Returns:
+        tuple: (queries, counts)
+    """
+    counts = Counter()
+    spellings = {}
+    for record in read_timing_records():
+        if record.get("query") and record.get("status") != "BUSY":
+            normalized = normalize_query(record["query"])
+            counts[normalized] += 1
+            spellings.setdefault(normalized, record["query"])
+    queries = list(counts)
+    return [spellings[q] for q in queries], np.array([counts[q] for q in queries], dtype=np.int64)
+
+
+def select_clusters(centroids, labels, vectors, is_logged, weights, args):
+    """
+    Pick dense clusters, highest traffic first.
+
+    Returns:
+        list: (cluster, size, traffic, cohesion) tuples
+    """
+    similarities = np.einsum("ij,ij->i", vectors, centroids[labels])
+    selected = []
+    for cluster in range(len(centroids)):
+        members = labels == cluster
+        corpus_members = members & ~is_logged
+        if not corpus_members.any():
+            # Nothing in the corpus to ground an answer on
+            continue
+        size = int(corpus_members.sum())
+        traffic = int(weights[members & is_logged].sum())
+        cohesion = float(similarities[members].mean())
+        if size + traffic >= args.min_size and cohesion >= args.min_cohesion:
+            selected.append((cluster, size, traffic, cohesion))
+    selected.sort(key=lambda item: (item[2], item[1]), reverse=True)
+    return selected[:args.max_entries]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the answer bank for recurring question clusters")
+    parser.add_argument("--clusters", type=int, default=ANSWER_BANK_CLUSTERS, help="k-means clusters")
+    parser.add_argument("--max-entries", type=int, default=ANSWER_BANK_MAX_ENTRIES, help="Answers to bank")
+    parser.add_argument("--min-size", type=int, default=ANSWER_BANK_MIN_CLUSTER_SIZE,
+                        help="Questions plus logged queries a banked cluster needs")
+    parser.add_argument("--min-cohesion", type=float, default=ANSWER_BANK_MIN_COHESION,
+                        help="Mean member-to-centroid similarity of a banked cluster")
+    parser.add_argument("--limit", type=int, default=None, help="Corpus questions to cluster (default: all)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    store = get_answer_store()
+    if store is None:
+        sys.exit("❌ No answer store found; run store_data.py first")
+
+    ids = store.ids[:args.limit] if args.limit else store.ids
+    questions = [question for question, _ in store.get_many(ids)]
+    queries, query_counts = logged_queries()
+    print(f"Embedding {len(questions)} corpus questions and {len(queries)} distinct logged queries...")
+
+    vectors = embed(questions + queries)
+    is_logged = np.arange(len(vectors)) >= len(questions)
+    weights = np.concatenate([np.ones(len(questions), dtype=np.int64), query_counts])
+
+    centroids, labels = cluster_embeddings(vectors, min(args.clusters, len(vectors)))
+    selected = select_clusters(centroids, labels, vectors, is_logged, weights, args)
+    print(f"{len(selected)} dense clusters selected")
+
+    vectorstore = get_vectorstore()
+    llm = generator_llm()
+    entries, bank_centroids = [], []
+    for cluster, size, traffic, cohesion in selected:
+        # The corpus question closest to the centroid stands for the cluster
+        members = np.flatnonzero((labels == cluster) & ~is_logged)
+        question = questions[members[np.argmax(vectors[members] @ centroids[cluster])]]
+
+        context, score, search_info = retrieve_context(
+            vectorstore, question, k=DEFAULT_RETRIEVAL_K, quality_tier="thorough", return_search_info=True
+        )
+        if score < HIGH_SIMILARITY_THRESHOLD:
+            continue
+        try:
+            answer = llm.generate_text(build_prompt(user_question=question, context=context, history=[]))
+        except LLMBackendError as e:
+            print(f"  ⚠️ Cluster {cluster}: generation failed ({e})")
+            continue
+
+        entries.append({
+            "cluster": cluster,
+            "question": question,
+            "answer": answer.strip(),
+            "source_ids": [int(row_id) for row_id in search_info["doc_ids"]],
+            "similarity_score": round(float(score), 4),
+            "size": size,
+            "traffic": traffic,
+            "cohesion": round(cohesion, 4),
+        })
+        bank_centroids.append(centroids[cluster])
+        print(f"  Cluster {cluster}: {size} questions, {traffic} logged queries - {question[:60]!r}")
+
+    # Offline coverage: logged traffic whose nearest banked centroid passes the threshold
+    coverage = None
+    if entries and queries:
+        nearest = (vectors[is_logged] @ np.asarray(bank_centroids).T).max(axis=1)
+        coverage = round(float(query_counts[nearest >= ANSWER_BANK_MATCH_THRESHOLD].sum() / query_counts.sum()), 4)
+
+    if not entries:
+        bank_centroids = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+    manifest = write_answer_bank(
+        bank_centroids, entries,
+        model_id=llm.model_id,
+        clusters=args.clusters,
+        min_size=args.min_size,
+        min_cohesion=args.min_cohesion,
+        match_threshold=ANSWER_BANK_MATCH_THRESHOLD,
+        logged_traffic_coverage=coverage,
+    )
+    print(f"\n✅ Answer bank: {manifest['count']} answers"
+          + (f", covering {coverage * 100:.1f}% of logged traffic" if coverage is not None else ""))
@@ -9,12 +9,12 @@ This module handles:
 
 import os
 import sys
-import re
 from datasets import load_dataset
 
 # Add parent directory to path for imports
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from app.config import HF_TOKEN
+from utils.helpers import clean_text
 
 
 def load_ubuntu_dataset():
@@ -33,31 +33,6 @@ def load_ubuntu_dataset():
     return dataset
 
 
-def clean_text(text):
-    """
-    Clean and normalize text by removing URLs, special characters, and extra whitespace.
-    
-    Args:
-        text (str): Raw text to clean
-        
-    Returns:
-        str: Cleaned and normalized text
-    """
-    # Convert to lowercase
-    text = text.lower()
-    
-    # Remove URLs
-    text = re.sub(r"http\S+", "", text)
-    
-    # Remove special characters (keep only alphanumeric and spaces)
-    text = re.sub(r"[^a-zA-Z0-9\s]", "", text)
-    
-    # Normalize whitespace
-    text = re.sub(r"\s+", " ", text)
-    
-    return text.strip()
-
-
 def preprocess_dataset(dataset):
     """
     Preprocess the Ubuntu dataset by cleaning questions and answers.
@@ -5,6 +5,7 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app.config import MILVUS_TOKEN, MILVUS_URL, COLLECTION_NAME
+from utils.constants import EMBEDDING_DIM, INDEX_PARAMS, NUM_TOPIC_PARTITIONS
 
 from pymilvus import (
     connections, FieldSchema, CollectionSchema, DataType, Collection, utility
@@ -16,13 +17,16 @@ from data_embedding import questions, answers
 # dataset.head()
 
 from data_embedding import embeddings
+from topic_partitions import cluster_embeddings, group_by_topic, save_centroids
+from retriever.topic_router import partition_name
+from retriever.answer_store import write_answer_store
+from generator.response_cache import get_response_cache
+from retriever.lexical_index import build_lexical_index
 
+# Milvus holds only ids and vectors; Q&A bodies live in the local answer store keyed by the same id
 fields = [
-    FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=True),
-    FieldSchema(name="question", dtype=DataType.VARCHAR, max_length=512),
-    FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=384),
-    FieldSchema(name="answer", dtype=DataType.VARCHAR, max_length=2048)
-
+    FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=False),
+    FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=EMBEDDING_DIM)
 ]
 
 schema = CollectionSchema(fields, description="Ubuntu RAG chatbot")
@@ -44,28 +48,41 @@ print(embeddings.shape)
 print(collection.schema)
 
 
-collection.insert([
-    questions,
-    embeddings.astype("float32").tolist(),
-    answers
-])
+ids = list(range(len(questions)))
+manifest = write_answer_store(ids, questions, answers, COLLECTION_NAME, vectors=embeddings)
+print(f"Answer store: {manifest['count']} records, "
+      f"{manifest['raw_bytes']} -> {manifest['compressed_bytes']} bytes")
+
+# Cached answers were generated from the old documents; opening the cache drops them
+get_response_cache()
+
+# BM25 inverted index over the same questions and ids for hybrid retrieval
+vocabulary_size = build_lexical_index(ids, questions)
+print(f"Lexical index: {vocabulary_size} terms")
+
+# Cluster questions into topics and store each non-empty topic in its own partition
+centroids, labels = cluster_embeddings(embeddings, NUM_TOPIC_PARTITIONS)
+centroids, topic_rows = group_by_topic(centroids, labels)
+save_centroids(centroids)
+if len(centroids) < NUM_TOPIC_PARTITIONS:
+    print(f"{NUM_TOPIC_PARTITIONS - len(centroids)} empty topics dropped")
+
+for topic, rows in enumerate(topic_rows):
+    collection.create_partition(partition_name(topic))
+    collection.insert([
+        [ids[i] for i in rows],
+        embeddings[rows].astype("float32").tolist()
+    ], partition_name=partition_name(topic))
+    print(f"{partition_name(topic)}: {len(rows)} rows")
 
 collection.flush()
 
 print(collection.num_entities)
 
-index_params = {
-    "index_type": "HNSW",
-    "metric_type": "IP",   # cosine similarity
-    "params": {
-        "M": 16,
-        "efConstruction": 200
-    }
-}
-
+# Index choice is benchmarked by timing/benchmark_index_types.py
 collection.create_index(
     field_name="embedding",
-    index_params=index_params
+    index_params=INDEX_PARAMS
 )
 
 collection.load()
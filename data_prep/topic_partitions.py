@@ -0,0 +1,83 @@
+"""
+Topic clustering module for partitioning the Milvus collection.
+
+This module handles:
+- k-means clustering of question embeddings into topics
+- Grouping rows by topic, dropping empty clusters
+- Saving centroids used by the retriever for query routing
+"""
+
+import os
+import sys
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.constants import NUM_TOPIC_PARTITIONS, TOPIC_CENTROIDS_FILE
+
+
+def cluster_embeddings(embeddings, num_topics=NUM_TOPIC_PARTITIONS, seed=42):
+    """
+    Cluster question embeddings into topics with mini-batch k-means.
+
+    Embeddings are L2-normalised so clustering on them approximates
+    spherical k-means, matching the inner-product metric of the index.
+
+    Args:
+        embeddings (numpy.ndarray): (n, dim) question embeddings
+        num_topics (int): Number of clusters
+        seed (int): Random seed
+
+    Returns:
+        tuple: (centroids, labels)
+            - centroids (numpy.ndarray): (num_topics, dim) normalised centroids
+            - labels (numpy.ndarray): Cluster index per embedding
+    """
+    kmeans = MiniBatchKMeans(
+        n_clusters=num_topics,
+        random_state=seed,
+        batch_size=4096,
+        n_init=3
+    )
+    labels = kmeans.fit_predict(embeddings)
+
+    centroids = kmeans.cluster_centers_.astype("float32")
+    centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+
+    return centroids, labels
+
+
+def group_by_topic(centroids, labels):
+    """
+    Group row indices by topic in one pass, keeping only non-empty topics.
+
+    Topics are renumbered so that partition i holds the rows of centroid i.
+
+    Args:
+        centroids (numpy.ndarray): (num_topics, dim) centroids
+        labels (numpy.ndarray): Cluster index per row
+
+    Returns:
+        tuple: (centroids, rows)
+            - centroids (numpy.ndarray): Centroids of the non-empty topics
+            - rows (list): Per kept topic, the row indices in it
+    """
+    rows_by_topic = {}
+    for i, label in enumerate(labels):
+        rows_by_topic.setdefault(int(label), []).append(i)
+    topics = sorted(rows_by_topic)
+    return centroids[topics], [rows_by_topic[topic] for topic in topics]
+
+
+def save_centroids(centroids, path=TOPIC_CENTROIDS_FILE):
+    """
+    Save topic centroids for the retriever.
+
+    Args:
+        centroids (numpy.ndarray): Normalised centroids
+        path (str): Output .npy file
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.save(path, centroids)
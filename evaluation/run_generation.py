@@ -3,8 +3,9 @@ Generation script for RAG system evaluation.
 
 This script:
 1. Loads evaluation queries
-2. Runs RAG pipeline for each query
-3. Saves results with context and generated answers
+2. Retrieves context for all queries in one batched call
+3. Runs generation for each query
+4. Saves results with context and generated answers
 """
 
 import json
@@ -14,24 +15,27 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from retriever.vector_store import get_vectorstore
-from retriever.retriever import retrieve_context
+from retriever.retriever import retrieve_context, retrieve_context_batch
 from generator.prompt_builder import build_prompt
 from generator.generator_llm import generator_llm
 
 
-def run_rag(query, vectorstore):
+def run_rag(query, vectorstore, retrieved=None):
     """
     Run the complete RAG pipeline for a single query.
     
     Args:
         query (str): User query
         vectorstore: Milvus vector store instance
+        retrieved (tuple, optional): (context, similarity) already fetched by a batch call
         
     Returns:
         dict: Result with query, context, answer, and similarity score
     """
     # Retrieve relevant context
-    context, similarity = retrieve_context(vectorstore, query)
+    if retrieved is None:
+        retrieved = retrieve_context(vectorstore, query)
+    context, similarity = retrieved
 
     # Build prompt with context
     prompt = build_prompt(
@@ -70,16 +74,24 @@ if __name__ == "__main__":
     vectorstore = get_vectorstore()
     print("Vector store ready!")
 
+    # Retrieve context for every query in one batched encode + search
+    print("Retrieving context for all queries...")
+    try:
+        retrieved = retrieve_context_batch(vectorstore, [item["query"] for item in queries])
+    except Exception as e:
+        print(f"✗ Batch retrieval failed ({e}), retrieving per query instead")
+        retrieved = [None] * len(queries)
+
     results = []
 
-    for i, item in enumerate(queries, 1):
+    for i, (item, item_retrieved) in enumerate(zip(queries, retrieved), 1):
         print(f"\n{'='*80}")
         print(f"Processing {i}/{len(queries)}: {item['id']}")
         print(f"Query: {item['query']}")
         print(f"{'='*80}")
         
         try:
-            output = run_rag(item["query"], vectorstore)
+            output = run_rag(item["query"], vectorstore, item_retrieved)
             results.append({
                 "id": item["id"],
                 **output
@@ -1,7 +1,17 @@
-from generator.generator_llm import generator_llm
+from functools import lru_cache
+
+from generator.generator_llm import GENERATION_PARAMS
+from llm.factory import create_backend
+
+
+@lru_cache(maxsize=1)
+def judge_llm():
+    # Same model and parameters as generation; a separate role so the stand-in returns scores
+    return create_backend("judge", GENERATION_PARAMS)
+
 
 def judge_with_llm(prompt):
-    response = generator_llm().generate_text(prompt)
+    response = judge_llm().generate_text(prompt)
     # print(response)
     # score_str = response.splitlines()[0].strip()
     return response
@@ -2,28 +2,31 @@
 LLM initialization module for response generation.
 
 This module handles:
-- IBM Watsonx AI model initialization
+- Generation backend creation (watsonx, or the offline stand-in via LLM_BACKEND)
 - Model parameter configuration
-- Warning suppression
 """
 
 import os
 import sys
-import warnings
-from ibm_watsonx_ai.foundation_models import ModelInference
+from functools import lru_cache
 
 # Add parent directory to path for imports
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from app.config import PROJECT_ID, WATSONX_CREDENTIALS, WATSONX_MODEL_ID
+from llm.factory import create_backend
 
-# Suppress deprecation and lifecycle warnings for cleaner output
-warnings.filterwarnings('ignore', category=DeprecationWarning)
-warnings.filterwarnings('ignore', message='.*deprecated state.*')
+GENERATION_PARAMS = {
+    "temperature": 0.1,              # Lower for more deterministic, factual responses
+    "max_new_tokens": 300,           # Increased from 100 to avoid truncation
+    "top_p": 0.85,                   # Slightly restricted for more focused responses
+    "repetition_penalty": 1.1,       # Prevent repetitive text
+    "stop_sequences": ["\n\nUser:", "Assistant:"]  # Stop at conversation boundaries
+}
 
 
+@lru_cache(maxsize=1)
 def generator_llm():
     """
-    Initialize and return IBM Watsonx AI model for response generation.
+    Initialize and return the LLM backend for response generation.
     
     Configured with parameters optimized for:
     - Factual, grounded responses (low temperature)
@@ -31,18 +34,13 @@ def generator_llm():
     - Focused output (controlled top_p)
     - Non-repetitive text (repetition penalty)
     
+    The backend is created once per process and reused by every request.
+    
     Returns:
-        ModelInference: Configured IBM Watsonx AI model instance
+        LLMBackend: Configured generation backend
     """
-    return ModelInference(
-        model_id=WATSONX_MODEL_ID,
-        credentials=WATSONX_CREDENTIALS,
-        project_id=PROJECT_ID,
-        params={
-            "temperature": 0.1,              # Lower for more deterministic, factual responses
-            "max_new_tokens": 300,           # Increased from 100 to avoid truncation
-            "top_p": 0.85,                   # Slightly restricted for more focused responses
-            "repetition_penalty": 1.1,       # Prevent repetitive text
-            "stop_sequences": ["\n\nUser:", "Assistant:"]  # Stop at conversation boundaries
-        }
-    )
\ No newline at end of file
+    return create_backend("generation", GENERATION_PARAMS)
+
+
+# HTTP sessions must not be shared across fork(); each worker creates its own client
+os.register_at_fork(after_in_child=generator_llm.cache_clear)
@@ -0,0 +1,219 @@
+"""
+Compact conversation history for prompts.
+
+This module handles:
+- Stripping UI decoration from assistant turns (confidence banner, metadata
+  footer, disclaimers and progress messages added by chatbot.py)
+- Capping each message at HISTORY_TURN_MAX_TOKENS
+- A rolling extractive summary of turns older than the recent window,
+  bounded by HISTORY_SUMMARY_MAX_TOKENS
+- Caching the compacted state per conversation prefix, so a request only
+  compacts the turns added since the previous one
+
+A conversation prefix is identified by a hash chained over its turns: the
+next request of the same conversation finds its previous state under the
+hash of its history minus the last turn.
+"""
+
+import os
+import re
+import sys
+import hashlib
+from functools import lru_cache
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from retriever.query_cache import LRUCache
+from utils.constants import (
+    HISTORY_CACHE_MAX_ENTRIES,
+    HISTORY_CHARS_PER_TOKEN,
+    HISTORY_SUMMARY_MAX_TOKENS,
+    HISTORY_TURN_MAX_TOKENS,
+    MAX_CONVERSATION_HISTORY_TURNS,
+)
+
+# Decoration added around answers by chatbot.py
+_BANNER = re.compile(r"^\s*(?:🟢|🟡|🔴) \*\*\w+ Confidence\*\* \(Score: [\d.]+\)\s*$")
+_ITALIC_LINE = re.compile(r"^\s*_[^_].*_\s*$")
+_FOOTER = re.compile(r"\n-{3,}\s*\n📊 \*\*Response Metadata:\*\*.*", re.DOTALL)
+_NOTE = re.compile(r"^\s*_⚠️.*_\s*$")
+_PROGRESS = "🔍 Generating response..."
+
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+# Sentences with a command, path or package are the most useful to keep
+_ACTIONABLE = re.compile(r"`|\bsudo\b|\bapt(?:-get)?\b|\bsnap\b|\bdpkg\b|/\w+|\b\w+ --?\w+")
+
+_QUESTION_TOKENS = 25  # Per summarised question
+_ANSWER_TOKENS = 35    # Per summarised answer
+
+
+def estimate_tokens(text):
+    """
+    Estimate the token count of text.
+
+    Args:
+        text (str): Any text
+
+    Returns:
+        int: Approximate number of tokens (HISTORY_CHARS_PER_TOKEN characters each)
+    """
+    return -(-len(text) // HISTORY_CHARS_PER_TOKEN)
+
+
+def strip_decoration(text):
+    """
+    Remove UI decoration from an assistant message, keeping the answer text.
+
+    Args:
+        text (str): Assistant message as shown in the chat
+
+    Returns:
+        str: Answer text on one line
+    """
+    if text.strip() == _PROGRESS:
+        return ""
+    text = _FOOTER.sub("", text)
+    lines = text.splitlines()
+    # Banner and the italic confidence / framing lines right after it
+    while lines and (not lines[0].strip() or _BANNER.match(lines[0]) or _ITALIC_LINE.match(lines[0])):
+        lines.pop(0)
+    lines = [line for line in lines if not _NOTE.match(line)]
+    return " ".join(" ".join(lines).split())
+
+
+def cap_tokens(text, max_tokens):
+    """
+    Truncate text to about max_tokens, at a word boundary.
+
+    Args:
+        text (str): Text to cap
+        max_tokens (int): Token budget
+
+    Returns:
+        str: The text, or its start followed by "…"
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    cut = text[:max_tokens * HISTORY_CHARS_PER_TOKEN]
+    return (cut.rsplit(" ", 1)[0] if " " in cut else cut) + " …"
+
+
+def _summary_line(user_msg, assistant_msg):
+    """One extractive summary line for a turn leaving the recent window."""
+    line = f"- User asked: {cap_tokens(user_msg, _QUESTION_TOKENS)}"
+    if assistant_msg:
+        sentences = _SENTENCE.split(assistant_msg)
+        key = next((s for s in sentences if _ACTIONABLE.search(s)), sentences[0])
+        line += f"; answer: {cap_tokens(key, _ANSWER_TOKENS)}"
+    return line
+
+
+def _turns(history):
+    """
+    Normalise history to (user, assistant) pairs.
+
+    Supports both Gradio format (tuples) and Watsonx format (dicts).
+    """
+    turns = []
+    for turn in history or []:
+        # Skip streaming generators
+        if hasattr(turn, "__iter__") and not isinstance(turn, (list, tuple, dict, str)):
+            continue
+        if isinstance(turn, (list, tuple)) and len(turn) == 2:
+            turns.append((str(turn[0] or ""), str(turn[1] or "")))
+        elif isinstance(turn, dict) and turn.get("content"):
+            if turn.get("role") == "user":
+                turns.append((str(turn["content"]), ""))
+            elif turn.get("role") == "assistant":
+                if turns and not turns[-1][1]:
+                    turns[-1] = (turns[-1][0], str(turn["content"]))
+                else:
+                    turns.append(("", str(turn["content"])))
+    return turns
+
+
+class HistoryManager:
+    """
+    Formats conversation history for prompts from cached, compacted state.
+
+    State per conversation prefix: (summary lines, recent compacted turns).
+    """
+
+    def __init__(self, turn_max_tokens=HISTORY_TURN_MAX_TOKENS, summary_max_tokens=HISTORY_SUMMARY_MAX_TOKENS,
+                 max_entries=HISTORY_CACHE_MAX_ENTRIES):
+        self.turn_max_tokens = turn_max_tokens
+        self.summary_max_tokens = summary_max_tokens
+        # Not an embedding or retrieval cache: kept out of the query cache hit ratios
+        self._states = LRUCache("history", max_entries, counted=False)
+
+    def _compact(self, turn):
+        user_msg, assistant_msg = turn
+        return (
+            cap_tokens(" ".join(user_msg.split()), self.turn_max_tokens),
+            cap_tokens(strip_decoration(assistant_msg), self.turn_max_tokens),
+        )
+
+    def _advance(self, state, turn, max_turns):
+        """State after one more turn: the oldest recent turn rolls into the summary."""
+        summary, recent = state
+        recent = recent + (self._compact(turn),)
+        if len(recent) > max_turns:
+            summary = summary + (_summary_line(*recent[0]),)
+            recent = recent[1:]
+            # Rolling: the oldest lines go first once the summary is over budget
+            while len(summary) > 1 and estimate_tokens("\n".join(summary)) > self.summary_max_tokens:
+                summary = summary[1:]
+        return summary, recent
+
+    def _state(self, turns, max_turns):
+        # Chained prefix hashes; the longest cached prefix is the starting point
+        keys = []
+        digest = hashlib.sha256(f"{max_turns}:{self.turn_max_tokens}:{self.summary_max_tokens}".encode("utf-8"))
+        for user_msg, assistant_msg in turns:
+            digest = digest.copy()
+            digest.update(f"\x00{user_msg}\x01{assistant_msg}".encode("utf-8"))
+            keys.append(digest.hexdigest())
+
+        start, state = 0, ((), ())
+        for i in range(len(turns), 0, -1):
+            cached = self._states.get(keys[i - 1])
+            if cached is not None:
+                start, state = i, cached
+                break
+
+        for i in range(start, len(turns)):
+            state = self._advance(state, turns[i], max_turns)
+            self._states.put(keys[i], state)
+        return state
+
+    def format(self, history, max_turns=MAX_CONVERSATION_HISTORY_TURNS):
+        """
+        Format conversation history for a prompt.
+
+        Args:
+            history (list): List of conversation turns
+            max_turns (int): Recent turns kept in full (capped); older ones are summarised
+
+        Returns:
+            str: Formatted conversation history string
+        """
+        turns = _turns(history)
+        if not turns:
+            return ""
+        summary, recent = self._state(turns, max_turns)
+
+        conversation_memory = ""
+        if summary:
+            conversation_memory += "Earlier in this conversation:\n" + "\n".join(summary) + "\n"
+        for user_msg, assistant_msg in recent:
+            if user_msg:
+                conversation_memory += f"User: {user_msg}\n"
+            if assistant_msg:
+                conversation_memory += f"Assistant: {assistant_msg}\n"
+        return conversation_memory
+
+
+@lru_cache(maxsize=1)
+def get_history_manager():
+    """Create the history manager once per process."""
+    return HistoryManager()
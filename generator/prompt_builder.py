@@ -2,46 +2,40 @@
 Prompt building module for LLM generation.
 
 This module handles:
-- Conversation history formatting
+- Conversation history formatting (compacted by generator/history_manager.py)
 - Context integration
 - Prompt template construction
+- The single-call template that either asks a clarification question or answers
 """
 
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from generator.history_manager import get_history_manager
+from utils.constants import CLARIFICATION_MARKER, CONTEXT_PREVIEW_LENGTH
+from utils.logging_setup import get_logger, sampled
+
+logger = get_logger("prompt_builder")
+
 
 def _format_conversation_history(history, max_turns=3):
     """
     Format conversation history from various input formats.
     
-    Supports both Gradio format (tuples) and Watsonx format (dicts).
+    Supports both Gradio format (tuples) and Watsonx format (dicts). UI
+    decoration is stripped, each message is capped and turns older than
+    max_turns are kept as a rolling summary (generator/history_manager.py).
     
     Args:
         history (list): List of conversation turns
-        max_turns (int): Maximum number of recent turns to include
+        max_turns (int): Maximum number of recent turns to include in full
         
     Returns:
         str: Formatted conversation history string
     """
-    recent_history = history[-max_turns:] if history else []
-    conversation_memory = ""
-
-    for turn in recent_history:
-        # Skip streaming generators
-        if hasattr(turn, "__iter__") and not isinstance(turn, (list, tuple, dict, str)):
-            continue
-
-        # Handle Gradio format: (user_message, assistant_message)
-        if isinstance(turn, (list, tuple)) and len(turn) == 2:
-            user_msg, assistant_msg = turn
-            conversation_memory += f"User: {user_msg}\nAssistant: {assistant_msg}\n"
-
-        # Handle Watsonx format: {"role": "...", "content": "..."}
-        elif isinstance(turn, dict):
-            role = turn.get("role")
-            content = turn.get("content")
-            if role and content:
-                conversation_memory += f"{role.capitalize()}: {content}\n"
-
-    return conversation_memory
+    return get_history_manager().format(history, max_turns=max_turns)
 
 
 def build_prompt(user_question, context, history):
@@ -100,12 +94,64 @@ Response Guidelines:
 
 Answer (based ONLY on Retrieved Context):"""
     
-    # Log context preview for debugging
-    print("\n" + "="*80)
-    print("RETRIEVED CONTEXT:")
-    print("="*80)
-    context_preview = context[:500] + "..." if len(context) > 500 else context
-    print(context_preview)
-    print("="*80 + "\n")
+    # Log a context preview for a sample of requests (formatted lazily, off the request path)
+    if sampled("context"):
+        logger.info("Retrieved context (%d chars):\n%.*s", len(context), CONTEXT_PREVIEW_LENGTH, context)
+    
+    return prompt.strip()
+
+
+def build_single_call_prompt(user_question, context, history):
+    """
+    Build a prompt that classifies the query and answers it in one LLM call.
+    
+    Used in single-call mode (PIPELINE_MODE=single_call), where retrieval runs
+    before any LLM call. The model either starts its output with
+    CLARIFICATION_MARKER followed by one follow-up question, or answers from
+    the retrieved context under the same rules as build_prompt.
     
-    return prompt.strip()
\ No newline at end of file
+    Args:
+        user_question (str): Current user query
+        context (str): Retrieved context from vector store
+        history (list): Conversation history
+        
+    Returns:
+        str: Complete formatted prompt for LLM
+    """
+    conversation_memory = _format_conversation_history(history, max_turns=3)
+
+    prompt = f"""You are a technical support assistant for Ubuntu systems.
+
+STEP 1 - DECIDE WHETHER THE QUERY CAN BE ANSWERED:
+- The query is AMBIGUOUS if it is too vague ("My system is broke", "It doesn't work"), lacks essential
+  details ("How do I fix it?"), is off-topic ("Recommend a movie") or asks several unrelated questions.
+- The query is CLEAR if it mentions a specific component, problem or task ("WiFi not working",
+  "Can't install packages", "How to check disk space?"). Conversation history counts as context.
+- If AMBIGUOUS: output ONLY "{CLARIFICATION_MARKER}" followed by one clarifying question asking for
+  the missing specifics, e.g. "{CLARIFICATION_MARKER} What specifically is broken? For example: WiFi,
+  display, sound, boot process, or something else?" Then stop.
+- If CLEAR: do not output the marker; answer as described in STEP 2.
+
+STEP 2 - ANSWER CLEAR QUERIES:
+1. ONLY use information explicitly stated in the "Retrieved Context" below
+2. If information is NOT in the context, you MUST say: "I don't have specific information about that in my knowledge base."
+3. DO NOT use your general knowledge about Ubuntu, Linux, or computers
+4. DO NOT make up or infer: commands, file paths, package names, configuration steps, or solutions
+5. When providing solutions, directly quote or closely paraphrase the context
+6. If context is incomplete, acknowledge what's missing rather than filling gaps with assumptions
+
+Conversation History:
+{conversation_memory}
+
+Retrieved Context (YOUR ONLY SOURCE - DO NOT GO BEYOND THIS):
+{context}
+
+User Query:
+{user_question}
+
+Output ({CLARIFICATION_MARKER} and a clarifying question, or an answer based ONLY on Retrieved Context):"""
+
+    if sampled("context"):
+        logger.info("Retrieved context (%d chars):\n%.*s", len(context), CONTEXT_PREVIEW_LENGTH, context)
+
+    return prompt.strip()
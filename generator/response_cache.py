@@ -0,0 +1,223 @@
+"""
+Exact-match cache for generated answers.
+
+This module handles:
+- Keying answers on the normalized query, the retrieved doc ids, the history
+  that reaches the prompt, and the model id and generation parameters
+- A bounded in-memory LRU per process
+- An optional SQLite tier shared by worker processes (RESPONSE_CACHE_DB)
+- Invalidation when the collection is rebuilt
+
+Keys include the collection version (the answer store's build timestamp,
+read from its manifest on every request), so answers generated against an
+older build are never served, even by a process that has not reloaded; the
+SQLite tier drops them when it is opened and when store_data.py rebuilds the
+collection. Without an answer store nothing identifies the build, and
+callers do not cache answers at all.
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from generator.prompt_builder import _format_conversation_history
+from retriever.answer_store import collection_version
+from utils.constants import (
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_DB_ENV,
+    RESPONSE_CACHE_DISK_MAX_ENTRIES,
+    RESPONSE_CACHE_TRIM_INTERVAL,
+)
+from utils.helpers import normalize_query
+from utils.logging_setup import get_logger
+from utils.metrics import RESPONSE_CACHE_LOOKUPS, lookups_counted
+
+logger = get_logger("response_cache")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    response TEXT NOT NULL,
+    last_used REAL NOT NULL
+)
+"""
+
+
+def cache_key(query, doc_ids, history, model_id, params, version):
+    """
+    Hash everything that determines a generated answer.
+
+    Args:
+        query (str): User question
+        doc_ids (list): Ids of the retrieved documents (order is ignored)
+        history (list): Conversation history (only the turns the prompt uses count)
+        model_id (str): Model identifier
+        params (dict): Generation parameters
+        version (str): Collection version from collection_version()
+
+    Returns:
+        str: Hex digest
+    """
+    material = json.dumps([
+        normalize_query(query),
+        sorted(doc_ids),
+        _format_conversation_history(history),
+        model_id,
+        params,
+        version,
+    ], sort_keys=True, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    In-memory LRU in front of an optional SQLite file.
+    """
+
+    def __init__(self, max_entries=RESPONSE_CACHE_MAX_ENTRIES, path=None,
+                 disk_max_entries=RESPONSE_CACHE_DISK_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.path = path
+        self.disk_max_entries = disk_max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes = 0
+
+    def _db(self):
+        # sqlite3 connections must not cross threads or fork(); one per thread per process
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key):
+        """
+        Look up a cached answer.
+
+        Args:
+            key (str): Key from cache_key
+
+        Returns:
+            tuple: (response or None, "memory", "disk" or "miss")
+        """
+        with self._lock:
+            response = self._entries.get(key)
+            if response is not None:
+                self._entries.move_to_end(key)
+        if response is not None:
+            self._count("memory")
+            return response, "memory"
+
+        if self.path:
+            try:
+                db = self._db()
+                row = db.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    db.execute("UPDATE responses SET last_used = julianday('now') WHERE key = ?", (key,))
+            except sqlite3.Error as e:
+                logger.warning("Response cache read failed: %s", e)
+                row = None
+            if row is not None:
+                self._remember(key, row[0])
+                self._count("disk")
+                return row[0], "disk"
+
+        self._count("miss")
+        return None, "miss"
+
+    @staticmethod
+    def _count(result):
+        if lookups_counted():
+            RESPONSE_CACHE_LOOKUPS.inc(result=result)
+
+    def put(self, key, response, version):
+        """
+        Store a generated answer in memory and, if configured, on disk.
+
+        Args:
+            key (str): Key from cache_key
+            response (str): Complete generated answer
+            version (str): Collection version the answer was generated against
+        """
+        self._remember(key, response)
+        if not self.path:
+            return
+        try:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, version, response, last_used) "
+                "VALUES (?, ?, ?, julianday('now'))",
+                (key, version, response)
+            )
+            with self._lock:
+                self._writes += 1
+                trim = self._writes % RESPONSE_CACHE_TRIM_INTERVAL == 0
+            if trim:
+                db.execute(
+                    "DELETE FROM responses WHERE key NOT IN "
+                    "(SELECT key FROM responses ORDER BY last_used DESC LIMIT ?)",
+                    (self.disk_max_entries,)
+                )
+        except sqlite3.Error as e:
+            logger.warning("Response cache write failed: %s", e)
+
+    def _remember(self, key, response):
+        with self._lock:
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, keep_version=None):
+        """
+        Drop cached answers.
+
+        Args:
+            keep_version (str, optional): Keep SQLite rows of this collection version
+        """
+        with self._lock:
+            self._entries.clear()
+        if not self.path:
+            return
+        try:
+            if keep_version is None:
+                removed = self._db().execute("DELETE FROM responses").rowcount
+            else:
+                removed = self._db().execute(
+                    "DELETE FROM responses WHERE version != ?", (keep_version,)
+                ).rowcount
+        except sqlite3.Error as e:
+            logger.warning("Response cache invalidation failed: %s", e)
+            return
+        if removed:
+            logger.info("Dropped %d cached responses", removed)
+
+
+@lru_cache(maxsize=1)
+def get_response_cache():
+    """
+    Open the response cache once per process.
+
+    Answers from earlier builds of the collection are dropped from the
+    SQLite tier on open.
+
+    Returns:
+        ResponseCache: The cache
+    """
+    cache = ResponseCache(path=os.environ.get(RESPONSE_CACHE_DB_ENV))
+    if cache.path:
+        cache.invalidate(keep_version=collection_version())
+    return cache
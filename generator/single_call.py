@@ -0,0 +1,73 @@
+"""
+Streaming parser for single-call generation output.
+
+This module handles:
+- Telling a clarification question (output starting with CLARIFICATION_MARKER)
+  from an answer as soon as enough of the stream has arrived
+- Releasing answer text chunk by chunk once it is known not to be a clarification
+- Collecting the clarification question until the stream ends
+
+Only the first len(CLARIFICATION_MARKER) non-blank characters are held back,
+so an answer starts rendering after a few tokens.
+"""
+
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.constants import CLARIFICATION_MARKER
+
+
+class SingleCallParser:
+    """
+    Incremental parser for the output of build_single_call_prompt.
+    """
+
+    def __init__(self, marker=CLARIFICATION_MARKER):
+        self.marker = marker
+        self._buffer = ""
+        self._mode = None  # None while undecided, then "answer" or "clarify"
+
+    def _decide(self):
+        text = self._buffer.lstrip()
+        if text.startswith(self.marker):
+            self._mode = "clarify"
+        elif not self.marker.startswith(text):
+            self._mode = "answer"
+
+    def feed(self, chunk):
+        """
+        Add a chunk of model output.
+
+        Args:
+            chunk (str): Next piece of the stream
+
+        Returns:
+            str or None: Answer text so far, or None while undecided or clarifying
+        """
+        self._buffer += chunk
+        if self._mode is None:
+            self._decide()
+        return self.answer if self._mode == "answer" else None
+
+    def finish(self):
+        """
+        Resolve the output once the stream has ended.
+
+        An output too short to contain the marker is an answer.
+        """
+        if self._mode is None:
+            self._mode = "clarify" if self._buffer.lstrip().startswith(self.marker) else "answer"
+
+    @property
+    def answer(self):
+        """Answer text ("" for a clarification)."""
+        return self._buffer.lstrip() if self._mode == "answer" else ""
+
+    @property
+    def clarification(self):
+        """The follow-up question, or None if the output is an answer or still undecided."""
+        if self._mode != "clarify":
+            return None
+        return self._buffer.lstrip()[len(self.marker):].strip()
@@ -0,0 +1,25 @@
+"""
+LLM backends for the RAG-based Technical Support Assistant.
+
+This package contains:
+- base: LLMBackend interface and LLMBackendError
+- watsonx: IBM Watsonx AI backend (imports ibm_watsonx_ai lazily)
+- standin: Offline stand-in that replays or synthesizes text with realistic latency
+- resilient: Deadlines, hedging, jittered retries and a circuit breaker around any backend
+- factory: create_backend, choosing the backend from LLM_BACKEND
+"""
+
+from llm.base import LLMBackend, LLMBackendError
+from llm.factory import create_backend
+from llm.resilient import CircuitOpenError, ResilientBackend
+from llm.standin import RecordingBackend, StandInBackend
+
+__all__ = [
+    'LLMBackend',
+    'LLMBackendError',
+    'create_backend',
+    'CircuitOpenError',
+    'ResilientBackend',
+    'RecordingBackend',
+    'StandInBackend',
+]
@@ -0,0 +1,53 @@
+"""
+LLM backend interface.
+
+This module handles:
+- The methods every backend provides (the subset of watsonx ModelInference the repo uses)
+- The error type backends raise for failed calls
+"""
+
+
+class LLMBackendError(Exception):
+    """Raised when a backend call fails."""
+
+
+class LLMBackend:
+    """
+    Text generation backend.
+
+    Subclasses implement generate_text and generate_text_stream. params holds
+    the default generation parameters (temperature, max_new_tokens, ...); a
+    call may pass its own params to replace them for that call. model_id
+    names the model behind the backend (part of response cache keys).
+    """
+
+    model_id = None
+
+    def __init__(self, params=None):
+        self.params = dict(params or {})
+
+    def generate_text(self, prompt, params=None):
+        """
+        Generate a complete response.
+
+        Args:
+            prompt (str): Prompt text
+            params (dict, optional): Generation parameters for this call
+
+        Returns:
+            str: Generated text
+        """
+        raise NotImplementedError
+
+    def generate_text_stream(self, prompt, params=None):
+        """
+        Generate a response as a stream of text chunks.
+
+        Args:
+            prompt (str): Prompt text
+            params (dict, optional): Generation parameters for this call
+
+        Yields:
+            str: Text chunks in order
+        """
+        raise NotImplementedError
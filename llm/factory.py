@@ -0,0 +1,79 @@
+"""
+LLM backend selection.
+
+This module handles:
+- Choosing the backend from the LLM_BACKEND environment variable
+- Applying LLM_STANDIN_* overrides to the stand-in's latency profile
+- Wrapping the backend to record prompts and responses when LLM_RECORD_FILE is set
+- Wrapping every backend with deadlines, retries, the circuit breaker and optional hedging
+"""
+
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from llm.resilient import ResilientBackend
+from llm.standin import RecordingBackend, StandInBackend
+from utils.constants import (
+    LLM_BACKEND_ENV,
+    LLM_RECORD_FILE_ENV,
+    LLM_REPLAY_FILE_ENV,
+    STANDIN_ENV_PREFIX,
+    STANDIN_TTFT_MS,
+    STANDIN_TTFT_SIGMA,
+    STANDIN_TOKENS_PER_SECOND,
+    STANDIN_ERROR_RATE,
+    STANDIN_SPIKE_RATE,
+    STANDIN_SPIKE_MS,
+    LLM_HEDGE_ENV,
+)
+
+
+def _standin_setting(name, default, cast=float):
+    value = os.environ.get(f"{STANDIN_ENV_PREFIX}{name}")
+    return default if value is None else cast(value)
+
+
+def create_backend(role, params, model_id=None):
+    """
+    Create the configured backend for one role.
+
+    Args:
+        role (str): "generation", "intent" or "judge" (shapes stand-in output)
+        params (dict): Default generation parameters
+        model_id (str, optional): watsonx model id (default: WATSONX_MODEL_ID)
+
+    Returns:
+        LLMBackend: Backend instance
+
+    Raises:
+        ValueError: If LLM_BACKEND names an unknown backend
+    """
+    name = os.environ.get(LLM_BACKEND_ENV, "watsonx").lower()
+
+    if name == "watsonx":
+        from llm.watsonx import WatsonxBackend
+        backend = WatsonxBackend(params, model_id=model_id)
+    elif name == "standin":
+        seed = _standin_setting("SEED", None, int)
+        backend = StandInBackend(
+            role,
+            params,
+            ttft_ms=_standin_setting("TTFT_MS", STANDIN_TTFT_MS),
+            ttft_sigma=_standin_setting("TTFT_SIGMA", STANDIN_TTFT_SIGMA),
+            tokens_per_second=_standin_setting("TOKENS_PER_SECOND", STANDIN_TOKENS_PER_SECOND),
+            error_rate=_standin_setting("ERROR_RATE", STANDIN_ERROR_RATE),
+            spike_rate=_standin_setting("SPIKE_RATE", STANDIN_SPIKE_RATE),
+            spike_ms=_standin_setting("SPIKE_MS", STANDIN_SPIKE_MS),
+            replay_file=os.environ.get(LLM_REPLAY_FILE_ENV),
+            # Different roles must not draw the same random sequence
+            seed=None if seed is None else f"{seed}:{role}",
+        )
+    else:
+        raise ValueError(f"Unknown {LLM_BACKEND_ENV} {name!r} (expected 'watsonx' or 'standin')")
+
+    record_file = os.environ.get(LLM_RECORD_FILE_ENV)
+    if record_file:
+        backend = RecordingBackend(backend, role, record_file)
+    return ResilientBackend(backend, role, hedge=os.environ.get(LLM_HEDGE_ENV) == "1")
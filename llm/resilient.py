@@ -0,0 +1,281 @@
+"""
+Deadline-aware, hedged and retried LLM calls.
+
+This module handles:
+- Bounding every LLM call by the request deadline (utils/deadline.py)
+- Hedging: sending a duplicate request once the recent p95 latency has
+  passed and using whichever answers first (opt-in via LLM_HEDGE=1)
+- Retrying failed calls with exponential backoff and full jitter
+- A circuit breaker that fails calls fast while the backend keeps failing
+
+Calls run on a shared thread pool so the caller stops waiting as soon as the
+deadline passes. A blocking non-streaming call cannot be interrupted, so its
+thread finishes in the background and the result is dropped. Abandoned
+streams are closed, which ends the HTTP response. For streams, hedging and
+retries only cover the time to the first chunk; nothing is repeated once
+output has been returned.
+"""
+
+import os
+import sys
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from llm.base import LLMBackend, LLMBackendError
+from utils.constants import (
+    LLM_CALL_POOL_SIZE,
+    LLM_MAX_RETRIES,
+    LLM_RETRY_BASE_SECONDS,
+    LLM_RETRY_MAX_SECONDS,
+    LLM_HEDGE_QUANTILE,
+    LLM_HEDGE_WINDOW,
+    LLM_HEDGE_MIN_SAMPLES,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_COOLDOWN_SECONDS,
+)
+from utils.deadline import DeadlineExceeded, remaining
+from utils.logging_setup import get_logger
+from utils.metrics import CIRCUIT_OPEN, LLM_CALLS, LLM_HEDGES, LLM_RETRIES, register_executor
+from utils.tracing import submit_with_context
+
+logger = get_logger("llm")
+
+_END = object()
+
+_pool = ThreadPoolExecutor(max_workers=LLM_CALL_POOL_SIZE, thread_name_prefix="llm")
+register_executor("llm", _pool)
+
+
+class CircuitOpenError(LLMBackendError):
+    """Raised without calling the backend while the circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Open after consecutive failures; allow one trial call after a cooldown.
+    """
+
+    def __init__(self, name, threshold=CIRCUIT_FAILURE_THRESHOLD, cooldown=CIRCUIT_COOLDOWN_SECONDS):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+        CIRCUIT_OPEN.set_function(lambda: int(self.opened_at is not None), backend=name)
+
+    def before_call(self):
+        """
+        Raises:
+            CircuitOpenError: If the circuit is open (or a trial call is already running)
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.cooldown or self._trial:
+                raise CircuitOpenError(f"{self.name} LLM circuit open")
+            self._trial = True
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info("%s LLM circuit closed", self.name)
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def release_trial(self):
+        """End a trial call without an outcome, e.g. because the caller stopped waiting for it."""
+        with self._lock:
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or (self.opened_at is None and self.failures >= self.threshold):
+                if self.opened_at is None:
+                    logger.warning("%s LLM circuit opened after %d failures", self.name, self.failures)
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+
+def _close_stream(stream):
+    try:
+        stream.close()
+    except (ValueError, AttributeError):
+        pass
+
+
+def _start_stream(backend, prompt, params):
+    """Open a stream and wait for its first chunk (the part that is hedged and retried)."""
+    stream = backend.generate_text_stream(prompt, params=params)
+    return stream, next(stream, _END)
+
+
+def _discard_stream(future):
+    # The losing copy of a hedged stream: close it once it has started
+    if not future.cancelled() and future.exception() is None:
+        _close_stream(future.result()[0])
+
+
+class ResilientBackend(LLMBackend):
+    """
+    Wrap a backend with deadlines, optional hedging, retries and a circuit breaker.
+    """
+
+    def __init__(self, backend, name, hedge=False, max_retries=LLM_MAX_RETRIES,
+                 retry_base=LLM_RETRY_BASE_SECONDS, retry_max=LLM_RETRY_MAX_SECONDS):
+        super().__init__(backend.params)
+        self.backend = backend
+        self.model_id = backend.model_id
+        self.name = name
+        self.hedge = hedge
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.breaker = CircuitBreaker(name)
+        self.latencies = deque(maxlen=LLM_HEDGE_WINDOW)
+
+    def _wait(self, future, on_discard=None):
+        """Wait for a future until the deadline; hand it to on_discard if it is abandoned."""
+        left = remaining()
+        done, _ = wait([future], timeout=None if left is None else max(0.0, left))
+        if not done:
+            if on_discard is not None:
+                future.add_done_callback(on_discard)
+            raise DeadlineExceeded(f"{self.name} LLM call exceeded the request deadline")
+        return future.result()
+
+    def _hedge_delay(self):
+        if not self.hedge or len(self.latencies) < LLM_HEDGE_MIN_SAMPLES:
+            return None
+        return float(np.quantile(self.latencies, LLM_HEDGE_QUANTILE))
+
+    def _attempt(self, func, on_discard=None):
+        """
+        Run func once, hedged with a second copy if it is slower than the recent p95.
+        """
+        primary = submit_with_context(_pool, func)
+        delay = self._hedge_delay()
+        if delay is None:
+            return self._wait(primary, on_discard)
+
+        left = remaining()
+        done, _ = wait([primary], timeout=delay if left is None else max(0.0, min(delay, left)))
+        if done:
+            return primary.result()
+
+        hedge = submit_with_context(_pool, func)
+        pending = {primary, hedge}
+        while pending:
+            left = remaining()
+            done, pending = wait(pending, timeout=None if left is None else max(0.0, left),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    LLM_HEDGES.inc(backend=self.name, winner="hedge" if future is hedge else "primary")
+                    break
+            else:
+                if pending:
+                    continue
+                # Both copies failed
+                return future.result()
+            for other in pending:
+                if on_discard is not None:
+                    other.add_done_callback(on_discard)
+            return future.result()
+
+        for other in pending:
+            if on_discard is not None:
+                other.add_done_callback(on_discard)
+        raise DeadlineExceeded(f"{self.name} LLM call exceeded the request deadline")
+
+    def _call(self, func, on_discard=None, count_ok=True):
+        """
+        Run func with retries, the circuit breaker and the deadline.
+
+        With count_ok=False a successful call is not counted in LLM_CALLS, so a
+        stream can count its outcome once, when it ends.
+        """
+        for attempt in range(self.max_retries + 1):
+            left = remaining()
+            if left is not None and left <= 0:
+                LLM_CALLS.inc(backend=self.name, outcome="timeout")
+                raise DeadlineExceeded(f"{self.name} LLM call started after the request deadline")
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                LLM_CALLS.inc(backend=self.name, outcome="rejected")
+                raise
+
+            start = time.perf_counter()
+            try:
+                result = self._attempt(func, on_discard)
+            except DeadlineExceeded:
+                # The caller's deadline says nothing about the backend (any client can send a
+                # tiny timeout); backend timeouts arrive as errors and are counted below
+                self.breaker.release_trial()
+                LLM_CALLS.inc(backend=self.name, outcome="timeout")
+                raise
+            except Exception as e:
+                self.breaker.record_failure()
+                LLM_CALLS.inc(backend=self.name, outcome="error")
+                if attempt == self.max_retries:
+                    raise LLMBackendError(f"{self.name} LLM call failed: {e}") from e
+
+                # Full jitter: spread retries out so they do not arrive together
+                backoff = random.uniform(0, min(self.retry_max, self.retry_base * 2 ** attempt))
+                left = remaining()
+                if left is not None and backoff >= left:
+                    raise LLMBackendError(f"{self.name} LLM call failed: {e}") from e
+                logger.warning("%s LLM call failed (%s); retrying in %.2fs", self.name, e, backoff)
+                LLM_RETRIES.inc(backend=self.name)
+                time.sleep(backoff)
+                continue
+
+            self.breaker.record_success()
+            if count_ok:
+                LLM_CALLS.inc(backend=self.name, outcome="ok")
+            self.latencies.append(time.perf_counter() - start)
+            return result
+
+    def generate_text(self, prompt, params=None):
+        return self._call(lambda: self.backend.generate_text(prompt, params=params))
+
+    def generate_text_stream(self, prompt, params=None):
+        stream, chunk = self._call(
+            lambda: _start_stream(self.backend, prompt, params), _discard_stream, count_ok=False
+        )
+        pending = None
+        outcome = "ok"
+        try:
+            while chunk is not _END:
+                yield chunk
+                pending = submit_with_context(_pool, next, stream, _END)
+                try:
+                    chunk = self._wait(pending)
+                except DeadlineExceeded:
+                    outcome = "timeout"
+                    raise
+                except Exception as e:
+                    outcome = "error"
+                    raise LLMBackendError(f"{self.name} LLM stream failed: {e}") from e
+                pending = None
+        finally:
+            # One outcome per stream, counted when it ends
+            LLM_CALLS.inc(backend=self.name, outcome=outcome)
+            if pending is not None and not pending.done():
+                # next() is still running in the pool; close the stream once it returns
+                pending.add_done_callback(lambda _: _close_stream(stream))
+            else:
+                _close_stream(stream)
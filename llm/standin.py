@@ -0,0 +1,163 @@
+"""
+Local stand-in LLM backend for offline load and latency experiments.
+
+This module handles:
+- Replaying responses recorded from a real backend (matched by prompt hash)
+- Synthesizing role-appropriate text when no recording matches
+- Pacing output with a log-normal time to first token and a fixed decode speed
+- Injecting latency spikes and failures into a configurable fraction of calls
+- Recording a real backend's prompts and responses for later replay
+
+Synthetic text is shaped so the pipeline keeps working: intent calls return
+a CLEAR classification, judge calls return a score, and generation calls
+return words taken from the prompt's retrieved context.
+"""
+
+import os
+import sys
+import time
+import random
+import hashlib
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from llm.base import LLMBackend, LLMBackendError
+from utils.constants import (
+    STANDIN_TTFT_MS,
+    STANDIN_TTFT_SIGMA,
+    STANDIN_TOKENS_PER_SECOND,
+    STANDIN_ERROR_RATE,
+    STANDIN_SPIKE_RATE,
+    STANDIN_SPIKE_MS,
+)
+from utils.timing_log import get_timing_writer, read_timing_records
+
+
+def prompt_hash(prompt):
+    """Key used to match recorded responses to prompts."""
+    return hashlib.sha1(prompt.encode("utf-8")).hexdigest()
+
+
+def load_recordings(path, role):
+    """
+    Load recorded responses for one role.
+
+    Args:
+        path (str): JSON Lines file written by RecordingBackend
+        role (str): Backend role ("generation", "intent" or "judge")
+
+    Returns:
+        dict: prompt hash -> response text
+    """
+    if not path:
+        return {}
+    # Same JSON Lines layout as the timing log, including rotated and per-worker files
+    return {
+        record["prompt_sha1"]: record["response"]
+        for record in read_timing_records(path, legacy_path=None)
+        if record.get("role") == role
+    }
+
+
+class StandInBackend(LLMBackend):
+    """
+    Backend that returns replayed or synthetic text at a realistic pace.
+    """
+
+    def __init__(self, role, params=None, ttft_ms=STANDIN_TTFT_MS, ttft_sigma=STANDIN_TTFT_SIGMA,
+                 tokens_per_second=STANDIN_TOKENS_PER_SECOND, error_rate=STANDIN_ERROR_RATE,
+                 spike_rate=STANDIN_SPIKE_RATE, spike_ms=STANDIN_SPIKE_MS, replay_file=None, seed=None):
+        super().__init__(params)
+        self.role = role
+        self.model_id = f"standin-{role}"
+        self.ttft_ms = ttft_ms
+        self.ttft_sigma = ttft_sigma
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.spike_rate = spike_rate
+        self.spike_ms = spike_ms
+        self.recordings = load_recordings(replay_file, role)
+        self.replayed = 0
+        self._rng = random.Random(seed)
+
+    def _ttft(self):
+        ttft = self.ttft_ms / 1000 * self._rng.lognormvariate(0.0, self.ttft_sigma)
+        if self._rng.random() < self.spike_rate:
+            # e.g. a cold replica or a queue on the provider side
+            ttft += self.spike_ms / 1000
+        return ttft
+
+    def _synthesize(self, prompt, max_new_tokens):
+        if self.role == "intent":
+            return '{"status": "CLEAR", "follow_up_question": ""}'
+        if self.role == "judge":
+            return f"{self._rng.uniform(0.5, 1.0):.2f}"
+
+        # Generation: words from the context's answers, so the output looks grounded
+        answers = [line.split("Assistant:", 1)[1] for line in prompt.splitlines() if "Assistant:" in line]
+        words = " ".join(answers).split() or prompt.split() or ["ok"]
+        length = max(1, int(max_new_tokens * self._rng.uniform(0.5, 1.0)))
+        start = self._rng.randrange(len(words))
+        return " ".join(words[(start + i) % len(words)] for i in range(length))
+
+    def _tokens(self, prompt, params):
+        """Start a call: maybe fail, then return the response split into tokens."""
+        if self._rng.random() < self.error_rate:
+            time.sleep(self._ttft())
+            raise LLMBackendError(f"Stand-in {self.role} backend: injected failure")
+
+        response = self.recordings.get(prompt_hash(prompt))
+        if response is not None:
+            self.replayed += 1
+        else:
+            max_new_tokens = (params or self.params).get("max_new_tokens", 300)
+            response = self._synthesize(prompt, max_new_tokens)
+
+        # Keep the whitespace with each word so the chunks join back to the response
+        tokens = response.split(" ")
+        return [token + " " for token in tokens[:-1]] + [tokens[-1]]
+
+    def generate_text(self, prompt, params=None):
+        tokens = self._tokens(prompt, params)
+        time.sleep(self._ttft() + (len(tokens) - 1) / self.tokens_per_second)
+        return "".join(tokens)
+
+    def generate_text_stream(self, prompt, params=None):
+        tokens = self._tokens(prompt, params)
+        time.sleep(self._ttft())
+        for i, token in enumerate(tokens):
+            if i:
+                time.sleep(1 / self.tokens_per_second)
+            yield token
+
+
+class RecordingBackend(LLMBackend):
+    """
+    Pass calls to another backend and append each prompt and response to a file.
+    """
+
+    def __init__(self, backend, role, path):
+        super().__init__(backend.params)
+        self.backend = backend
+        self.model_id = backend.model_id
+        self.role = role
+        self.path = path
+
+    def _record(self, prompt, response):
+        get_timing_writer(self.path).write({
+            "role": self.role,
+            "prompt_sha1": prompt_hash(prompt),
+            "response": response,
+        })
+
+    def generate_text(self, prompt, params=None):
+        response = self.backend.generate_text(prompt, params=params)
+        self._record(prompt, response)
+        return response
+
+    def generate_text_stream(self, prompt, params=None):
+        chunks = []
+        for chunk in self.backend.generate_text_stream(prompt, params=params):
+            chunks.append(chunk)
+            yield chunk
+        self._record(prompt, "".join(chunks))
@@ -0,0 +1,47 @@
+"""
+IBM Watsonx AI backend.
+
+This module handles:
+- Creating the ModelInference client from app/config.py credentials
+- Passing generation calls through to it
+
+ibm_watsonx_ai and app.config are imported when the backend is created, so
+the rest of the repo (and the stand-in backend) works without them.
+"""
+
+import os
+import sys
+import warnings
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from llm.base import LLMBackend
+
+
+class WatsonxBackend(LLMBackend):
+    """
+    Backend backed by a watsonx ModelInference client.
+    """
+
+    def __init__(self, params=None, model_id=None):
+        super().__init__(params)
+        from ibm_watsonx_ai.foundation_models import ModelInference
+        from app.config import PROJECT_ID, WATSONX_CREDENTIALS, WATSONX_MODEL_ID
+
+        # Suppress deprecation and lifecycle warnings for cleaner output
+        warnings.filterwarnings('ignore', category=DeprecationWarning)
+        warnings.filterwarnings('ignore', message='.*deprecated state.*')
+
+        self.model_id = model_id or WATSONX_MODEL_ID
+        self.model = ModelInference(
+            model_id=self.model_id,
+            credentials=WATSONX_CREDENTIALS,
+            project_id=PROJECT_ID,
+            params=self.params,
+        )
+
+    def generate_text(self, prompt, params=None):
+        return self.model.generate_text(prompt=prompt, params=params)
+
+    def generate_text_stream(self, prompt, params=None):
+        return self.model.generate_text_stream(prompt=prompt, params=params)
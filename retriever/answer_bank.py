@@ -0,0 +1,116 @@
+"""
+Precomputed answers for high-traffic question clusters.
+
+This module handles:
+- Writing the bank built by data_prep/build_answer_bank.py
+- Loading it once per process, only if it matches the live collection build
+- Matching a query embedding to the nearest cluster centroid
+
+Layout of the bank directory:
+- centroids.npy: (n, dim) float32 L2-normalised cluster centroids
+- entries.json: One entry per centroid (question, answer, source ids, cluster stats)
+- manifest.json: Collection version, model id, build settings and offline coverage
+"""
+
+import os
+import sys
+import json
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from retriever.answer_store import collection_version
+from utils.constants import ANSWER_BANK_DIR, ANSWER_BANK_MATCH_THRESHOLD
+from utils.logging_setup import get_logger
+
+logger = get_logger("answer_bank")
+
+
+def write_answer_bank(centroids, entries, path=ANSWER_BANK_DIR, **manifest_fields):
+    """
+    Write banked answers and their centroids.
+
+    Args:
+        centroids (numpy.ndarray): (n, dim) L2-normalised centroids, one per entry
+        entries (list): Dicts with question, answer, source_ids and cluster stats
+        path (str): Output directory
+        **manifest_fields: Extra manifest fields (model id, build settings, coverage)
+
+    Returns:
+        dict: Manifest written alongside the bank
+    """
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "centroids.npy"), np.asarray(centroids, dtype=np.float32))
+    with open(os.path.join(path, "entries.json"), "w") as f:
+        json.dump(entries, f)
+
+    manifest = {
+        "collection_version": collection_version(),
+        "count": len(entries),
+        "created": datetime.now().isoformat(),
+        **manifest_fields,
+    }
+    with open(os.path.join(path, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+class AnswerBank:
+    """
+    Banked answers with a nearest-centroid lookup.
+    """
+
+    def __init__(self, path=ANSWER_BANK_DIR, threshold=ANSWER_BANK_MATCH_THRESHOLD):
+        with open(os.path.join(path, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        with open(os.path.join(path, "entries.json")) as f:
+            self.entries = json.load(f)
+        self.centroids = np.load(os.path.join(path, "centroids.npy"))
+        self.threshold = threshold
+
+    def __len__(self):
+        return len(self.entries)
+
+    def match(self, query_vector):
+        """
+        Find the banked answer for a query.
+
+        Args:
+            query_vector (list): Query embedding
+
+        Returns:
+            tuple or None: (entry, similarity), or None if no centroid is close enough
+        """
+        if not self.entries:
+            return None
+        vector = np.asarray(query_vector, dtype=np.float32)
+        similarities = self.centroids @ (vector / np.linalg.norm(vector))
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+        return self.entries[best], float(similarities[best])
+
+
+@lru_cache(maxsize=1)
+def get_answer_bank(path=ANSWER_BANK_DIR):
+    """
+    Open the answer bank once per process.
+
+    Args:
+        path (str): Bank directory
+
+    Returns:
+        AnswerBank or None: The bank, or None if it is missing or was built for another collection build
+    """
+    if not os.path.exists(os.path.join(path, "manifest.json")):
+        return None
+    bank = AnswerBank(path)
+    version = collection_version()
+    if version is None or bank.manifest["collection_version"] != version:
+        logger.warning("Answer bank was built for %s, not %s; rebuild it with data_prep/build_answer_bank.py",
+                       bank.manifest["collection_version"], version)
+        return None
+    return bank
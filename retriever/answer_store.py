@@ -0,0 +1,321 @@
+"""
+Local answer store module for retrieved Q&A bodies.
+
+This module handles:
+- Writing question/answer pairs as zstd-compressed records keyed by row id
+- Memory-mapped reads so only the hits that are used get decompressed
+- Detecting whether the store matches the live collection
+- Identifying the collection build that cached results were computed from
+
+Layout of the store directory:
+- data.bin: Concatenated zstd frames, one per record
+- index.npy: (n, 3) int64 array of (row id, offset, length), sorted by row id
+- dict.bin: Shared zstd dictionary trained on the records (optional)
+- vectors.npy: (n, dim) float32 question embeddings in index order (optional)
+- manifest.json: Collection name, record count and build timestamp
+
+Each build is written and fsynced in a sibling directory <path>.<timestamp>,
+then published by atomically replacing the <path> symlink, so serving
+workers never see a half-written file. A worker keeps reading the build it
+opened until it reloads (SIGHUP); the previous build is kept for workers that
+have not reloaded yet, and older ones are removed.
+"""
+
+import os
+import sys
+import json
+import mmap
+import shutil
+import threading
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+import zstandard as zstd
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.constants import ANSWER_STORE_DIR
+
+# Separator between question and answer inside a record (cleaned text is alphanumeric)
+_FIELD_SEPARATOR = "\x00"
+
+
+def write_answer_store(ids, questions, answers, collection_name, path=ANSWER_STORE_DIR,
+                       level=10, dict_size=112640, vectors=None):
+    """
+    Write question/answer pairs to a compressed store keyed by row id.
+
+    The store is built in a new sibling directory and swapped in atomically.
+
+    Args:
+        ids (list): Row ids matching the Milvus primary keys
+        questions (list): Question texts
+        answers (list): Answer texts
+        collection_name (str): Milvus collection the ids belong to
+        path (str): Store path (a symlink to the current build directory)
+        level (int): zstd compression level
+        dict_size (int): Size of the trained zstd dictionary in bytes
+        vectors (array-like, optional): Question embeddings in the same order as ids,
+            stored so lexical hits can be scored without the embedding model
+
+    Returns:
+        dict: Manifest written alongside the store
+    """
+    path = os.path.normpath(path)
+    build = f"{path}.{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+    os.makedirs(build)
+    records = [f"{q}{_FIELD_SEPARATOR}{a}".encode("utf-8") for q, a in zip(questions, answers)]
+
+    # Short records compress poorly on their own; a shared dictionary recovers most of the ratio
+    try:
+        dictionary = zstd.train_dictionary(dict_size, records)
+        with open(os.path.join(build, "dict.bin"), "wb") as f:
+            f.write(dictionary.as_bytes())
+            _sync(f)
+    except zstd.ZstdError:
+        dictionary = None
+
+    compressor = zstd.ZstdCompressor(level=level, dict_data=dictionary)
+    order = np.argsort(np.asarray(ids, dtype=np.int64), kind="stable")
+    index = np.zeros((len(records), 3), dtype=np.int64)
+
+    offset = 0
+    raw_bytes = 0
+    with open(os.path.join(build, "data.bin"), "wb") as f:
+        for position, row in enumerate(order):
+            frame = compressor.compress(records[row])
+            f.write(frame)
+            index[position] = (ids[row], offset, len(frame))
+            offset += len(frame)
+            raw_bytes += len(records[row])
+        _sync(f)
+
+    with open(os.path.join(build, "index.npy"), "wb") as f:
+        np.save(f, index)
+        _sync(f)
+
+    if vectors is not None:
+        with open(os.path.join(build, "vectors.npy"), "wb") as f:
+            np.save(f, np.asarray(vectors, dtype=np.float32)[order])
+            _sync(f)
+
+    manifest = {
+        "collection": collection_name,
+        "count": len(records),
+        "raw_bytes": raw_bytes,
+        "compressed_bytes": offset,
+        "created": datetime.now().isoformat(),
+    }
+    with open(os.path.join(build, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+        _sync(f)
+    _sync_dir(build)
+
+    _publish(path, build)
+    return manifest
+
+
+def _sync(f):
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _sync_dir(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _publish(path, build):
+    """
+    Point the path symlink at a finished build in one atomic rename.
+
+    Args:
+        path (str): Store path served to workers
+        build (str): Fully written sibling build directory
+    """
+    parent = os.path.dirname(path) or "."
+    previous = os.path.realpath(path) if os.path.islink(path) else None
+    if os.path.isdir(path) and not os.path.islink(path):
+        if os.listdir(path):
+            # A store written in place by an older version: move it aside, open mmaps keep working
+            previous = f"{path}.legacy"
+            shutil.rmtree(previous, ignore_errors=True)
+            os.rename(path, previous)
+        else:
+            os.rmdir(path)
+
+    link = f"{path}.tmp-{os.getpid()}"
+    if os.path.lexists(link):
+        os.remove(link)
+    os.symlink(os.path.basename(build), link)
+    os.replace(link, path)
+    _sync_dir(parent)
+
+    # Only the new and the previous build can still be opened by a worker
+    prefix = os.path.basename(path) + "."
+    keep = {os.path.realpath(build), previous}
+    for name in os.listdir(parent):
+        candidate = os.path.join(parent, name)
+        if (name.startswith(prefix) and not os.path.islink(candidate) and os.path.isdir(candidate)
+                and os.path.realpath(candidate) not in keep):
+            shutil.rmtree(candidate, ignore_errors=True)
+
+
+class AnswerStore:
+    """
+    Read-only, memory-mapped view of a store written by write_answer_store.
+    """
+
+    def __init__(self, path=ANSWER_STORE_DIR):
+        # Resolve the symlink once so every file comes from the same build
+        path = os.path.realpath(path)
+        with open(os.path.join(path, "manifest.json")) as f:
+            self.manifest = json.load(f)
+
+        self._index = np.load(os.path.join(path, "index.npy"), mmap_mode="r")
+        self._ids = self._index[:, 0]
+
+        self._file = open(os.path.join(path, "data.bin"), "rb")
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        vectors_path = os.path.join(path, "vectors.npy")
+        self._vectors = np.load(vectors_path, mmap_mode="r") if os.path.exists(vectors_path) else None
+
+        dict_path = os.path.join(path, "dict.bin")
+        self._dictionary = None
+        if os.path.exists(dict_path):
+            with open(dict_path, "rb") as f:
+                self._dictionary = zstd.ZstdCompressionDict(f.read())
+
+        # zstd decompressors are not safe to share between threads
+        self._local = threading.local()
+
+    @property
+    def collection(self):
+        """Name of the Milvus collection the row ids belong to."""
+        return self.manifest["collection"]
+
+    def __len__(self):
+        return len(self._ids)
+
+    @property
+    def ids(self):
+        """Row ids in the store, sorted."""
+        return self._ids
+
+    def _decompressor(self):
+        if not hasattr(self._local, "decompressor"):
+            self._local.decompressor = zstd.ZstdDecompressor(dict_data=self._dictionary)
+        return self._local.decompressor
+
+    def _position(self, row_id):
+        position = int(np.searchsorted(self._ids, row_id))
+        if position >= len(self._ids) or self._ids[position] != row_id:
+            raise KeyError(row_id)
+        return position
+
+    def get(self, row_id):
+        """
+        Fetch one question/answer pair.
+
+        Args:
+            row_id (int): Milvus primary key
+
+        Returns:
+            tuple: (question, answer)
+
+        Raises:
+            KeyError: If the id is not in the store
+        """
+        _, offset, length = self._index[self._position(row_id)]
+        record = self._decompressor().decompress(self._data[offset:offset + length])
+        question, _, answer = record.decode("utf-8").partition(_FIELD_SEPARATOR)
+        return question, answer
+
+    def get_many(self, row_ids):
+        """
+        Fetch several question/answer pairs in the given order.
+
+        Args:
+            row_ids (list): Milvus primary keys
+
+        Returns:
+            list: (question, answer) tuples
+        """
+        return [self.get(row_id) for row_id in row_ids]
+
+    def get_vectors(self, row_ids):
+        """
+        Fetch the stored question embeddings for several rows.
+
+        Args:
+            row_ids (list): Milvus primary keys
+
+        Returns:
+            np.ndarray or None: (len(row_ids), dim) float32 array, or None if
+                the store was written without vectors
+
+        Raises:
+            KeyError: If an id is not in the store
+        """
+        if self._vectors is None:
+            return None
+        return np.asarray(self._vectors[[self._position(row_id) for row_id in row_ids]], dtype=np.float32)
+
+
+@lru_cache(maxsize=1)
+def get_answer_store(path=ANSWER_STORE_DIR):
+    """
+    Open the answer store once per process.
+
+    Args:
+        path (str): Store directory
+
+    Returns:
+        AnswerStore or None: The store, or None if the collection still keeps answers in Milvus
+    """
+    if not os.path.exists(os.path.join(path, "manifest.json")):
+        return None
+    return AnswerStore(path)
+
+
+# Manifest path -> ((inode, mtime), version), so unchanged manifests are not re-parsed
+_versions = {}
+
+
+def collection_version(path=ANSWER_STORE_DIR):
+    """
+    Identify the current build of the collection.
+
+    Read from the manifest on disk on every call (a stat, and a parse only when
+    it changed), so a rebuild invalidates cached results in every process,
+    whether or not it has reloaded.
+
+    Args:
+        path (str): Store path
+
+    Returns:
+        str or None: "<collection>:<build timestamp>", or None without an answer store
+            (nothing identifies the build then, so nothing may be cached)
+    """
+    manifest_path = os.path.join(path, "manifest.json")
+    try:
+        stat = os.stat(manifest_path)
+    except FileNotFoundError:
+        return None
+    stamp = (stat.st_ino, stat.st_mtime_ns)
+    cached = _versions.get(manifest_path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    version = f"{manifest['collection']}:{manifest['created']}"
+    _versions[manifest_path] = (stamp, version)
+    return version
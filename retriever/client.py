@@ -0,0 +1,79 @@
+"""
+Client shim for the standalone retrieval service.
+
+This module handles:
+- Connecting to retriever/service.py over HTTP or a Unix socket
+- Exposing retrieve/retrieve_batch with the same results as the local functions
+
+get_vectorstore() returns a RetrievalServiceClient when RETRIEVAL_SERVICE_URL
+is set, and retrieve_context / retrieve_context_batch delegate to it, so
+callers do not change.
+"""
+
+import os
+import sys
+
+import httpx
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.constants import RETRIEVAL_SERVICE_TIMEOUT_SECONDS
+
+
+class RetrievalServiceClient:
+    """
+    Stand-in for the local vector store that forwards retrieval to the service.
+    """
+
+    def __init__(self, url, timeout=RETRIEVAL_SERVICE_TIMEOUT_SECONDS):
+        """
+        Args:
+            url (str): "http://host:port" or "unix:///path/to/socket"
+            timeout (float): Request timeout in seconds
+        """
+        self.url = url
+        if url.startswith("unix://"):
+            transport = httpx.HTTPTransport(uds=url[len("unix://"):])
+            self._http = httpx.Client(base_url="http://retrieval", transport=transport, timeout=timeout)
+        else:
+            self._http = httpx.Client(base_url=url, timeout=timeout)
+
+    def _post(self, path, payload):
+        response = self._http.post(path, json=payload)
+        response.raise_for_status()
+        return response.json()
+
+    def retrieve_batch(self, queries, k, quality_tier=None, latency_budget_ms=None,
+                       use_lexical=True, return_search_info=False):
+        """
+        Retrieve context for several queries through the service.
+
+        Returns:
+            list: Same tuples as retrieve_context_batch
+        """
+        results = self._post("/retrieve", {
+            "queries": queries,
+            "k": k,
+            "quality_tier": quality_tier,
+            "latency_budget_ms": latency_budget_ms,
+            "use_lexical": use_lexical,
+        })["results"]
+
+        if return_search_info:
+            return [(r["context"], r["score"], r["search_info"]) for r in results]
+        return [(r["context"], r["score"]) for r in results]
+
+    def health(self):
+        """
+        Check service readiness.
+
+        Returns:
+            dict: Service health payload
+        """
+        response = self._http.get("/health")
+        response.raise_for_status()
+        return response.json()
+
+    def close(self):
+        """Close the underlying HTTP connection pool."""
+        self._http.close()
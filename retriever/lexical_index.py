@@ -0,0 +1,222 @@
+"""
+Lexical (BM25) index module for hybrid retrieval.
+
+This module handles:
+- Tokenising text the same way the corpus was cleaned
+- Building a compact inverted index over corpus questions
+- BM25 search with per-hit query-term coverage
+- Deciding when a lexical match is decisive enough to skip dense search
+- Reciprocal-rank fusion of lexical and dense result lists
+"""
+
+import os
+import sys
+from functools import lru_cache
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.constants import (
+    LEXICAL_INDEX_FILE,
+    BM25_K1,
+    BM25_B,
+    RRF_K,
+    LEXICAL_FAST_PATH_MIN_TERMS,
+    LEXICAL_FAST_PATH_MARGIN,
+)
+from utils.helpers import clean_text
+
+# Words too common in support questions to help ranking
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from have how i if in is it its me my "
+    "of on or so that the this to was what when where which why with you your".split()
+)
+
+
+def tokenize(text):
+    """
+    Split text into index terms using the corpus cleaning rules.
+
+    Args:
+        text (str): Raw or cleaned text
+
+    Returns:
+        list: Terms with stopwords removed
+    """
+    return [term for term in clean_text(text).split() if term not in STOPWORDS]
+
+
+def build_lexical_index(ids, questions, path=LEXICAL_INDEX_FILE):
+    """
+    Build and save a BM25 inverted index over corpus questions.
+
+    Postings are stored in CSR form: the postings of term t are
+    doc_positions[term_offsets[t]:term_offsets[t + 1]] with matching term_freqs.
+
+    Args:
+        ids (list): Row ids matching the Milvus primary keys
+        questions (list): Question texts
+        path (str): Output .npz file
+
+    Returns:
+        int: Vocabulary size
+    """
+    postings = {}
+    doc_lengths = np.zeros(len(questions), dtype=np.int32)
+
+    for position, question in enumerate(questions):
+        terms = tokenize(question)
+        doc_lengths[position] = len(terms)
+        counts = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        for term, count in counts.items():
+            postings.setdefault(term, []).append((position, count))
+
+    vocabulary = sorted(postings)
+    term_offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+    for t, term in enumerate(vocabulary):
+        term_offsets[t + 1] = term_offsets[t] + len(postings[term])
+
+    doc_positions = np.empty(term_offsets[-1], dtype=np.int32)
+    term_freqs = np.empty(term_offsets[-1], dtype=np.float32)
+    for t, term in enumerate(vocabulary):
+        entries = np.asarray(postings[term])
+        doc_positions[term_offsets[t]:term_offsets[t + 1]] = entries[:, 0]
+        term_freqs[term_offsets[t]:term_offsets[t + 1]] = entries[:, 1]
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez(
+        path,
+        vocabulary=np.asarray(vocabulary),
+        term_offsets=term_offsets,
+        doc_positions=doc_positions,
+        term_freqs=term_freqs,
+        doc_lengths=doc_lengths,
+        ids=np.asarray(ids, dtype=np.int64),
+    )
+    return len(vocabulary)
+
+
+class LexicalIndex:
+    """
+    In-memory BM25 index loaded from build_lexical_index output.
+    """
+
+    def __init__(self, path=LEXICAL_INDEX_FILE):
+        data = np.load(path)
+        self._terms = {term: t for t, term in enumerate(data["vocabulary"].tolist())}
+        self._offsets = data["term_offsets"]
+        self._positions = data["doc_positions"]
+        self._freqs = data["term_freqs"]
+        self._ids = data["ids"]
+
+        doc_lengths = data["doc_lengths"].astype(np.float32)
+        self._length_norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths / max(doc_lengths.mean(), 1.0))
+
+        num_docs = len(doc_lengths)
+        doc_freqs = np.diff(self._offsets).astype(np.float32)
+        self._idf = np.log(1 + (num_docs - doc_freqs + 0.5) / (doc_freqs + 0.5))
+
+    def search(self, query, k):
+        """
+        Rank corpus questions against the query with BM25.
+
+        Args:
+            query (str): User's question
+            k (int): Number of hits to return
+
+        Returns:
+            tuple: (hits, num_terms)
+                - hits (list): (row_id, bm25_score, coverage) tuples, best first; coverage
+                  is the share of the query's IDF mass the question matches
+                - num_terms (int): Distinct query terms found in the vocabulary
+        """
+        term_ids = sorted({self._terms[term] for term in tokenize(query) if term in self._terms})
+        if not term_ids:
+            return [], 0
+
+        scores = np.zeros(len(self._length_norm), dtype=np.float32)
+        matched = np.zeros(len(self._length_norm), dtype=np.float32)
+        total_idf = float(self._idf[term_ids].sum())
+
+        for t in term_ids:
+            start, end = self._offsets[t], self._offsets[t + 1]
+            docs = self._positions[start:end]
+            freqs = self._freqs[start:end]
+            # Each document appears once per term, so fancy-index accumulation is safe
+            scores[docs] += self._idf[t] * freqs * (BM25_K1 + 1) / (freqs + self._length_norm[docs])
+            matched[docs] += self._idf[t]
+
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        top = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        hits = [
+            (int(self._ids[doc]), float(scores[doc]), float(matched[doc]) / total_idf)
+            for doc in top
+        ]
+        return hits, len(term_ids)
+
+
+@lru_cache(maxsize=1)
+def get_lexical_index(path=LEXICAL_INDEX_FILE):
+    """
+    Load the lexical index once per process.
+
+    Args:
+        path (str): Index .npz file
+
+    Returns:
+        LexicalIndex or None: The index, or None if hybrid retrieval is not set up
+    """
+    if not os.path.exists(path):
+        return None
+    return LexicalIndex(path)
+
+
+def decisive_hits(hits, num_terms):
+    """
+    Return the lexical hits that make dense search unnecessary, if any.
+
+    A match is decisive when the query has enough terms, the best hits
+    contain every query term, and they outscore the best partial match by
+    LEXICAL_FAST_PATH_MARGIN.
+
+    Args:
+        hits (list): (row_id, bm25_score, coverage) tuples from LexicalIndex.search
+        num_terms (int): Distinct query terms found in the vocabulary
+
+    Returns:
+        list: Fully matching hits, or an empty list if the match is not decisive
+    """
+    if num_terms < LEXICAL_FAST_PATH_MIN_TERMS or not hits:
+        return []
+
+    exact = [hit for hit in hits if hit[2] >= 0.999]
+    partial = [hit for hit in hits if hit[2] < 0.999]
+    if not exact or hits[0][2] < 0.999:
+        return []
+    if partial and exact[0][1] < LEXICAL_FAST_PATH_MARGIN * partial[0][1]:
+        return []
+    return exact
+
+
+def reciprocal_rank_fusion(*ranked_id_lists, k=RRF_K):
+    """
+    Fuse ranked id lists with reciprocal-rank fusion.
+
+    Args:
+        *ranked_id_lists (list): Lists of row ids, best first
+        k (int): RRF constant
+
+    Returns:
+        list: Row ids ordered by fused score
+    """
+    fused = {}
+    for ranked_ids in ranked_id_lists:
+        for rank, row_id in enumerate(ranked_ids, 1):
+            fused[row_id] = fused.get(row_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused, key=fused.get, reverse=True)
@@ -0,0 +1,79 @@
+"""
+Per-process caches for query embeddings and retrieval results.
+
+This module handles:
+- A small thread-safe LRU
+- The query embedding cache (keyed by the exact query text)
+- The retrieval result cache (keyed by query, search settings and collection version)
+
+Both are filled by normal traffic and by the startup warm-up (api/warmup.py).
+Forked workers inherit the parent's entries; they stay valid because
+retrieval keys include the collection version. Without an answer store there
+is no version and retrieval results are not cached.
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.constants import EMBEDDING_CACHE_MAX_ENTRIES, RETRIEVAL_CACHE_MAX_ENTRIES
+from utils.metrics import QUERY_CACHE_LOOKUPS, lookups_counted
+
+
+class LRUCache:
+    """
+    Bounded mapping that evicts the least recently used entry.
+
+    Lookups are counted in rag_query_cache_lookups_total unless counted is
+    False (caches that are not embedding or retrieval caches).
+    """
+
+    def __init__(self, name, max_entries, counted=True):
+        self.name = name
+        self.max_entries = max_entries
+        self.counted = counted
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns:
+            Any: Cached value, or None on a miss
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+        if self.counted and lookups_counted():
+            QUERY_CACHE_LOOKUPS.inc(cache=self.name, result="miss" if value is None else "hit")
+        return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+@lru_cache(maxsize=1)
+def get_embedding_cache():
+    """Query text -> embedding vector."""
+    return LRUCache("embedding", EMBEDDING_CACHE_MAX_ENTRIES)
+
+
+@lru_cache(maxsize=1)
+def get_retrieval_cache():
+    """(query, k, tier, budget, lexical, collection version) -> (context, score, search info)."""
+    return LRUCache("retrieval", RETRIEVAL_CACHE_MAX_ENTRIES)
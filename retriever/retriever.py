@@ -3,55 +3,497 @@ Context retrieval module for RAG system.
 
 This module handles:
 - Semantic search in vector database
+- Adaptive search effort (ef/nprobe) per request
+- Routing queries to their nearest topic partitions
+- Fetching Q&A bodies from the local answer store for relevant hits only
+- Hybrid BM25 + vector retrieval with reciprocal-rank fusion and a lexical fast path
+- Batched multi-query retrieval (one encode pass, one multi-vector search)
+- Delegating to the shared retrieval service when the vector store is its client
+- Caching query embeddings and retrieval results per process (retriever/query_cache.py)
+- Tracing spans for lexical search, embedding, Milvus search and context assembly
 - Document filtering by relevance
 - Context formatting for LLM
 """
 
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
-def retrieve_context(vectorstore, query, k=8):
+import numpy as np
+
+from retriever.answer_store import collection_version, get_answer_store
+from retriever.client import RetrievalServiceClient
+from retriever.lexical_index import get_lexical_index, decisive_hits, reciprocal_rank_fusion
+from retriever.query_cache import get_embedding_cache, get_retrieval_cache
+from retriever.search_params import choose_search_params, track_load
+from retriever.topic_router import route_query, routing_centroids
+from utils.constants import (
+    DEFAULT_RETRIEVAL_K,
+    EXPANDED_RETRIEVAL_K,
+    HIGH_SIMILARITY_THRESHOLD,
+    LOW_SIMILARITY_THRESHOLD,
+    MIN_RELEVANT_DOCS,
+    PARTITIONS_PER_QUERY,
+    LEXICAL_MIN_COVERAGE,
+    LEXICAL_FAST_PATH_WAIT_MS,
+)
+from utils.logging_setup import get_logger
+from utils.metrics import register_executor
+from utils.tracing import span, submit_with_context
+
+logger = get_logger("retriever")
+
+# Lexical searches run here so they overlap with query embedding and vector search
+_lexical_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="lexical")
+register_executor("lexical", _lexical_executor)
+
+
+class _LexicalJob:
+    """
+    A BM25 search on the lexical executor and the time it started running.
+
+    The fast-path wait is measured from the start, not from submission, so a
+    query queued behind others in a batch gets the same budget it would get
+    alone. Waiting for the start is bounded by the same budget: when the
+    lexical workers are saturated the search is cancelled and the query is
+    answered from the vector search alone.
+    """
+
+    def __init__(self, lexical, query, k):
+        self._started = threading.Event()
+        self._started_at = None
+        self.future = submit_with_context(_lexical_executor, self._run, lexical, query, k)
+
+    def _run(self, lexical, query, k):
+        self._started_at = time.monotonic()
+        self._started.set()
+        with span("retrieval.lexical"):
+            return lexical.search(query, k)
+
+    def result_within(self, budget_s):
+        """
+        Returns:
+            tuple: LexicalIndex.search result, if ready within budget_s of starting
+
+        Raises:
+            concurrent.futures.TimeoutError: If the search does not start within budget_s
+                (it is then cancelled) or runs longer than the budget
+        """
+        if not self._started.wait(budget_s):
+            if self.future.cancel():
+                raise FutureTimeoutError()
+            # Picked up between the timeout and the cancel
+            self._started.wait()
+        return self.future.result(timeout=max(0.0, self._started_at + budget_s - time.monotonic()))
+
+    def result(self):
+        """
+        Returns:
+            tuple or None: LexicalIndex.search result, or None if the search was cancelled
+        """
+        if self.future.cancelled():
+            return None
+        return self.future.result()
+
+
+def _uses_answer_store(vectorstore):
+    """Check whether the answer store belongs to this vector store's collection."""
+    store = get_answer_store()
+    return store is not None and store.collection == vectorstore.collection_name
+
+
+def _search(vectorstore, query_vectors, k, param, partitions):
+    """
+    Run one multi-vector search and return hits without their Q&A bodies where possible.
+
+    When an answer store for the collection exists, Milvus only returns ids and
+    scores for all vectors in a single request and the bodies are fetched later
+    for relevant hits. Otherwise the question and answer come back from Milvus
+    through LangChain metadata, one search per vector.
+
+    Args:
+        vectorstore: Milvus vector store instance
+        query_vectors (list): Query embeddings
+        k (int): Number of results per query
+        param (dict): Milvus search parameters
+        partitions (list or None): Partitions to search
+
+    Returns:
+        list: Per query, (row_id, score, qa_pair) tuples; qa_pair is None when it must be fetched from the store
+    """
+    if _uses_answer_store(vectorstore):
+        results = vectorstore.client.search(
+            collection_name=vectorstore.collection_name,
+            data=query_vectors,
+            anns_field="embedding",
+            limit=k,
+            search_params=param,
+            output_fields=[],
+            partition_names=partitions
+        )
+        return [[(hit["id"], hit["distance"], None) for hit in hits] for hits in results]
+
+    return [
+        [
+            (doc.metadata.get("id"), score, (doc.page_content, doc.metadata.get("answer", "")))
+            for doc, score in vectorstore.similarity_search_with_score_by_vector(
+                query_vector, k=k, param=param, partition_names=partitions
+            )
+        ]
+        for query_vector in query_vectors
+    ]
+
+
+def _routed_search(vectorstore, query_vectors, k, param, num_partitions):
+    """
+    Search each query in its nearest topic partitions, batching queries that share a route.
+
+    Args:
+        vectorstore: Milvus vector store instance
+        query_vectors (list): Query embeddings
+        k (int): Number of results per query
+        param (dict): Milvus search parameters
+        num_partitions (int): Partitions to search per query
+
+    Returns:
+        tuple: (hits, partitions) lists aligned with query_vectors
+    """
+    centroids = routing_centroids(vectorstore)
+    partitions = [
+        route_query(vector, num_partitions, centroids) if centroids is not None else None
+        for vector in query_vectors
+    ]
+
+    groups = {}
+    for i, route in enumerate(partitions):
+        groups.setdefault(tuple(route) if route else None, []).append(i)
+
+    hits = [None] * len(query_vectors)
+    for route, members in groups.items():
+        group_hits = _search(vectorstore, [query_vectors[i] for i in members], k, param,
+                             list(route) if route else None)
+        for i, query_hits in zip(members, group_hits):
+            hits[i] = query_hits
+
+    return hits, partitions
+
+
+def _fetch_qa_pairs(hits):
+    """
+    Resolve Q&A bodies for hits, reading the answer store only for ids that need it.
+
+    Args:
+        hits (list): (row_id, score, qa_pair) tuples from _search
+
+    Returns:
+        list: (question, answer) tuples in hit order
+    """
+    missing = [row_id for row_id, _, qa_pair in hits if qa_pair is None]
+    fetched = dict(zip(missing, get_answer_store().get_many(missing))) if missing else {}
+    return [qa_pair if qa_pair is not None else fetched[row_id] for row_id, _, qa_pair in hits]
+
+
+def embed_queries(vectorstore, queries):
+    """
+    Embed queries in one batch, reusing cached embeddings.
+
+    Args:
+        vectorstore: Milvus vector store instance (not the retrieval service client)
+        queries (list): Query texts
+
+    Returns:
+        list: One embedding per query
+    """
+    cache = get_embedding_cache()
+    cached = [cache.get(query) for query in queries]
+    vectors = [None if vector is None else vector.tolist() for vector in cached]
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    if missing:
+        computed = vectorstore.embeddings.embed_documents([queries[i] for i in missing])
+        for i, vector in zip(missing, computed):
+            # float32 arrays take a sixth of the memory of a list of Python floats
+            cache.put(queries[i], np.asarray(vector, dtype=np.float32))
+            vectors[i] = vector
+    return vectors
+
+
+def _lexical_similarities(vectorstore, queries, row_ids):
+    """
+    Similarity of each query to its decisive lexical hit, without a Milvus search.
+
+    The matched questions' embeddings are read from the answer store, so only
+    queries missing from the embedding cache go through the embedding model;
+    a cached query is scored with no model call at all. Stores written without
+    vectors fall back to embedding the matched questions in the same forward
+    pass. Stored vectors are embeddings of the same questions, so the inner
+    product is the score the vector search would report for that row.
+
+    Args:
+        vectorstore: Milvus vector store instance
+        queries (list): Query texts
+        row_ids (list): Best lexical hit per query
+
+    Returns:
+        list: One similarity score per query
+    """
+    cache = get_embedding_cache()
+    cached = [cache.get(query) for query in queries]
+    missing = [i for i, vector in enumerate(cached) if vector is None]
+    store = get_answer_store()
+    question_vectors = store.get_vectors(row_ids)
+    questions = [] if question_vectors is not None else [question for question, _ in store.get_many(row_ids)]
+
+    texts = [queries[i] for i in missing] + questions
+    computed = vectorstore.embeddings.embed_documents(texts) if texts else []
+    for i, vector in zip(missing, computed):
+        cached[i] = np.asarray(vector, dtype=np.float32)
+        cache.put(queries[i], cached[i])
+
+    if question_vectors is None:
+        question_vectors = np.asarray(computed[len(missing):], dtype=np.float32)
+    return [float(np.dot(query_vector, question_vector))
+            for query_vector, question_vector in zip(cached, question_vectors)]
+
+
+def _fuse(dense_hits, lexical_hits, limit):
+    """
+    Merge relevant dense hits with strong lexical hits using reciprocal-rank fusion.
+
+    Lexical-only hits must match at least LEXICAL_MIN_COVERAGE of the query's
+    IDF mass and have their bodies fetched from the answer store.
+
+    Args:
+        dense_hits (list): Relevant (row_id, score, qa_pair) tuples from _search
+        lexical_hits (list): (row_id, bm25_score, coverage) tuples from LexicalIndex.search
+        limit (int): Maximum number of fused hits
+
+    Returns:
+        list: (row_id, score, qa_pair) tuples in fused order; score is None for lexical-only hits
+    """
+    strong_lexical = [hit for hit in lexical_hits if hit[2] >= LEXICAL_MIN_COVERAGE]
+    by_id = {hit[0]: hit for hit in dense_hits}
+    for row_id, _, _ in strong_lexical:
+        by_id.setdefault(row_id, (row_id, None, None))
+
+    fused_ids = reciprocal_rank_fusion([hit[0] for hit in dense_hits], [hit[0] for hit in strong_lexical])
+    return [by_id[row_id] for row_id in fused_ids[:limit]]
+
+
+def retrieve_context_batch(vectorstore, queries, k=DEFAULT_RETRIEVAL_K, quality_tier=None,
+                           latency_budget_ms=None, use_lexical=True, return_search_info=False):
+    """
+    Retrieve relevant context for several queries at once.
+
+    All queries that need dense search are embedded in one batched forward
+    pass and searched with one multi-vector Milvus request per topic route;
+    queries that need the expanded search are batched again. Each result is
+    identical to calling retrieve_context on that query alone.
+
+    Results are cached per query and search settings for the current build
+    of the collection; cached results have search_info["cached"] set. Results
+    searched at a tier lowered for load are not cached, so they are never
+    served once the load has passed.
+
+    Args:
+        vectorstore: Milvus vector store instance
+        queries (list): User questions
+        k (int): Number of documents to retrieve initially (default: 8)
+        quality_tier (str, optional): "fast", "balanced" or "thorough"
+        latency_budget_ms (float, optional): Retrieval latency budget, used when no tier is given
+        use_lexical (bool): Use the BM25 index when available
+        return_search_info (bool): Also return the search parameters that were used
+
+    Returns:
+        list: One (context, highest_score) or (context, highest_score, search_info) tuple per query
+    """
+    cache = get_retrieval_cache()
+    version = collection_version()
+    keys = [(query, k, quality_tier, latency_budget_ms, use_lexical, version) for query in queries]
+
+    results = []
+    for key in keys:
+        # Without a collection version a cached result could outlive a rebuild
+        cached = cache.get(key) if version is not None else None
+        results.append(None if cached is None else (cached[0], cached[1], {**cached[2], "cached": True}))
+
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        computed = _retrieve_batch(
+            vectorstore, [queries[i] for i in missing], k, quality_tier, latency_budget_ms, use_lexical
+        )
+        for i, (context, highest_score, search_info) in zip(missing, computed):
+            if version is not None and not search_info.get("downgraded", False):
+                cache.put(keys[i], (context, highest_score, search_info))
+            results[i] = (context, highest_score, {**search_info, "cached": False})
+
+    if return_search_info:
+        return results
+    return [(context, highest_score) for context, highest_score, _ in results]
+
+
+def _retrieve_batch(vectorstore, queries, k, quality_tier, latency_budget_ms, use_lexical):
+    """
+    Retrieve context for queries that are not cached (see retrieve_context_batch).
+
+    Returns:
+        list: One (context, highest_score, search_info) tuple per query
+    """
+    # Shared retrieval service: the embedding model and Milvus live in another process
+    if isinstance(vectorstore, RetrievalServiceClient):
+        with span("retrieval.service", queries=len(queries)):
+            return vectorstore.retrieve_batch(
+                queries, k, quality_tier, latency_budget_ms, use_lexical, return_search_info=True
+            )
+
+    lexical = get_lexical_index() if use_lexical and _uses_answer_store(vectorstore) else None
+    lexical_jobs = [_LexicalJob(lexical, query, k) if lexical else None for query in queries]
+
+    # Per query: (relevant hits, highest score, search info)
+    results = [None] * len(queries)
+
+    # Lexical fast path: skip the vector search when a keyword match is decisive
+    for i, job in enumerate(lexical_jobs):
+        if job is None:
+            continue
+        try:
+            fast_hits = decisive_hits(*job.result_within(LEXICAL_FAST_PATH_WAIT_MS / 1000))
+        except FutureTimeoutError:
+            continue
+        if fast_hits:
+            fast_hits = [(row_id, None, None) for row_id, _, _ in fast_hits[:k]]
+            results[i] = (fast_hits, None, {
+                "mode": "lexical",
+                "tier": None,
+                "search_params": None,
+                "in_flight": 0,
+                "downgraded": False,
+                "expanded": False,
+                "partitions": None,
+            })
+
+    # The confidence label and fallback need a similarity on the vector search scale
+    fast = [i for i, result in enumerate(results) if result is not None]
+    if fast:
+        with span("retrieval.embed", queries=len(fast), fast_path=True):
+            similarities = _lexical_similarities(
+                vectorstore, [queries[i] for i in fast], [results[i][0][0][0] for i in fast]
+            )
+        for i, similarity in zip(fast, similarities):
+            results[i] = (results[i][0], similarity, results[i][2])
+
+    pending = [i for i, result in enumerate(results) if result is None]
+    if pending:
+        # One batched forward pass for every query that needs dense search
+        with span("retrieval.embed", queries=len(pending)):
+            query_vectors = embed_queries(vectorstore, [queries[i] for i in pending])
+
+        with track_load() as in_flight:
+            # Initial retrieval with similarity scores
+            search = choose_search_params(k, quality_tier, latency_budget_ms, in_flight)
+            with span("retrieval.search", tier=search["tier"], k=k, queries=len(pending)):
+                hits, partitions = _routed_search(vectorstore, query_vectors, k, search["param"], PARTITIONS_PER_QUERY)
+
+            # Filter documents by similarity threshold (balanced for quality and coverage)
+            relevant = [[hit for hit in query_hits if hit[1] > HIGH_SIMILARITY_THRESHOLD] for query_hits in hits]
+
+            # If too few relevant docs found, expand search with lower threshold and more effort
+            expanded = [j for j, query_relevant in enumerate(relevant) if len(query_relevant) < MIN_RELEVANT_DOCS]
+            if expanded:
+                wide_search = choose_search_params(
+                    EXPANDED_RETRIEVAL_K, quality_tier, latency_budget_ms, in_flight, widen=True
+                )
+                with span("retrieval.search_expanded", tier=wide_search["tier"],
+                          k=EXPANDED_RETRIEVAL_K, queries=len(expanded)):
+                    wide_hits, wide_partitions = _routed_search(
+                        vectorstore, [query_vectors[j] for j in expanded], EXPANDED_RETRIEVAL_K,
+                        wide_search["param"], 2 * PARTITIONS_PER_QUERY
+                    )
+                for j, query_hits, route in zip(expanded, wide_hits, wide_partitions):
+                    relevant[j] = [hit for hit in query_hits if hit[1] > LOW_SIMILARITY_THRESHOLD]
+                    partitions[j] = route
+
+        expanded = set(expanded)
+        for j, i in enumerate(pending):
+            query_search = wide_search if j in expanded else search
+
+            # Track highest similarity score (dense scores only)
+            highest_score = max((score for _, score, _ in relevant[j]), default=0.0)
+
+            mode = "dense"
+            query_relevant = relevant[j]
+            lexical_result = lexical_jobs[i].result() if lexical_jobs[i] is not None else None
+            if lexical_result is not None:
+                lexical_hits, _ = lexical_result
+                query_relevant = _fuse(query_relevant, lexical_hits, EXPANDED_RETRIEVAL_K if j in expanded else k)
+                mode = "hybrid"
+
+            results[i] = (query_relevant, highest_score, {
+                "mode": mode,
+                "tier": query_search["tier"],
+                "search_params": query_search["param"]["params"],
+                "in_flight": query_search["in_flight"],
+                # The initial search decides which queries get expanded, so it counts too
+                "downgraded": search["downgraded"] or query_search["downgraded"],
+                "expanded": j in expanded,
+                "partitions": partitions[j],
+            })
+
+    with span("retrieval.context_assembly", queries=len(queries)):
+        outputs = []
+        for relevant_hits, highest_score, search_info in results:
+            # Build context string from relevant documents
+            context = ""
+
+            for question, answer in _fetch_qa_pairs(relevant_hits):
+                # Format as Q&A pair
+                context += f"User: {question}\nAssistant: {answer}\n\n"
+
+            # Log retrieval statistics
+            logger.debug("Retrieved %d docs (%s), highest score: %.4f, tier: %s, params: %s",
+                         len(relevant_hits), search_info["mode"], highest_score,
+                         search_info["tier"], search_info["search_params"])
+
+            search_info["doc_ids"] = [row_id for row_id, _, _ in relevant_hits]
+            outputs.append((context.strip(), highest_score, search_info))
+
+    return outputs
+
+
+def retrieve_context(vectorstore, query, k=DEFAULT_RETRIEVAL_K, quality_tier=None,
+                     latency_budget_ms=None, use_lexical=True, return_search_info=False):
     """
     Retrieve relevant context from vector store for a given query.
-    
+
     This function performs semantic search, filters results by similarity score,
-    and formats the retrieved documents as context for the LLM.
-    
+    and formats the retrieved documents as context for the LLM. Search effort is
+    chosen from the quality tier or latency budget and the current load, and is
+    raised for the expanded search when too few relevant documents are found.
+    When topic centroids exist, the query only searches its nearest partitions;
+    the expanded search covers twice as many. Q&A bodies are only read for hits
+    that pass the similarity threshold.
+
+    When a lexical index exists, a BM25 search runs in parallel with embedding
+    and vector search and the two lists are fused with reciprocal-rank fusion.
+    If the lexical result is decisive (every query term matched, clear margin)
+    the Milvus search is skipped; the score is then the similarity between the
+    query and the best matching question, embedded together in one pass.
+
     Args:
         vectorstore: Milvus vector store instance
         query (str): User's question
         k (int): Number of documents to retrieve initially (default: 8)
-        
+        quality_tier (str, optional): "fast", "balanced" or "thorough"
+        latency_budget_ms (float, optional): Retrieval latency budget, used when no tier is given
+        use_lexical (bool): Use the BM25 index when available
+        return_search_info (bool): Also return the search parameters that were used
+
     Returns:
-        tuple: (context, highest_score)
+        tuple: (context, highest_score) or (context, highest_score, search_info)
             - context (str): Formatted context string with Q&A pairs
             - highest_score (float): Highest similarity score among retrieved docs
+            - search_info (dict): Mode, tier, Milvus params, partitions, load downgrade and
+              expansion flags, doc ids and whether the result came from the cache
     """
-    # Initial retrieval with similarity scores
-    docs_with_scores = vectorstore.similarity_search_with_score(query, k=k)
-    
-    # Filter documents by similarity threshold (balanced for quality and coverage)
-    relevant_docs = [(d, score) for d, score in docs_with_scores if score > 0.5]
-    
-    # If too few relevant docs found, expand search with lower threshold
-    if len(relevant_docs) < 3:
-        docs_with_scores = vectorstore.similarity_search_with_score(query, k=12)
-        relevant_docs = [(d, score) for d, score in docs_with_scores if score > 0.4]
-    
-    # Build context string from relevant documents
-    context = ""
-    highest_score = 0.0
-    
-    for doc, score in relevant_docs:
-        # Track highest similarity score
-        if score > highest_score:
-            highest_score = score
-        
-        # Extract answer from metadata
-        answer = doc.metadata.get("answer", "")
-        
-        # Format as Q&A pair
-        context += f"User: {doc.page_content}\nAssistant: {answer}\n\n"
-    
-    # Log retrieval statistics
-    print(f"retrieve_context: Retrieved {len(relevant_docs)} docs, highest score: {highest_score:.4f}")
-    
-    return context.strip(), highest_score
+    return retrieve_context_batch(
+        vectorstore, [query], k, quality_tier, latency_budget_ms, use_lexical, return_search_info
+    )[0]
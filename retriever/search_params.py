@@ -0,0 +1,144 @@
+"""
+Adaptive search effort module for vector retrieval.
+
+This module handles:
+- Mapping latency budgets and quality tiers to Milvus search parameters
+- Tracking concurrent searches to lower effort under load
+- Widening the search for low-score queries
+"""
+
+import os
+import sys
+import math
+import threading
+from contextlib import contextmanager
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.constants import (
+    INDEX_PARAMS,
+    SEARCH_QUALITY_TIERS,
+    DEFAULT_QUALITY_TIER,
+    LATENCY_BUDGET_TIERS,
+    SEARCH_LOAD_SHARES,
+)
+from utils.admission import stage_executor_size
+from utils.metrics import SEARCHES_IN_FLIGHT
+
+# Tiers ordered from cheapest to most thorough
+TIER_ORDER = ["fast", "balanced", "thorough"]
+
+_in_flight = 0
+_in_flight_lock = threading.Lock()
+SEARCHES_IN_FLIGHT.set_function(lambda: _in_flight)
+
+
+@contextmanager
+def track_load():
+    """
+    Count a search as in flight for the duration of the block.
+
+    Yields:
+        int: Number of searches in flight including this one
+    """
+    global _in_flight
+    with _in_flight_lock:
+        _in_flight += 1
+        current = _in_flight
+    try:
+        yield current
+    finally:
+        with _in_flight_lock:
+            _in_flight -= 1
+
+
+def load_thresholds():
+    """
+    Searches in flight at which effort drops one and two tiers.
+
+    The thresholds are SEARCH_LOAD_SHARES of the retrieval executor's threads
+    (by default half the pool, then all of it), never less than two so a lone
+    search always runs at full effort.
+
+    Returns:
+        tuple: (one-tier threshold, two-tier threshold)
+    """
+    size = stage_executor_size("retrieval")
+    return tuple(max(2, math.ceil(share * size)) for share in SEARCH_LOAD_SHARES)
+
+
+def tier_for_budget(latency_budget_ms):
+    """
+    Translate a retrieval latency budget into a quality tier.
+
+    Args:
+        latency_budget_ms (float): Time the caller can spend on search
+
+    Returns:
+        str: Quality tier name
+    """
+    for max_budget, tier in LATENCY_BUDGET_TIERS:
+        if latency_budget_ms <= max_budget:
+            return tier
+    return TIER_ORDER[-1]
+
+
+def _shift_tier(tier, steps):
+    """Move a tier up (positive steps) or down (negative steps), clamped to the ends."""
+    index = TIER_ORDER.index(tier) + steps
+    return TIER_ORDER[max(0, min(index, len(TIER_ORDER) - 1))]
+
+
+def choose_search_params(k, quality_tier=None, latency_budget_ms=None, in_flight=1, widen=False):
+    """
+    Choose Milvus search parameters for one search.
+
+    The tier comes from an explicit quality tier, else the latency budget,
+    else DEFAULT_QUALITY_TIER. It is lowered one or two tiers when in_flight
+    reaches the load_thresholds() and raised one tier when widen is set.
+
+    Args:
+        k (int): Number of results requested (HNSW ef must be >= k)
+        quality_tier (str, optional): "fast", "balanced" or "thorough"
+        latency_budget_ms (float, optional): Retrieval latency budget
+        in_flight (int): Concurrent searches including this one
+        widen (bool): Whether this is a wider search for a low-score query
+
+    Returns:
+        dict: Search info with keys:
+            - tier (str): Effective quality tier
+            - param (dict): Milvus search parameters
+            - in_flight (int): Concurrent searches when chosen
+            - downgraded (bool): Whether load lowered the effective tier
+    """
+    if quality_tier is None:
+        quality_tier = tier_for_budget(latency_budget_ms) if latency_budget_ms is not None else DEFAULT_QUALITY_TIER
+
+    tier = quality_tier
+    one_tier, two_tiers = load_thresholds()
+    if in_flight >= two_tiers:
+        tier = _shift_tier(tier, -2)
+    elif in_flight >= one_tier:
+        tier = _shift_tier(tier, -1)
+    if widen:
+        tier = _shift_tier(tier, 1)
+    unloaded_tier = _shift_tier(quality_tier, 1) if widen else quality_tier
+
+    effort = SEARCH_QUALITY_TIERS[tier]
+    index_type = INDEX_PARAMS["index_type"]
+
+    if index_type == "HNSW":
+        params = {"ef": max(effort["ef"], k)}
+    elif index_type.startswith("IVF"):
+        params = {"nprobe": effort["nprobe"]}
+    elif index_type == "DISKANN":
+        params = {"search_list": max(effort["search_list"], k)}
+    else:
+        params = {}
+
+    return {
+        "tier": tier,
+        "param": {"metric_type": INDEX_PARAMS["metric_type"], "params": params},
+        "in_flight": in_flight,
+        "downgraded": tier != unloaded_tier,
+    }
@@ -0,0 +1,189 @@
+"""
+Standalone retrieval service shared by multiple front-end workers.
+
+This module handles:
+- Owning the embedding model and Milvus connection in one process
+- Micro-batching concurrent requests into retrieve_context_batch calls
+- Serving retrieval over HTTP or a Unix socket, with /health and /metrics
+
+Front ends point RETRIEVAL_SERVICE_URL at this process and keep calling
+get_vectorstore() / retrieve_context() as before (see retriever/client.py).
+
+Usage:
+    python retriever/service.py --port 8001
+    python retriever/service.py --uds /tmp/retrieval.sock
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from retriever.retriever import retrieve_context_batch
+from retriever.vector_store import get_local_vectorstore
+from utils.logging_setup import setup_logging
+from utils.metrics import CONTENT_TYPE, render_metrics
+from utils.constants import (
+    DEFAULT_RETRIEVAL_K,
+    RETRIEVAL_SERVICE_PORT,
+    RETRIEVAL_SERVICE_MAX_BATCH,
+    RETRIEVAL_SERVICE_BATCH_WINDOW_MS,
+)
+
+
+class RetrieveRequest(BaseModel):
+    queries: List[str]
+    k: int = DEFAULT_RETRIEVAL_K
+    quality_tier: Optional[str] = None
+    latency_budget_ms: Optional[float] = None
+    use_lexical: bool = True
+
+
+class MicroBatcher:
+    """
+    Merge queries from concurrent requests into batched retrieval calls.
+
+    Requests with identical retrieval options are run together; a batch is
+    dispatched when it reaches max_batch queries or the batch window expires.
+    """
+
+    def __init__(self, vectorstore, max_batch=RETRIEVAL_SERVICE_MAX_BATCH,
+                 window_ms=RETRIEVAL_SERVICE_BATCH_WINDOW_MS):
+        self.vectorstore = vectorstore
+        self.max_batch = max_batch
+        self.window = window_ms / 1000
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.queries = 0
+
+    async def submit(self, request):
+        """
+        Queue a request and wait for its results.
+
+        Returns:
+            list: (context, score, search_info) tuples for the request's queries
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((request, future))
+        return await future
+
+    async def run(self):
+        """Collect queued requests into batches until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self.queue.get()]
+            size = len(pending[0][0].queries)
+            deadline = time.monotonic() + self.window
+
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                size += len(item[0].queries)
+
+            # Requests with the same options share one retrieve_context_batch call
+            groups = {}
+            for request, future in pending:
+                key = (request.k, request.quality_tier, request.latency_budget_ms, request.use_lexical)
+                groups.setdefault(key, []).append((request, future))
+
+            for (k, tier, budget, use_lexical), members in groups.items():
+                queries = [query for request, _ in members for query in request.queries]
+                try:
+                    results = await loop.run_in_executor(
+                        None, retrieve_context_batch, self.vectorstore, queries,
+                        k, tier, budget, use_lexical, True
+                    )
+                except Exception as e:
+                    for _, future in members:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+
+                self.batches += 1
+                self.queries += len(queries)
+                offset = 0
+                for request, future in members:
+                    if not future.done():
+                        future.set_result(results[offset:offset + len(request.queries)])
+                    offset += len(request.queries)
+
+
+def create_app():
+    """
+    Create the retrieval service application.
+
+    Returns:
+        FastAPI: Application serving /retrieve, /health and /metrics
+    """
+    state = {}
+
+    @asynccontextmanager
+    async def lifespan(app):
+        # Load the embedding model and connect to Milvus once for all front ends
+        loop = asyncio.get_running_loop()
+        vectorstore = await loop.run_in_executor(None, get_local_vectorstore)
+        state["batcher"] = MicroBatcher(vectorstore)
+        task = asyncio.create_task(state["batcher"].run())
+        yield
+        task.cancel()
+
+    app = FastAPI(title="Ubuntu RAG retrieval service", lifespan=lifespan)
+
+    @app.post("/retrieve")
+    async def retrieve(request: RetrieveRequest):
+        results = await state["batcher"].submit(request)
+        return {
+            "results": [
+                {"context": context, "score": score, "search_info": search_info}
+                for context, score, search_info in results
+            ]
+        }
+
+    @app.get("/health")
+    async def health():
+        batcher = state.get("batcher")
+        return {
+            "ready": batcher is not None,
+            "pid": os.getpid(),
+            "batches": batcher.batches if batcher else 0,
+            "queries": batcher.queries if batcher else 0,
+        }
+
+    @app.get("/metrics")
+    async def metrics():
+        return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
+
+    return app
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the shared retrieval service")
+    parser.add_argument("--host", default="127.0.0.1", help="Host to bind (ignored with --uds)")
+    parser.add_argument("--port", type=int, default=RETRIEVAL_SERVICE_PORT, help="Port to bind")
+    parser.add_argument("--uds", default=None, help="Serve on this Unix socket path instead of TCP")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    setup_logging()
+    if args.uds:
+        uvicorn.run(create_app(), uds=args.uds, log_level="warning")
+    else:
+        uvicorn.run(create_app(), host=args.host, port=args.port, log_level="warning")
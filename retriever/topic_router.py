@@ -0,0 +1,112 @@
+"""
+Topic partition routing module for vector retrieval.
+
+This module handles:
+- Naming of the topic partitions created at ingestion time
+- Loading the k-means topic centroids
+- Checking that the collection has one partition per centroid before routing
+- Routing a query vector to its nearest partitions
+"""
+
+import os
+import sys
+from functools import lru_cache
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.constants import PARTITIONS_PER_QUERY, TOPIC_CENTROIDS_FILE
+from utils.logging_setup import get_logger
+
+logger = get_logger("topic_router")
+
+
+def partition_name(topic):
+    """
+    Get the Milvus partition name for a topic cluster.
+
+    Args:
+        topic (int): Cluster index
+
+    Returns:
+        str: Partition name
+    """
+    return f"topic_{topic}"
+
+
+@lru_cache(maxsize=1)
+def load_centroids(path=TOPIC_CENTROIDS_FILE):
+    """
+    Load the L2-normalised topic centroids written by store_data.py.
+
+    Args:
+        path (str): Centroids .npy file
+
+    Returns:
+        numpy.ndarray or None: (num_topics, dim) array, or None if the collection is unpartitioned
+    """
+    if not os.path.exists(path):
+        return None
+    return np.load(path)
+
+
+@lru_cache(maxsize=4)
+def partitions_match(client, collection_name, num_topics):
+    """
+    Check that a collection has exactly the partitions the centroids route to.
+
+    Args:
+        client: MilvusClient connected to the collection's server
+        collection_name (str): Collection to check
+        num_topics (int): Number of centroids
+
+    Returns:
+        bool: True if every centroid has its partition and there are no others
+    """
+    expected = {partition_name(topic) for topic in range(num_topics)}
+    # Milvus always keeps a (here empty) default partition
+    actual = set(client.list_partitions(collection_name)) - {"_default"}
+    if actual != expected:
+        logger.warning("Collection %s has %d topic partitions but there are %d centroids; searching unpartitioned",
+                       collection_name, len(actual), num_topics)
+        return False
+    return True
+
+
+def routing_centroids(vectorstore):
+    """
+    Centroids to route a collection's queries with.
+
+    Args:
+        vectorstore: Milvus vector store instance
+
+    Returns:
+        numpy.ndarray or None: Centroids, or None if there are none or they do not match the collection
+    """
+    centroids = load_centroids()
+    if centroids is None or not partitions_match(vectorstore.client, vectorstore.collection_name, len(centroids)):
+        return None
+    return centroids
+
+
+def route_query(query_vector, num_partitions=PARTITIONS_PER_QUERY, centroids=None):
+    """
+    Pick the partitions whose centroids are closest to the query vector.
+
+    Args:
+        query_vector (list): Query embedding
+        num_partitions (int): Number of partitions to search
+        centroids (numpy.ndarray, optional): Centroids to use instead of the saved file
+
+    Returns:
+        list or None: Partition names ordered by similarity, or None to search the whole collection
+    """
+    if centroids is None:
+        centroids = load_centroids()
+    if centroids is None or num_partitions >= len(centroids):
+        return None
+
+    similarities = centroids @ np.asarray(query_vector, dtype=np.float32)
+    nearest = np.argsort(-similarities)[:num_partitions]
+    return [partition_name(int(topic)) for topic in nearest]
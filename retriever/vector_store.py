@@ -5,48 +5,95 @@ This module handles:
 - Connection to Milvus vector database
 - Embedding function initialization
 - Vector store configuration
+- Switching to the shared retrieval service when one is configured
 """
 
 import os
 import sys
 import warnings
+from functools import lru_cache
 from langchain_milvus import Milvus
 from langchain_huggingface import HuggingFaceEmbeddings
 
 # Add parent directory to path for imports
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from app.config import EMBEDDING_MODEL_NAME, COLLECTION_NAME, MILVUS_URL, MILVUS_TOKEN
+from retriever.answer_store import get_answer_store
+from retriever.client import RetrievalServiceClient
+from utils.constants import RETRIEVAL_SERVICE_ENV
 
 # Suppress Milvus async warnings (async operations not needed for our synchronous use case)
 warnings.filterwarnings('ignore', message='.*AsyncMilvusClient.*')
 warnings.filterwarnings('ignore', message='.*async connection.*')
 
 
+@lru_cache(maxsize=1)
 def get_vectorstore():
+    """
+    Return the vector store for this process.
+    
+    If RETRIEVAL_SERVICE_URL is set, a client for the shared retrieval
+    service is returned and no embedding model is loaded in this process.
+    Otherwise the local Milvus vector store is used. The instance is created
+    once per process, so per-request calls do not reload the embedding model.
+    
+    Returns:
+        Milvus or RetrievalServiceClient: Vector store for retrieve_context
+    """
+    service_url = os.environ.get(RETRIEVAL_SERVICE_ENV)
+    if service_url:
+        return RetrievalServiceClient(service_url)
+    return get_local_vectorstore()
+
+
+@lru_cache(maxsize=1)
+def get_embeddings():
+    """
+    Load the embedding model once per process.
+    
+    Kept separate from the Milvus connection so a pre-fork master can load
+    the weights and share them copy-on-write with its workers.
+    
+    Returns:
+        HuggingFaceEmbeddings: Embedding function
+    """
+    return HuggingFaceEmbeddings(
+        model_name=EMBEDDING_MODEL_NAME
+    )
+
+
+@lru_cache(maxsize=1)
+def get_local_vectorstore():
     """
     Initialize and return a Milvus vector store instance.
     
     This function creates a connection to the Milvus vector database
-    with the configured embedding model and collection.
+    with the configured embedding model and collection. Collections built
+    with an answer store only hold ids and embeddings, so the question is
+    only used as the text field for collections that still store Q&A bodies.
     
     Returns:
         Milvus: Configured Milvus vector store instance
     """
-    # Initialize embedding function
-    embedding_fn = HuggingFaceEmbeddings(
-        model_name=EMBEDDING_MODEL_NAME
-    )
+    fields = {"vector_field": "embedding"}
+    store = get_answer_store()
+    if store is None or store.collection != COLLECTION_NAME:
+        fields["text_field"] = "question"
 
     # Create Milvus vector store instance
     vectorstore = Milvus(
-        embedding_function=embedding_fn,
+        embedding_function=get_embeddings(),
         collection_name=COLLECTION_NAME,
         connection_args={
             "uri": MILVUS_URL,
             "token": MILVUS_TOKEN
         },
-        vector_field="embedding",
-        text_field="question"
+        **fields
     )
 
     return vectorstore
+
+
+# Connections must not be shared across fork(); the embedding model can be
+os.register_at_fork(after_in_child=get_local_vectorstore.cache_clear)
+os.register_at_fork(after_in_child=get_vectorstore.cache_clear)
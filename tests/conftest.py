@@ -0,0 +1,11 @@
+"""
+Shared pytest setup.
+
+Tests import the project packages from the repository root, like the
+scripts do, and must run offline: no Milvus, watsonx or embedding model.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -0,0 +1,58 @@
+"""Tests for admission control (utils/admission.py)."""
+
+import asyncio
+
+import pytest
+
+from utils.admission import AdmissionController, AdmissionRejected
+
+
+def test_free_slot_is_taken_without_waiting():
+    async def scenario():
+        admission = AdmissionController(max_concurrent=2, max_queue=1, queue_timeout=1)
+        assert await admission.acquire() == 0.0
+        assert await admission.acquire() == 0.0
+        assert admission.waiting == 0
+
+    asyncio.run(scenario())
+
+
+def test_queued_request_gets_the_released_slot():
+    async def scenario():
+        admission = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=1)
+        await admission.acquire()
+        waiter = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0.01)
+        assert admission.waiting == 1
+
+        admission.release()
+        assert await waiter > 0.0
+        assert admission.waiting == 0
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_rejects_immediately():
+    async def scenario():
+        admission = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=1)
+        await admission.acquire()
+        waiter = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0.01)
+        with pytest.raises(AdmissionRejected, match="queue full"):
+            await admission.acquire()
+        admission.release()
+        await waiter
+
+    asyncio.run(scenario())
+
+
+def test_queue_timeout_rejects():
+    async def scenario():
+        admission = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=0.01)
+        await admission.acquire()
+        with pytest.raises(AdmissionRejected, match="queue timeout"):
+            await admission.acquire()
+        assert admission.waiting == 0
+
+    asyncio.run(scenario())
+
@@ -0,0 +1,91 @@
+"""Tests for the local compressed answer store (retriever/answer_store.py)."""
+
+import os
+
+import pytest
+
+from retriever.answer_store import AnswerStore, collection_version, write_answer_store
+
+IDS = [30, 10, 20]
+QUESTIONS = ["how do i mount a usb drive", "wifi drops after suspend", "apt held broken packages"]
+ANSWERS = ["use udisksctl mount", "reload the iwlwifi module", "run sudo apt --fix-broken install"]
+
+
+@pytest.fixture
+def store(tmp_path):
+    write_answer_store(IDS, QUESTIONS, ANSWERS, "ubuntu", path=str(tmp_path / "answer_store"))
+    return AnswerStore(str(tmp_path / "answer_store"))
+
+
+def test_manifest(store):
+    assert store.collection == "ubuntu"
+    assert store.manifest["count"] == 3
+    assert len(store) == 3
+
+
+def test_ids_are_sorted(store):
+    assert list(store.ids) == [10, 20, 30]
+
+
+def test_get_returns_the_pair_for_its_id(store):
+    for row_id, question, answer in zip(IDS, QUESTIONS, ANSWERS):
+        assert store.get(row_id) == (question, answer)
+
+
+def test_get_many_keeps_request_order(store):
+    assert store.get_many([20, 30]) == [(QUESTIONS[2], ANSWERS[2]), (QUESTIONS[0], ANSWERS[0])]
+
+
+def test_unknown_id_raises(store):
+    with pytest.raises(KeyError):
+        store.get(15)
+    with pytest.raises(KeyError):
+        store.get(99)
+
+
+def test_vectors_follow_their_ids(tmp_path):
+    vectors = [[3.0, 0.0], [1.0, 0.0], [2.0, 0.0]]
+    write_answer_store(IDS, QUESTIONS, ANSWERS, "ubuntu", path=str(tmp_path / "answer_store"), vectors=vectors)
+    store = AnswerStore(str(tmp_path / "answer_store"))
+    assert store.get_vectors([20, 30, 10])[:, 0].tolist() == [2.0, 3.0, 1.0]
+    with pytest.raises(KeyError):
+        store.get_vectors([15])
+
+
+def test_vectors_are_optional(store):
+    assert store.get_vectors([10]) is None
+
+
+def test_rebuild_swaps_in_a_new_build_without_touching_open_stores(tmp_path):
+    path = str(tmp_path / "answer_store")
+    for collection in ("v1", "v2"):
+        write_answer_store(IDS, QUESTIONS, ANSWERS, collection, path=path)
+    serving = AnswerStore(path)
+    write_answer_store([1], ["new question"], ["new answer"], "v3", path=path)
+
+    # A worker that has not reloaded keeps reading its own build
+    assert serving.collection == "v2"
+    assert serving.get(10) == (QUESTIONS[1], ANSWERS[1])
+    assert AnswerStore(path).get(1) == ("new question", "new answer")
+    # Only the current and the previous build are kept
+    assert len([name for name in os.listdir(tmp_path) if name.startswith("answer_store.")]) == 2
+
+
+def test_store_written_in_place_is_replaced(tmp_path):
+    path = tmp_path / "answer_store"
+    path.mkdir()
+    (path / "manifest.json").write_text("{}")
+    write_answer_store(IDS, QUESTIONS, ANSWERS, "ubuntu", path=str(path))
+    assert path.is_symlink()
+    assert AnswerStore(str(path)).collection == "ubuntu"
+
+
+def test_collection_version_follows_rebuilds_without_reopening(tmp_path):
+    path = str(tmp_path / "answer_store")
+    assert collection_version(path) is None
+
+    first = write_answer_store(IDS, QUESTIONS, ANSWERS, "ubuntu", path=path)
+    assert collection_version(path) == f"ubuntu:{first['created']}"
+    second = write_answer_store(IDS, QUESTIONS, ANSWERS, "ubuntu", path=path)
+    assert second["created"] != first["created"]
+    assert collection_version(path) == f"ubuntu:{second['created']}"
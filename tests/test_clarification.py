@@ -0,0 +1,35 @@
+"""Tests for recognising and merging replies to follow-up questions (context_expansion/clarification.py)."""
+
+from context_expansion.clarification import merge_clarification, pending_clarification
+from context_expansion.intent_rules import GREETING_FOLLOW_UP, VAGUE_FOLLOW_UP
+
+ANSWER = "🟢 **High Confidence** (Score: 0.82)\n\n_Found highly relevant information_\n\nRun sudo apt update."
+
+
+def test_reply_to_a_follow_up_is_found_from_history_alone():
+    # Gradio tuples and Watsonx dicts carry the same exchange
+    assert pending_clarification([("my laptop is broken", VAGUE_FOLLOW_UP)]) == "my laptop is broken"
+    history = [
+        {"role": "user", "content": "my laptop is broken"},
+        {"role": "assistant", "content": "Which device stopped working after the update?"},
+    ]
+    assert pending_clarification(history) == "my laptop is broken"
+
+
+def test_answers_and_notices_are_not_follow_ups():
+    assert pending_clarification([]) is None
+    assert pending_clarification([("How do I update Ubuntu?", ANSWER)]) is None
+    busy = "⏳ The assistant is handling too many requests right now. Please try again in a moment."
+    assert pending_clarification([("How do I update Ubuntu?", busy)]) is None
+    # Only the last exchange counts
+    assert pending_clarification([("my laptop is broken", VAGUE_FOLLOW_UP), ("wifi", ANSWER)]) is None
+
+
+def test_follow_ups_to_messages_without_content_are_not_merged():
+    assert pending_clarification([("Hello", GREETING_FOLLOW_UP)]) is None
+    assert pending_clarification([("What's the weather?", "Do you have an Ubuntu-related question?")]) is None
+
+
+def test_merge_joins_question_and_reply():
+    assert merge_clarification("my laptop is broken", " the wifi ") == "my laptop is broken. the wifi"
+    assert merge_clarification("Is it broken?", "wifi") == "Is it broken? wifi"
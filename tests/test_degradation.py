@@ -0,0 +1,66 @@
+"""Tests for graceful degradation (utils/degradation.py)."""
+
+from utils import degradation
+from utils.degradation import (
+    NORMAL, REDUCED_RETRIEVAL, RETRIEVAL_ONLY, SHORT_ANSWER, SKIP_INTENT, DegradationController
+)
+
+
+class FakeAdmission:
+    waiting = 0
+
+
+class FakeClock:
+    now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def make_controller(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(degradation, "time", clock)
+    admission = FakeAdmission()
+    controller = DegradationController(
+        admission, queue_thresholds=(4, 12, 20, 28), latency_thresholds=(10, 15, 20, 30),
+        smoothing=0.5, recovery_seconds=10
+    )
+    return controller, admission, clock
+
+
+def test_normal_without_load(monkeypatch):
+    controller, _, _ = make_controller(monkeypatch)
+    assert controller.current() == NORMAL
+
+
+def test_steps_up_immediately_with_queue_depth(monkeypatch):
+    controller, admission, _ = make_controller(monkeypatch)
+    admission.waiting = 4
+    assert controller.current() == SKIP_INTENT
+    admission.waiting = 30
+    assert controller.current() == RETRIEVAL_ONLY
+
+
+def test_latency_drives_the_level_too(monkeypatch):
+    controller, _, _ = make_controller(monkeypatch)
+    controller.observe(40)
+    controller.observe(40)
+    # Smoothed latency 30s
+    assert controller.latency == 30
+    assert controller.current() == RETRIEVAL_ONLY
+
+
+def test_recovers_one_level_per_interval(monkeypatch):
+    controller, admission, clock = make_controller(monkeypatch)
+    admission.waiting = 20
+    assert controller.current() == SHORT_ANSWER
+
+    admission.waiting = 0
+    clock.now += 5
+    assert controller.current() == SHORT_ANSWER
+    clock.now += 5
+    assert controller.current() == REDUCED_RETRIEVAL
+    clock.now += 10
+    assert controller.current() == SKIP_INTENT
+    clock.now += 10
+    assert controller.current() == NORMAL
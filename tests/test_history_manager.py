@@ -0,0 +1,65 @@
+"""Tests for compacting conversation history for prompts (generator/history_manager.py)."""
+
+from generator.history_manager import HistoryManager, cap_tokens, estimate_tokens, strip_decoration
+from utils.metrics import QUERY_CACHE_LOOKUPS
+
+DECORATED = (
+    "🟢 **High Confidence** (Score: 0.82)\n\n"
+    "_Found highly relevant information_\n\n"
+    "Run `sudo apt update` first.\n"
+    "_⚠️ The answer was cut short because generation did not finish in time._\n\n"
+    "---\n📊 **Response Metadata:**\n- Similarity Score: 0.820\n"
+)
+
+
+def conversation(turns):
+    return [(f"question {i} about wifi", f"Answer {i}. Run `sudo systemctl restart nm{i}`.") for i in range(turns)]
+
+
+def test_strip_decoration_keeps_only_the_answer():
+    assert strip_decoration(DECORATED) == "Run `sudo apt update` first."
+    assert strip_decoration("🔍 Generating response...") == ""
+
+
+def test_cap_tokens_cuts_at_a_word_boundary():
+    assert cap_tokens("short text", 10) == "short text"
+    capped = cap_tokens("word " * 100, 10)
+    assert capped.endswith(" …")
+    assert estimate_tokens(capped) <= 11
+
+
+def test_old_turns_roll_into_a_bounded_summary():
+    manager = HistoryManager(summary_max_tokens=40)
+    formatted = manager.format(conversation(8), max_turns=2)
+
+    assert formatted.startswith("Earlier in this conversation:\n")
+    summary, recent = formatted.split("\nUser: ", 1)
+    assert estimate_tokens("\n".join(summary.splitlines()[1:])) <= 40
+    # The summary keeps the actionable sentence, the newest summarised turn survives
+    assert "- User asked: question 5 about wifi; answer: Run `sudo systemctl restart nm5`." in summary
+    assert "question 0" not in summary
+    assert recent.startswith("question 6 about wifi")
+    assert "User: question 7 about wifi" in formatted
+
+
+def test_incremental_state_matches_a_fresh_format():
+    cached = HistoryManager()
+    history = conversation(7)
+    for i in range(1, len(history) + 1):
+        cached.format(history[:i], max_turns=3)
+    assert cached.format(history, max_turns=3) == HistoryManager().format(history, max_turns=3)
+
+
+def test_dict_history_formats_like_tuples():
+    history = [("How do I update?", DECORATED)]
+    dicts = [{"role": "user", "content": "How do I update?"}, {"role": "assistant", "content": DECORATED}]
+    manager = HistoryManager()
+    assert manager.format(dicts) == manager.format(history)
+    assert manager.format(history) == "User: How do I update?\nAssistant: Run `sudo apt update` first.\n"
+    assert manager.format([]) == ""
+
+
+def test_state_lookups_stay_out_of_the_query_cache_metric():
+    HistoryManager().format(conversation(3))
+    assert QUERY_CACHE_LOOKUPS.value(cache="history", result="hit") == 0
+    assert QUERY_CACHE_LOOKUPS.value(cache="history", result="miss") == 0
@@ -0,0 +1,53 @@
+"""Tests for the index benchmark configurations and recall computation (timing/index_eval.py)."""
+
+import numpy as np
+import pytest
+
+from timing.index_eval import INDEX_MATRIX, exact_top_k, latency_percentiles, mean_recall
+from utils.constants import INDEX_PARAMS
+
+
+def test_exact_top_k_returns_highest_inner_products():
+    corpus = np.eye(4, dtype=np.float32)
+    queries = np.array([[0.9, 0.1, 0.0, 0.0], [0.0, 0.0, 0.2, 0.8]], dtype=np.float32)
+
+    assert exact_top_k(corpus, queries, 2) == [{0, 1}, {2, 3}]
+
+
+def test_exact_top_k_with_k_equal_to_corpus_size():
+    corpus = np.eye(3, dtype=np.float32)
+    queries = np.ones((1, 3), dtype=np.float32)
+
+    assert exact_top_k(corpus, queries, 3) == [{0, 1, 2}]
+
+
+def test_exact_top_k_caps_k_at_corpus_size():
+    corpus = np.eye(2, dtype=np.float32)
+    queries = np.ones((1, 2), dtype=np.float32)
+
+    assert exact_top_k(corpus, queries, 8) == [{0, 1}]
+
+
+def test_mean_recall_against_exact_results():
+    corpus = np.eye(4, dtype=np.float32)
+    queries = np.array([[0.9, 0.1, 0.0, 0.0], [0.0, 0.0, 0.2, 0.8]], dtype=np.float32)
+    truth = exact_top_k(corpus, queries, 2)
+
+    assert mean_recall(truth, truth) == 1.0
+    # Half of the first query's neighbours, none of the second's
+    assert mean_recall([{0, 3}, {0, 1}], truth) == 0.25
+
+
+def test_latency_percentiles():
+    summary = latency_percentiles([float(ms) for ms in range(1, 101)])
+    assert summary == {"latency_p50_ms": pytest.approx(50.5), "latency_p95_ms": pytest.approx(95.05)}
+
+
+@pytest.mark.parametrize("name", list(INDEX_MATRIX))
+def test_search_params_use_the_index_metric(name):
+    index_params, search_params = INDEX_MATRIX[name]
+    assert search_params["metric_type"] == index_params["metric_type"] == "IP"
+
+
+def test_configured_index_type_is_benchmarked():
+    assert INDEX_PARAMS["index_type"] in {index["index_type"] for index, _ in INDEX_MATRIX.values()}
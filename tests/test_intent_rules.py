@@ -0,0 +1,76 @@
+"""Tests for the rule-based intent pre-classifier (context_expansion/intent_rules.py)."""
+
+import json
+import os
+
+import pytest
+
+from context_expansion.intent_rules import classify_intent
+
+LABELLED = os.path.join(os.path.dirname(__file__), "..", "evaluation", "data", "intent_queries.json")
+
+
+def rule(query):
+    result = classify_intent(query)
+    return result and (result["status"], result["rule"])
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("hello ubuntu users", ("AMBIGUOUS", "greeting")),
+    ("I need help with linux", ("AMBIGUOUS", "short_reply")),
+    ("tell me about the latest ubuntu news", ("AMBIGUOUS", "off_topic")),
+    ("my ubuntu is broken", ("AMBIGUOUS", "vague")),
+    ("It's not working", ("AMBIGUOUS", "vague")),
+    ("how to install", ("AMBIGUOUS", "bare_task")),
+])
+def test_vague_queries_are_ambiguous_despite_generic_words(query, expected):
+    assert rule(query) == expected
+
+
+@pytest.mark.parametrize("query", ["WiFi not working", "How do I enable UFW firewall for SSH?"])
+def test_specific_component_with_a_problem_is_clear(query):
+    assert rule(query) == ("CLEAR", "component")
+
+
+def test_error_output_is_clear():
+    assert rule("E: Unable to locate package libssl1.1") == ("CLEAR", "error_pattern")
+
+
+def test_startup_failures_are_clear():
+    assert rule("Ubuntu won't boot after update") == ("CLEAR", "symptom")
+
+
+@pytest.mark.parametrize("query", ["wifi", "How to update Ubuntu from terminal?"])
+def test_undecided_queries_go_to_the_llm(query):
+    assert classify_intent(query) is None
+
+
+@pytest.mark.parametrize("query", [
+    "GNOME Weather app won't open",
+    "news feed app crashes in gnome",
+    "the capital letters on keyboard not working",
+    "bitcoin miner docker container fails to start",
+])
+def test_off_topic_words_in_technical_queries_go_to_the_llm(query):
+    assert classify_intent(query) is None
+
+
+def test_off_topic_without_anything_technical():
+    assert rule("what's the bitcoin price today") == ("AMBIGUOUS", "off_topic")
+
+
+def test_rules_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("INTENT_RULES", "off")
+    assert classify_intent("Hello") is None
+
+
+@pytest.mark.parametrize("source", [None, "held_out"])
+def test_agreement_on_the_labelled_set(source):
+    with open(LABELLED) as f:
+        labelled = [entry for entry in json.load(f) if source in (None, entry["source"])]
+    decided = [(classify_intent(entry["query"]), entry["expected"]) for entry in labelled]
+    decided = [(result["status"], expected) for result, expected in decided if result]
+    agreed = sum(status == expected for status, expected in decided)
+
+    assert len(decided) >= len(labelled) // 2
+    assert agreed / len(decided) >= 0.95
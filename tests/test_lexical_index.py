@@ -0,0 +1,51 @@
+"""Tests for the BM25 index, decisive matches and rank fusion (retriever/lexical_index.py)."""
+
+import pytest
+
+from retriever.lexical_index import LexicalIndex, build_lexical_index, decisive_hits, reciprocal_rank_fusion, tokenize
+
+IDS = [100, 101, 102, 103]
+QUESTIONS = [
+    "grub rescue prompt after installing windows",
+    "wifi adapter not detected after kernel upgrade",
+    "how do i change the grub timeout",
+    "sound stops working after suspend",
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = str(tmp_path / "lexical_index.npz")
+    build_lexical_index(IDS, QUESTIONS, path=path)
+    return LexicalIndex(path)
+
+
+def test_tokenize_drops_stopwords():
+    assert tokenize("How do I change the grub timeout") == ["change", "grub", "timeout"]
+
+
+def test_search_ranks_full_matches_first(index):
+    hits, num_terms = index.search("grub rescue windows", 3)
+    assert num_terms == 3
+    assert hits[0][0] == 100
+    assert hits[0][2] == pytest.approx(1.0)
+    assert all(coverage < 1.0 for _, _, coverage in hits[1:])
+
+
+def test_search_without_known_terms(index):
+    assert index.search("bluetooth headset", 5) == ([], 0)
+
+
+def test_decisive_hits_need_every_term_and_a_margin(index):
+    assert [hit[0] for hit in decisive_hits(*index.search("grub rescue windows", 5))] == [100]
+    # Only one of two terms matches anything: not decisive
+    assert decisive_hits(*index.search("grub bluetooth", 5)) == []
+
+
+def test_decisive_hits_need_enough_terms(index):
+    assert decisive_hits(*index.search("grub", 5)) == []
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    assert reciprocal_rank_fusion([1, 2, 3], [2, 4]) == [2, 1, 4, 3]
+    assert reciprocal_rank_fusion([5, 6]) == [5, 6]
@@ -0,0 +1,108 @@
+"""Tests for in-process metrics (utils/metrics.py)."""
+
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import metrics
+from utils.metrics import EXECUTOR_QUEUE_DEPTH, Counter, Gauge, Histogram, register_executor
+
+
+def test_counter_sums_thread_shards():
+    counter = Counter("test_counter_total", "Test counter", ["kind"])
+    threads = [threading.Thread(target=lambda: [counter.inc(kind="a") for _ in range(100)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.inc(5, kind="b")
+
+    assert counter.value(kind="a") == 400
+    assert counter.total() == 405
+    assert 'test_counter_total{kind="b"} 5' in counter.render()
+
+
+def test_gauge_function_and_inprogress():
+    gauge = Gauge("test_gauge", "Test gauge", ["name"])
+    gauge.set_function(lambda: 7, name="fn")
+    with gauge.track_inprogress(name="block"):
+        assert gauge.value(name="block") == 1
+    assert gauge.value(name="block") == 0
+    assert 'test_gauge{name="fn"} 7' in gauge.render()
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_seconds", "Test histogram", buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value)
+    lines = histogram.render()
+
+    assert 'test_seconds_bucket{le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{le="1"} 2' in lines
+    assert 'test_seconds_bucket{le="+Inf"} 3' in lines
+    assert "test_seconds_count 3" in lines
+
+
+def test_executor_queue_depth_counts_waiting_items():
+    executor = ThreadPoolExecutor(max_workers=1)
+    register_executor("test", executor)
+    started, release = threading.Event(), threading.Event()
+    running = executor.submit(lambda: (started.set(), release.wait()))
+    queued = [executor.submit(lambda: None) for _ in range(3)]
+
+    # One item runs, three wait for the only thread
+    started.wait(timeout=5)
+    assert EXECUTOR_QUEUE_DEPTH.value(executor="test") == 3
+
+    queued[-1].cancel()
+    assert EXECUTOR_QUEUE_DEPTH.value(executor="test") == 2
+
+    release.set()
+    for future in [running] + queued[:-1]:
+        future.result(timeout=5)
+    assert EXECUTOR_QUEUE_DEPTH.value(executor="test") == 0
+    executor.shutdown()
+
+
+def test_metrics_server_binds_localhost_by_default(monkeypatch):
+    monkeypatch.delenv("METRICS_HOST", raising=False)
+    monkeypatch.setattr(metrics, "_server", None)
+    server = metrics.start_metrics_server(port=0)
+    try:
+        host, port = server.server_address
+        assert host == "127.0.0.1"
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            assert b"rag_requests_total" in response.read()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_metrics_host_env_override(monkeypatch):
+    monkeypatch.setenv("METRICS_HOST", "0.0.0.0")
+    monkeypatch.setattr(metrics, "_server", None)
+    server = metrics.start_metrics_server(port=0)
+    try:
+        assert server.server_address[0] == "0.0.0.0"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_intent_decisions_use_the_intent_status():
+    before = metrics.INTENT_DECISIONS.value(source="rules", status="AMBIGUOUS")
+    # The request ended as a fallback, but the intent decision was CLEAR
+    metrics.record_request({"status": "FALLBACK", "intent_source": "rules", "intent_status": "CLEAR"})
+    metrics.record_request({"status": "AMBIGUOUS", "intent_source": "rules", "intent_status": "AMBIGUOUS"})
+    assert metrics.INTENT_DECISIONS.value(source="rules", status="FALLBACK") == 0
+    assert metrics.INTENT_DECISIONS.value(source="rules", status="AMBIGUOUS") == before + 1
+
+
+def test_metrics_route_follows_metrics_host(monkeypatch):
+    monkeypatch.delenv("METRICS_HOST", raising=False)
+    assert metrics.metrics_client_allowed("127.0.0.1")
+    assert not metrics.metrics_client_allowed("203.0.113.7")
+    assert not metrics.metrics_client_allowed(None)
+
+    monkeypatch.setenv("METRICS_HOST", "0.0.0.0")
+    assert metrics.metrics_client_allowed("203.0.113.7")
@@ -0,0 +1,36 @@
+"""Tests for the per-process query caches (retriever/query_cache.py)."""
+
+from retriever.query_cache import LRUCache
+from utils.metrics import QUERY_CACHE_LOOKUPS, uncounted_lookups
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache("test_lru", 2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+
+def test_lookups_are_counted():
+    cache = LRUCache("test_counted", 2)
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("missing")
+    assert QUERY_CACHE_LOOKUPS.value(cache="test_counted", result="hit") == 1
+    assert QUERY_CACHE_LOOKUPS.value(cache="test_counted", result="miss") == 1
+
+
+def test_warm_up_lookups_are_not_counted():
+    cache = LRUCache("test_uncounted", 2)
+    cache.put("a", 1)
+    with uncounted_lookups():
+        assert cache.get("a") == 1
+        assert cache.get("missing") is None
+    assert QUERY_CACHE_LOOKUPS.value(cache="test_uncounted", result="hit") == 0
+    assert QUERY_CACHE_LOOKUPS.value(cache="test_uncounted", result="miss") == 0
+
+    cache.get("a")
+    assert QUERY_CACHE_LOOKUPS.value(cache="test_uncounted", result="hit") == 1
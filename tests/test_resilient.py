@@ -0,0 +1,129 @@
+"""Tests for deadlines, retries and the circuit breaker around LLM calls (llm/resilient.py)."""
+
+import time
+
+import pytest
+
+from llm.base import LLMBackend, LLMBackendError
+from llm.resilient import CircuitBreaker, CircuitOpenError, ResilientBackend
+from utils.deadline import DeadlineExceeded, deadline_scope
+from utils.metrics import LLM_CALLS
+
+
+class FakeBackend(LLMBackend):
+    model_id = "fake"
+
+    def __init__(self, delay=0.0, failures=0):
+        super().__init__({})
+        self.delay = delay
+        self.failures = failures
+        self.calls = 0
+
+    def generate_text(self, prompt, params=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise ConnectionError("backend unavailable")
+        return f"answer to {prompt}"
+
+    def generate_text_stream(self, prompt, params=None):
+        yield from self.generate_text(prompt, params).split()
+
+
+class StallingStreamBackend(FakeBackend):
+    def generate_text_stream(self, prompt, params=None):
+        yield "first"
+        time.sleep(0.2)
+        yield "late"
+
+
+def calls(outcome):
+    return LLM_CALLS.value(backend="test", outcome=outcome)
+
+
+def resilient(backend, max_retries=0):
+    return ResilientBackend(backend, "test", max_retries=max_retries, retry_base=0.001, retry_max=0.001)
+
+
+def test_breaker_opens_after_threshold_and_closes_after_trial():
+    breaker = CircuitBreaker("test", threshold=2, cooldown=0.05)
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    breaker.before_call()
+    # Only one trial at a time
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    breaker.before_call()
+
+
+def test_caller_deadline_does_not_trip_the_breaker():
+    llm = resilient(FakeBackend(delay=0.05))
+    for _ in range(llm.breaker.threshold + 1):
+        with deadline_scope(0.001):
+            with pytest.raises(DeadlineExceeded):
+                llm.generate_text("q")
+
+    assert llm.breaker.failures == 0
+    assert llm.breaker.opened_at is None
+    assert llm.generate_text("q") == "answer to q"
+
+
+def test_caller_deadline_releases_a_trial_call():
+    llm = resilient(FakeBackend(delay=0.05))
+    llm.breaker.cooldown = 0.0
+    for _ in range(llm.breaker.threshold):
+        llm.breaker.record_failure()
+
+    with deadline_scope(0.001):
+        with pytest.raises(DeadlineExceeded):
+            llm.generate_text("q")
+    # The abandoned trial does not block the next one
+    assert llm.generate_text("q") == "answer to q"
+    assert llm.breaker.opened_at is None
+
+
+def test_backend_errors_are_retried_then_open_the_circuit():
+    backend = FakeBackend(failures=100)
+    llm = resilient(backend, max_retries=2)
+    with pytest.raises(LLMBackendError):
+        llm.generate_text("q")
+    assert backend.calls == 3
+
+    with pytest.raises(LLMBackendError):
+        llm.generate_text("q")
+    assert llm.breaker.opened_at is not None
+    calls = backend.calls
+    with pytest.raises(CircuitOpenError):
+        llm.generate_text("q")
+    assert backend.calls == calls
+
+
+def test_retry_recovers_from_a_transient_error():
+    llm = resilient(FakeBackend(failures=1), max_retries=1)
+    assert llm.generate_text("q") == "answer to q"
+    assert llm.breaker.failures == 0
+
+
+def test_stream_yields_every_chunk():
+    llm = resilient(FakeBackend())
+    assert list(llm.generate_text_stream("q")) == ["answer", "to", "q"]
+
+
+def test_stream_outcome_is_counted_once():
+    before = {outcome: calls(outcome) for outcome in ("ok", "timeout")}
+    assert list(resilient(FakeBackend()).generate_text_stream("q")) == ["answer", "to", "q"]
+    assert calls("ok") == before["ok"] + 1
+
+    with deadline_scope(0.05):
+        stream = resilient(StallingStreamBackend()).generate_text_stream("q")
+        assert next(stream) == "first"
+        with pytest.raises(DeadlineExceeded):
+            next(stream)
+    assert calls("ok") == before["ok"] + 1
+    assert calls("timeout") == before["timeout"] + 1
@@ -0,0 +1,54 @@
+"""Tests for the generated-answer cache (generator/response_cache.py)."""
+
+from generator.response_cache import ResponseCache, cache_key
+
+PARAMS = {"max_new_tokens": 300}
+
+
+def key(query="How do I update Ubuntu?", doc_ids=(1, 2), history=(), model_id="granite", params=PARAMS,
+        version="ubuntu:1"):
+    return cache_key(query, list(doc_ids), list(history), model_id, params, version)
+
+
+def test_key_ignores_query_formatting_and_doc_order():
+    assert key() == key(query="  how do i update ubuntu?  ")
+    assert key() == key(doc_ids=(2, 1))
+
+
+def test_key_changes_with_everything_that_shapes_the_answer():
+    base = key()
+    assert key(doc_ids=(1, 3)) != base
+    assert key(history=[("What is apt?", "A package manager.")]) != base
+    assert key(model_id="llama") != base
+    assert key(params={"max_new_tokens": 100}) != base
+    assert key(version="ubuntu:2") != base
+
+
+def test_memory_lru_evicts_oldest():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", "A", "v1")
+    cache.put("b", "B", "v1")
+    assert cache.get("a") == ("A", "memory")
+    cache.put("c", "C", "v1")
+    assert cache.get("b") == (None, "miss")
+    assert cache.get("a") == ("A", "memory")
+
+
+def test_disk_tier_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "responses.db")
+    ResponseCache(path=path).put("k", "answer", "v1")
+    other = ResponseCache(path=path)
+    assert other.get("k") == ("answer", "disk")
+    # Promoted to memory after the disk hit
+    assert other.get("k") == ("answer", "memory")
+
+
+def test_invalidate_keeps_only_the_current_version(tmp_path):
+    path = str(tmp_path / "responses.db")
+    cache = ResponseCache(path=path)
+    cache.put("old", "stale", "v1")
+    cache.put("new", "fresh", "v2")
+    cache.invalidate(keep_version="v2")
+
+    assert cache.get("old") == (None, "miss")
+    assert cache.get("new") == ("fresh", "disk")
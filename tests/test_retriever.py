@@ -0,0 +1,234 @@
+"""Tests for retrieval (retriever/retriever.py) against an in-memory collection."""
+
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+import numpy as np
+import pytest
+
+from retriever import retriever
+from retriever.answer_store import AnswerStore, write_answer_store
+from retriever.lexical_index import LexicalIndex, build_lexical_index, tokenize
+from retriever.query_cache import get_embedding_cache, get_retrieval_cache
+from retriever.search_params import load_thresholds
+from utils.admission import stage_executor
+
+IDS = [0, 1, 2, 3, 4]
+QUESTIONS = [
+    "grub rescue prompt after installing windows",
+    "wifi adapter not detected after kernel upgrade",
+    "how do i change the grub timeout",
+    "sound stops working after suspend",
+    "wifi keeps disconnecting after suspend",
+]
+ANSWERS = [f"answer {row_id}" for row_id in IDS]
+
+
+class FakeEmbeddings:
+    """Hashed bag of words, L2-normalised."""
+
+    def embed_documents(self, texts):
+        vectors = []
+        for text in texts:
+            vector = np.zeros(64, dtype=np.float32)
+            for term in tokenize(text):
+                vector[zlib.crc32(term.encode()) % 64] += 1.0
+            vectors.append((vector / max(np.linalg.norm(vector), 1e-9)).tolist())
+        return vectors
+
+
+class FakeClient:
+    """Exact inner-product search over the stored question vectors."""
+
+    def __init__(self, vectors):
+        self.vectors = np.asarray(vectors, dtype=np.float32)
+
+    def search(self, collection_name, data, anns_field, limit, search_params, output_fields, partition_names):
+        results = []
+        for query_vector in data:
+            scores = self.vectors @ np.asarray(query_vector, dtype=np.float32)
+            order = np.argsort(-scores, kind="stable")[:limit]
+            results.append([{"id": IDS[i], "distance": float(scores[i])} for i in order])
+        return results
+
+
+class FakeVectorStore:
+    collection_name = "ubuntu"
+
+    def __init__(self):
+        self.embeddings = FakeEmbeddings()
+        self.client = FakeClient(self.embeddings.embed_documents(QUESTIONS))
+
+
+@pytest.fixture
+def vectorstore(tmp_path, monkeypatch):
+    write_answer_store(IDS, QUESTIONS, ANSWERS, "ubuntu", path=str(tmp_path / "answer_store"),
+                       vectors=FakeEmbeddings().embed_documents(QUESTIONS))
+    store = AnswerStore(str(tmp_path / "answer_store"))
+    build_lexical_index(IDS, QUESTIONS, path=str(tmp_path / "lexical_index.npz"))
+    lexical = LexicalIndex(str(tmp_path / "lexical_index.npz"))
+
+    monkeypatch.setattr(retriever, "get_answer_store", lambda: store)
+    monkeypatch.setattr(retriever, "get_lexical_index", lambda: lexical)
+    monkeypatch.setattr(retriever, "collection_version", lambda: "ubuntu:test")
+    monkeypatch.setattr(retriever, "routing_centroids", lambda vectorstore: None)
+    # Lexical results are always in time for the fast path, however slow the test machine
+    monkeypatch.setattr(retriever, "LEXICAL_FAST_PATH_WAIT_MS", 1000)
+    get_embedding_cache().clear()
+    get_retrieval_cache().clear()
+    yield FakeVectorStore()
+    get_embedding_cache().clear()
+    get_retrieval_cache().clear()
+
+
+def test_dense_search_reports_similarity(vectorstore):
+    context, score, info = retriever.retrieve_context(
+        vectorstore, "wifi disconnecting suspend", use_lexical=False, return_search_info=True
+    )
+    assert info["mode"] == "dense"
+    assert info["doc_ids"][0] == 4
+    assert "answer 4" in context
+    assert 0.0 < score <= 1.0
+
+
+def test_lexical_fast_path_reports_vector_similarity_not_coverage(vectorstore):
+    query = "grub rescue windows"
+    _, score, info = retriever.retrieve_context(vectorstore, query, return_search_info=True)
+    assert info["mode"] == "lexical"
+    assert info["doc_ids"][0] == 0
+
+    # The score is what the vector search would report for the matched row
+    dense = vectorstore.client.search("ubuntu", vectorstore.embeddings.embed_documents([query]),
+                                      "embedding", 1, {}, [], None)[0][0]
+    assert dense["id"] == 0
+    assert score == pytest.approx(dense["distance"], abs=1e-5)
+    assert score < 0.999
+
+
+def test_lexical_fast_path_embeds_only_uncached_queries(vectorstore, monkeypatch):
+    embedded = []
+    embed_documents = vectorstore.embeddings.embed_documents
+    monkeypatch.setattr(vectorstore.embeddings, "embed_documents",
+                        lambda texts: embedded.append(list(texts)) or embed_documents(texts))
+
+    query = "grub rescue windows"
+    _, score, info = retriever.retrieve_context(vectorstore, query, return_search_info=True)
+    assert info["mode"] == "lexical"
+    # The matched question's vector comes from the answer store
+    assert embedded == [[query]]
+
+    get_retrieval_cache().clear()
+    _, cached_score, info = retriever.retrieve_context(vectorstore, query, return_search_info=True)
+    assert info["mode"] == "lexical" and not info["cached"]
+    assert embedded == [[query]]
+    assert cached_score == pytest.approx(score)
+
+
+def test_lexical_fast_path_without_stored_vectors(vectorstore, tmp_path, monkeypatch):
+    write_answer_store(IDS, QUESTIONS, ANSWERS, "ubuntu", path=str(tmp_path / "plain_store"))
+    store = AnswerStore(str(tmp_path / "plain_store"))
+    assert store.get_vectors([0]) is None
+    monkeypatch.setattr(retriever, "get_answer_store", lambda: store)
+
+    query = "grub rescue windows"
+    _, score, info = retriever.retrieve_context(vectorstore, query, return_search_info=True)
+    assert info["mode"] == "lexical"
+    expected = np.dot(*np.asarray(vectorstore.embeddings.embed_documents([query, QUESTIONS[0]])))
+    assert score == pytest.approx(expected, abs=1e-5)
+
+
+def test_batch_matches_single_queries(vectorstore, monkeypatch):
+    queries = [
+        "grub rescue windows", "wifi adapter kernel", "change grub timeout", "sound suspend",
+        "wifi disconnecting suspend", "grub windows", "adapter detected upgrade", "sound working",
+    ] * 2
+    # Slow lexical searches: a batch queues them behind each other on the lexical workers
+    lexical = retriever.get_lexical_index()
+    search = lexical.search
+    monkeypatch.setattr(lexical, "search", lambda query, k: (time.sleep(0.04), search(query, k))[1])
+    monkeypatch.setattr(retriever, "LEXICAL_FAST_PATH_WAIT_MS", 100)
+
+    single = [retriever.retrieve_context(vectorstore, query, return_search_info=True) for query in queries]
+    get_retrieval_cache().clear()
+    batch = retriever.retrieve_context_batch(vectorstore, queries, return_search_info=True)
+
+    assert [info["mode"] for _, _, info in single].count("lexical") >= 4
+    for (context, score, info), (batch_context, batch_score, batch_info) in zip(single, batch):
+        assert batch_context == context
+        assert batch_score == pytest.approx(score, abs=1e-6)
+        assert batch_info["mode"] == info["mode"]
+        assert batch_info["doc_ids"] == info["doc_ids"]
+
+
+def test_results_downgraded_for_load_are_not_cached(vectorstore, monkeypatch):
+    def retrieve():
+        return retriever.retrieve_context(vectorstore, "wifi disconnecting suspend", quality_tier="thorough",
+                                          use_lexical=False, return_search_info=True)[2]
+
+    track_load = retriever.track_load
+    monkeypatch.setattr(retriever, "track_load", contextmanager(lambda: (yield load_thresholds()[1])))
+    info = retrieve()
+    assert info["downgraded"] and info["tier"] != "thorough"
+
+    # Once the load has passed the query is searched at full effort, then served from the cache
+    monkeypatch.setattr(retriever, "track_load", track_load)
+    info = retrieve()
+    assert not info["cached"] and not info["downgraded"]
+    info = retrieve()
+    assert info["cached"] and info["tier"] == "thorough"
+
+
+def test_full_retrieval_executor_lowers_effort_two_tiers(vectorstore, monkeypatch):
+    executor = stage_executor("retrieval")
+    size = executor._max_workers
+    # Hold every search inside track_load until the whole pool is searching
+    barrier = threading.Barrier(size, timeout=5)
+    choose = retriever.choose_search_params
+
+    def choose_when_full(*args, **kwargs):
+        if not kwargs.get("widen"):
+            barrier.wait()
+        return choose(*args, **kwargs)
+
+    monkeypatch.setattr(retriever, "choose_search_params", choose_when_full)
+    # No widened second search, so the reported tier is the one load chose
+    monkeypatch.setattr(retriever, "MIN_RELEVANT_DOCS", 1)
+    get_retrieval_cache().clear()
+    futures = [
+        executor.submit(retriever.retrieve_context, vectorstore, QUESTIONS[4],
+                        quality_tier="thorough", use_lexical=False, return_search_info=True)
+        for _ in range(size)
+    ]
+    infos = sorted((future.result()[2] for future in futures), key=lambda info: info["in_flight"])
+
+    assert infos[-1]["in_flight"] == size
+    assert infos[-1]["tier"] == "fast" and infos[-1]["downgraded"]
+    assert infos[0]["tier"] == "thorough"
+
+
+def test_saturated_lexical_pool_falls_back_to_dense(vectorstore, monkeypatch):
+    monkeypatch.setattr(retriever, "LEXICAL_FAST_PATH_WAIT_MS", 50)
+    release = threading.Event()
+    blockers = [retriever._lexical_executor.submit(release.wait) for _ in range(8)]
+    try:
+        start = time.monotonic()
+        _, _, info = retriever.retrieve_context(vectorstore, "grub rescue windows", return_search_info=True)
+        elapsed = time.monotonic() - start
+    finally:
+        release.set()
+        for blocker in blockers:
+            blocker.result()
+
+    assert info["mode"] == "dense"
+    assert info["doc_ids"][0] == 0
+    assert elapsed < 1.0
+
+
+def test_nothing_is_cached_without_a_collection_version(vectorstore, monkeypatch):
+    monkeypatch.setattr(retriever, "collection_version", lambda: None)
+    for _ in range(2):
+        info = retriever.retrieve_context(vectorstore, "wifi disconnecting suspend", return_search_info=True)[2]
+        assert not info["cached"]
+    assert len(get_retrieval_cache()) == 0
@@ -0,0 +1,65 @@
+"""Tests for adaptive search effort (retriever/search_params.py)."""
+
+from retriever.search_params import choose_search_params, load_thresholds, tier_for_budget, track_load
+from utils.constants import DEFAULT_QUALITY_TIER, SEARCH_QUALITY_TIERS
+
+ONE_TIER, TWO_TIERS = load_thresholds()
+
+
+def test_tier_for_budget():
+    assert tier_for_budget(20) == "fast"
+    assert tier_for_budget(100) == "balanced"
+    assert tier_for_budget(10_000) == "thorough"
+
+
+def test_default_tier_without_budget_or_tier():
+    assert choose_search_params(5)["tier"] == DEFAULT_QUALITY_TIER
+
+
+def test_explicit_tier_wins_over_budget():
+    assert choose_search_params(5, quality_tier="thorough", latency_budget_ms=10)["tier"] == "thorough"
+
+
+def test_load_lowers_the_tier():
+    assert choose_search_params(5, "thorough", in_flight=ONE_TIER)["tier"] == "balanced"
+    assert choose_search_params(5, "thorough", in_flight=TWO_TIERS)["tier"] == "fast"
+    assert choose_search_params(5, "fast", in_flight=TWO_TIERS)["tier"] == "fast"
+
+
+def test_load_thresholds_follow_the_retrieval_executor(monkeypatch):
+    monkeypatch.delenv("RAG_EXECUTOR_RETRIEVAL", raising=False)
+    # Half of the 8 retrieval threads lowers one tier, all 8 lower two
+    assert load_thresholds() == (4, 8)
+    monkeypatch.setenv("RAG_EXECUTOR_RETRIEVAL", "32")
+    assert load_thresholds() == (16, 32)
+    monkeypatch.setenv("RAG_EXECUTOR_RETRIEVAL", "1")
+    assert load_thresholds() == (2, 2)
+    assert not choose_search_params(5, "thorough", in_flight=1)["downgraded"]
+
+
+def test_downgraded_only_when_load_changes_the_tier():
+    assert not choose_search_params(5, "balanced")["downgraded"]
+    assert choose_search_params(5, "balanced", in_flight=ONE_TIER)["downgraded"]
+    # Already the cheapest tier, or widened back to the top: same search as without load
+    assert not choose_search_params(5, "fast", in_flight=ONE_TIER)["downgraded"]
+    assert not choose_search_params(5, "thorough", in_flight=ONE_TIER, widen=True)["downgraded"]
+
+
+def test_widen_raises_the_tier():
+    assert choose_search_params(5, "balanced", widen=True)["tier"] == "thorough"
+    assert choose_search_params(5, "thorough", widen=True)["tier"] == "thorough"
+
+
+def test_hnsw_ef_is_at_least_k():
+    params = choose_search_params(500, "fast")["param"]["params"]
+    assert params["ef"] == 500
+    params = choose_search_params(5, "fast")["param"]["params"]
+    assert params["ef"] == SEARCH_QUALITY_TIERS["fast"]["ef"]
+
+
+def test_track_load_counts_nested_searches():
+    with track_load() as outer:
+        with track_load() as inner:
+            assert inner == outer + 1
+    with track_load() as again:
+        assert again == outer
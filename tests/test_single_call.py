@@ -0,0 +1,40 @@
+"""Tests for the streaming single-call output parser (generator/single_call.py)."""
+
+from generator.single_call import SingleCallParser
+from utils.constants import CLARIFICATION_MARKER
+
+
+def feed_all(parser, chunks):
+    return [parser.feed(chunk) for chunk in chunks]
+
+
+def test_answer_is_released_once_it_cannot_be_the_marker():
+    parser = SingleCallParser()
+    released = feed_all(parser, ["  [", "[To", " fix"])
+    # "[" could still start the marker; "[[To" cannot
+    assert released == [None, "[[To", "[[To fix"]
+    parser.finish()
+    assert parser.answer == "[[To fix"
+    assert parser.clarification is None
+
+
+def test_clarification_is_collected_until_the_end():
+    parser = SingleCallParser()
+    released = feed_all(parser, [CLARIFICATION_MARKER[:3], CLARIFICATION_MARKER[3:], " Which", " device?"])
+    assert released == [None, None, None, None]
+    parser.finish()
+    assert parser.clarification == "Which device?"
+    assert parser.answer == ""
+
+
+def test_short_output_is_an_answer():
+    parser = SingleCallParser()
+    assert parser.feed("[") is None
+    assert parser.clarification is None
+    parser.finish()
+    assert parser.answer == "["
+
+
+def test_first_chunk_decides_a_plain_answer():
+    parser = SingleCallParser()
+    assert parser.feed("Run sudo apt update") == "Run sudo apt update"
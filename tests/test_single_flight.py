@@ -0,0 +1,108 @@
+"""Tests for request coalescing (utils/single_flight.py)."""
+
+import asyncio
+
+from utils.single_flight import SingleFlight
+
+
+async def collect(flight):
+    return [chunk async for chunk in flight.subscribe()]
+
+
+def test_identical_requests_share_one_execution():
+    async def scenario():
+        flights = SingleFlight()
+        started = []
+
+        async def pipeline(stats):
+            started.append(stats)
+            for text in ("a", "ab", "abc"):
+                await asyncio.sleep(0.01)
+                yield text
+
+        first, joined_first = flights.join("q", pipeline)
+        second, joined_second = flights.join("q", pipeline)
+        results = await asyncio.gather(collect(first), collect(second))
+
+        assert first is second
+        assert (joined_first, joined_second) == (False, True)
+        assert len(started) == 1
+        # Cumulative chunks: every subscriber ends on the full text, and gets it once
+        assert all(result[-1] == "abc" and result.count("abc") == 1 for result in results)
+        assert len(flights) == 0
+
+    asyncio.run(scenario())
+
+
+def test_different_keys_run_separately():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def pipeline(stats):
+            yield "x"
+
+        first, _ = flights.join("q1", pipeline)
+        second, joined = flights.join("q2", pipeline)
+        assert first is not second and not joined
+        await asyncio.gather(collect(first), collect(second))
+
+    asyncio.run(scenario())
+
+
+def test_error_reaches_every_subscriber():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def pipeline(stats):
+            yield "partial"
+            raise RuntimeError("backend down")
+
+        flight, _ = flights.join("q", pipeline)
+        flights.join("q", pipeline)
+        results = await asyncio.gather(collect(flight), collect(flight), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    asyncio.run(scenario())
+
+
+def test_last_subscriber_leaving_cancels_the_execution():
+    async def scenario():
+        flights = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def pipeline(stats):
+            try:
+                yield "first"
+                await asyncio.sleep(10)
+                yield "never"
+            finally:
+                cancelled.set()
+
+        flight, _ = flights.join("q", pipeline)
+        stream = flight.subscribe()
+        assert await stream.__anext__() == "first"
+        await stream.aclose()
+
+        await asyncio.wait_for(cancelled.wait(), 1)
+        assert len(flights) == 0
+
+    asyncio.run(scenario())
+
+
+def test_joining_after_completion_starts_a_new_execution():
+    async def scenario():
+        flights = SingleFlight()
+        runs = []
+
+        async def pipeline(stats):
+            runs.append(1)
+            yield "done"
+
+        flight, _ = flights.join("q", pipeline)
+        await collect(flight)
+        second, joined = flights.join("q", pipeline)
+        assert not joined
+        assert await collect(second) == ["done"]
+        assert len(runs) == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,81 @@
+"""Tests for the append-only timing log (utils/timing_log.py)."""
+
+import glob
+import json
+
+from utils import timing_log
+from utils.timing_log import TimingLogWriter, get_timing_writer, read_timing_records, set_worker_index
+
+
+def test_writer_appends_json_lines(tmp_path):
+    path = str(tmp_path / "timing_log.jsonl")
+    writer = TimingLogWriter(path, flush_interval=0.01)
+    for i in range(5):
+        writer.write({"timestamp": f"2026-01-01T00:00:0{i}", "n": i})
+    writer.close()
+
+    with open(path) as f:
+        assert [json.loads(line)["n"] for line in f] == [0, 1, 2, 3, 4]
+    assert writer.written == 5
+    assert writer.dropped == 0
+
+
+def test_writer_rotates_and_reader_reads_segments(tmp_path):
+    path = str(tmp_path / "timing_log.jsonl")
+    writer = TimingLogWriter(path, max_bytes=1, flush_interval=0.01, flush_batch=1)
+    for i in range(3):
+        writer.write({"n": i})
+    writer.close()
+
+    assert glob.glob(str(tmp_path / "timing_log.*.jsonl.zst"))
+    assert [record["n"] for record in read_timing_records(path, legacy_path=None)] == [0, 1, 2]
+
+
+def test_non_json_values_are_still_written(tmp_path):
+    path = str(tmp_path / "timing_log.jsonl")
+    writer = TimingLogWriter(path, flush_interval=0.01)
+    writer.write({"n": 0, "bad": float("nan")})
+    writer.write({"n": 1, "set": {1, 2}})
+    writer.close()
+
+    # NaN is written as JSON allows it; a set falls back to str()
+    assert [record["n"] for record in read_timing_records(path, legacy_path=None)] == [0, 1]
+
+
+def test_reader_merges_legacy_active_and_worker_files(tmp_path):
+    path = tmp_path / "timing_log.jsonl"
+    legacy = tmp_path / "timing_log.json"
+    legacy.write_text(json.dumps([{"timestamp": "2026-01-01T00:00:00", "n": 0}]))
+    path.write_text(json.dumps({"timestamp": "2026-01-01T00:00:03", "n": 3}) + "\n")
+    (tmp_path / "timing_log.w0.jsonl").write_text(
+        json.dumps({"timestamp": "2026-01-01T00:00:02", "n": 2}) + "\n"
+    )
+    # A crash mid-write leaves a truncated last line
+    (tmp_path / "timing_log.w1.jsonl").write_text(
+        json.dumps({"timestamp": "2026-01-01T00:00:01", "n": 1}) + '\n{"timestamp": "2026-01'
+    )
+
+    records = read_timing_records(str(path), legacy_path=str(legacy))
+    assert [record["n"] for record in records] == [0, 1, 2, 3]
+
+
+def test_worker_files_are_per_generation(tmp_path, monkeypatch):
+    monkeypatch.setattr(timing_log, "_worker_tag", None)
+    path = str(tmp_path / "timing_log.jsonl")
+    try:
+        # A worker and its replacement after a reload run side by side
+        set_worker_index(2, generation=0)
+        old = get_timing_writer(path)
+        set_worker_index(2, generation=1)
+        new = get_timing_writer(path)
+        assert old.path != new.path
+        assert new.path == str(tmp_path / "timing_log.w2g1.jsonl")
+
+        old.write({"timestamp": "2026-01-01T00:00:00", "n": 0})
+        new.write({"timestamp": "2026-01-01T00:00:01", "n": 1})
+        old.close()
+        new.close()
+    finally:
+        get_timing_writer.cache_clear()
+
+    assert [record["n"] for record in read_timing_records(path, legacy_path=None)] == [0, 1]
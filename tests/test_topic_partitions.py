@@ -0,0 +1,70 @@
+"""Tests for topic partitioning (data_prep/topic_partitions.py) and query routing (retriever/topic_router.py)."""
+
+import numpy as np
+import pytest
+
+from retriever import topic_router
+from retriever.topic_router import partition_name, partitions_match, route_query, routing_centroids
+
+CENTROIDS = np.eye(4, dtype=np.float32)
+
+
+class FakeClient:
+    def __init__(self, partitions):
+        self.partitions = partitions
+
+    def list_partitions(self, collection_name):
+        return self.partitions
+
+
+class FakeVectorStore:
+    def __init__(self, partitions, collection_name="ubuntu"):
+        self.client = FakeClient(partitions)
+        self.collection_name = collection_name
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    partitions_match.cache_clear()
+    yield
+    partitions_match.cache_clear()
+
+
+def test_route_query_orders_partitions_by_similarity():
+    vector = [0.1, 0.0, 0.9, 0.5]
+    assert route_query(vector, 2, CENTROIDS) == [partition_name(2), partition_name(3)]
+
+
+def test_route_query_searches_everything_when_routing_to_all_partitions():
+    assert route_query([1.0, 0.0, 0.0, 0.0], 4, CENTROIDS) is None
+
+
+def test_group_by_topic_drops_empty_topics_and_renumbers():
+    pytest.importorskip("sklearn")
+    from data_prep.topic_partitions import group_by_topic
+
+    labels = np.array([2, 0, 2, 0, 3])
+    centroids, rows = group_by_topic(CENTROIDS, labels)
+
+    np.testing.assert_array_equal(centroids, CENTROIDS[[0, 2, 3]])
+    assert rows == [[1, 3], [0, 2], [4]]
+
+
+def test_partitions_match_requires_one_partition_per_centroid():
+    expected = ["_default"] + [partition_name(t) for t in range(4)]
+    assert partitions_match(FakeClient(expected), "ubuntu", 4)
+    assert not partitions_match(FakeClient(["_default"]), "unpartitioned", 4)
+    assert not partitions_match(FakeClient(expected[:-1]), "missing_one", 4)
+
+
+def test_routing_centroids_off_when_collection_is_unpartitioned(monkeypatch):
+    monkeypatch.setattr(topic_router, "load_centroids", lambda: CENTROIDS)
+
+    assert routing_centroids(FakeVectorStore(["_default"])) is None
+    partitioned = FakeVectorStore([partition_name(t) for t in range(4)], collection_name="partitioned")
+    assert routing_centroids(partitioned) is CENTROIDS
+
+
+def test_routing_centroids_off_without_centroids(monkeypatch):
+    monkeypatch.setattr(topic_router, "load_centroids", lambda: None)
+    assert routing_centroids(FakeVectorStore(["_default"])) is None
@@ -1,28 +1,32 @@
 """
 Analyze timing log data collected from chatbot.py
 
-This script reads timing_log.json and provides:
+This script reads timing_log.jsonl (including rotated .zst segments and the
+legacy timing_log.json array) and provides:
 - Average latency by component
 - Breakdown by query status (CLEAR vs AMBIGUOUS)
 - Performance statistics
 - Visualization-ready data
 """
 
-import json
 import os
+import sys
 from datetime import datetime
 from statistics import mean, median, stdev
 
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.constants import TIMING_LOG_FILE, LEGACY_TIMING_LOG_FILE
+from utils.timing_log import read_timing_records
 
-def load_timing_log(filename="timing/timing_log.json"):
-    """Load timing log from JSON file."""
-    if not os.path.exists(filename):
-        print(f"❌ File not found: {filename}")
+
+def load_timing_log(filename=TIMING_LOG_FILE, legacy_filename=LEGACY_TIMING_LOG_FILE):
+    """Load timing records from the JSON Lines log, its rotated segments and the legacy JSON file."""
+    logs = read_timing_records(filename, legacy_filename)
+    if not logs:
+        print(f"❌ No timing data found in {filename} or {legacy_filename}")
         print(f"   Run chatbot.py with ENABLE_TIMING=True to generate timing data.")
-        return []
-    
-    with open(filename, 'r') as f:
-        return json.load(f)
+    return logs
 
 
 def analyze_timing_data(logs):
@@ -34,13 +38,67 @@ def analyze_timing_data(logs):
     # Separate by status
     clear_logs = [log for log in logs if log["status"] == "CLEAR"]
     ambiguous_logs = [log for log in logs if log["status"] == "AMBIGUOUS"]
+    fallback_logs = [log for log in logs if log["status"] == "FALLBACK"]
+    busy_logs = [log for log in logs if log["status"] == "BUSY"]
+    banked_logs = [log for log in logs if log["status"] == "BANKED"]
     
     print(f"\n{'='*80}")
     print("TIMING LOG ANALYSIS")
     print(f"{'='*80}")
     print(f"Total Queries: {len(logs)}")
     print(f"  - CLEAR: {len(clear_logs)}")
+    print(f"  - BANKED (answered from the answer bank): {len(banked_logs)}")
     print(f"  - AMBIGUOUS: {len(ambiguous_logs)}")
+    print(f"  - FALLBACK (low similarity): {len(fallback_logs)}")
+    print(f"  - BUSY (rejected by admission control): {len(busy_logs)}")
+    
+    # Requests served in a cheaper mode under load (older records have no level)
+    degraded_logs = [log for log in logs if log.get("degradation_level")]
+    if degraded_logs:
+        print(f"\nDegraded Requests: {len(degraded_logs)}")
+        for level in sorted({log["degradation_level"] for log in degraded_logs}):
+            print(f"  - Level {level}: {sum(1 for log in degraded_logs if log['degradation_level'] == level)}")
+    
+    # Answer bank coverage and latency against generated answers
+    if banked_logs:
+        answered = len(banked_logs) + len(clear_logs)
+        print(f"\nAnswer Bank: {len(banked_logs) / answered * 100:.1f}% of answered queries")
+        print(f"  Average total (banked):    {mean(log['total_time'] for log in banked_logs):.3f}s")
+        print(f"  Median total (banked):     {median(log['total_time'] for log in banked_logs):.3f}s")
+        if clear_logs:
+            print(f"  Average total (generated): {mean(log['total_time'] for log in clear_logs):.3f}s")
+    
+    # Answers served from the response cache (older records have no cache result)
+    cached_logs = [log for log in logs if log.get("response_cache") in ("memory", "disk")]
+    missed_logs = [log for log in logs if log.get("response_cache") == "miss"]
+    if cached_logs or missed_logs:
+        print(f"\nResponse Cache ({len(cached_logs) + len(missed_logs)} lookups):")
+        print(f"  Hit rate: {len(cached_logs) / (len(cached_logs) + len(missed_logs)) * 100:.1f}%")
+        for result in ("memory", "disk"):
+            print(f"  - {result}: {sum(1 for log in cached_logs if log['response_cache'] == result)}")
+        if cached_logs:
+            print(f"  Average total (hit):  {mean(log['total_time'] for log in cached_logs):.3f}s")
+        if missed_logs:
+            print(f"  Average total (miss): {mean(log['total_time'] for log in missed_logs):.3f}s")
+    
+    # Intent decisions made by rules instead of the LLM (older records have no source)
+    sourced_logs = [log for log in logs if log.get("intent_source")]
+    if sourced_logs:
+        print(f"\nIntent Source ({len(sourced_logs)} classified queries):")
+        for source in ("rules", "llm", "clarification", "skipped"):
+            source_logs = [log for log in sourced_logs if log["intent_source"] == source]
+            if source_logs:
+                print(f"  - {source}: {len(source_logs)} ({len(source_logs) / len(sourced_logs) * 100:.1f}%), "
+                      f"average intent {mean(log['intent_time'] for log in source_logs):.3f}s")
+    
+    # Time spent waiting for an admission slot (older records have no queue wait)
+    queued_logs = [log for log in logs if log.get("queue_wait_time") is not None and log["status"] != "BUSY"]
+    if queued_logs:
+        queue_waits = [log["queue_wait_time"] for log in queued_logs]
+        print(f"\nAdmission Queue Wait ({len(queued_logs)} admitted queries):")
+        print(f"  Average: {mean(queue_waits):.3f}s")
+        print(f"  Median:  {median(queue_waits):.3f}s")
+        print(f"  Max:     {max(queue_waits):.3f}s")
     
     # Analyze CLEAR queries
     if clear_logs:
@@ -103,6 +161,37 @@ def analyze_timing_data(logs):
         print(f"  Vector Retrieval:    {avg_retrieval/avg_total*100:.1f}%")
         print(f"  Response Generation: {avg_generation/avg_total*100:.1f}%")
     
+    # Time to first token (streamed generation, traced requests only)
+    ttft_logs = [log for log in clear_logs if log.get("ttft_time") is not None]
+    if ttft_logs:
+        ttft_times = [log["ttft_time"] for log in ttft_logs]
+        print(f"\nTime to First Token (from request start, {len(ttft_logs)} queries):")
+        print(f"  Average: {mean(ttft_times):.3f}s")
+        print(f"  Median:  {median(ttft_times):.3f}s")
+        print(f"  Max:     {max(ttft_times):.3f}s")
+    
+    # Correlate search effort with latency and similarity
+    effort_logs = [log for log in logs if log.get("search_tier")]
+    if effort_logs:
+        print(f"\n{'='*80}")
+        print("SEARCH EFFORT ANALYSIS")
+        print(f"{'='*80}")
+        
+        for tier in sorted({log["search_tier"] for log in effort_logs}):
+            tier_logs = [log for log in effort_logs if log["search_tier"] == tier]
+            print(f"\n{tier} ({len(tier_logs)} queries, params: {tier_logs[-1]['search_params']}):")
+            print(f"  Avg Retrieval:  {mean(log['retrieval_time'] for log in tier_logs):.3f}s")
+            print(f"  Avg Similarity: {mean(log['similarity_score'] for log in tier_logs):.4f}")
+            print(f"  Expanded:       {sum(1 for log in tier_logs if log.get('search_expanded'))}")
+    
+    # Lexical fast path / hybrid usage
+    mode_logs = [log for log in logs if log.get("search_mode")]
+    if mode_logs:
+        print(f"\nRetrieval Modes:")
+        for mode in sorted({log["search_mode"] for log in mode_logs}):
+            mode_times = [log["retrieval_time"] for log in mode_logs if log["search_mode"] == mode]
+            print(f"  {mode}: {len(mode_times)} queries, avg retrieval {mean(mode_times):.3f}s")
+    
     # Analyze AMBIGUOUS queries
     if ambiguous_logs:
         print(f"\n{'='*80}")
@@ -0,0 +1,107 @@
+"""
+Analyze per-request traces exported by chatbot.py.
+
+This script reads timing/traces.jsonl (OTLP/JSON lines written by
+utils/tracing.py, including rotated .zst segments) and prints:
+- p50 / p95 / mean duration for every span name (intent, retrieval.embed, ...)
+- Time to first token from the generation spans
+- The slowest requests with their per-stage breakdown
+
+Usage:
+    python timing/analyze_traces.py
+    python timing/analyze_traces.py --slowest 10
+"""
+
+import os
+import sys
+import argparse
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.constants import TRACE_LOG_FILE
+from utils.timing_log import read_timing_records
+
+
+def load_spans(path=TRACE_LOG_FILE):
+    """
+    Flatten exported traces into span dicts.
+
+    Returns:
+        list: One list of spans per trace, each span with name, duration_ms, parent and attributes
+    """
+    traces = []
+    for record in read_timing_records(path, legacy_path=None):
+        spans = []
+        for resource in record.get("resourceSpans", []):
+            for scope in resource.get("scopeSpans", []):
+                for span in scope.get("spans", []):
+                    attributes = {
+                        attr["key"]: next(iter(attr["value"].values()))
+                        for attr in span.get("attributes", [])
+                    }
+                    spans.append({
+                        "name": span["name"],
+                        "span_id": span["spanId"],
+                        "parent_id": span.get("parentSpanId"),
+                        "duration_ms": (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6,
+                        "attributes": attributes,
+                    })
+        if spans:
+            traces.append(spans)
+    return traces
+
+
+def summarize(values):
+    """Format p50 / p95 / mean of a list of milliseconds."""
+    return (f"p50 {np.percentile(values, 50):>9.2f}ms | p95 {np.percentile(values, 95):>9.2f}ms | "
+            f"mean {np.mean(values):>9.2f}ms | n={len(values)}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Summarize request traces")
+    parser.add_argument("--file", default=TRACE_LOG_FILE, help="Trace file to read")
+    parser.add_argument("--slowest", type=int, default=5, help="Number of slowest requests to show")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    traces = load_spans(args.file)
+    if not traces:
+        print(f"❌ No traces found in {args.file}. Run chatbot.py and ask a few queries first.")
+        sys.exit(1)
+
+    durations = {}
+    for spans in traces:
+        for span in spans:
+            durations.setdefault(span["name"], []).append(span["duration_ms"])
+
+    print(f"\n{'='*80}")
+    print(f"SPAN DURATIONS ({len(traces)} requests)")
+    print(f"{'='*80}")
+    for name in sorted(durations):
+        print(f"  {name:<28} {summarize(durations[name])}")
+
+    ttft = [
+        float(span["attributes"]["ttft_ms"])
+        for spans in traces for span in spans
+        if span["name"] == "generation" and "ttft_ms" in span["attributes"]
+    ]
+    if ttft:
+        print(f"\nTime to first token (from generation start):")
+        print(f"  {'generation.ttft':<28} {summarize(ttft)}")
+
+    print(f"\n{'='*80}")
+    print("SLOWEST REQUESTS")
+    print(f"{'='*80}")
+    roots = sorted(
+        ((next(s for s in spans if s["parent_id"] is None), spans) for spans in traces),
+        key=lambda pair: pair[0]["duration_ms"], reverse=True
+    )
+    for root, spans in roots[:args.slowest]:
+        print(f"\n[{root['attributes'].get('request.id')}] {root['duration_ms']:.1f}ms")
+        for span in spans:
+            if span["parent_id"] == root["span_id"]:
+                print(f"  {span['name']:<20} {span['duration_ms']:>10.1f}ms")
@@ -0,0 +1,100 @@
+"""
+Report startup warm-ups and the cache hit ratio of the traffic that followed.
+
+This script reads timing/warmup_log.jsonl (written by api/warmup.py) and the
+timing log, and prints for each restart:
+- warm-up duration, queries warmed and answers generated
+- retrieval and response cache hit ratios over the following window
+  (WARMUP_REPORT_WINDOW_SECONDS, one hour by default)
+
+Warm-ups of several workers that start within one window are reported
+together as one restart.
+
+Usage:
+    python timing/analyze_warmup.py
+    python timing/analyze_warmup.py --window 1800
+"""
+
+import os
+import sys
+import argparse
+from datetime import datetime, timedelta
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.constants import WARMUP_LOG_FILE, WARMUP_REPORT_WINDOW_SECONDS
+from utils.timing_log import read_timing_records
+
+
+def group_restarts(warmups, window):
+    """
+    Group warm-up records of workers that started together.
+
+    Returns:
+        list: Lists of warm-up records, oldest restart first
+    """
+    restarts = []
+    for warmup in sorted(warmups, key=lambda record: record["timestamp"]):
+        started = datetime.fromisoformat(warmup["timestamp"])
+        if restarts and started - datetime.fromisoformat(restarts[-1][0]["timestamp"]) < window:
+            restarts[-1].append(warmup)
+        else:
+            restarts.append([warmup])
+    return restarts
+
+
+def hit_ratio(records, field, hit):
+    """
+    Returns:
+        tuple: (hits, lookups) over records that have the field
+    """
+    lookups = [record for record in records if field in record]
+    return sum(1 for record in lookups if hit(record[field])), len(lookups)
+
+
+def report(restart, logs, window):
+    start = datetime.fromisoformat(restart[0]["timestamp"])
+    traffic = [
+        log for log in logs
+        if start <= datetime.fromisoformat(log["timestamp"]) < start + window
+    ]
+    durations = [warmup["duration_s"] for warmup in restart]
+
+    print(f"\n{start.isoformat(timespec='seconds')} ({len(restart)} worker(s), mode {restart[0]['mode']})")
+    print(f"  Warm-up duration: max {max(durations):.1f}s, mean {sum(durations) / len(durations):.1f}s")
+    print(f"  Queries warmed:   {max(w['retrieved'] for w in restart)} of {max(w['queries'] for w in restart)}")
+    if any(w["answered"] for w in restart):
+        print(f"  Answers generated: {sum(w['answered'] for w in restart)}")
+
+    print(f"  Requests in the next {window.total_seconds() / 60:.0f} min: {len(traffic)}")
+    for label, field, hit in (
+        ("Retrieval cache", "search_cached", bool),
+        ("Response cache", "response_cache", lambda result: result in ("memory", "disk")),
+    ):
+        hits, lookups = hit_ratio(traffic, field, hit)
+        if lookups:
+            print(f"  {label + ':':<17} {hits}/{lookups} hits ({hits / lookups * 100:.1f}%)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Report warm-ups and the cache hit ratio that followed")
+    parser.add_argument("--window", type=float, default=WARMUP_REPORT_WINDOW_SECONDS,
+                        help="Seconds of traffic after each restart")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    window = timedelta(seconds=args.window)
+
+    warmups = read_timing_records(WARMUP_LOG_FILE, legacy_path=None)
+    if not warmups:
+        print(f"❌ No warm-ups found in {WARMUP_LOG_FILE}")
+        sys.exit(1)
+
+    logs = read_timing_records()
+    print(f"{'='*80}")
+    print("WARM-UP REPORT")
+    print(f"{'='*80}")
+    for restart in group_restarts(warmups, window):
+        report(restart, logs, window)
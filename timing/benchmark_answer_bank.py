@@ -0,0 +1,142 @@
+"""
+Answer bank coverage and latency benchmark.
+
+Replays the logged queries (weighted by how often they were asked) and the
+evaluation queries against the answer bank built by
+data_prep/build_answer_bank.py and reports:
+- coverage: the share of traffic a banked answer would serve
+- p50 / p95 latency of a bank lookup (embedding + nearest centroid)
+- p50 / p95 latency of the retrieval a generated answer starts with, for comparison
+- banked coverage at several match thresholds, to help tune ANSWER_BANK_MATCH_THRESHOLD
+
+End-to-end numbers for served traffic (BANKED vs CLEAR total time) are in
+timing/analyze_timing_log.py.
+
+Results are appended as one JSON line per run to timing/answer_bank_benchmark.jsonl.
+
+Usage:
+    python timing/benchmark_answer_bank.py
+    python timing/benchmark_answer_bank.py --limit 500
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from retriever.answer_bank import get_answer_bank
+from retriever.query_cache import get_embedding_cache, get_retrieval_cache
+from retriever.retriever import embed_queries, retrieve_context
+from retriever.vector_store import get_vectorstore
+from utils.constants import ANSWER_BANK_MATCH_THRESHOLD, DEFAULT_QUALITY_TIER, DEFAULT_RETRIEVAL_K
+from utils.helpers import normalize_query
+from utils.timing_log import read_timing_records
+
+# Output file (JSON Lines, one record per benchmark run)
+BENCHMARK_LOG_FILE = "timing/answer_bank_benchmark.jsonl"
+
+THRESHOLDS = (0.75, 0.8, 0.85, 0.9, 0.95)
+
+
+def traffic(limit):
+    """
+    Logged queries and evaluation queries with their weights.
+
+    Returns:
+        tuple: (queries, weights)
+    """
+    counts = Counter()
+    spellings = {}
+    for record in read_timing_records():
+        if record.get("query") and record.get("status") != "BUSY":
+            normalized = normalize_query(record["query"])
+            counts[normalized] += 1
+            spellings.setdefault(normalized, record["query"])
+    with open("evaluation/data/eval_queries.json") as f:
+        for item in json.load(f):
+            normalized = normalize_query(item["query"])
+            # Evaluation queries count once unless they were logged
+            if normalized not in counts:
+                counts[normalized] = 1
+            spellings.setdefault(normalized, item["query"])
+    most_common = counts.most_common(limit)
+    return [spellings[q] for q, _ in most_common], np.array([n for _, n in most_common], dtype=np.float64)
+
+
+def percentiles(seconds):
+    return {
+        "p50_ms": round(float(np.percentile(seconds, 50)) * 1000, 2),
+        "p95_ms": round(float(np.percentile(seconds, 95)) * 1000, 2),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure answer bank coverage and lookup latency")
+    parser.add_argument("--limit", type=int, default=1000, help="Most frequent distinct queries to replay")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    bank = get_answer_bank()
+    if bank is None:
+        sys.exit("❌ No answer bank for the current collection; run data_prep/build_answer_bank.py first")
+
+    vectorstore = get_vectorstore()
+    queries, weights = traffic(args.limit)
+    print(f"⏳ {len(queries)} distinct queries, {int(weights.sum())} requests, {len(bank)} banked answers")
+
+    lookup_seconds, retrieval_seconds, similarities = [], [], []
+    for query in queries:
+        # Cold caches, as for a query the process has not seen yet
+        get_embedding_cache().clear()
+        get_retrieval_cache().clear()
+
+        start = time.perf_counter()
+        vector = embed_queries(vectorstore, [query])[0]
+        bank.match(vector)
+        lookup_seconds.append(time.perf_counter() - start)
+        vector = np.asarray(vector, dtype=np.float32)
+        similarities.append(float((bank.centroids @ (vector / np.linalg.norm(vector))).max()))
+
+        get_embedding_cache().clear()
+        start = time.perf_counter()
+        retrieve_context(vectorstore, query, k=DEFAULT_RETRIEVAL_K, quality_tier=DEFAULT_QUALITY_TIER)
+        retrieval_seconds.append(time.perf_counter() - start)
+
+    similarities = np.array(similarities)
+    coverage = {
+        str(threshold): round(float(weights[similarities >= threshold].sum() / weights.sum()), 4)
+        for threshold in THRESHOLDS
+    }
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "queries": len(queries),
+        "requests": int(weights.sum()),
+        "banked_answers": len(bank),
+        "match_threshold": ANSWER_BANK_MATCH_THRESHOLD,
+        "coverage": round(float(weights[similarities >= ANSWER_BANK_MATCH_THRESHOLD].sum() / weights.sum()), 4),
+        "coverage_by_threshold": coverage,
+        "bank_lookup": percentiles(lookup_seconds),
+        "retrieval": percentiles(retrieval_seconds),
+    }
+
+    print(f"\nCoverage at {ANSWER_BANK_MATCH_THRESHOLD}: {record['coverage'] * 100:.1f}% of requests")
+    for threshold, share in coverage.items():
+        print(f"  threshold {threshold}: {share * 100:5.1f}%")
+    print(f"Bank lookup: p50 {record['bank_lookup']['p50_ms']:.2f} ms, p95 {record['bank_lookup']['p95_ms']:.2f} ms")
+    print(f"Retrieval:   p50 {record['retrieval']['p50_ms']:.2f} ms, p95 {record['retrieval']['p95_ms']:.2f} ms "
+          f"(generation comes on top of this)")
+
+    with open(BENCHMARK_LOG_FILE, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+    print(f"\n✅ Results appended to {BENCHMARK_LOG_FILE}")
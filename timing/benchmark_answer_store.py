@@ -0,0 +1,196 @@
+"""
+Answer store benchmark: Q&A bodies in Milvus versus the local answer store.
+
+This script builds two scratch collections with the index from INDEX_PARAMS:
+- "inline": question and answer kept as VARCHAR fields and returned by every search
+- "ids_only": only ids and vectors, with bodies read from a local zstd answer store
+  for hits above the similarity threshold
+
+and reports for each:
+- Loaded segment memory reported by Milvus
+- Search response payload size (serialised hits)
+- p50 / p95 end-to-end retrieval latency (search + body fetch + context build)
+
+Results are appended as one JSON line per run to timing/answer_store_benchmark.jsonl.
+
+Usage:
+    python timing/benchmark_answer_store.py --limit 50000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+from datetime import datetime
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pymilvus import (
+    connections, FieldSchema, CollectionSchema, DataType, Collection, utility
+)
+from sentence_transformers import SentenceTransformer
+
+from app.config import MILVUS_TOKEN, MILVUS_URL, COLLECTION_NAME, EMBEDDING_MODEL_NAME
+from data_prep.data_loader import load_ubuntu_dataset, preprocess_dataset
+from retriever.answer_store import AnswerStore, write_answer_store
+from retriever.search_params import choose_search_params
+from timing.benchmark_index_types import loaded_memory_bytes
+from utils.constants import EMBEDDING_DIM, INDEX_PARAMS, HIGH_SIMILARITY_THRESHOLD
+
+# Output file (JSON Lines, one record per benchmark run)
+BENCHMARK_LOG_FILE = "timing/answer_store_benchmark.jsonl"
+
+
+def build_collection(name, embeddings, questions=None, answers=None, batch_size=5000):
+    """
+    Create a scratch collection, with Q&A bodies inline when questions/answers are given.
+
+    Returns:
+        Collection: Loaded collection
+    """
+    if utility.has_collection(name):
+        utility.drop_collection(name)
+
+    inline = questions is not None
+    fields = [
+        FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=False),
+        FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=EMBEDDING_DIM),
+    ]
+    if inline:
+        fields += [
+            FieldSchema(name="question", dtype=DataType.VARCHAR, max_length=512),
+            FieldSchema(name="answer", dtype=DataType.VARCHAR, max_length=2048),
+        ]
+    collection = Collection(name=name, schema=CollectionSchema(fields, description="Answer store benchmark"))
+
+    for i in range(0, len(embeddings), batch_size):
+        ids = list(range(i, min(i + batch_size, len(embeddings))))
+        columns = [ids, embeddings[i:i+batch_size].tolist()]
+        if inline:
+            columns += [[questions[j][:512] for j in ids], [answers[j][:2048] for j in ids]]
+        collection.insert(columns)
+
+    collection.flush()
+    collection.create_index(field_name="embedding", index_params=INDEX_PARAMS)
+    utility.wait_for_index_building_complete(name)
+    collection.load()
+    return collection
+
+
+def retrieve(collection, vector, k, param, store=None):
+    """
+    Search and build the context string the way retrieve_context does.
+
+    Returns:
+        tuple: (context, payload_bytes)
+    """
+    output_fields = [] if store is not None else ["question", "answer"]
+    hits = collection.search([vector.tolist()], "embedding", param, limit=k, output_fields=output_fields)[0]
+
+    payload = [
+        {"id": hit.id, "distance": hit.distance, **{f: hit.entity.get(f) for f in output_fields}}
+        for hit in hits
+    ]
+    payload_bytes = len(json.dumps(payload).encode("utf-8"))
+
+    relevant = [hit for hit in payload if hit["distance"] > HIGH_SIMILARITY_THRESHOLD]
+    if store is not None:
+        pairs = store.get_many([hit["id"] for hit in relevant])
+    else:
+        pairs = [(hit["question"], hit["answer"]) for hit in relevant]
+
+    context = "".join(f"User: {q}\nAssistant: {a}\n\n" for q, a in pairs)
+    return context.strip(), payload_bytes
+
+
+def replay(collection, query_embeddings, k, store=None):
+    """
+    Replay all queries and summarise payload size and latency.
+
+    Returns:
+        dict: Payload and latency statistics
+    """
+    param = choose_search_params(k)["param"]
+    latencies = []
+    payloads = []
+
+    for vector in query_embeddings:
+        start = time.perf_counter()
+        _, payload_bytes = retrieve(collection, vector, k, param, store)
+        latencies.append((time.perf_counter() - start) * 1000)
+        payloads.append(payload_bytes)
+
+    return {
+        "payload_bytes_mean": round(float(np.mean(payloads)), 1),
+        "latency_p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "latency_p95_ms": round(float(np.percentile(latencies, 95)), 3),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark inline answers versus the local answer store")
+    parser.add_argument("--limit", type=int, default=None, help="Limit corpus size")
+    parser.add_argument("--k", type=int, default=8, help="Top-k per search")
+    parser.add_argument("--output", default=BENCHMARK_LOG_FILE, help="JSON Lines output file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    print("⏳ Loading and embedding corpus...")
+    questions, answers = preprocess_dataset(load_ubuntu_dataset())
+    if args.limit:
+        questions, answers = questions[:args.limit], answers[:args.limit]
+
+    embedder = SentenceTransformer(EMBEDDING_MODEL_NAME)
+    embeddings = embedder.encode(questions, show_progress_bar=True, convert_to_numpy=True,
+                                 normalize_embeddings=True).astype("float32")
+    with open("evaluation/data/eval_queries.json") as f:
+        query_texts = [item["query"] for item in json.load(f)]
+    query_embeddings = embedder.encode(query_texts, convert_to_numpy=True,
+                                       normalize_embeddings=True).astype("float32")
+
+    connections.connect(uri=MILVUS_URL, token=MILVUS_TOKEN)
+    results = {}
+
+    # Before: bodies stored in Milvus and returned with every hit
+    name = f"{COLLECTION_NAME}_bench_inline"
+    collection = build_collection(name, embeddings, questions, answers)
+    results["inline"] = {"memory_bytes": loaded_memory_bytes(name),
+                         **replay(collection, query_embeddings, args.k)}
+    collection.release()
+    utility.drop_collection(name)
+
+    # After: ids and vectors in Milvus, bodies in the memory-mapped store
+    name = f"{COLLECTION_NAME}_bench_ids_only"
+    with tempfile.TemporaryDirectory() as tmp:
+        store_dir = os.path.join(tmp, "answer_store")
+        manifest = write_answer_store(list(range(len(questions))), questions, answers, name, store_dir)
+        store = AnswerStore(store_dir)
+        collection = build_collection(name, embeddings)
+        results["ids_only"] = {"memory_bytes": loaded_memory_bytes(name),
+                               "answer_store_bytes": manifest["compressed_bytes"],
+                               **replay(collection, query_embeddings, args.k, store)}
+        collection.release()
+        utility.drop_collection(name)
+
+    for variant, stats in results.items():
+        print(f"  {variant}: {stats}")
+
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "corpus_size": len(questions),
+        "num_queries": len(query_texts),
+        "k": args.k,
+        "results": results,
+    }
+    with open(args.output, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+    print(f"\n✅ Results appended to {args.output}")
@@ -0,0 +1,139 @@
+"""
+Headless API versus Gradio queue throughput benchmark.
+
+This script starts api/app.py with the Gradio UI mounted on the same server
+(so both paths share the same warm models and process) and, for each
+concurrency level, sends the evaluation queries through:
+- api: POST /answer on the FastAPI app
+- gradio: the ChatInterface /chat endpoint through the Gradio queue (gradio_client)
+
+and reports requests per second and p50 / p95 latency for each path.
+
+Results are appended as one JSON line per run to timing/api_benchmark.jsonl.
+
+Usage:
+    python timing/benchmark_api.py
+    python timing/benchmark_api.py --concurrency 1 4 16 --requests 64
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from datetime import datetime
+from itertools import cycle, islice
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import numpy as np
+from gradio_client import Client
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.constants import UI_MOUNT_PATH
+
+# Output file (JSON Lines, one record per benchmark run)
+BENCHMARK_LOG_FILE = "timing/api_benchmark.jsonl"
+
+
+def start_server(port):
+    """
+    Launch api/app.py with the UI mounted and wait until it is ready.
+
+    Returns:
+        subprocess.Popen: Server process
+    """
+    process = subprocess.Popen([sys.executable, "api/app.py", "--host", "127.0.0.1",
+                                "--port", str(port), "--ui"])
+    for _ in range(600):
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).json()["ready"]:
+                return process
+        except (httpx.HTTPError, ValueError):
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("API server did not become ready")
+
+
+def run_path(send, queries, concurrency):
+    """
+    Send every query with the given concurrency.
+
+    Returns:
+        dict: Throughput and latency percentiles
+    """
+    def timed(query):
+        start = time.perf_counter()
+        send(query)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed, queries))
+    wall = time.perf_counter() - start
+
+    return {
+        "requests_per_second": round(len(queries) / wall, 3),
+        "latency_p50_s": round(float(np.percentile(latencies, 50)), 3),
+        "latency_p95_s": round(float(np.percentile(latencies, 95)), 3),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare the headless API with the Gradio queue")
+    parser.add_argument("--port", type=int, default=8010, help="Port for the benchmark server")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16], help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=32, help="Requests per path and concurrency level")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    with open("evaluation/data/eval_queries.json") as f:
+        queries = list(islice(cycle(item["query"] for item in json.load(f)), args.requests))
+
+    print("⏳ Starting API server with the Gradio UI mounted...")
+    server = start_server(args.port)
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    api = httpx.Client(base_url=base_url, timeout=300)
+    gradio = Client(f"{base_url}{UI_MOUNT_PATH}/", verbose=False)
+
+    def send_api(query):
+        api.post("/answer", json={"query": query}).raise_for_status()
+
+    def send_gradio(query):
+        gradio.predict(query, api_name="/chat")
+
+    results = []
+    try:
+        send_api(queries[0])  # warm-up
+        for concurrency in args.concurrency:
+            result = {
+                "concurrency": concurrency,
+                "api": run_path(send_api, queries, concurrency),
+                "gradio": run_path(send_gradio, queries, concurrency),
+            }
+            results.append(result)
+            print(f"  concurrency={concurrency:>3}: api {result['api']['requests_per_second']:>7.3f} req/s "
+                  f"(p95 {result['api']['latency_p95_s']}s) | gradio "
+                  f"{result['gradio']['requests_per_second']:>7.3f} req/s (p95 {result['gradio']['latency_p95_s']}s)")
+    finally:
+        api.close()
+        server.terminate()
+        server.wait()
+
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "requests": args.requests,
+        "results": results,
+    }
+    with open(BENCHMARK_LOG_FILE, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+    print(f"\n✅ Results appended to {BENCHMARK_LOG_FILE}")
@@ -0,0 +1,86 @@
+"""
+Batched retrieval throughput benchmark.
+
+For batch sizes 1..256 this script retrieves the same queries two ways:
+- serial: one retrieve_context call (one encode, one Milvus search) per query
+- batch: retrieve_context_batch (one encode pass, one multi-vector search per route)
+
+and reports queries per second for each. The evaluation queries are cycled
+to fill the larger batches.
+
+Results are appended as one JSON line per run to timing/batch_retrieval_benchmark.jsonl.
+
+Usage:
+    python timing/benchmark_batch_retrieval.py
+    python timing/benchmark_batch_retrieval.py --sizes 1 8 64 --no-lexical
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+from itertools import cycle, islice
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from retriever.retriever import retrieve_context, retrieve_context_batch
+from retriever.vector_store import get_vectorstore
+
+# Output file (JSON Lines, one record per benchmark run)
+BENCHMARK_LOG_FILE = "timing/batch_retrieval_benchmark.jsonl"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark batched versus serial retrieval")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1, 2, 4, 8, 16, 32, 64, 128, 256],
+                        help="Batch sizes to benchmark")
+    parser.add_argument("--no-lexical", action="store_true", help="Disable the BM25 fast path")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    use_lexical = not args.no_lexical
+
+    with open("evaluation/data/eval_queries.json") as f:
+        pool = [item["query"] for item in json.load(f)]
+
+    print("⏳ Initializing vector store...")
+    vectorstore = get_vectorstore()
+    retrieve_context(vectorstore, pool[0], use_lexical=use_lexical)  # warm-up
+
+    results = []
+    for size in args.sizes:
+        queries = list(islice(cycle(pool), size))
+
+        start = time.perf_counter()
+        serial = [retrieve_context(vectorstore, query, use_lexical=use_lexical) for query in queries]
+        serial_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch = retrieve_context_batch(vectorstore, queries, use_lexical=use_lexical)
+        batch_time = time.perf_counter() - start
+
+        result = {
+            "batch_size": size,
+            "serial_qps": round(size / serial_time, 2),
+            "batch_qps": round(size / batch_time, 2),
+            "speedup": round(serial_time / batch_time, 2),
+            "identical": serial == batch,
+        }
+        results.append(result)
+        print(f"  batch={size:>3}: serial {result['serial_qps']:>8.2f} q/s | "
+              f"batch {result['batch_qps']:>8.2f} q/s | x{result['speedup']}")
+
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "use_lexical": use_lexical,
+        "results": results,
+    }
+    with open(BENCHMARK_LOG_FILE, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+    print(f"\n✅ Results appended to {BENCHMARK_LOG_FILE}")
@@ -0,0 +1,144 @@
+"""
+Hybrid retrieval benchmark: dense-only versus BM25 + vector with fusion.
+
+For every query in evaluation/data/eval_queries.json this script runs
+retrieve_context with and without the lexical index and reports:
+- p50 / p95 retrieval latency per mode, and p50 of the fast-path queries alone
+- How often the lexical fast path skipped the Milvus search
+- Recall against a pooled reference set
+
+Every mode starts with empty retrieval and embedding caches. The fast path
+reads the matched question's vector from the answer store but still embeds a
+query it has not seen, so it only skips the embedding model for queries whose
+embedding is cached; "hybrid_cached" reruns the hybrid mode with the query
+embeddings from the previous run kept to measure that case.
+
+The eval set has no relevance labels, so the reference set for a query is the
+union of (a) thorough dense hits above HIGH_SIMILARITY_THRESHOLD and (b) corpus
+questions containing every query term (BM25 top 50, full coverage). Treat the
+recall numbers as a relative comparison, not an absolute quality measure.
+
+Results are appended as one JSON line per run to timing/hybrid_benchmark.jsonl.
+
+Usage:
+    python timing/benchmark_hybrid.py
+"""
+
+import os
+import sys
+import json
+import time
+from datetime import datetime
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from retriever.retriever import retrieve_context
+from retriever.query_cache import get_embedding_cache, get_retrieval_cache
+from retriever.lexical_index import get_lexical_index
+from retriever.search_params import choose_search_params
+from retriever.vector_store import get_vectorstore
+from utils.constants import HIGH_SIMILARITY_THRESHOLD
+
+# Output file (JSON Lines, one record per benchmark run)
+BENCHMARK_LOG_FILE = "timing/hybrid_benchmark.jsonl"
+
+
+def reference_ids(vectorstore, lexical, query, k=50):
+    """
+    Build the pooled reference set for one query.
+
+    Returns:
+        set: Row ids judged relevant by either exhaustive dense or exact lexical matching
+    """
+    dense = vectorstore.client.search(
+        collection_name=vectorstore.collection_name,
+        data=[vectorstore.embeddings.embed_query(query)],
+        anns_field="embedding",
+        limit=k,
+        search_params=choose_search_params(k, "thorough")["param"],
+        output_fields=[]
+    )[0]
+    relevant = {hit["id"] for hit in dense if hit["distance"] > HIGH_SIMILARITY_THRESHOLD}
+
+    lexical_hits, _ = lexical.search(query, k)
+    relevant |= {row_id for row_id, _, coverage in lexical_hits if coverage >= 0.999}
+    return relevant
+
+
+def run_mode(vectorstore, queries, references, use_lexical, keep_embeddings=False):
+    """
+    Run every query through retrieve_context in one mode.
+
+    Args:
+        keep_embeddings (bool): Keep query embeddings cached by the previous run
+
+    Returns:
+        dict: Latency, recall and fast-path statistics
+    """
+    get_retrieval_cache().clear()
+    if not keep_embeddings:
+        get_embedding_cache().clear()
+
+    latencies = []
+    recalls = []
+    modes = []
+
+    for query, reference in zip(queries, references):
+        start = time.perf_counter()
+        _, _, info = retrieve_context(vectorstore, query, use_lexical=use_lexical, return_search_info=True)
+        latencies.append((time.perf_counter() - start) * 1000)
+        modes.append(info["mode"])
+        if reference:
+            recalls.append(len(set(info["doc_ids"]) & reference) / len(reference))
+
+    fast_latencies = [latency for latency, mode in zip(latencies, modes) if mode == "lexical"]
+    return {
+        "latency_p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "latency_p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        "fast_path_p50_ms": round(float(np.percentile(fast_latencies, 50)), 3) if fast_latencies else None,
+        "recall_pooled": round(float(np.mean(recalls)), 4) if recalls else None,
+        "fast_path_rate": round(modes.count("lexical") / len(modes), 4),
+    }
+
+
+if __name__ == "__main__":
+    with open("evaluation/data/eval_queries.json") as f:
+        queries = [item["query"] for item in json.load(f)]
+
+    lexical = get_lexical_index()
+    if lexical is None:
+        print("❌ No lexical index found. Rebuild the collection with data_prep/store_data.py first.")
+        sys.exit(1)
+
+    print("⏳ Initializing vector store...")
+    vectorstore = get_vectorstore()
+
+    # Warm up the embedding model and connection so the first query is not penalised
+    retrieve_context(vectorstore, queries[0], use_lexical=False)
+
+    references = [reference_ids(vectorstore, lexical, query) for query in queries]
+
+    results = {
+        "dense": run_mode(vectorstore, queries, references, use_lexical=False),
+        "hybrid": run_mode(vectorstore, queries, references, use_lexical=True),
+        "hybrid_cached": run_mode(vectorstore, queries, references, use_lexical=True, keep_embeddings=True),
+    }
+
+    print(f"\n{'='*80}")
+    print("HYBRID RETRIEVAL BENCHMARK")
+    print(f"{'='*80}")
+    for mode, stats in results.items():
+        print(f"  {mode}: {stats}")
+
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "num_queries": len(queries),
+        "results": results,
+    }
+    with open(BENCHMARK_LOG_FILE, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+    print(f"\n✅ Results appended to {BENCHMARK_LOG_FILE}")
@@ -0,0 +1,255 @@
+"""
+Index-type benchmark for the Milvus collection build.
+
+This script builds the Ubuntu Q&A embeddings into a scratch collection once
+per index configuration and measures:
+- Index build time (create_index + load)
+- Loaded segment memory reported by Milvus
+- p50 / p95 single-query search latency
+- recall@k against exact (brute-force inner product) search
+
+Results are appended as one JSON line per run to timing/index_benchmark.jsonl
+so index choices can be tracked over time. The winning configuration should be
+copied into INDEX_PARAMS in utils/constants.py, which store_data.py uses.
+
+Usage:
+    python timing/benchmark_index_types.py
+    python timing/benchmark_index_types.py --limit 20000 --configs FLAT HNSW_M16
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pymilvus import (
+    connections, FieldSchema, CollectionSchema, DataType, Collection, utility
+)
+from sentence_transformers import SentenceTransformer
+
+from app.config import MILVUS_TOKEN, MILVUS_URL, COLLECTION_NAME, EMBEDDING_MODEL_NAME
+from data_prep.data_loader import load_ubuntu_dataset, preprocess_dataset
+from utils.constants import EMBEDDING_DIM
+from timing.index_eval import INDEX_MATRIX, exact_top_k, mean_recall, latency_percentiles
+
+# Output file (JSON Lines, one record per benchmark run)
+BENCHMARK_LOG_FILE = "timing/index_benchmark.jsonl"
+
+
+def load_corpus_embeddings(limit=None):
+    """
+    Load and embed the question corpus.
+
+    Args:
+        limit (int, optional): Only use the first `limit` questions
+
+    Returns:
+        tuple: (questions, embeddings, embedder)
+    """
+    dataset = load_ubuntu_dataset()
+    questions, _ = preprocess_dataset(dataset)
+    if limit:
+        questions = questions[:limit]
+
+    embedder = SentenceTransformer(EMBEDDING_MODEL_NAME)
+    embeddings = embedder.encode(
+        questions,
+        show_progress_bar=True,
+        convert_to_numpy=True,
+        normalize_embeddings=True
+    ).astype("float32")
+
+    return questions, embeddings, embedder
+
+
+def load_query_set(embedder, questions, corpus_queries=100, seed=42):
+    """
+    Build the replay query set: evaluation queries plus a sample of corpus questions.
+
+    Args:
+        embedder: SentenceTransformer model
+        questions (list): Corpus questions
+        corpus_queries (int): Number of corpus questions to sample as queries
+        seed (int): Random seed for the sample
+
+    Returns:
+        tuple: (query_texts, query_embeddings)
+    """
+    with open("evaluation/data/eval_queries.json") as f:
+        query_texts = [item["query"] for item in json.load(f)]
+
+    rng = random.Random(seed)
+    sample_size = min(corpus_queries, len(questions))
+    query_texts += rng.sample(questions, sample_size)
+
+    query_embeddings = embedder.encode(
+        query_texts,
+        convert_to_numpy=True,
+        normalize_embeddings=True
+    ).astype("float32")
+
+    return query_texts, query_embeddings
+
+
+def build_collection(name, embeddings, index_params, batch_size=5000):
+    """
+    Create a scratch collection, insert embeddings and build the index.
+
+    Row ids equal the position in the corpus so results can be compared
+    against exact search.
+
+    Returns:
+        tuple: (collection, insert_time, build_time)
+    """
+    if utility.has_collection(name):
+        utility.drop_collection(name)
+
+    fields = [
+        FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=False),
+        FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=EMBEDDING_DIM),
+    ]
+    collection = Collection(name=name, schema=CollectionSchema(fields, description="Index benchmark"))
+
+    insert_start = time.perf_counter()
+    for i in range(0, len(embeddings), batch_size):
+        batch = embeddings[i:i+batch_size]
+        collection.insert([list(range(i, i + len(batch))), batch.tolist()])
+    collection.flush()
+    insert_time = time.perf_counter() - insert_start
+
+    build_start = time.perf_counter()
+    collection.create_index(field_name="embedding", index_params=index_params)
+    utility.wait_for_index_building_complete(name)
+    collection.load()
+    build_time = time.perf_counter() - build_start
+
+    return collection, insert_time, build_time
+
+
+def loaded_memory_bytes(name):
+    """
+    Sum the memory of loaded segments as reported by Milvus.
+
+    Returns:
+        int or None: Bytes in memory, or None if the server does not report it
+    """
+    try:
+        return int(sum(seg.mem_size for seg in utility.get_query_segment_info(name)))
+    except Exception:
+        return None
+
+
+def replay_queries(collection, query_embeddings, search_params, k, warmup=5):
+    """
+    Run each query as a single search and record latency and result ids.
+
+    Returns:
+        tuple: (latencies_ms, result_id_sets)
+    """
+    for vector in query_embeddings[:warmup]:
+        collection.search([vector.tolist()], "embedding", search_params, limit=k)
+
+    latencies = []
+    results = []
+    for vector in query_embeddings:
+        start = time.perf_counter()
+        hits = collection.search([vector.tolist()], "embedding", search_params, limit=k)[0]
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append({hit.id for hit in hits})
+
+    return latencies, results
+
+
+def benchmark_config(config_name, embeddings, query_embeddings, ground_truth, k, keep=False):
+    """
+    Benchmark a single index configuration.
+
+    Returns:
+        dict: Machine-readable result for this configuration
+    """
+    index_params, search_params = INDEX_MATRIX[config_name]
+    name = f"{COLLECTION_NAME}_bench_{config_name.lower()}"
+
+    print(f"\n{'='*80}")
+    print(f"BENCHMARKING {config_name}")
+    print(f"{'='*80}")
+
+    try:
+        collection, insert_time, build_time = build_collection(name, embeddings, index_params)
+    except Exception as e:
+        # Index type not available on this server (e.g. DISKANN on managed Milvus)
+        print(f"⚠️  Skipped {config_name}: {e}")
+        if utility.has_collection(name):
+            utility.drop_collection(name)
+        return {"config": config_name, "index_params": index_params, "error": str(e)}
+
+    memory = loaded_memory_bytes(name)
+    latencies, results = replay_queries(collection, query_embeddings, search_params, k)
+
+    result = {
+        "config": config_name,
+        "index_params": index_params,
+        "search_params": search_params,
+        "insert_time_s": round(insert_time, 3),
+        "build_time_s": round(build_time, 3),
+        "memory_bytes": memory,
+        **latency_percentiles(latencies),
+        f"recall_at_{k}": mean_recall(results, ground_truth),
+    }
+
+    print(f"  Build: {build_time:.2f}s | p50: {result['latency_p50_ms']:.2f}ms | "
+          f"p95: {result['latency_p95_ms']:.2f}ms | recall@{k}: {result[f'recall_at_{k}']:.4f}")
+
+    if not keep:
+        collection.release()
+        utility.drop_collection(name)
+
+    return result
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark Milvus index types for the Ubuntu corpus")
+    parser.add_argument("--configs", nargs="+", default=list(INDEX_MATRIX),
+                        choices=list(INDEX_MATRIX), help="Index configurations to benchmark")
+    parser.add_argument("--limit", type=int, default=None, help="Limit corpus size")
+    parser.add_argument("--k", type=int, default=8, help="Top-k for search and recall")
+    parser.add_argument("--corpus-queries", type=int, default=100,
+                        help="Corpus questions added to the evaluation queries")
+    parser.add_argument("--keep", action="store_true", help="Keep scratch collections after the run")
+    parser.add_argument("--output", default=BENCHMARK_LOG_FILE, help="JSON Lines output file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    print("⏳ Loading and embedding corpus...")
+    questions, embeddings, embedder = load_corpus_embeddings(args.limit)
+    query_texts, query_embeddings = load_query_set(embedder, questions, args.corpus_queries)
+    ground_truth = exact_top_k(embeddings, query_embeddings, args.k)
+    print(f"✅ {len(questions)} corpus vectors, {len(query_texts)} queries")
+
+    connections.connect(uri=MILVUS_URL, token=MILVUS_TOKEN)
+
+    results = [
+        benchmark_config(name, embeddings, query_embeddings, ground_truth, args.k, args.keep)
+        for name in args.configs
+    ]
+
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "corpus_size": len(questions),
+        "num_queries": len(query_texts),
+        "k": args.k,
+        "results": results,
+    }
+    with open(args.output, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+    print(f"\n✅ Results appended to {args.output}")
@@ -0,0 +1,162 @@
+"""
+Request-path logging cost benchmark: print banners versus sampled queue logging.
+
+For every record in evaluation/results.json (query, retrieved context and
+generated answer) this script emits the per-request diagnostics two ways:
+- print: the previous stdout banners (context preview, raw intent output,
+  retrieval stats, full answer) written synchronously by the request thread
+- logging: the current leveled, sampled, queue-based loggers at the default level
+
+Requests run on --threads concurrent threads. For each style it reports the
+request-thread CPU time per request (thread_time), wall-clock throughput,
+and the CPU saved. Output goes to --output (default /dev/null) so terminal
+speed does not dominate; pass --output - to write to the real stdout.
+
+Results are appended as one JSON line per run to timing/logging_benchmark.jsonl.
+
+Usage:
+    python timing/benchmark_logging.py
+    python timing/benchmark_logging.py --requests 20000 --threads 8 --output -
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+from datetime import datetime
+from itertools import cycle, islice
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.constants import CONTEXT_PREVIEW_LENGTH
+from utils.logging_setup import get_logger, sampled, setup_logging
+from utils.tracing import Span, Trace, span
+
+# Output file (JSON Lines, one record per benchmark run)
+BENCHMARK_LOG_FILE = "timing/logging_benchmark.jsonl"
+
+
+def print_request(item):
+    """The per-request stdout output before leveled logging."""
+    print("\n" + "="*80)
+    print("STREAM RESPONSE - Starting generation")
+    print("="*80)
+    print(f"Intent Analysis - Raw response: {json.dumps({'status': 'CLEAR', 'follow_up_question': ''})}")
+    print(f"Intent Analysis - Extracted JSON: {json.dumps({'status': 'CLEAR'})}")
+    print(f"Intent Analysis - Final result: {{'status': 'CLEAR', 'follow_up_question': ''}}")
+    print(f"retrieve_context: Retrieved 8 docs (dense), highest score: {item['similarity']:.4f}, "
+          f"tier: balanced, params: {{'ef': 64}}")
+    print(f"\nSimilarity Score: {item['similarity']:.4f}")
+    print("\n" + "="*80)
+    print("RETRIEVED CONTEXT:")
+    print("="*80)
+    context = item["context"]
+    print(context[:CONTEXT_PREVIEW_LENGTH] + "..." if len(context) > CONTEXT_PREVIEW_LENGTH else context)
+    print("="*80 + "\n")
+    print("\n" + "="*80)
+    print("GENERATED RESPONSE:")
+    print("="*80)
+    print(item["answer"])
+    print("="*80 + "\n")
+
+
+_chatbot = get_logger("chatbot")
+_intent = get_logger("intent_analyzer")
+_retriever = get_logger("retriever")
+_prompt = get_logger("prompt_builder")
+
+
+def log_request(item):
+    """The same diagnostics through the application's loggers, as the pipeline emits them."""
+    _chatbot.debug("Processing message (request %s)", "benchmark")
+    _intent.debug("Raw response: %s", {"status": "CLEAR", "follow_up_question": ""},
+                  extra={"category": "intent_raw"})
+    _intent.debug("Extracted JSON: %s", {"status": "CLEAR"})
+    _intent.debug("Final result: %s", {"status": "CLEAR", "follow_up_question": ""})
+    _retriever.debug("Retrieved %d docs (%s), highest score: %.4f, tier: %s, params: %s",
+                     8, "dense", item["similarity"], "balanced", {"ef": 64})
+    _chatbot.debug("Similarity score: %.4f", item["similarity"])
+    if sampled("context"):
+        _prompt.info("Retrieved context (%d chars):\n%.*s", len(item["context"]),
+                     CONTEXT_PREVIEW_LENGTH, item["context"])
+    if sampled("response"):
+        _chatbot.info("Generated response:\n%s", item["answer"])
+
+
+def run_style(emit, items, threads):
+    """
+    Emit diagnostics for every item on a thread pool.
+
+    Each request runs inside its own (unexported) trace, as in chatbot.py,
+    so sampling decisions are per request; creating the trace is not timed.
+
+    Returns:
+        dict: Request-thread CPU per request and throughput
+    """
+    def timed(item):
+        with span("request", parent=Span(Trace(), "benchmark")):
+            start = time.thread_time_ns()
+            emit(item)
+            return time.thread_time_ns() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        cpu_ns = list(pool.map(timed, items))
+    wall = time.perf_counter() - start
+
+    return {
+        "cpu_us_per_request": round(sum(cpu_ns) / len(cpu_ns) / 1000, 2),
+        "requests_per_second": round(len(items) / wall, 1),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark request-path logging cost")
+    parser.add_argument("--requests", type=int, default=10000, help="Synthetic requests per style")
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent request threads")
+    parser.add_argument("--output", default=os.devnull, help="Where log output goes ('-' for stdout)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    with open("evaluation/results.json") as f:
+        items = list(islice(cycle(json.load(f)), args.requests))
+
+    sink = sys.stdout if args.output == "-" else open(args.output, "w")
+    setup_logging(stream=sink)
+
+    with contextlib.redirect_stdout(sink):
+        results = {
+            "print": run_style(print_request, items, args.threads),
+            "logging": run_style(log_request, items, args.threads),
+        }
+    results["cpu_saved_pct"] = round(
+        100 * (1 - results["logging"]["cpu_us_per_request"] / results["print"]["cpu_us_per_request"]), 1
+    )
+
+    print(f"\n{'='*80}")
+    print(f"LOGGING BENCHMARK ({args.requests} requests, {args.threads} threads)")
+    print(f"{'='*80}")
+    for style in ("print", "logging"):
+        stats = results[style]
+        print(f"  {style:<8} {stats['cpu_us_per_request']:>9.2f} µs CPU/request | "
+              f"{stats['requests_per_second']:>10.1f} req/s")
+    print(f"  Request-path CPU saved: {results['cpu_saved_pct']}%")
+
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "requests": args.requests,
+        "threads": args.threads,
+        "output": args.output,
+        "results": results,
+    }
+    with open(BENCHMARK_LOG_FILE, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+    print(f"\n✅ Results appended to {BENCHMARK_LOG_FILE}")
@@ -0,0 +1,185 @@
+"""
+Topic partition benchmark for the Milvus collection.
+
+For several corpus sizes this script builds two scratch collections with the
+index from INDEX_PARAMS — one unpartitioned, one split into k-means topic
+partitions — and compares:
+- p50 / p95 search latency
+- recall@k against exact search
+when each query is routed to its nearest 1..N partitions.
+
+Results are appended as one JSON line per run to timing/partition_benchmark.jsonl.
+
+Usage:
+    python timing/benchmark_partitions.py
+    python timing/benchmark_partitions.py --sizes 10000 50000 --max-routed 4
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pymilvus import (
+    connections, FieldSchema, CollectionSchema, DataType, Collection, utility
+)
+
+from app.config import MILVUS_TOKEN, MILVUS_URL, COLLECTION_NAME
+from data_prep.topic_partitions import cluster_embeddings, group_by_topic
+from retriever.search_params import choose_search_params
+from retriever.topic_router import partition_name, route_query
+from timing.benchmark_index_types import load_corpus_embeddings, load_query_set
+from timing.index_eval import exact_top_k, mean_recall, latency_percentiles
+from utils.constants import EMBEDDING_DIM, INDEX_PARAMS, NUM_TOPIC_PARTITIONS
+
+# Output file (JSON Lines, one record per benchmark run)
+BENCHMARK_LOG_FILE = "timing/partition_benchmark.jsonl"
+
+
+def build_collection(name, embeddings, topic_rows=None, batch_size=5000):
+    """
+    Create a scratch collection, optionally split into topic partitions.
+
+    Row ids equal the position in the corpus so results can be compared
+    against exact search.
+
+    Returns:
+        Collection: Loaded collection
+    """
+    if utility.has_collection(name):
+        utility.drop_collection(name)
+
+    fields = [
+        FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=False),
+        FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=EMBEDDING_DIM),
+    ]
+    collection = Collection(name=name, schema=CollectionSchema(fields, description="Partition benchmark"))
+
+    if topic_rows is None:
+        groups = [(None, np.arange(len(embeddings)))]
+    else:
+        groups = [(partition_name(t), np.asarray(rows)) for t, rows in enumerate(topic_rows)]
+
+    for partition, rows in groups:
+        if partition:
+            collection.create_partition(partition)
+        for i in range(0, len(rows), batch_size):
+            batch = rows[i:i+batch_size]
+            collection.insert([batch.tolist(), embeddings[batch].tolist()], partition_name=partition)
+
+    collection.flush()
+    collection.create_index(field_name="embedding", index_params=INDEX_PARAMS)
+    utility.wait_for_index_building_complete(name)
+    collection.load()
+    return collection
+
+
+def replay(collection, query_embeddings, ground_truth, k, centroids=None, routed=None):
+    """
+    Replay queries against a collection, routing to partitions when centroids are given.
+
+    Returns:
+        dict: Latency percentiles and recall@k
+    """
+    param = choose_search_params(k)["param"]
+    latencies = []
+    results = []
+
+    for vector in query_embeddings:
+        partitions = route_query(vector, routed, centroids) if centroids is not None else None
+        start = time.perf_counter()
+        hits = collection.search([vector.tolist()], "embedding", param, limit=k,
+                                 partition_names=partitions)[0]
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append({hit.id for hit in hits})
+
+    return {
+        **latency_percentiles(latencies),
+        f"recall_at_{k}": mean_recall(results, ground_truth),
+    }
+
+
+def benchmark_size(size, embeddings, query_embeddings, k, num_topics, max_routed):
+    """
+    Compare the unpartitioned and partitioned collections at one corpus size.
+
+    Returns:
+        dict: Machine-readable result for this corpus size
+    """
+    corpus = embeddings[:size]
+    ground_truth = exact_top_k(corpus, query_embeddings, k)
+
+    print(f"\n{'='*80}")
+    print(f"CORPUS SIZE {len(corpus)}")
+    print(f"{'='*80}")
+
+    flat_name = f"{COLLECTION_NAME}_bench_unpartitioned"
+    collection = build_collection(flat_name, corpus)
+    result = {"corpus_size": len(corpus), "unpartitioned": replay(collection, query_embeddings, ground_truth, k)}
+    print(f"  Unpartitioned: {result['unpartitioned']}")
+    collection.release()
+    utility.drop_collection(flat_name)
+
+    centroids, topic_rows = group_by_topic(*cluster_embeddings(corpus, num_topics))
+    num_topics = len(centroids)
+    part_name = f"{COLLECTION_NAME}_bench_partitioned"
+    collection = build_collection(part_name, corpus, topic_rows)
+    result["partitioned"] = {}
+    for routed in range(1, max_routed + 1):
+        stats = replay(collection, query_embeddings, ground_truth, k, centroids, routed)
+        result["partitioned"][str(routed)] = stats
+        print(f"  Routed to {routed}/{num_topics} partitions: {stats}")
+    collection.release()
+    utility.drop_collection(part_name)
+
+    return result
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark topic-partitioned retrieval")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10000, 50000, 100000],
+                        help="Corpus sizes to benchmark (capped at the full corpus)")
+    parser.add_argument("--topics", type=int, default=NUM_TOPIC_PARTITIONS, help="Number of topic partitions")
+    parser.add_argument("--max-routed", type=int, default=4, help="Largest number of partitions searched per query")
+    parser.add_argument("--k", type=int, default=8, help="Top-k for search and recall")
+    parser.add_argument("--corpus-queries", type=int, default=100,
+                        help="Corpus questions added to the evaluation queries")
+    parser.add_argument("--output", default=BENCHMARK_LOG_FILE, help="JSON Lines output file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    print("⏳ Loading and embedding corpus...")
+    questions, embeddings, embedder = load_corpus_embeddings(max(args.sizes))
+    query_texts, query_embeddings = load_query_set(embedder, questions, args.corpus_queries)
+    print(f"✅ {len(questions)} corpus vectors, {len(query_texts)} queries")
+
+    connections.connect(uri=MILVUS_URL, token=MILVUS_TOKEN)
+
+    sizes = sorted({min(size, len(questions)) for size in args.sizes})
+    results = [
+        benchmark_size(size, embeddings, query_embeddings, args.k, args.topics, args.max_routed)
+        for size in sizes
+    ]
+
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "index_params": INDEX_PARAMS,
+        "num_topics": args.topics,
+        "num_queries": len(query_texts),
+        "k": args.k,
+        "results": results,
+    }
+    with open(args.output, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+    print(f"\n✅ Results appended to {args.output}")
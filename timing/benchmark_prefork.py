@@ -0,0 +1,210 @@
+"""
+Pre-fork versus independent-process memory and throughput benchmark.
+
+For each worker count N this script starts the API two ways:
+- prefork: api/prefork.py --workers N (one master, N forked workers, one socket)
+- independent: N separate api/app.py processes on consecutive ports
+
+and reports, once every worker is ready:
+- total RSS over all processes (counts shared pages once per process)
+- total PSS from /proc/<pid>/smaps_rollup (shared pages split between sharers)
+- requests per second and p95 latency for concurrent POST /answer calls
+
+Results are appended as one JSON line per run to timing/prefork_benchmark.jsonl.
+
+Usage:
+    python timing/benchmark_prefork.py
+    python timing/benchmark_prefork.py --workers 1 2 4 8 --requests 64
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import subprocess
+from datetime import datetime
+from itertools import cycle, islice
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Output file (JSON Lines, one record per benchmark run)
+BENCHMARK_LOG_FILE = "timing/prefork_benchmark.jsonl"
+STATUS_FILE = "timing/prefork_benchmark_status.json"
+
+
+def memory_kb(pid):
+    """
+    RSS and PSS of one process in kB.
+
+    Returns:
+        tuple: (rss_kb, pss_kb)
+    """
+    values = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if parts[0] in ("Rss:", "Pss:"):
+                    values[parts[0]] = int(parts[1])
+    except OSError:
+        pass
+    return values.get("Rss:", 0), values.get("Pss:", 0)
+
+
+def wait_ready(ports, timeout=600):
+    """Wait until /health reports ready on every port."""
+    deadline = time.monotonic() + timeout
+    pending = set(ports)
+    while pending and time.monotonic() < deadline:
+        for port in list(pending):
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).json()["ready"]:
+                    pending.discard(port)
+            except (httpx.HTTPError, ValueError):
+                pass
+        time.sleep(0.5)
+    if pending:
+        raise RuntimeError(f"Servers on ports {sorted(pending)} did not become ready")
+
+
+def start_prefork(workers, port):
+    """
+    Start api/prefork.py and wait until all workers report ready.
+
+    Returns:
+        tuple: (master process, list of all pids)
+    """
+    if os.path.exists(STATUS_FILE):
+        os.remove(STATUS_FILE)
+    process = subprocess.Popen([sys.executable, "api/prefork.py", "--workers", str(workers),
+                                "--host", "127.0.0.1", "--port", str(port), "--status-file", STATUS_FILE])
+    wait_ready([port])
+    for _ in range(600):
+        try:
+            with open(STATUS_FILE) as f:
+                status = json.load(f)
+            if len(status["workers"]) == workers and all(w.get("ready") for w in status["workers"]):
+                return process, [status["master_pid"]] + [w["pid"] for w in status["workers"]]
+        except (OSError, ValueError, KeyError):
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("Pre-fork workers did not become ready")
+
+
+def start_independent(workers, port):
+    """
+    Start one api/app.py per worker on consecutive ports.
+
+    Returns:
+        list: Server processes
+    """
+    processes = [
+        subprocess.Popen([sys.executable, "api/app.py", "--host", "127.0.0.1", "--port", str(port + i)])
+        for i in range(workers)
+    ]
+    wait_ready([port + i for i in range(workers)])
+    return processes
+
+
+def run_load(ports, queries, concurrency):
+    """
+    Send every query, spreading them round-robin over the ports.
+
+    Returns:
+        dict: Throughput and latency percentiles
+    """
+    clients = [httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=300) for port in ports]
+
+    def timed(item):
+        index, query = item
+        start = time.perf_counter()
+        clients[index % len(clients)].post("/answer", json={"query": query}).raise_for_status()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed, enumerate(queries)))
+    wall = time.perf_counter() - start
+    for client in clients:
+        client.close()
+
+    return {
+        "requests_per_second": round(len(queries) / wall, 3),
+        "latency_p95_s": round(float(np.percentile(latencies, 95)), 3),
+    }
+
+
+def measure(pids, ports, queries, concurrency):
+    # Serve the load first so memory reflects workers that have touched their pages
+    load = run_load(ports, queries, concurrency)
+    rss, pss = zip(*(memory_kb(pid) for pid in pids))
+    return {
+        "processes": len(pids),
+        "total_rss_mb": round(sum(rss) / 1024, 1),
+        "total_pss_mb": round(sum(pss) / 1024, 1),
+        **load,
+    }
+
+
+def stop(processes):
+    for process in processes:
+        process.send_signal(signal.SIGTERM)
+    for process in processes:
+        process.wait()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare pre-forked workers with independent processes")
+    parser.add_argument("--workers", nargs="+", type=int, default=list(range(1, 9)), help="Worker counts")
+    parser.add_argument("--port", type=int, default=8020, help="First port used by the benchmark servers")
+    parser.add_argument("--requests", type=int, default=32, help="Requests per run")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    with open("evaluation/data/eval_queries.json") as f:
+        queries = list(islice(cycle(item["query"] for item in json.load(f)), args.requests))
+
+    results = []
+    for workers in args.workers:
+        print(f"⏳ N={workers}: pre-fork...")
+        master, pids = start_prefork(workers, args.port)
+        try:
+            prefork = measure(pids, [args.port], queries, args.concurrency)
+        finally:
+            stop([master])
+
+        print(f"⏳ N={workers}: independent processes...")
+        processes = start_independent(workers, args.port)
+        try:
+            independent = measure([p.pid for p in processes],
+                                  [args.port + i for i in range(workers)], queries, args.concurrency)
+        finally:
+            stop(processes)
+
+        results.append({"workers": workers, "prefork": prefork, "independent": independent})
+        print(f"  N={workers}: prefork PSS {prefork['total_pss_mb']:>8.1f} MB, "
+              f"{prefork['requests_per_second']:>7.3f} req/s | independent PSS "
+              f"{independent['total_pss_mb']:>8.1f} MB, {independent['requests_per_second']:>7.3f} req/s")
+
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "results": results,
+    }
+    with open(BENCHMARK_LOG_FILE, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+    print(f"\n✅ Results appended to {BENCHMARK_LOG_FILE}")
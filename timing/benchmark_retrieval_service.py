@@ -0,0 +1,178 @@
+"""
+Retrieval service benchmark: per-worker model copies versus one shared service.
+
+For 1, 4 and 8 worker processes this script runs the evaluation queries two ways:
+- local: every worker loads its own embedding model and Milvus connection
+- service: workers forward retrieval to one retriever/service.py over a Unix socket
+
+and reports aggregate queries per second plus the resident memory (RSS) of
+the workers and, in service mode, of the service process.
+
+Results are appended as one JSON line per run to timing/retrieval_service_benchmark.jsonl.
+
+Usage:
+    python timing/benchmark_retrieval_service.py
+    python timing/benchmark_retrieval_service.py --workers 1 2 4 --rounds 3
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import multiprocessing as mp
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.constants import RETRIEVAL_SERVICE_ENV
+
+# Output file (JSON Lines, one record per benchmark run)
+BENCHMARK_LOG_FILE = "timing/retrieval_service_benchmark.jsonl"
+
+
+def rss_bytes(pid):
+    """
+    Read the resident set size of a process from /proc.
+
+    Returns:
+        int: RSS in bytes (0 if unavailable)
+    """
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def worker(service_url, queries, rounds, ready, start, results):
+    """
+    Initialise retrieval, wait for the start signal, then replay the queries.
+    """
+    if service_url:
+        os.environ[RETRIEVAL_SERVICE_ENV] = service_url
+    else:
+        os.environ.pop(RETRIEVAL_SERVICE_ENV, None)
+
+    from retriever.retriever import retrieve_context
+    from retriever.vector_store import get_vectorstore
+
+    vectorstore = get_vectorstore()
+    retrieve_context(vectorstore, queries[0])  # warm-up
+    ready.put(os.getpid())
+    start.wait()
+
+    begin = time.perf_counter()
+    for _ in range(rounds):
+        for query in queries:
+            retrieve_context(vectorstore, query)
+    elapsed = time.perf_counter() - begin
+
+    results.put({"elapsed": elapsed, "queries": rounds * len(queries), "rss_bytes": rss_bytes(os.getpid())})
+
+
+def run_workers(num_workers, service_url, queries, rounds):
+    """
+    Run num_workers retrieval processes concurrently.
+
+    Returns:
+        dict: Throughput and worker memory statistics
+    """
+    ctx = mp.get_context("spawn")
+    ready, results, start = ctx.Queue(), ctx.Queue(), ctx.Event()
+    processes = [
+        ctx.Process(target=worker, args=(service_url, queries, rounds, ready, start, results))
+        for _ in range(num_workers)
+    ]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        ready.get()
+
+    begin = time.perf_counter()
+    start.set()
+    stats = [results.get() for _ in processes]
+    wall = time.perf_counter() - begin
+
+    for process in processes:
+        process.join()
+
+    total_queries = sum(s["queries"] for s in stats)
+    return {
+        "workers": num_workers,
+        "qps": round(total_queries / wall, 2),
+        "worker_rss_mb": round(sum(s["rss_bytes"] for s in stats) / 1024 ** 2, 1),
+    }
+
+
+def start_service(socket_path):
+    """
+    Launch retriever/service.py on a Unix socket and wait until it is ready.
+
+    Returns:
+        tuple: (process, client)
+    """
+    from retriever.client import RetrievalServiceClient
+
+    process = subprocess.Popen([sys.executable, "retriever/service.py", "--uds", socket_path])
+    client = RetrievalServiceClient(f"unix://{socket_path}")
+    for _ in range(600):
+        try:
+            if client.health()["ready"]:
+                return process, client
+        except Exception:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("Retrieval service did not become ready")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark local retrieval against the shared retrieval service")
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 4, 8], help="Worker counts to benchmark")
+    parser.add_argument("--rounds", type=int, default=2, help="Passes over the eval queries per worker")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    with open("evaluation/data/eval_queries.json") as f:
+        queries = [item["query"] for item in json.load(f)]
+
+    socket_path = os.path.join(tempfile.mkdtemp(), "retrieval.sock")
+    print("⏳ Starting retrieval service...")
+    service, client = start_service(socket_path)
+
+    results = []
+    try:
+        for num_workers in args.workers:
+            local = run_workers(num_workers, None, queries, args.rounds)
+            shared = run_workers(num_workers, f"unix://{socket_path}", queries, args.rounds)
+            shared["service_rss_mb"] = round(rss_bytes(service.pid) / 1024 ** 2, 1)
+
+            results.append({"workers": num_workers, "local": local, "service": shared})
+            print(f"  workers={num_workers}: local {local['qps']:>8.2f} q/s, {local['worker_rss_mb']:>8.1f} MB | "
+                  f"service {shared['qps']:>8.2f} q/s, "
+                  f"{shared['worker_rss_mb'] + shared['service_rss_mb']:>8.1f} MB")
+    finally:
+        client.close()
+        service.terminate()
+        service.wait()
+
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "num_queries": len(queries),
+        "rounds": args.rounds,
+        "results": results,
+    }
+    with open(BENCHMARK_LOG_FILE, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+    print(f"\n✅ Results appended to {BENCHMARK_LOG_FILE}")
@@ -0,0 +1,138 @@
+"""
+Tail latency benchmark for hedged and retried LLM calls.
+
+Runs the same calls against a local stand-in backend with injected latency
+spikes and failures (llm/standin.py) three ways:
+- plain: the stand-in called directly
+- retries: ResilientBackend with jittered retries and the circuit breaker
+- hedged: the same, plus a duplicate request once the recent p95 has passed
+
+and reports p50/p95/p99 latency for generate_text and time to first chunk
+for generate_text_stream, along with how many calls failed or timed out.
+
+Results are appended as one JSON line per run to timing/tail_latency_benchmark.jsonl.
+
+Usage:
+    python timing/benchmark_tail_latency.py
+    python timing/benchmark_tail_latency.py --calls 400 --spike-rate 0.05 --spike-ms 3000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from llm import LLMBackendError, ResilientBackend, StandInBackend
+from utils.constants import LLM_HEDGE_MIN_SAMPLES
+from utils.deadline import DeadlineExceeded, deadline_scope
+
+# Output file (JSON Lines, one record per benchmark run)
+BENCHMARK_LOG_FILE = "timing/tail_latency_benchmark.jsonl"
+
+PROMPT = (
+    "Context:\n"
+    "User: How do I check my Ubuntu version?\n"
+    "Assistant: Run lsb_release -a in a terminal, or read /etc/os-release.\n\n"
+    "Question: Which Ubuntu version am I running?\n"
+)
+
+
+def make_backend(mode, args, seed):
+    standin = StandInBackend(
+        "generation",
+        {"max_new_tokens": args.max_new_tokens},
+        ttft_ms=args.ttft_ms,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        spike_rate=args.spike_rate,
+        spike_ms=args.spike_ms,
+        seed=seed,
+    )
+    if mode == "plain":
+        return standin
+    return ResilientBackend(standin, f"benchmark-{mode}", hedge=mode == "hedged")
+
+
+def timed_call(backend, stream, deadline):
+    """
+    Returns:
+        tuple: (seconds to the answer or first chunk, outcome)
+    """
+    start = time.perf_counter()
+    try:
+        with deadline_scope(deadline):
+            if stream:
+                chunks = backend.generate_text_stream(PROMPT)
+                next(chunks)
+                chunks.close()
+            else:
+                backend.generate_text(PROMPT)
+        return time.perf_counter() - start, "ok"
+    except DeadlineExceeded:
+        return time.perf_counter() - start, "timeout"
+    except LLMBackendError:
+        return time.perf_counter() - start, "error"
+
+
+def run(backend, stream, args):
+    if isinstance(backend, ResilientBackend) and backend.hedge:
+        # Fill the latency window so the hedge delay is known from the first measured call
+        for _ in range(LLM_HEDGE_MIN_SAMPLES):
+            timed_call(backend, stream, args.deadline)
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda _: timed_call(backend, stream, args.deadline), range(args.calls)))
+
+    latencies = [seconds for seconds, outcome in results if outcome == "ok"]
+    summary = {outcome: sum(1 for _, o in results if o == outcome) for outcome in ("ok", "error", "timeout")}
+    if latencies:
+        for q in (50, 95, 99):
+            summary[f"p{q}_ms"] = round(float(np.percentile(latencies, q)) * 1000, 1)
+    return summary
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare plain, retried and hedged LLM calls under latency spikes")
+    parser.add_argument("--calls", type=int, default=300, help="Calls per mode")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent callers")
+    parser.add_argument("--ttft-ms", type=float, default=400, help="Median stand-in time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=200, help="Stand-in decode speed")
+    parser.add_argument("--max-new-tokens", type=int, default=40, help="Tokens per generate_text answer")
+    parser.add_argument("--spike-rate", type=float, default=0.05, help="Fraction of calls with a latency spike")
+    parser.add_argument("--spike-ms", type=float, default=3000, help="Extra latency of a spike")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="Fraction of calls that fail")
+    parser.add_argument("--deadline", type=float, default=10.0, help="Per-call deadline in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="Stand-in random seed")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    results = {}
+    for call in ("generate_text", "stream_ttft"):
+        results[call] = {}
+        for mode in ("plain", "retries", "hedged"):
+            print(f"⏳ {call}: {mode}...")
+            backend = make_backend(mode, args, seed=args.seed)
+            summary = run(backend, call == "stream_ttft", args)
+            results[call][mode] = summary
+            print(f"  {mode:<8} p50 {summary.get('p50_ms', 0):>8.1f} ms  p95 {summary.get('p95_ms', 0):>8.1f} ms  "
+                  f"p99 {summary.get('p99_ms', 0):>8.1f} ms  errors {summary['error']:>3}  timeouts {summary['timeout']:>3}")
+
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "config": vars(args),
+        "results": results,
+    }
+    with open(BENCHMARK_LOG_FILE, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+    print(f"\n✅ Results appended to {BENCHMARK_LOG_FILE}")
@@ -0,0 +1,174 @@
+"""
+Compare the single-call pipeline with the two-call pipeline on the eval set.
+
+Runs every evaluation query through chatbot_router in both modes:
+- two_call: intent LLM call, then retrieval and generation
+- single_call: retrieval, then one LLM call that asks a clarification
+  question or answers (PIPELINE_MODE=single_call)
+
+and reports p50/p95 end-to-end latency and time to first output for each
+mode, and how often both modes agree on the outcome: a clarification
+question, an answer, or the low-similarity fallback message.
+
+Agreement on the offline stand-in (LLM_BACKEND=standin) is not evidence of
+classification quality: the stand-in never emits CLARIFICATION_MARKER, so
+single-call mode always answers. Measure agreement against watsonx or a
+replay of real model output (LLM_REPLAY_FILE).
+
+The rule-based intent pre-classifier is switched off by default so that every
+query reaches the LLM in both modes (--with-rules keeps it). Response,
+retrieval and embedding caches are cleared before every run, the modes
+alternate which goes first, and only the in-memory response cache is used.
+
+Results are appended as one JSON line per run to timing/single_call_comparison.jsonl.
+
+Usage:
+    python timing/compare_single_call.py
+    python timing/compare_single_call.py --repeat 3 --with-rules
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from chatbot import FALLBACK_MESSAGE, chatbot_router
+from generator.response_cache import get_response_cache
+from retriever.query_cache import get_embedding_cache, get_retrieval_cache
+from utils.constants import INTENT_RULES_ENV, LLM_BACKEND_ENV, LLM_REPLAY_FILE_ENV, RESPONSE_CACHE_DB_ENV
+
+# Output file (JSON Lines, one record per comparison run)
+COMPARISON_LOG_FILE = "timing/single_call_comparison.jsonl"
+
+MODES = ("two_call", "single_call")
+PROGRESS_MESSAGE = "🔍 Generating response..."
+
+
+def outcome(output):
+    """
+    Classify a final response.
+
+    Returns:
+        str: "fallback", "answer" or "clarify"
+    """
+    if FALLBACK_MESSAGE in output:
+        return "fallback"
+    # Answers carry the confidence header; follow-up questions do not
+    return "answer" if "(Score:" in output else "clarify"
+
+
+async def run_query(query, mode):
+    """
+    Returns:
+        tuple: (seconds to first output, total seconds, outcome of the response)
+    """
+    get_response_cache().invalidate()
+    get_embedding_cache().clear()
+    get_retrieval_cache().clear()
+
+    start = time.perf_counter()
+    first_output = None
+    output = ""
+    async for chunk in chatbot_router(query, [], pipeline_mode=mode):
+        if first_output is None and chunk and chunk != PROGRESS_MESSAGE:
+            first_output = time.perf_counter() - start
+        output = chunk
+    total = time.perf_counter() - start
+    return first_output if first_output is not None else total, total, outcome(output)
+
+
+def percentiles(seconds):
+    return {
+        "p50_s": round(float(np.percentile(seconds, 50)), 3),
+        "p95_s": round(float(np.percentile(seconds, 95)), 3),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare single-call and two-call pipelines on the eval set")
+    parser.add_argument("--queries", default="evaluation/data/eval_queries.json", help="Evaluation queries file")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per query and mode")
+    parser.add_argument("--with-rules", action="store_true", help="Keep the rule-based intent pre-classifier on")
+    return parser.parse_args()
+
+
+async def main(args):
+    with open(args.queries) as f:
+        queries = [item["query"] for item in json.load(f)]
+    print(f"⏳ {len(queries)} queries x {args.repeat} run(s) per mode")
+
+    results = {mode: {"first_output": [], "total": [], "outcomes": Counter()} for mode in MODES}
+    agreed = 0
+    disagreements = []
+    for i in range(args.repeat):
+        for j, query in enumerate(queries):
+            # Alternate the order so neither mode always runs second
+            order = MODES if (i + j) % 2 == 0 else MODES[::-1]
+            outcomes = {}
+            for mode in order:
+                first_output, total, outcomes[mode] = await run_query(query, mode)
+                results[mode]["first_output"].append(first_output)
+                results[mode]["total"].append(total)
+                results[mode]["outcomes"][outcomes[mode]] += 1
+            if outcomes["two_call"] == outcomes["single_call"]:
+                agreed += 1
+            elif i == 0:
+                disagreements.append((query, outcomes["two_call"], outcomes["single_call"]))
+
+    runs = len(queries) * args.repeat
+    backend = os.environ.get(LLM_BACKEND_ENV, "watsonx").lower()
+    standin = backend == "standin" and not os.environ.get(LLM_REPLAY_FILE_ENV)
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "backend": backend,
+        "agreement_is_evidence": not standin,
+        "queries": len(queries),
+        "repeat": args.repeat,
+        "intent_rules": args.with_rules,
+        "agreement": round(agreed / runs, 4),
+        **{
+            mode: {
+                "first_output": percentiles(results[mode]["first_output"]),
+                "total": percentiles(results[mode]["total"]),
+                "outcomes": dict(results[mode]["outcomes"]),
+            }
+            for mode in MODES
+        },
+    }
+
+    print(f"\n{'Mode':<12} {'first output p50':>17} {'p95':>8} {'total p50':>10} {'p95':>8}")
+    for mode in MODES:
+        first_output, total = record[mode]["first_output"], record[mode]["total"]
+        print(f"{mode:<12} {first_output['p50_s']:>16.3f}s {first_output['p95_s']:>7.3f}s "
+              f"{total['p50_s']:>9.3f}s {total['p95_s']:>7.3f}s")
+    print(f"\n{'Mode':<12} {'answer':>8} {'clarify':>8} {'fallback':>9}")
+    for mode in MODES:
+        counts = results[mode]["outcomes"]
+        print(f"{mode:<12} {counts['answer']:>8} {counts['clarify']:>8} {counts['fallback']:>9}")
+    print(f"\nOutcome agreement: {record['agreement'] * 100:.1f}% ({agreed}/{runs})")
+    if standin:
+        print("⚠️  The stand-in never emits the clarification marker, so this agreement "
+              "is not evidence of single-call classification quality")
+    for query, two_call, single_call in disagreements:
+        print(f"  two_call={two_call:<8} single_call={single_call:<8} {query[:60]!r}")
+
+    with open(COMPARISON_LOG_FILE, "a") as f:
+        f.write(json.dumps(record) + "\n")
+    print(f"\n✅ Results appended to {COMPARISON_LOG_FILE}")
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    # Memory-only response cache, so clearing it does not touch a shared SQLite file
+    os.environ.pop(RESPONSE_CACHE_DB_ENV, None)
+    if not args.with_rules:
+        os.environ[INTENT_RULES_ENV] = "off"
+    asyncio.run(main(args))
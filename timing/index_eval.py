@@ -0,0 +1,96 @@
+"""
+Index configurations and recall computation for the index benchmarks.
+
+This module handles:
+- The matrix of Milvus index and search parameters benchmarked per build
+- Exact (brute-force inner product) top-k ids used as ground truth
+- recall@k of approximate results against that ground truth
+- Latency percentiles in the shape the benchmark logs record them
+
+It depends only on numpy, so the computation is tested without Milvus, the
+embedding model or app.config. timing/benchmark_index_types.py and
+timing/benchmark_partitions.py import it.
+"""
+
+import numpy as np
+
+# Index matrix: name -> (index params, search params)
+INDEX_MATRIX = {
+    "FLAT": (
+        {"index_type": "FLAT", "metric_type": "IP", "params": {}},
+        {"metric_type": "IP", "params": {}},
+    ),
+    "IVF_FLAT_1024": (
+        {"index_type": "IVF_FLAT", "metric_type": "IP", "params": {"nlist": 1024}},
+        {"metric_type": "IP", "params": {"nprobe": 16}},
+    ),
+    "IVF_SQ8_1024": (
+        {"index_type": "IVF_SQ8", "metric_type": "IP", "params": {"nlist": 1024}},
+        {"metric_type": "IP", "params": {"nprobe": 16}},
+    ),
+    "HNSW_M8": (
+        {"index_type": "HNSW", "metric_type": "IP", "params": {"M": 8, "efConstruction": 100}},
+        {"metric_type": "IP", "params": {"ef": 64}},
+    ),
+    "HNSW_M16": (
+        {"index_type": "HNSW", "metric_type": "IP", "params": {"M": 16, "efConstruction": 200}},
+        {"metric_type": "IP", "params": {"ef": 64}},
+    ),
+    "HNSW_M32": (
+        {"index_type": "HNSW", "metric_type": "IP", "params": {"M": 32, "efConstruction": 360}},
+        {"metric_type": "IP", "params": {"ef": 128}},
+    ),
+    "DISKANN": (
+        {"index_type": "DISKANN", "metric_type": "IP", "params": {}},
+        {"metric_type": "IP", "params": {"search_list": 100}},
+    ),
+}
+
+
+def exact_top_k(corpus_embeddings, query_embeddings, k):
+    """
+    Compute exact inner-product top-k ids with numpy (ground truth for recall).
+
+    Args:
+        corpus_embeddings (np.ndarray): (n, dim) corpus vectors; row ids are positions
+        query_embeddings (np.ndarray): (q, dim) query vectors
+        k (int): Number of ids per query (capped at the corpus size)
+
+    Returns:
+        list: One set of row ids per query
+    """
+    k = min(k, len(corpus_embeddings))
+    scores = query_embeddings @ corpus_embeddings.T
+    top = np.argpartition(-scores, kth=k - 1, axis=1)[:, :k]
+    return [set(row.tolist()) for row in top]
+
+
+def mean_recall(results, ground_truth):
+    """
+    Average recall of approximate results against exact ones.
+
+    Args:
+        results (list): Set of returned row ids per query
+        ground_truth (list): Set of exact top-k row ids per query
+
+    Returns:
+        float: Mean of |found & truth| / |truth|, rounded to 4 places
+    """
+    recalls = [len(found & truth) / len(truth) for found, truth in zip(results, ground_truth)]
+    return round(float(np.mean(recalls)), 4)
+
+
+def latency_percentiles(latencies):
+    """
+    Summarise per-query latencies.
+
+    Args:
+        latencies (list): Latencies in milliseconds
+
+    Returns:
+        dict: latency_p50_ms and latency_p95_ms, rounded to the microsecond
+    """
+    return {
+        "latency_p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "latency_p95_ms": round(float(np.percentile(latencies, 95)), 3),
+    }
@@ -19,7 +19,7 @@ import asyncio
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from context_expansion.intent_analyzer import analyze_intent
-from retriever.retriever import retrieve_context
+from retriever.retriever import retrieve_context, retrieve_context_batch
 from retriever.vector_store import get_vectorstore
 from generator.generator_llm import generator_llm
 from generator.prompt_builder import build_prompt
@@ -59,6 +59,28 @@ def measure_retrieval(query, vectorstore):
     return elapsed, context, similarity_score
 
 
+def measure_batch_retrieval(queries, vectorstore):
+    """Compare serial retrieval against one batched retrieval call."""
+    print(f"\n{'='*80}")
+    print("MEASURING BATCH RETRIEVAL")
+    print(f"{'='*80}")
+    
+    start = time.time()
+    for query in queries:
+        retrieve_context(vectorstore, query)
+    serial_time = time.time() - start
+    
+    start = time.time()
+    retrieve_context_batch(vectorstore, queries)
+    batch_time = time.time() - start
+    
+    print(f"Queries: {len(queries)}")
+    print(f"⏱️  Serial: {serial_time:.3f}s ({len(queries)/serial_time:.1f} queries/s)")
+    print(f"⏱️  Batch:  {batch_time:.3f}s ({len(queries)/batch_time:.1f} queries/s)")
+    
+    return serial_time, batch_time
+
+
 def measure_generation(query, context, history=[]):
     """Measure response generation latency."""
     print(f"\n{'='*80}")
@@ -195,6 +217,9 @@ def run_multiple_measurements(queries):
         print(f"⏱️  TOTAL:            {avg_total:.3f}s")
         print(f"\nBased on {len(clear_results)} CLEAR queries")
     
+    # Retrieval throughput: serial vs batched for the same queries
+    measure_batch_retrieval(queries, vectorstore)
+    
     return results
 
 
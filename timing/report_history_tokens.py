@@ -0,0 +1,125 @@
+"""
+Report prompt tokens per turn with verbatim and compacted conversation history.
+
+Builds multi-turn transcripts from the evaluation results (each turn asks an
+evaluation query and gets its generated answer, decorated as the chat shows
+it) and, for every turn, compares the generation prompt built with:
+- before: the last MAX_CONVERSATION_HISTORY_TURNS turns verbatim, with the
+  confidence banner, metadata footer and disclaimer
+- after: generator/history_manager.py (decoration stripped, messages capped,
+  older turns in a rolling summary)
+
+It also reports the time to format the history with the per-conversation
+cache (incremental) and without it (rebuilt every request).
+
+Token counts are estimates (HISTORY_CHARS_PER_TOKEN characters per token).
+Results are appended as one JSON line per run to timing/history_tokens_report.jsonl.
+
+Usage:
+    python timing/report_history_tokens.py
+    python timing/report_history_tokens.py --turns 12 --transcripts 18
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+from statistics import mean
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from chatbot import _format_response
+from generator.history_manager import HistoryManager, estimate_tokens
+from generator.prompt_builder import build_prompt
+from utils.constants import HISTORY_CHARS_PER_TOKEN, MAX_CONVERSATION_HISTORY_TURNS
+
+# Output file (JSON Lines, one record per report run)
+REPORT_LOG_FILE = "timing/history_tokens_report.jsonl"
+
+
+def verbatim_history(history, max_turns=MAX_CONVERSATION_HISTORY_TURNS):
+    """The history block as it was built before compaction: recent turns, verbatim."""
+    return "".join(f"User: {user_msg}\nAssistant: {assistant_msg}\n" for user_msg, assistant_msg in history[-max_turns:])
+
+
+def transcripts(results, count, turns):
+    """
+    Returns:
+        list: Transcripts, each a list of (query, context, decorated answer)
+    """
+    conversations = []
+    for start in range(count):
+        conversation = []
+        for i in range(turns):
+            item = results[(start + i) % len(results)]
+            num_sources = len([c for c in item["context"].split("\n\n") if c.strip()])
+            answer = _format_response(item["answer"].strip(), item["similarity"], num_sources)
+            conversation.append((item["query"], item["context"], answer))
+        conversations.append(conversation)
+    return conversations
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Report prompt tokens per turn before and after history compaction")
+    parser.add_argument("--results", default="evaluation/results.json", help="Evaluation results with answers")
+    parser.add_argument("--turns", type=int, default=8, help="Turns per transcript")
+    parser.add_argument("--transcripts", type=int, default=None, help="Transcripts (default: one per result)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    with open(args.results) as f:
+        results = json.load(f)
+    conversations = transcripts(results, args.transcripts or len(results), args.turns)
+    print(f"⏳ {len(conversations)} transcripts x {args.turns} turns "
+          f"(~{HISTORY_CHARS_PER_TOKEN} characters per token)")
+
+    manager = HistoryManager()
+    per_turn = [{"before": [], "after": [], "history_before": [], "history_after": []} for _ in range(args.turns)]
+    cached_ms, rebuilt_ms = [], []
+    for conversation in conversations:
+        history = []
+        for turn, (query, context, answer) in enumerate(conversation):
+            start = time.perf_counter()
+            compact = manager.format(history)
+            cached_ms.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            HistoryManager().format(history)
+            rebuilt_ms.append((time.perf_counter() - start) * 1000)
+
+            verbatim = verbatim_history(history)
+            after = build_prompt(user_question=query, context=context, history=history)
+            before = after.replace(f"Conversation History:\n{compact}", f"Conversation History:\n{verbatim}", 1)
+
+            per_turn[turn]["before"].append(estimate_tokens(before))
+            per_turn[turn]["after"].append(estimate_tokens(after))
+            per_turn[turn]["history_before"].append(estimate_tokens(verbatim))
+            per_turn[turn]["history_after"].append(estimate_tokens(compact))
+            history.append((query, answer))
+
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "transcripts": len(conversations),
+        "turns": args.turns,
+        "chars_per_token": HISTORY_CHARS_PER_TOKEN,
+        "per_turn": [
+            {key: round(mean(values), 1) for key, values in stats.items()}
+            for stats in per_turn
+        ],
+        "format_ms": {"cached": round(mean(cached_ms), 3), "rebuilt": round(mean(rebuilt_ms), 3)},
+    }
+
+    print(f"\n{'Turn':<6} {'prompt before':>14} {'after':>8} {'history before':>15} {'after':>8} {'saved':>7}")
+    for turn, stats in enumerate(record["per_turn"], start=1):
+        saved = 1 - stats["after"] / stats["before"]
+        print(f"{turn:<6} {stats['before']:>14.0f} {stats['after']:>8.0f} "
+              f"{stats['history_before']:>15.0f} {stats['history_after']:>8.0f} {saved * 100:>6.1f}%")
+    print(f"\nHistory formatting: {record['format_ms']['cached']:.3f} ms incremental, "
+          f"{record['format_ms']['rebuilt']:.3f} ms rebuilt per request")
+
+    with open(REPORT_LOG_FILE, "a") as f:
+        f.write(json.dumps(record) + "\n")
+    print(f"\n✅ Results appended to {REPORT_LOG_FILE}")
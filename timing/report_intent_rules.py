@@ -0,0 +1,203 @@
+"""
+Report how many intent LLM calls the rule-based pre-classifier eliminates.
+
+Replays every logged query whose intent was classified by the LLM (records
+without an intent source predate the rules) through
+context_expansion/intent_rules.py and reports:
+- the share of intent LLM calls a rule would have answered instead
+- hits per rule
+- agreement of the rule with the LLM's logged decision (FALLBACK counts as CLEAR)
+- intent seconds that would have been saved
+- the share of all logged classifications already made by the rules
+
+With --labelled, the rules are instead measured against a labelled query set
+(evaluation/data/intent_queries.json: the intent prompt's examples,
+TEST_QUERIES.md, the evaluation queries and logged queries), reporting
+coverage and agreement per rule and per source without any LLM calls. The
+"held_out" source was labelled before the rules were tuned against it.
+
+Results are appended as one JSON line per run to timing/intent_rules_report.jsonl.
+
+Usage:
+    python timing/report_intent_rules.py
+    python timing/report_intent_rules.py --show-disagreements 20
+    python timing/report_intent_rules.py --labelled evaluation/data/intent_queries.json
+"""
+
+import os
+import sys
+import json
+import argparse
+from collections import Counter
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from context_expansion.intent_rules import classify_intent
+from utils.timing_log import read_timing_records
+
+# Output file (JSON Lines, one record per report run)
+REPORT_LOG_FILE = "timing/intent_rules_report.jsonl"
+
+CLASSIFIED_STATUSES = ("CLEAR", "AMBIGUOUS", "FALLBACK")
+
+
+def llm_classified(record):
+    """Whether the logged request paid for an intent LLM call."""
+    return (
+        record.get("query")
+        and record.get("status") in CLASSIFIED_STATUSES
+        and record.get("intent_source", "llm") == "llm"
+        and record.get("intent_time", 0.0) > 0
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Report intent LLM calls eliminated by the rule-based classifier")
+    parser.add_argument("--show-disagreements", type=int, default=10,
+                        help="Rule decisions that differ from the LLM to print")
+    parser.add_argument("--labelled", default=None,
+                        help="Measure against a labelled query set (JSON list of {query, expected}) "
+                             "instead of the timing log")
+    return parser.parse_args()
+
+
+def report_labelled(path, show_disagreements):
+    """
+    Measure rule coverage and agreement on a labelled query set.
+
+    Args:
+        path (str): JSON file with a list of {"query", "expected"} entries
+        show_disagreements (int): Rule decisions that differ from the label to print
+
+    Returns:
+        dict: Report record
+    """
+    with open(path) as f:
+        labelled = json.load(f)
+
+    rule_hits = Counter()
+    rule_agreed = Counter()
+    source_counts = Counter()
+    source_decided = Counter()
+    source_agreed = Counter()
+    disagreements = []
+    for entry in labelled:
+        source = entry.get("source", "unknown")
+        source_counts[source] += 1
+        result = classify_intent(entry["query"])
+        if result is None:
+            continue
+        rule_hits[result["rule"]] += 1
+        source_decided[source] += 1
+        if result["status"] == entry["expected"]:
+            rule_agreed[result["rule"]] += 1
+            source_agreed[source] += 1
+        else:
+            disagreements.append((result["rule"], result["status"], entry["expected"], entry["query"]))
+
+    decided = sum(rule_hits.values())
+    agreed = sum(rule_agreed.values())
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "labelled_set": path,
+        "queries": len(labelled),
+        "decided": decided,
+        "coverage": round(decided / len(labelled), 4) if labelled else None,
+        "agreement": round(agreed / decided, 4) if decided else None,
+        "rule_hits": dict(rule_hits),
+        "by_source": {
+            source: {"queries": count, "decided": source_decided[source], "agreed": source_agreed[source]}
+            for source, count in source_counts.items()
+        },
+    }
+
+    print(f"{'='*80}")
+    print("INTENT RULES REPORT (labelled set)")
+    print(f"{'='*80}")
+    print(f"\nLabelled queries:      {len(labelled)}")
+    print(f"Decided by rules:      {decided} ({(record['coverage'] or 0) * 100:.1f}%)")
+    for rule, hits in rule_hits.most_common():
+        print(f"  - {rule}: {rule_agreed[rule]} of {hits} agree")
+    if decided:
+        print(f"Agreement with labels: {agreed} of {decided} ({record['agreement'] * 100:.1f}%)")
+    print("By source (decided / queries, agreed):")
+    for source, count in source_counts.most_common():
+        print(f"  - {source}: {source_decided[source]} / {count}, {source_agreed[source]} agree")
+
+    if disagreements and show_disagreements:
+        print(f"\nDisagreements (rule, rule status, label, query):")
+        for rule, status, expected, query in disagreements[:show_disagreements]:
+            print(f"  {rule:<14} {status:<10} {expected:<10} {query[:60]!r}")
+    return record
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if args.labelled:
+        record = report_labelled(args.labelled, args.show_disagreements)
+        with open(REPORT_LOG_FILE, "a") as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"\n✅ Results appended to {REPORT_LOG_FILE}")
+        sys.exit(0)
+
+    logs = read_timing_records()
+    classified = [log for log in logs if log.get("intent_source") or llm_classified(log)]
+    replayed = [log for log in classified if llm_classified(log)]
+    if not replayed:
+        print("❌ No LLM-classified queries found in the timing log")
+        sys.exit(1)
+
+    rule_hits = Counter()
+    agreed = 0
+    saved_seconds = 0.0
+    disagreements = []
+    for log in replayed:
+        result = classify_intent(log["query"])
+        if result is None:
+            continue
+        rule_hits[result["rule"]] += 1
+        saved_seconds += log["intent_time"]
+        logged_status = "AMBIGUOUS" if log["status"] == "AMBIGUOUS" else "CLEAR"
+        if result["status"] == logged_status:
+            agreed += 1
+        else:
+            disagreements.append((result["rule"], result["status"], logged_status, log["query"]))
+
+    eliminated = sum(rule_hits.values())
+    already_rules = sum(1 for log in classified if log.get("intent_source") == "rules")
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "llm_calls": len(replayed),
+        "eliminated": eliminated,
+        "eliminated_fraction": round(eliminated / len(replayed), 4),
+        "agreement": round(agreed / eliminated, 4) if eliminated else None,
+        "rule_hits": dict(rule_hits),
+        "intent_seconds_saved": round(saved_seconds, 3),
+        "logged_rules_fraction": round(already_rules / len(classified), 4),
+    }
+
+    print(f"{'='*80}")
+    print("INTENT RULES REPORT")
+    print(f"{'='*80}")
+    print(f"\nIntent LLM calls replayed: {len(replayed)}")
+    print(f"Eliminated by rules:       {eliminated} ({record['eliminated_fraction'] * 100:.1f}%)")
+    for rule, hits in rule_hits.most_common():
+        print(f"  - {rule}: {hits}")
+    if eliminated:
+        print(f"Agreement with the LLM:    {record['agreement'] * 100:.1f}%")
+        print(f"Intent time saved:         {saved_seconds:.1f}s "
+              f"({saved_seconds / eliminated:.3f}s per eliminated call)")
+    print(f"Already classified by rules in the log: {already_rules} of {len(classified)} "
+          f"({record['logged_rules_fraction'] * 100:.1f}%)")
+
+    if disagreements and args.show_disagreements:
+        print(f"\nDisagreements (rule, rule status, LLM status, query):")
+        for rule, status, logged_status, query in disagreements[:args.show_disagreements]:
+            print(f"  {rule:<14} {status:<10} {logged_status:<10} {query[:60]!r}")
+
+    with open(REPORT_LOG_FILE, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+    print(f"\n✅ Results appended to {REPORT_LOG_FILE}")
@@ -105,7 +105,7 @@ def create_chatbot_interface(chatbot_fn):
         ),
         submit_btn=True,
         examples=get_example_queries(),
-        concurrency_limit=None,  # Remove concurrency limit for faster responses
+        concurrency_limit=None,  # chatbot_router bounds concurrency itself and answers "busy" when overloaded
     )
 
 
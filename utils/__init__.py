@@ -4,6 +4,13 @@ Utility modules for the RAG-based Technical Support Assistant.
 This package contains:
 - constants: Application-wide constants and configuration values
 - helpers: Reusable utility functions
+- timing_log: Background append-only timing log writer and reader
+- tracing: Per-request spans exported as OTLP/JSON lines
+- metrics: Sharded counters/histograms and the Prometheus /metrics endpoint
+- logging_setup: Queue-based, leveled and sampled application logging
+- admission: Bounded per-stage executors and chat request admission control
+- degradation: Load-driven switch to cheaper pipeline modes and back
+- single_flight: Coalescing identical concurrent requests onto one execution
 """
 
 from utils.constants import (
@@ -12,6 +19,30 @@ from utils.constants import (
     HIGH_SIMILARITY_THRESHOLD,
     LOW_SIMILARITY_THRESHOLD,
     MIN_RELEVANT_DOCS,
+    EMBEDDING_DIM,
+    INDEX_PARAMS,
+    ARTIFACTS_DIR,
+    NUM_TOPIC_PARTITIONS,
+    PARTITIONS_PER_QUERY,
+    TOPIC_CENTROIDS_FILE,
+    ANSWER_STORE_DIR,
+    LEXICAL_INDEX_FILE,
+    BM25_K1,
+    BM25_B,
+    RRF_K,
+    LEXICAL_MIN_COVERAGE,
+    LEXICAL_FAST_PATH_MIN_TERMS,
+    LEXICAL_FAST_PATH_MARGIN,
+    LEXICAL_FAST_PATH_WAIT_MS,
+    SEARCH_QUALITY_TIERS,
+    DEFAULT_QUALITY_TIER,
+    LATENCY_BUDGET_TIERS,
+    SEARCH_LOAD_SHARES,
+    RETRIEVAL_SERVICE_ENV,
+    RETRIEVAL_SERVICE_PORT,
+    RETRIEVAL_SERVICE_MAX_BATCH,
+    RETRIEVAL_SERVICE_BATCH_WINDOW_MS,
+    RETRIEVAL_SERVICE_TIMEOUT_SECONDS,
     STREAMING_DELAY_SECONDS,
     MAX_CONVERSATION_HISTORY_TURNS,
     CHATBOT_HEIGHT,
@@ -20,12 +51,102 @@ from utils.constants import (
     SERVER_PORT,
     LOG_SEPARATOR,
     CONTEXT_PREVIEW_LENGTH,
+    TIMING_LOG_FILE,
+    LEGACY_TIMING_LOG_FILE,
+    TIMING_LOG_QUEUE_SIZE,
+    TIMING_LOG_FLUSH_BATCH,
+    TIMING_LOG_FLUSH_INTERVAL_SECONDS,
+    TIMING_LOG_MAX_BYTES,
+    TIMING_LOG_MAX_AGE_SECONDS,
+    TRACE_LOG_FILE,
+    TRACE_SERVICE_NAME,
+    METRICS_PORT,
+    LATENCY_BUCKETS_SECONDS,
+    SIMILARITY_BUCKETS,
+    LOG_LEVEL_ENV,
+    DEFAULT_LOG_LEVEL,
+    LOG_FORMAT,
+    LOG_SAMPLE_RATES,
+    API_PORT,
+    API_REQUEST_TIMEOUT_SECONDS,
+    API_MAX_TIMEOUT_SECONDS,
+    UI_MOUNT_PATH,
+    PREFORK_DEFAULT_WORKERS,
+    PREFORK_HEARTBEAT_SECONDS,
+    PREFORK_HEARTBEAT_TIMEOUT_SECONDS,
+    PREFORK_GRACEFUL_TIMEOUT_SECONDS,
+    PREFORK_STATUS_FILE,
+    STAGE_EXECUTOR_SIZES,
+    STAGE_EXECUTOR_ENV_PREFIX,
+    ADMISSION_MAX_CONCURRENT,
+    ADMISSION_MAX_QUEUE,
+    ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    ADMISSION_RETRY_AFTER_SECONDS,
+    DEGRADATION_QUEUE_THRESHOLDS,
+    DEGRADATION_LATENCY_THRESHOLDS_SECONDS,
+    DEGRADATION_LATENCY_SMOOTHING,
+    DEGRADATION_RECOVERY_SECONDS,
+    DEGRADED_RETRIEVAL_K,
+    DEGRADED_QUALITY_TIER,
+    DEGRADED_MAX_NEW_TOKENS,
+    RETRIEVAL_ONLY_PAIRS,
+    LLM_BACKEND_ENV,
+    LLM_RECORD_FILE_ENV,
+    LLM_REPLAY_FILE_ENV,
+    STANDIN_ENV_PREFIX,
+    STANDIN_TTFT_MS,
+    STANDIN_TTFT_SIGMA,
+    STANDIN_TOKENS_PER_SECOND,
+    STANDIN_ERROR_RATE,
+    STANDIN_SPIKE_RATE,
+    STANDIN_SPIKE_MS,
+    REQUEST_DEADLINE_SECONDS,
+    LLM_CALL_POOL_SIZE,
+    LLM_MAX_RETRIES,
+    LLM_RETRY_BASE_SECONDS,
+    LLM_RETRY_MAX_SECONDS,
+    LLM_HEDGE_ENV,
+    LLM_HEDGE_QUANTILE,
+    LLM_HEDGE_WINDOW,
+    LLM_HEDGE_MIN_SAMPLES,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_COOLDOWN_SECONDS,
+    API_DEADLINE_GRACE_SECONDS,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_DB_ENV,
+    RESPONSE_CACHE_DISK_MAX_ENTRIES,
+    RESPONSE_CACHE_TRIM_INTERVAL,
+    EMBEDDING_CACHE_MAX_ENTRIES,
+    RETRIEVAL_CACHE_MAX_ENTRIES,
+    WARMUP_MODE_ENV,
+    WARMUP_TOP_QUERIES,
+    WARMUP_BATCH_SIZE,
+    WARMUP_MAX_SECONDS,
+    WARMUP_LOG_FILE,
+    WARMUP_REPORT_WINDOW_SECONDS,
+    ANSWER_BANK_DIR,
+    ANSWER_BANK_CLUSTERS,
+    ANSWER_BANK_MAX_ENTRIES,
+    ANSWER_BANK_MIN_CLUSTER_SIZE,
+    ANSWER_BANK_MIN_COHESION,
+    ANSWER_BANK_MATCH_THRESHOLD,
+    PIPELINE_MODE_ENV,
+    CLARIFICATION_MARKER,
+    INTENT_RULES_ENV,
+    HISTORY_TURN_MAX_TOKENS,
+    HISTORY_SUMMARY_MAX_TOKENS,
+    HISTORY_CHARS_PER_TOKEN,
+    HISTORY_CACHE_MAX_ENTRIES,
+    METRICS_HOST,
+    METRICS_HOST_ENV,
 )
 
 from utils.helpers import (
     format_log_separator,
     truncate_text,
     validate_query,
+    normalize_query,
+    clean_text,
     format_qa_pair,
 )
 
@@ -36,6 +157,30 @@ __all__ = [
     'HIGH_SIMILARITY_THRESHOLD',
     'LOW_SIMILARITY_THRESHOLD',
     'MIN_RELEVANT_DOCS',
+    'EMBEDDING_DIM',
+    'INDEX_PARAMS',
+    'ARTIFACTS_DIR',
+    'NUM_TOPIC_PARTITIONS',
+    'PARTITIONS_PER_QUERY',
+    'TOPIC_CENTROIDS_FILE',
+    'ANSWER_STORE_DIR',
+    'LEXICAL_INDEX_FILE',
+    'BM25_K1',
+    'BM25_B',
+    'RRF_K',
+    'LEXICAL_MIN_COVERAGE',
+    'LEXICAL_FAST_PATH_MIN_TERMS',
+    'LEXICAL_FAST_PATH_MARGIN',
+    'LEXICAL_FAST_PATH_WAIT_MS',
+    'SEARCH_QUALITY_TIERS',
+    'DEFAULT_QUALITY_TIER',
+    'LATENCY_BUDGET_TIERS',
+    'SEARCH_LOAD_SHARES',
+    'RETRIEVAL_SERVICE_ENV',
+    'RETRIEVAL_SERVICE_PORT',
+    'RETRIEVAL_SERVICE_MAX_BATCH',
+    'RETRIEVAL_SERVICE_BATCH_WINDOW_MS',
+    'RETRIEVAL_SERVICE_TIMEOUT_SECONDS',
     'STREAMING_DELAY_SECONDS',
     'MAX_CONVERSATION_HISTORY_TURNS',
     'CHATBOT_HEIGHT',
@@ -44,10 +189,100 @@ __all__ = [
     'SERVER_PORT',
     'LOG_SEPARATOR',
     'CONTEXT_PREVIEW_LENGTH',
+    'TIMING_LOG_FILE',
+    'LEGACY_TIMING_LOG_FILE',
+    'TIMING_LOG_QUEUE_SIZE',
+    'TIMING_LOG_FLUSH_BATCH',
+    'TIMING_LOG_FLUSH_INTERVAL_SECONDS',
+    'TIMING_LOG_MAX_BYTES',
+    'TIMING_LOG_MAX_AGE_SECONDS',
+    'TRACE_LOG_FILE',
+    'TRACE_SERVICE_NAME',
+    'METRICS_PORT',
+    'LATENCY_BUCKETS_SECONDS',
+    'SIMILARITY_BUCKETS',
+    'LOG_LEVEL_ENV',
+    'DEFAULT_LOG_LEVEL',
+    'LOG_FORMAT',
+    'LOG_SAMPLE_RATES',
+    'API_PORT',
+    'API_REQUEST_TIMEOUT_SECONDS',
+    'API_MAX_TIMEOUT_SECONDS',
+    'UI_MOUNT_PATH',
+    'PREFORK_DEFAULT_WORKERS',
+    'PREFORK_HEARTBEAT_SECONDS',
+    'PREFORK_HEARTBEAT_TIMEOUT_SECONDS',
+    'PREFORK_GRACEFUL_TIMEOUT_SECONDS',
+    'PREFORK_STATUS_FILE',
+    'STAGE_EXECUTOR_SIZES',
+    'STAGE_EXECUTOR_ENV_PREFIX',
+    'ADMISSION_MAX_CONCURRENT',
+    'ADMISSION_MAX_QUEUE',
+    'ADMISSION_QUEUE_TIMEOUT_SECONDS',
+    'ADMISSION_RETRY_AFTER_SECONDS',
+    'DEGRADATION_QUEUE_THRESHOLDS',
+    'DEGRADATION_LATENCY_THRESHOLDS_SECONDS',
+    'DEGRADATION_LATENCY_SMOOTHING',
+    'DEGRADATION_RECOVERY_SECONDS',
+    'DEGRADED_RETRIEVAL_K',
+    'DEGRADED_QUALITY_TIER',
+    'DEGRADED_MAX_NEW_TOKENS',
+    'RETRIEVAL_ONLY_PAIRS',
+    'LLM_BACKEND_ENV',
+    'LLM_RECORD_FILE_ENV',
+    'LLM_REPLAY_FILE_ENV',
+    'STANDIN_ENV_PREFIX',
+    'STANDIN_TTFT_MS',
+    'STANDIN_TTFT_SIGMA',
+    'STANDIN_TOKENS_PER_SECOND',
+    'STANDIN_ERROR_RATE',
+    'STANDIN_SPIKE_RATE',
+    'STANDIN_SPIKE_MS',
+    'REQUEST_DEADLINE_SECONDS',
+    'LLM_CALL_POOL_SIZE',
+    'LLM_MAX_RETRIES',
+    'LLM_RETRY_BASE_SECONDS',
+    'LLM_RETRY_MAX_SECONDS',
+    'LLM_HEDGE_ENV',
+    'LLM_HEDGE_QUANTILE',
+    'LLM_HEDGE_WINDOW',
+    'LLM_HEDGE_MIN_SAMPLES',
+    'CIRCUIT_FAILURE_THRESHOLD',
+    'CIRCUIT_COOLDOWN_SECONDS',
+    'API_DEADLINE_GRACE_SECONDS',
+    'RESPONSE_CACHE_MAX_ENTRIES',
+    'RESPONSE_CACHE_DB_ENV',
+    'RESPONSE_CACHE_DISK_MAX_ENTRIES',
+    'RESPONSE_CACHE_TRIM_INTERVAL',
+    'EMBEDDING_CACHE_MAX_ENTRIES',
+    'RETRIEVAL_CACHE_MAX_ENTRIES',
+    'WARMUP_MODE_ENV',
+    'WARMUP_TOP_QUERIES',
+    'WARMUP_BATCH_SIZE',
+    'WARMUP_MAX_SECONDS',
+    'WARMUP_LOG_FILE',
+    'WARMUP_REPORT_WINDOW_SECONDS',
+    'ANSWER_BANK_DIR',
+    'ANSWER_BANK_CLUSTERS',
+    'ANSWER_BANK_MAX_ENTRIES',
+    'ANSWER_BANK_MIN_CLUSTER_SIZE',
+    'ANSWER_BANK_MIN_COHESION',
+    'ANSWER_BANK_MATCH_THRESHOLD',
+    'PIPELINE_MODE_ENV',
+    'CLARIFICATION_MARKER',
+    'INTENT_RULES_ENV',
+    'HISTORY_TURN_MAX_TOKENS',
+    'HISTORY_SUMMARY_MAX_TOKENS',
+    'HISTORY_CHARS_PER_TOKEN',
+    'HISTORY_CACHE_MAX_ENTRIES',
+    'METRICS_HOST',
+    'METRICS_HOST_ENV',
     # Helpers
     'format_log_separator',
     'truncate_text',
     'validate_query',
+    'normalize_query',
+    'clean_text',
     'format_qa_pair',
 ]
 
@@ -14,11 +14,135 @@ HIGH_SIMILARITY_THRESHOLD = 0.5            # Primary similarity threshold
 LOW_SIMILARITY_THRESHOLD = 0.4             # Fallback similarity threshold
 MIN_RELEVANT_DOCS = 3                      # Minimum documents needed before expansion
 
+# ============================================================================
+# VECTOR INDEX CONSTANTS
+# ============================================================================
+EMBEDDING_DIM = 384                        # all-MiniLM-L6-v2 output dimension
+INDEX_PARAMS = {                           # Index built on the "embedding" field by store_data.py
+    "index_type": "HNSW",
+    "metric_type": "IP",                   # cosine similarity (embeddings are L2-normalised)
+    "params": {
+        "M": 16,
+        "efConstruction": 200
+    }
+}
+
+# ============================================================================
+# TOPIC PARTITION CONSTANTS
+# ============================================================================
+ARTIFACTS_DIR = "data_prep/artifacts"      # Local files written by the ingestion pipeline
+NUM_TOPIC_PARTITIONS = 16                  # k-means clusters, one Milvus partition each
+PARTITIONS_PER_QUERY = 3                   # Nearest partitions searched per query
+TOPIC_CENTROIDS_FILE = f"{ARTIFACTS_DIR}/topic_centroids.npy"  # Routing disabled if missing
+ANSWER_STORE_DIR = f"{ARTIFACTS_DIR}/answer_store"  # Compressed Q&A bodies keyed by row id
+
+# ============================================================================
+# LEXICAL (BM25) SEARCH CONSTANTS
+# ============================================================================
+LEXICAL_INDEX_FILE = f"{ARTIFACTS_DIR}/lexical_index.npz"  # Hybrid search disabled if missing
+BM25_K1 = 1.2                              # BM25 term-frequency saturation
+BM25_B = 0.75                              # BM25 document-length normalisation
+RRF_K = 60                                 # Reciprocal-rank fusion constant
+LEXICAL_MIN_COVERAGE = 0.6                 # Query IDF share a lexical-only hit must match to enter context
+LEXICAL_FAST_PATH_MIN_TERMS = 2            # Query terms required before the fast path is considered
+LEXICAL_FAST_PATH_MARGIN = 1.5             # Top BM25 score vs next non-exact hit for a decisive match
+LEXICAL_FAST_PATH_WAIT_MS = 5              # Time to wait for the lexical result before embedding
+
+# ============================================================================
+# SEARCH EFFORT CONSTANTS
+# ============================================================================
+SEARCH_QUALITY_TIERS = {                   # Per-tier search effort for each index family
+    "fast": {"ef": 32, "nprobe": 8, "search_list": 50},
+    "balanced": {"ef": 64, "nprobe": 16, "search_list": 100},
+    "thorough": {"ef": 128, "nprobe": 32, "search_list": 200},
+}
+DEFAULT_QUALITY_TIER = "balanced"          # Tier used when no budget or tier is given
+LATENCY_BUDGET_TIERS = [                   # (max budget in ms, tier) checked in order
+    (50, "fast"),
+    (150, "balanced"),
+]
+SEARCH_LOAD_SHARES = (0.5, 1.0)            # Share of retrieval executor threads searching before effort drops one/two tiers
+
+# ============================================================================
+# RETRIEVAL SERVICE CONSTANTS
+# ============================================================================
+RETRIEVAL_SERVICE_ENV = "RETRIEVAL_SERVICE_URL"  # e.g. http://127.0.0.1:8001 or unix:///tmp/retrieval.sock
+RETRIEVAL_SERVICE_PORT = 8001              # Default port for retriever/service.py
+RETRIEVAL_SERVICE_MAX_BATCH = 64           # Queries merged into one retrieve_context_batch call
+RETRIEVAL_SERVICE_BATCH_WINDOW_MS = 5      # Time to wait for more queries before running a batch
+RETRIEVAL_SERVICE_TIMEOUT_SECONDS = 30     # Client request timeout
+
 # ============================================================================
 # GENERATION CONSTANTS
 # ============================================================================
 STREAMING_DELAY_SECONDS = 0.005            # Delay between tokens for streaming effect (reduced for faster display)
 MAX_CONVERSATION_HISTORY_TURNS = 3         # Number of recent conversation turns to include
+HISTORY_TURN_MAX_TOKENS = 120              # Each user or assistant message in the prompt history is capped at this
+HISTORY_SUMMARY_MAX_TOKENS = 150           # Rolling extractive summary of turns older than MAX_CONVERSATION_HISTORY_TURNS
+HISTORY_CHARS_PER_TOKEN = 4                # Token estimate for history budgets and reports (no tokenizer needed)
+HISTORY_CACHE_MAX_ENTRIES = 10000          # Compacted conversation prefixes kept per process
+INTENT_RULES_ENV = "INTENT_RULES"          # Set to "off" to send every query to the intent LLM (no rule-based pre-classification)
+PIPELINE_MODE_ENV = "PIPELINE_MODE"        # "two_call" (default: intent LLM call, then generation) or "single_call"
+CLARIFICATION_MARKER = "[[CLARIFY]]"       # Single-call output starting with this is a follow-up question, not an answer
+
+# ============================================================================
+# QUERY CACHE AND WARM-UP CONSTANTS
+# ============================================================================
+EMBEDDING_CACHE_MAX_ENTRIES = 4096         # Query embeddings kept per process
+RETRIEVAL_CACHE_MAX_ENTRIES = 2048         # retrieve_context results kept per process
+WARMUP_MODE_ENV = "WARMUP"                 # "off", "retrieval" (default) or "generate" (also precompute answers)
+WARMUP_TOP_QUERIES = 200                   # Most frequent logged queries warmed at startup
+WARMUP_BATCH_SIZE = 32                     # Queries per retrieve_context_batch call during warm-up
+WARMUP_MAX_SECONDS = 120                   # Warm-up stops after this long and the server reports ready
+WARMUP_LOG_FILE = "timing/warmup_log.jsonl"  # One record per warm-up (duration, queries, cache sizes)
+WARMUP_REPORT_WINDOW_SECONDS = 3600        # Traffic after a warm-up counted in its hit ratio report
+
+# ============================================================================
+# ANSWER BANK CONSTANTS
+# ============================================================================
+ANSWER_BANK_DIR = f"{ARTIFACTS_DIR}/answer_bank"  # Banked answers and cluster centroids (disabled if missing)
+ANSWER_BANK_CLUSTERS = 2000                # k-means clusters over corpus questions and logged queries
+ANSWER_BANK_MAX_ENTRIES = 300              # Banked answers kept, highest-traffic clusters first
+ANSWER_BANK_MIN_CLUSTER_SIZE = 5           # Questions plus logged queries a cluster needs to be banked
+ANSWER_BANK_MIN_COHESION = 0.8             # Mean member-to-centroid similarity of a dense cluster
+ANSWER_BANK_MATCH_THRESHOLD = 0.85         # Query-to-centroid similarity needed to serve a banked answer
+
+# ============================================================================
+# RESPONSE CACHE CONSTANTS
+# ============================================================================
+RESPONSE_CACHE_MAX_ENTRIES = 1024          # Generated answers kept in each process's LRU
+RESPONSE_CACHE_DB_ENV = "RESPONSE_CACHE_DB"  # SQLite file shared by worker processes (memory only if unset)
+RESPONSE_CACHE_DISK_MAX_ENTRIES = 50000    # Answers kept in the SQLite tier
+RESPONSE_CACHE_TRIM_INTERVAL = 100         # Writes between trims of the SQLite tier
+
+# ============================================================================
+# LLM BACKEND CONSTANTS
+# ============================================================================
+LLM_BACKEND_ENV = "LLM_BACKEND"            # "watsonx" (default) or "standin" (offline, no credentials)
+LLM_RECORD_FILE_ENV = "LLM_RECORD_FILE"    # Record every prompt/response pair to this JSON Lines file
+LLM_REPLAY_FILE_ENV = "LLM_REPLAY_FILE"    # Stand-in replays responses recorded in this file
+STANDIN_ENV_PREFIX = "LLM_STANDIN_"        # e.g. LLM_STANDIN_TTFT_MS=800 overrides a stand-in default
+STANDIN_TTFT_MS = 400                      # Median stand-in time to first token
+STANDIN_TTFT_SIGMA = 0.5                   # Log-normal spread of the stand-in TTFT (0 = constant)
+STANDIN_TOKENS_PER_SECOND = 40             # Stand-in decode speed (one token = one word)
+STANDIN_ERROR_RATE = 0.0                   # Fraction of stand-in calls that raise LLMBackendError
+STANDIN_SPIKE_RATE = 0.0                   # Fraction of stand-in calls with an extra latency spike
+STANDIN_SPIKE_MS = 3000                    # Extra time to first token of a spiked call
+
+# ============================================================================
+# DEADLINE AND LLM RESILIENCE CONSTANTS
+# ============================================================================
+REQUEST_DEADLINE_SECONDS = 60              # Deadline of a chat request when the caller gives none
+LLM_CALL_POOL_SIZE = 32                    # Threads running (and hedging) LLM calls
+LLM_MAX_RETRIES = 2                        # Retries of a failed LLM call (before any output)
+LLM_RETRY_BASE_SECONDS = 0.2               # Backoff before the first retry (doubles, with full jitter)
+LLM_RETRY_MAX_SECONDS = 2.0                # Longest backoff between retries
+LLM_HEDGE_ENV = "LLM_HEDGE"                # Set to 1 to send a duplicate request after the p95 latency
+LLM_HEDGE_QUANTILE = 0.95                  # Latency quantile after which a hedge is sent
+LLM_HEDGE_WINDOW = 200                     # Recent calls the quantile is computed over
+LLM_HEDGE_MIN_SAMPLES = 20                 # Calls observed before hedging starts
+CIRCUIT_FAILURE_THRESHOLD = 5              # Consecutive failures that open the circuit
+CIRCUIT_COOLDOWN_SECONDS = 30              # Time an open circuit fails fast before a trial call
 
 # ============================================================================
 # UI CONSTANTS
@@ -28,10 +152,92 @@ TEXTBOX_INITIAL_LINES = 2                  # Initial height of input textbox
 TEXTBOX_MAX_LINES = 5                      # Maximum height of input textbox
 SERVER_PORT = 7860                         # Default Gradio server port
 
+# ============================================================================
+# API CONSTANTS
+# ============================================================================
+API_PORT = 8000                            # Default port for the headless FastAPI app (api/app.py)
+API_REQUEST_TIMEOUT_SECONDS = 60           # Default end-to-end timeout for /answer requests
+API_MAX_TIMEOUT_SECONDS = 120              # Upper bound on a client-supplied timeout
+API_DEADLINE_GRACE_SECONDS = 1.0           # Extra wait for the pipeline's own deadline fallback before a 504
+UI_MOUNT_PATH = "/ui"                      # Where the Gradio UI is mounted with --ui
+
+# ============================================================================
+# PRE-FORK DEPLOYMENT CONSTANTS
+# ============================================================================
+PREFORK_DEFAULT_WORKERS = 4                # Worker processes forked by api/prefork.py
+PREFORK_HEARTBEAT_SECONDS = 2              # Interval between worker heartbeats
+PREFORK_HEARTBEAT_TIMEOUT_SECONDS = 60     # Silent workers are killed and respawned after this
+PREFORK_GRACEFUL_TIMEOUT_SECONDS = 30      # Time a stopping worker gets to finish in-flight requests
+PREFORK_STATUS_FILE = "timing/prefork_status.json"  # Per-worker health written by the master
+
+# ============================================================================
+# ADMISSION CONTROL CONSTANTS
+# ============================================================================
+STAGE_EXECUTOR_SIZES = {                   # Threads per pipeline stage executor
+    "intent": 8,                           # Intent LLM calls
+    "retrieval": 8,                        # Query embedding and Milvus search
+    "generation": 16,                      # Pulling streamed LLM chunks
+}
+STAGE_EXECUTOR_ENV_PREFIX = "RAG_EXECUTOR_"  # e.g. RAG_EXECUTOR_GENERATION=32 overrides a size
+ADMISSION_MAX_CONCURRENT = 16              # Chat requests processed at once per process
+ADMISSION_MAX_QUEUE = 32                   # Requests waiting for a slot before new ones are rejected
+ADMISSION_QUEUE_TIMEOUT_SECONDS = 10       # Longest a request waits for a slot before it is rejected
+ADMISSION_RETRY_AFTER_SECONDS = 2          # Retry-After sent with a busy (503) API response
+
+# ============================================================================
+# DEGRADATION CONSTANTS
+# ============================================================================
+DEGRADATION_QUEUE_THRESHOLDS = (4, 12, 20, 28)     # Admission queue depth entering levels 1-4
+DEGRADATION_LATENCY_THRESHOLDS_SECONDS = (10, 15, 20, 30)  # Smoothed request latency entering levels 1-4
+DEGRADATION_LATENCY_SMOOTHING = 0.2        # Weight of the newest request in the latency average
+DEGRADATION_RECOVERY_SECONDS = 10          # Time between one-level steps back towards normal
+DEGRADED_RETRIEVAL_K = 4                   # Documents retrieved from level 2 (reduced retrieval)
+DEGRADED_QUALITY_TIER = "fast"             # Search effort from level 2
+DEGRADED_MAX_NEW_TOKENS = 120              # Generation length from level 3 (short answers)
+RETRIEVAL_ONLY_PAIRS = 2                   # Q&A pairs returned at level 4 (no generation)
+
 # ============================================================================
 # LOGGING CONSTANTS
 # ============================================================================
 LOG_SEPARATOR = "=" * 80                   # Separator line for console logs
 CONTEXT_PREVIEW_LENGTH = 500               # Characters to show in context preview
+LOG_LEVEL_ENV = "LOG_LEVEL"                # Environment variable overriding the log level
+DEFAULT_LOG_LEVEL = "INFO"                 # Level of the "rag" loggers
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+LOG_SAMPLE_RATES = {                       # Fraction of requests that log each verbose category
+    "context": 0.01,                       # Retrieved context preview
+    "response": 0.01,                      # Full generated answer
+    "intent_raw": 0.05,                    # Raw intent LLM output
+}
+
+# ============================================================================
+# TIMING LOG CONSTANTS
+# ============================================================================
+TIMING_LOG_FILE = "timing/timing_log.jsonl"          # Active append-only timing log (JSON Lines)
+LEGACY_TIMING_LOG_FILE = "timing/timing_log.json"    # Pre-JSONL log (single JSON array), read-only
+TIMING_LOG_QUEUE_SIZE = 10000              # Records buffered before new ones are dropped
+TIMING_LOG_FLUSH_BATCH = 256               # Records written per flush at most
+TIMING_LOG_FLUSH_INTERVAL_SECONDS = 1.0    # Longest a record waits in the queue before being written
+TIMING_LOG_MAX_BYTES = 16 * 1024 * 1024    # Rotate the active segment above this size
+TIMING_LOG_MAX_AGE_SECONDS = 24 * 3600     # Rotate the active segment after this long
+
+# ============================================================================
+# TRACING CONSTANTS
+# ============================================================================
+TRACE_LOG_FILE = "timing/traces.jsonl"     # OTLP/JSON trace export (one request per line)
+TRACE_SERVICE_NAME = "ubuntu-rag-chatbot"  # service.name resource attribute on exported traces
+
+# ============================================================================
+# METRICS CONSTANTS
+# ============================================================================
+METRICS_PORT = 8002                        # Port of the Prometheus /metrics endpoint
+METRICS_HOST = "127.0.0.1"                 # Interface the /metrics endpoint binds (local scrapers only)
+METRICS_HOST_ENV = "METRICS_HOST"          # Override the bind interface, e.g. 0.0.0.0 for a remote Prometheus
+LATENCY_BUCKETS_SECONDS = (                # Stage latency histogram bucket bounds
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30
+)
+SIMILARITY_BUCKETS = (                     # Similarity score histogram bucket bounds
+    0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0
+)
 
  
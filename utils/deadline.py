@@ -0,0 +1,59 @@
+"""
+Per-request deadlines.
+
+This module handles:
+- Setting an absolute deadline for everything a request does
+- Reading the time left from any stage, including executor threads
+  (run_in_executor / submit_with_context copy the deadline along with the context)
+"""
+
+import time
+import contextvars
+from contextlib import contextmanager
+
+_deadline = contextvars.ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a request's deadline passes before a stage completes."""
+
+
+@contextmanager
+def deadline_scope(seconds):
+    """
+    Run the block with a deadline seconds from now (or the enclosing one, if sooner).
+
+    Args:
+        seconds (float): Time budget for the block
+    """
+    previous = _deadline.get()
+    deadline = time.monotonic() + seconds
+    _deadline.set(deadline if previous is None else min(previous, deadline))
+    try:
+        yield
+    finally:
+        # Restore by value: async generators may resume in a different context
+        _deadline.set(previous)
+
+
+def remaining():
+    """
+    Seconds left before the current deadline.
+
+    Returns:
+        float or None: Time left (negative once passed), or None without a deadline
+    """
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def check_deadline():
+    """
+    Raise if the current deadline has passed.
+
+    Raises:
+        DeadlineExceeded: If no time is left
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("request deadline exceeded")
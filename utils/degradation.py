@@ -0,0 +1,92 @@
+"""
+Graceful degradation under overload.
+
+This module handles:
+- Choosing a degradation level from the admission queue depth and recent latency
+- Stepping up immediately when load rises and back down one level at a time
+- The cheaper pipeline modes each level switches on
+
+Levels are cumulative; each one keeps the savings of the levels below it:
+    0 normal           full pipeline
+    1 skip_intent      no LLM intent check (every query is treated as CLEAR)
+    2 reduced_retrieval  fewer documents and the fast search tier
+    3 short_answer     shorter generation (DEGRADED_MAX_NEW_TOKENS)
+    4 retrieval_only   top Q&A pairs returned without generation
+"""
+
+import os
+import sys
+import time
+from bisect import bisect_right
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.constants import (
+    DEGRADATION_QUEUE_THRESHOLDS,
+    DEGRADATION_LATENCY_THRESHOLDS_SECONDS,
+    DEGRADATION_LATENCY_SMOOTHING,
+    DEGRADATION_RECOVERY_SECONDS,
+)
+from utils.logging_setup import get_logger
+from utils.metrics import DEGRADATION_LEVEL
+
+NORMAL, SKIP_INTENT, REDUCED_RETRIEVAL, SHORT_ANSWER, RETRIEVAL_ONLY = range(5)
+LEVEL_NAMES = ("normal", "skip_intent", "reduced_retrieval", "short_answer", "retrieval_only")
+
+logger = get_logger("degradation")
+
+
+class DegradationController:
+    """
+    Track load and pick the level for each newly admitted request.
+
+    Must be used from a single event loop, like the AdmissionController it reads.
+    """
+
+    def __init__(self, admission, queue_thresholds=DEGRADATION_QUEUE_THRESHOLDS,
+                 latency_thresholds=DEGRADATION_LATENCY_THRESHOLDS_SECONDS,
+                 smoothing=DEGRADATION_LATENCY_SMOOTHING, recovery_seconds=DEGRADATION_RECOVERY_SECONDS):
+        self.admission = admission
+        self.queue_thresholds = queue_thresholds
+        self.latency_thresholds = latency_thresholds
+        self.smoothing = smoothing
+        self.recovery_seconds = recovery_seconds
+        self.level = NORMAL
+        self.latency = 0.0
+        self._changed_at = time.monotonic()
+        DEGRADATION_LEVEL.set_function(lambda: self.level)
+
+    def _target(self):
+        by_queue = bisect_right(self.queue_thresholds, self.admission.waiting)
+        by_latency = bisect_right(self.latency_thresholds, self.latency)
+        return max(by_queue, by_latency)
+
+    def current(self):
+        """
+        Return the level for a request that is about to run.
+
+        Returns:
+            int: Degradation level (NORMAL to RETRIEVAL_ONLY)
+        """
+        target = self._target()
+        now = time.monotonic()
+        if target > self.level:
+            logger.warning("Degrading %s -> %s (queue %d, latency %.1fs)", LEVEL_NAMES[self.level],
+                           LEVEL_NAMES[target], self.admission.waiting, self.latency)
+            self.level = target
+            self._changed_at = now
+        elif target < self.level and now - self._changed_at >= self.recovery_seconds:
+            # Recover one level at a time so a brief lull does not release the whole backlog
+            self.level -= 1
+            self._changed_at = now
+            logger.info("Recovering to %s", LEVEL_NAMES[self.level])
+        return self.level
+
+    def observe(self, seconds):
+        """
+        Feed a finished request's end-to-end latency (including queue wait).
+
+        Args:
+            seconds (float): Request latency
+        """
+        self.latency += self.smoothing * (seconds - self.latency)
@@ -5,6 +5,8 @@ This module contains reusable utility functions that don't fit
 into specific domain modules.
 """
 
+import re
+
 
 def format_log_separator(title=""):
     """
@@ -52,6 +54,46 @@ def validate_query(query):
     return bool(query and query.strip())
 
 
+def normalize_query(query):
+    """
+    Normalize a query for identity checks: case, whitespace and trailing punctuation.
+    
+    Unlike clean_text, inner punctuation is kept, so "apt-get" and "aptget" differ.
+    
+    Args:
+        query (str): User query
+        
+    Returns:
+        str: Normalized query
+    """
+    return " ".join(query.lower().split()).rstrip("?!. ")
+
+
+def clean_text(text):
+    """
+    Clean and normalize text by removing URLs, special characters, and extra whitespace.
+    
+    Args:
+        text (str): Raw text to clean
+        
+    Returns:
+        str: Cleaned and normalized text
+    """
+    # Convert to lowercase
+    text = text.lower()
+    
+    # Remove URLs
+    text = re.sub(r"http\S+", "", text)
+    
+    # Remove special characters (keep only alphanumeric and spaces)
+    text = re.sub(r"[^a-zA-Z0-9\s]", "", text)
+    
+    # Normalize whitespace
+    text = re.sub(r"\s+", " ", text)
+    
+    return text.strip()
+
+
 def format_qa_pair(question, answer):
     """
     Format a question-answer pair for context display.
@@ -0,0 +1,149 @@
+"""
+Leveled, sampled, queue-based logging for the RAG pipeline.
+
+This module handles:
+- One "rag" logger hierarchy shared by the application modules
+- A QueueHandler so request threads never write to stdout themselves
+- Formatting records on the listener thread instead of the request path
+- Per-category sampling (e.g. full contexts for 1% of requests)
+
+Log calls use lazy %-formatting, so messages below the level are never
+built. Guard verbose records with sampled() so unsampled requests do not
+even create a LogRecord:
+
+    if sampled("context"):
+        logger.info("Context:\\n%.500s", context)
+
+Records tagged with extra={"category": ...} are also sampled by the handler,
+which is enough for DEBUG-level records (already dropped by level at INFO).
+"""
+
+import os
+import sys
+import zlib
+import queue
+import atexit
+import logging
+import logging.handlers
+import threading
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.constants import LOG_LEVEL_ENV, DEFAULT_LOG_LEVEL, LOG_FORMAT, LOG_SAMPLE_RATES
+from utils.tracing import current_span
+
+ROOT_LOGGER = "rag"
+
+_listener = None
+_setup_lock = threading.Lock()
+
+
+def get_logger(name):
+    """
+    Return a logger in the application hierarchy.
+
+    Args:
+        name (str): Module or component name, e.g. "retriever"
+
+    Returns:
+        logging.Logger: Logger named "rag.<name>"
+    """
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def sampled(category, rates=LOG_SAMPLE_RATES):
+    """
+    Decide whether this request logs records of a sampled category.
+
+    The decision is a hash of the category and the current request id, so
+    all records of one request agree; outside a trace every call is sampled
+    independently.
+
+    Args:
+        category (str): Sampling category
+        rates (dict): Category -> fraction of requests to log
+
+    Returns:
+        bool: True if the record should be logged
+    """
+    rate = rates.get(category, 1.0)
+    if rate >= 1.0:
+        return True
+    if rate <= 0.0:
+        return False
+    active = current_span()
+    key = active.trace.request_id if active is not None and active.trace is not None else os.urandom(8).hex()
+    return zlib.crc32(f"{category}:{key}".encode()) % 10000 < rate * 10000
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Drop records of sampled categories for requests that were not sampled.
+    """
+
+    def __init__(self, rates=LOG_SAMPLE_RATES):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        category = getattr(record, "category", None)
+        return category is None or sampled(category, self.rates)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread.
+
+    The stock handler formats the message in the caller's thread so records
+    can be pickled; this queue stays in-process, so the record is passed
+    through as-is. Arguments must not be mutated after the log call.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def _reset_after_fork():
+    # The listener thread does not survive fork(); setup_logging() starts a new one
+    global _listener
+    _listener = None
+    logging.getLogger(ROOT_LOGGER).handlers = []
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def setup_logging(level=None, stream=None, rates=LOG_SAMPLE_RATES):
+    """
+    Route the "rag" loggers through a queue to a single writer thread (once per process).
+
+    Args:
+        level (str or int, optional): Log level; defaults to $LOG_LEVEL or DEFAULT_LOG_LEVEL
+        stream (file, optional): Output stream (default: stdout)
+        rates (dict): Per-category sampling rates
+
+    Returns:
+        logging.Logger: The configured "rag" logger
+    """
+    global _listener
+    logger = logging.getLogger(ROOT_LOGGER)
+    with _setup_lock:
+        if _listener is not None:
+            return logger
+
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(logging.Formatter(LOG_FORMAT))
+
+        records = queue.SimpleQueue()
+        handler = _DeferredQueueHandler(records)
+        handler.addFilter(SamplingFilter(rates))
+
+        logger.handlers = [handler]
+        level = level or os.environ.get(LOG_LEVEL_ENV, DEFAULT_LOG_LEVEL)
+        logger.setLevel(level.upper() if isinstance(level, str) else level)
+        logger.propagate = False
+
+        _listener = logging.handlers.QueueListener(records, output)
+        _listener.start()
+        atexit.register(_listener.stop)
+    return logger
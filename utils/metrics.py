@@ -0,0 +1,416 @@
+"""
+In-process metrics with a Prometheus text endpoint.
+
+This module handles:
+- Counters, gauges and histograms with per-thread shards (no lock on the hot path)
+- Rendering all metrics in the Prometheus text exposition format
+- Serving /metrics from a background HTTP server thread
+- The RAG pipeline's stage latency, similarity, status and in-flight metrics
+
+Each thread updates its own shard; a scrape sums the shards. Shards are
+kept after their thread exits, so counters never go backwards.
+"""
+
+import os
+import sys
+import bisect
+import ipaddress
+import threading
+import contextvars
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.constants import METRICS_HOST, METRICS_HOST_ENV, METRICS_PORT, LATENCY_BUCKETS_SECONDS, SIMILARITY_BUCKETS
+from utils.logging_setup import get_logger
+
+logger = get_logger("metrics")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_registry = []
+
+
+class _Metric:
+    """
+    Base class: one shard per thread, summed at scrape time.
+    """
+
+    kind = None
+
+    def __init__(self, name, description, labelnames=()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+        _registry.append(self)
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _label_text(self, key, extra=None):
+        pairs = list(zip(self.labelnames, key)) + (list(extra.items()) if extra else [])
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+    def _snapshot(self):
+        with self._shards_lock:
+            shards = list(self._shards)
+        # list(dict.items()) is atomic under the GIL, so writers never block
+        return [list(shard.items()) for shard in shards]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    """
+    Monotonic counter.
+    """
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        """Add amount to the counter for these label values."""
+        shard = self._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def value(self, **labels):
+        """Current total for these label values."""
+        key = self._key(labels)
+        return sum(dict(items).get(key, 0) for items in self._snapshot())
+
+    def total(self):
+        """Current total across all label values."""
+        return sum(value for items in self._snapshot() for _, value in items)
+
+    def _totals(self):
+        totals = {}
+        for items in self._snapshot():
+            for key, value in items:
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def _samples(self):
+        return [f"{self.name}{self._label_text(key)} {value}" for key, value in sorted(self._totals().items())]
+
+
+class Gauge(Counter):
+    """
+    Value that can go up and down, or be computed at scrape time.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, description, labelnames=()):
+        super().__init__(name, description, labelnames)
+        self._functions = {}
+
+    def dec(self, amount=1, **labels):
+        """Subtract amount from the gauge."""
+        self.inc(-amount, **labels)
+
+    def set_function(self, function, **labels):
+        """Report function() for these label values at every scrape."""
+        self._functions[self._key(labels)] = function
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        """Increment the gauge for the duration of the block."""
+        self.inc(1, **labels)
+        try:
+            yield
+        finally:
+            self.dec(1, **labels)
+
+    def _totals(self):
+        totals = super()._totals()
+        for key, function in list(self._functions.items()):
+            try:
+                totals[key] = function()
+            except Exception:
+                continue
+        return totals
+
+
+class Histogram(_Metric):
+    """
+    Cumulative-bucket histogram.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, description, labelnames=(), buckets=LATENCY_BUCKETS_SECONDS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        """Record one observation."""
+        shard = self._shard()
+        key = self._key(labels)
+        state = shard.get(key)
+        if state is None:
+            # [per-bucket counts (last is +Inf), sum]
+            state = shard[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def _samples(self):
+        totals = {}
+        for items in self._snapshot():
+            for key, (counts, total) in items:
+                merged = totals.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0])
+                merged[0] = [a + b for a, b in zip(merged[0], counts)]
+                merged[1] += total
+
+        lines = []
+        for key, (counts, total) in sorted(totals.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{self._label_text(key, {'le': bound})} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_text(key)} {total}")
+            lines.append(f"{self.name}_count{self._label_text(key)} {cumulative}")
+        return lines
+
+
+def render_metrics():
+    """
+    Render every registered metric.
+
+    Returns:
+        str: Prometheus text exposition
+    """
+    lines = []
+    for metric in list(_registry):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would otherwise flood stdout
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=METRICS_PORT, host=None):
+    """
+    Serve /metrics from a daemon thread (once per process).
+
+    Args:
+        port (int): Port to listen on
+        host (str, optional): Interface to bind (default: METRICS_HOST env var, else 127.0.0.1)
+
+    Returns:
+        ThreadingHTTPServer: The running server
+    """
+    global _server
+    host = host or os.environ.get(METRICS_HOST_ENV, METRICS_HOST)
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+            logger.info("📈 Metrics available at http://%s:%d/metrics", host, _server.server_address[1])
+    return _server
+
+
+def metrics_client_allowed(client_host):
+    """
+    Whether a client may read /metrics on a server that also serves traffic.
+
+    Follows METRICS_HOST like start_metrics_server: with the default loopback
+    interface only local clients are answered.
+
+    Args:
+        client_host (str or None): Client address of the request
+
+    Returns:
+        bool: True if the metrics may be returned
+    """
+    host = os.environ.get(METRICS_HOST_ENV, METRICS_HOST)
+    if not _is_loopback(host):
+        return True
+    return client_host is not None and _is_loopback(client_host)
+
+
+def _is_loopback(address):
+    if address == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(address).is_loopback
+    except ValueError:
+        # A host name, or a test client without an address
+        return False
+
+
+_lookups_counted = contextvars.ContextVar("lookups_counted", default=True)
+
+
+@contextmanager
+def uncounted_lookups():
+    """
+    Leave cache lookups made in the block out of the lookup counters.
+
+    Used by the startup warm-up, whose lookups are not traffic and would
+    skew the hit ratios.
+    """
+    token = _lookups_counted.set(False)
+    try:
+        yield
+    finally:
+        _lookups_counted.reset(token)
+
+
+def lookups_counted():
+    """Whether cache lookups in the current context should be counted."""
+    return _lookups_counted.get()
+
+
+def register_executor(name, executor):
+    """
+    Report a ThreadPoolExecutor's queued (not yet running) work items.
+
+    The executor's submit is wrapped so each work item is counted when it is
+    submitted and uncounted when a thread starts it (a cancelled item never
+    starts and is uncounted when it is cancelled).
+
+    Args:
+        name (str): Executor label value
+        executor (ThreadPoolExecutor): Executor to observe
+    """
+    submit = executor.submit
+
+    def counted_submit(fn, /, *args, **kwargs):
+        def run(*args, **kwargs):
+            EXECUTOR_QUEUE_DEPTH.dec(executor=name)
+            return fn(*args, **kwargs)
+
+        def uncount_cancelled(future):
+            if future.cancelled():
+                EXECUTOR_QUEUE_DEPTH.dec(executor=name)
+
+        EXECUTOR_QUEUE_DEPTH.inc(executor=name)
+        try:
+            future = submit(run, *args, **kwargs)
+        except RuntimeError:
+            # Executor already shut down: nothing was queued
+            EXECUTOR_QUEUE_DEPTH.dec(executor=name)
+            raise
+        future.add_done_callback(uncount_cancelled)
+        return future
+
+    executor.submit = counted_submit
+
+
+# ============================================================================
+# RAG PIPELINE METRICS
+# ============================================================================
+STAGE_LATENCY = Histogram(
+    "rag_stage_latency_seconds", "Latency of each pipeline stage", ["stage"]
+)
+TIME_TO_FIRST_TOKEN = Histogram(
+    "rag_time_to_first_token_seconds", "Time from request start to the first generated token"
+)
+SIMILARITY_SCORE = Histogram(
+    "rag_similarity_score", "Highest retrieval similarity score per query", buckets=SIMILARITY_BUCKETS
+)
+REQUESTS = Counter(
+    "rag_requests_total", "Requests by outcome (CLEAR, BANKED, AMBIGUOUS, FALLBACK, BUSY)", ["status"]
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "rag_requests_in_flight", "Chat requests currently being processed"
+)
+SEARCHES_IN_FLIGHT = Gauge(
+    "rag_searches_in_flight", "Milvus searches currently running (drives adaptive search effort)"
+)
+EXECUTOR_QUEUE_DEPTH = Gauge(
+    "rag_executor_queue_depth", "Work items waiting for an executor thread", ["executor"]
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "rag_admission_queue_depth", "Chat requests waiting for an admission slot"
+)
+DEGRADATION_LEVEL = Gauge(
+    "rag_degradation_level", "Current degradation level (0 = normal, 4 = retrieval only)"
+)
+COALESCED_REQUESTS = Counter(
+    "rag_coalesced_requests_total", "Requests served by attaching to an identical in-flight request"
+)
+LLM_CALLS_SAVED = Counter(
+    "rag_llm_calls_saved_total", "LLM calls avoided by coalescing identical requests"
+)
+LLM_CALLS = Counter(
+    "rag_llm_calls_total", "LLM call attempts by outcome (ok, error, timeout, rejected)", ["backend", "outcome"]
+)
+LLM_RETRIES = Counter(
+    "rag_llm_retries_total", "LLM calls retried after a failure", ["backend"]
+)
+LLM_HEDGES = Counter(
+    "rag_llm_hedges_total", "Hedged LLM requests by which copy answered first", ["backend", "winner"]
+)
+CIRCUIT_OPEN = Gauge(
+    "rag_llm_circuit_open", "1 while the LLM circuit breaker fails calls fast", ["backend"]
+)
+
+QUERY_CACHE_LOOKUPS = Counter(
+    "rag_query_cache_lookups_total", "Embedding and retrieval cache lookups by result (hit, miss)", ["cache", "result"]
+)
+RESPONSE_CACHE_LOOKUPS = Counter(
+    "rag_response_cache_lookups_total", "Generated-answer cache lookups by result (memory, disk, miss)", ["result"]
+)
+INTENT_DECISIONS = Counter(
+    "rag_intent_decisions_total",
+    "Intent classifications by source (rules, llm, clarification, skipped, single_call) and intent status",
+    ["source", "status"]
+)
+
+
+def record_request(record):
+    """
+    Update the pipeline metrics from a finished request's timing record.
+
+    Args:
+        record (dict): Timing record as written to the timing log
+    """
+    REQUESTS.inc(status=record["status"])
+    for stage in ("queue_wait", "intent", "retrieval", "generation", "total"):
+        value = record.get(f"{stage}_time")
+        if value:
+            STAGE_LATENCY.observe(value, stage=stage)
+    if record.get("intent_source") and record.get("intent_status"):
+        INTENT_DECISIONS.inc(source=record["intent_source"], status=record["intent_status"])
+    if record.get("ttft_time") is not None:
+        TIME_TO_FIRST_TOKEN.observe(record["ttft_time"])
+    if record.get("similarity_score") is not None:
+        SIMILARITY_SCORE.observe(record["similarity_score"])
@@ -0,0 +1,125 @@
+"""
+Single-flight coalescing of identical concurrent requests.
+
+This module handles:
+- Running one pipeline execution per key while it is in flight
+- Streaming that execution's output to every request that joined it
+- Cancelling the execution when every subscriber has gone away
+
+Chunks are cumulative (each one is the full text so far, as chatbot_router
+yields them), so a subscriber that falls behind skips to the newest chunk
+instead of buffering every intermediate one; the last chunk is always delivered.
+"""
+
+import asyncio
+
+
+class Flight:
+    """
+    One in-flight execution and its subscribers.
+    """
+
+    def __init__(self, key, chunks, registry, stats):
+        self.key = key
+        self.subscribers = 0
+        self.stats = stats         # Filled in by the execution (e.g. "llm_calls")
+        self._latest = None
+        self._version = 0
+        self._done = False
+        self._error = None
+        self._changed = asyncio.Event()
+        self._registry = registry
+        self._task = asyncio.create_task(self._pump(chunks))
+        self._task.add_done_callback(self._finish)
+
+    def _unregister(self):
+        if self._registry.get(self.key) is self:
+            del self._registry[self.key]
+
+    def _wake(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def _publish(self):
+        self._version += 1
+        self._wake()
+
+    async def _pump(self, chunks):
+        try:
+            async for chunk in chunks:
+                self._latest = chunk
+                self._publish()
+        except Exception as e:
+            self._error = e
+        finally:
+            await chunks.aclose()
+
+    def _finish(self, task):
+        # Runs even if the task was cancelled before it started
+        self._done = True
+        self._unregister()
+        # Wake subscribers without a new version, so the last chunk is not delivered twice
+        self._wake()
+
+    async def subscribe(self):
+        """
+        Stream the execution's output from its newest chunk onwards.
+
+        Yields:
+            Any: Chunks as they are produced
+
+        Raises:
+            Exception: Whatever the execution raised
+        """
+        self.subscribers += 1
+        seen = 0
+        try:
+            while True:
+                if self._version > seen and self._latest is not None:
+                    seen = self._version
+                    yield self._latest
+                    continue
+                if self._done:
+                    break
+                await self._changed.wait()
+            if self._error is not None:
+                raise self._error
+        finally:
+            self.subscribers -= 1
+            if not self.subscribers and not self._done:
+                # Nobody is listening any more (e.g. every client disconnected)
+                self._unregister()
+                self._task.cancel()
+
+
+class SingleFlight:
+    """
+    Registry of in-flight executions keyed by request identity.
+
+    Must be used from a single event loop.
+    """
+
+    def __init__(self):
+        self._flights = {}
+
+    def join(self, key, start):
+        """
+        Attach to the execution for key, starting one if none is running.
+
+        Args:
+            key (hashable): Request identity
+            start (callable): Called with the flight's stats dict; returns the async iterator to run
+
+        Returns:
+            tuple: (Flight, joined) where joined is True if the execution was already running
+        """
+        flight = self._flights.get(key)
+        if flight is not None:
+            return flight, True
+        stats = {}
+        flight = Flight(key, start(stats), self._flights, stats)
+        self._flights[key] = flight
+        return flight, False
+
+    def __len__(self):
+        return len(self._flights)
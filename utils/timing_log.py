@@ -0,0 +1,259 @@
+"""
+Append-only timing log with a background writer.
+
+This module handles:
+- Queuing timing records from the request path without blocking on disk I/O
+- Writing records as JSON Lines in batched flushes from one writer thread
+- Rotating the active segment by size or age and zstd-compressing old segments
+- Reading records back from rotated segments, the active file and the legacy JSON array
+- One file per worker process when several processes log (see api/prefork.py)
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+import time
+import queue
+import atexit
+import threading
+from datetime import datetime
+from functools import lru_cache
+
+import zstandard as zstd
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.constants import (
+    TIMING_LOG_FILE,
+    LEGACY_TIMING_LOG_FILE,
+    TIMING_LOG_QUEUE_SIZE,
+    TIMING_LOG_FLUSH_BATCH,
+    TIMING_LOG_FLUSH_INTERVAL_SECONDS,
+    TIMING_LOG_MAX_BYTES,
+    TIMING_LOG_MAX_AGE_SECONDS,
+)
+
+_STOP = object()
+
+# Set in pre-forked workers so each process appends to its own file
+_worker_tag = None
+
+
+def _segment_pattern(path):
+    """Glob pattern matching the rotated, compressed segments of a log file."""
+    base, ext = os.path.splitext(path)
+    return f"{base}.*{ext}.zst"
+
+
+class TimingLogWriter:
+    """
+    Background JSON Lines writer fed from a bounded queue.
+
+    write() only enqueues the record, so its cost on the request path is
+    constant. Records are serialised and written by the writer thread; if the
+    queue is full the record is dropped and counted rather than blocking.
+    Records must not be mutated after they are passed to write().
+    """
+
+    def __init__(self, path=TIMING_LOG_FILE, max_bytes=TIMING_LOG_MAX_BYTES,
+                 max_age_seconds=TIMING_LOG_MAX_AGE_SECONDS,
+                 flush_interval=TIMING_LOG_FLUSH_INTERVAL_SECONDS,
+                 flush_batch=TIMING_LOG_FLUSH_BATCH, queue_size=TIMING_LOG_QUEUE_SIZE):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self.dropped = 0
+        self.written = 0
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._file = None
+        self._opened_at = 0.0
+        self._thread = threading.Thread(target=self._run, name="timing-log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, record):
+        """
+        Queue one record for writing.
+
+        Args:
+            record (dict): JSON-serialisable timing record
+        """
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout=5.0):
+        """Write everything still queued and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        # Segment age counts from when this process opened it
+        self._opened_at = time.time()
+
+    def _should_rotate(self):
+        if not self._file.tell():
+            return False
+        return (self._file.tell() >= self.max_bytes
+                or time.time() - self._opened_at >= self.max_age_seconds)
+
+    def _rotate(self):
+        """Close the active segment, compress it and start a new one."""
+        self._file.close()
+        base, ext = os.path.splitext(self.path)
+        rotated = f"{base}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}{ext}"
+        os.replace(self.path, rotated)
+
+        compressor = zstd.ZstdCompressor(level=10)
+        with open(rotated, "rb") as src, open(rotated + ".zst", "wb") as dst:
+            compressor.copy_stream(src, dst)
+        os.remove(rotated)
+        self._open()
+
+    def _flush(self, records):
+        lines = []
+        for record in records:
+            try:
+                lines.append(json.dumps(record, default=str))
+            except (TypeError, ValueError) as e:
+                print(f"⚠️  Failed to serialise timing record: {e}")
+        if lines:
+            self._file.write("\n".join(lines) + "\n")
+            self._file.flush()
+            self.written += len(lines)
+        if self._should_rotate():
+            self._rotate()
+
+    def _run(self):
+        self._open()
+        stopping = False
+        while not stopping:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if self._should_rotate():
+                    self._rotate()
+                continue
+
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            item = first
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.flush_batch:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+
+            try:
+                self._flush(batch)
+            except OSError as e:
+                print(f"⚠️  Failed to write timing log: {e}")
+        self._file.close()
+
+
+def _worker_path(path, tag):
+    base, ext = os.path.splitext(path)
+    return f"{base}.{tag}{ext}"
+
+
+def set_worker_index(index, generation=0):
+    """
+    Make this process write to its own files, e.g. timing_log.w3g1.jsonl.
+
+    Several processes appending to and rotating one file would interleave
+    and lose records; read_timing_records merges the per-worker files. The
+    generation keeps a reloaded worker off the file of the worker it replaces,
+    which keeps writing until its in-flight requests finish.
+
+    Args:
+        index (int): Worker number
+        generation (int): Reload generation the worker was started in
+    """
+    global _worker_tag
+    _worker_tag = f"w{index}g{generation}"
+    get_timing_writer.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def get_timing_writer(path=TIMING_LOG_FILE):
+    """
+    Return the process-wide writer for a log file, starting it on first use.
+
+    Args:
+        path (str): JSON Lines file to append to
+
+    Returns:
+        TimingLogWriter: Writer for the file (or this worker's copy of it)
+    """
+    return TimingLogWriter(_worker_path(path, _worker_tag) if _worker_tag else path)
+
+
+# The writer thread does not survive fork(); children start their own writer
+os.register_at_fork(after_in_child=get_timing_writer.cache_clear)
+
+
+def read_timing_records(path=TIMING_LOG_FILE, legacy_path=LEGACY_TIMING_LOG_FILE):
+    """
+    Load every timing record, oldest first.
+
+    Reads the legacy JSON array (if present), then rotated .zst segments in
+    rotation order, then the active JSON Lines file and any per-worker files.
+    A truncated last line (e.g. from a crash mid-write) is skipped. When
+    per-worker files exist, records are merged by their "timestamp" field.
+
+    Args:
+        path (str): Active JSON Lines file
+        legacy_path (str): Legacy JSON array file, or None to skip it
+
+    Returns:
+        list: Timing records
+    """
+    records = []
+
+    if legacy_path and os.path.exists(legacy_path):
+        with open(legacy_path, "r") as f:
+            records.extend(json.load(f))
+
+    def parse_lines(lines):
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+
+    decompressor = zstd.ZstdDecompressor()
+    for segment in sorted(glob.glob(_segment_pattern(path))):
+        with open(segment, "rb") as f:
+            parse_lines(decompressor.decompressobj().decompress(f.read()).decode("utf-8").splitlines())
+
+    base, ext = os.path.splitext(path)
+    worker_file = re.compile(re.escape(base) + r"\.w\d+(?:g\d+)?" + re.escape(ext) + "$")
+    worker_files = sorted(p for p in glob.glob(f"{base}.w*{ext}") if worker_file.match(p))
+
+    for active in [path] + worker_files:
+        if os.path.exists(active):
+            with open(active, "r", encoding="utf-8") as f:
+                parse_lines(f)
+
+    if worker_files and all("timestamp" in record for record in records):
+        records.sort(key=lambda record: record["timestamp"])
+
+    return records
@@ -0,0 +1,236 @@
+"""
+Lightweight in-process request tracing.
+
+This module handles:
+- A trace and request id per chat request
+- Nested spans timed with perf_counter_ns and tracked through contextvars
+- Carrying the active span into executor threads
+- Exporting finished traces as OTLP/JSON lines through the background log writer
+
+Each exported line is an OTLP ExportTraceServiceRequest, so the file can be
+replayed into an OpenTelemetry collector or read with timing/analyze_traces.py.
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import functools
+import contextvars
+from contextlib import contextmanager
+
+# Add parent directory to path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.constants import TRACE_LOG_FILE, TRACE_SERVICE_NAME
+from utils.timing_log import get_timing_writer
+
+# perf_counter_ns is monotonic but has no epoch; this maps it onto Unix time once
+_EPOCH_OFFSET_NS = time.time_ns() - time.perf_counter_ns()
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Trace:
+    """
+    All spans recorded for one request.
+    """
+
+    def __init__(self, request_id=None):
+        self.trace_id = uuid.uuid4().hex
+        self.request_id = request_id or self.trace_id[:12]
+        self.spans = []
+
+
+class Span:
+    """
+    One timed stage of a request.
+
+    Spans without a trace (created outside start_trace) are timed but never exported.
+    """
+
+    def __init__(self, trace, name, parent=None, attributes=None):
+        self.trace = trace
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = dict(attributes or {})
+        self.events = []
+        self.error = None
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns = None
+        if trace is not None:
+            trace.spans.append(self)
+
+    def set_attribute(self, key, value):
+        """Attach an attribute to the span."""
+        self.attributes[key] = value
+
+    def add_event(self, name, **attributes):
+        """Record a point-in-time event, e.g. the first generated token."""
+        self.events.append((name, time.perf_counter_ns(), attributes))
+
+    def end(self):
+        """Stop the span's clock (idempotent)."""
+        if self.end_ns is None:
+            self.end_ns = time.perf_counter_ns()
+
+    @property
+    def duration_s(self):
+        """Elapsed seconds; measured up to now if the span is still open."""
+        return ((self.end_ns or time.perf_counter_ns()) - self.start_ns) / 1e9
+
+    def to_otlp(self):
+        """
+        Convert the span to OTLP/JSON.
+
+        Returns:
+            dict: OTLP span object
+        """
+        otlp = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns + _EPOCH_OFFSET_NS),
+            "endTimeUnixNano": str((self.end_ns or self.start_ns) + _EPOCH_OFFSET_NS),
+            "attributes": _otlp_attributes(self.attributes),
+            "events": [
+                {"timeUnixNano": str(t + _EPOCH_OFFSET_NS), "name": name, "attributes": _otlp_attributes(attrs)}
+                for name, t, attrs in self.events
+            ],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            otlp["parentSpanId"] = self.parent_id
+        return otlp
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, str):
+        return {"stringValue": value}
+    return {"stringValue": json.dumps(value, default=str)}
+
+
+def _otlp_attributes(attributes):
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+def _export(trace):
+    """Queue a finished trace for the background writer as one OTLP/JSON line."""
+    get_timing_writer(TRACE_LOG_FILE).write({
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": TRACE_SERVICE_NAME})},
+            "scopeSpans": [{
+                "scope": {"name": "utils.tracing"},
+                "spans": [span.to_otlp() for span in trace.spans],
+            }],
+        }]
+    })
+
+
+def current_span():
+    """
+    Return the span active in this context.
+
+    Returns:
+        Span or None: Active span
+    """
+    return _current_span.get()
+
+
+@contextmanager
+def start_trace(name, request_id=None, **attributes):
+    """
+    Start a new trace with a root span and export it when the block exits.
+
+    Args:
+        name (str): Root span name
+        request_id (str, optional): Request id; generated if omitted
+        **attributes: Root span attributes
+
+    Yields:
+        Span: The root span (its .trace holds the request id)
+    """
+    trace = Trace(request_id)
+    root = Span(trace, name, attributes={"request.id": trace.request_id, **attributes})
+    previous = _current_span.get()
+    _current_span.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.error = type(e).__name__
+        raise
+    finally:
+        root.end()
+        # Restore by value, not token: async generators may resume in another context
+        _current_span.set(previous)
+        _export(trace)
+
+
+@contextmanager
+def span(name, parent=None, **attributes):
+    """
+    Time a nested stage.
+
+    The parent defaults to the span active in this context. Async generators
+    that yield inside a trace should pass the parent explicitly, since the
+    consumer may resume them in a different context.
+
+    Args:
+        name (str): Span name
+        parent (Span, optional): Parent span
+        **attributes: Span attributes
+
+    Yields:
+        Span: The new span
+    """
+    parent = parent or _current_span.get()
+    child = Span(parent.trace if parent else None, name, parent, attributes)
+    previous = _current_span.get()
+    _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.error = type(e).__name__
+        raise
+    finally:
+        child.end()
+        _current_span.set(previous)
+
+
+async def run_in_executor(func, *args, executor=None):
+    """
+    Run a blocking call in an executor with the caller's context (and active span).
+
+    loop.run_in_executor does not copy contextvars, so spans opened inside
+    func would otherwise lose their parent.
+
+    Args:
+        func (callable): Blocking function
+        *args: Positional arguments for func
+        executor (Executor, optional): Executor to use (default: the loop's)
+
+    Returns:
+        Any: func's return value
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(executor, functools.partial(ctx.run, func, *args))
+
+
+def submit_with_context(executor, func, *args, **kwargs):
+    """
+    Submit func to a concurrent.futures executor with the caller's context.
+
+    Returns:
+        Future: The submitted future
+    """
+    return executor.submit(contextvars.copy_context().run, func, *args, **kwargs)